@@ -0,0 +1,149 @@
+"""
+Leitura e escrita em fluxo dos arquivos de lote (api/tasks.py).
+
+A entrada é lida aos pedaços: CSV com pandas em blocos de LEITURA_LINHAS
+linhas e XLSX com o openpyxl em modo read-only, linha a linha. Os
+resultados são gravados à medida que saem do detector, no formato pedido
+pelo job:
+
+    - json (padrão): lista, no mesmo formato de json.dump(..., indent=2)
+    - jsonl: um objeto por linha
+    - csv: colunas de COLUNAS_SAIDA; findings como JSON
+    - parquet: grupos de PARQUET_LINHAS_POR_GRUPO linhas (requer pyarrow)
+
+Nenhum dos lados guarda o arquivo inteiro em memória: o pico de memória
+depende do tamanho do bloco, não do arquivo.
+"""
+
+import csv
+import json
+import os
+import textwrap
+from typing import Dict, Iterable, Iterator, Tuple
+
+import pandas as pd
+
+FORMATOS_SAIDA = ("json", "jsonl", "csv", "parquet")
+TIPOS_MIDIA = {
+    "json": "application/json",
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUNAS_SAIDA = ("linha", "texto", "is_pii", "nivel_risco", "confianca", "findings")
+LEITURA_LINHAS = 1000           # Linhas por bloco lido do CSV
+PARQUET_LINHAS_POR_GRUPO = 1000  # Linhas por row group do Parquet
+
+
+def _texto(registro) -> object:
+    return registro.get('texto') or registro.get('Texto') or str(registro)
+
+
+def _linhas_csv(arquivo_path: str) -> Iterator[Tuple[int, object]]:
+    # Blocos com índice contínuo: o índice do pandas segue de um bloco para o outro
+    for bloco in pd.read_csv(arquivo_path, chunksize=LEITURA_LINHAS):
+        for idx, row in bloco.iterrows():
+            yield idx, _texto(row)
+
+
+def _linhas_xlsx(arquivo_path: str) -> Iterator[Tuple[int, object]]:
+    try:
+        from openpyxl import load_workbook
+        livro = load_workbook(arquivo_path, read_only=True, data_only=True)
+    except Exception:  # .xls (formato antigo) ou openpyxl ausente: lê tudo com o pandas
+        for idx, row in pd.read_excel(arquivo_path).iterrows():
+            yield idx, _texto(row)
+        return
+    try:
+        linhas = livro.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [
+            str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(next(linhas, ()) or ())
+        ]
+        for idx, valores in enumerate(linhas):
+            if all(v is None for v in valores):
+                continue
+            yield idx, _texto(pd.Series(dict(zip(cabecalho, valores)), dtype=object))
+    finally:
+        livro.close()
+
+
+def ler_linhas_lote(arquivo_path: str, tipo_arquivo: str) -> Iterator[Tuple[int, object]]:
+    """(índice, texto) de cada linha do arquivo, na ordem, sem carregá-lo inteiro."""
+    if tipo_arquivo == 'csv':
+        return _linhas_csv(arquivo_path)
+    if tipo_arquivo == 'xlsx':
+        return _linhas_xlsx(arquivo_path)
+    raise ValueError('Tipo de arquivo não suportado')
+
+
+def caminho_saida(arquivo_path: str, formato: str) -> str:
+    return f"{arquivo_path}.resultado.{formato}"
+
+
+def tipo_midia(caminho: str) -> str:
+    return TIPOS_MIDIA.get(os.path.splitext(caminho)[1].lstrip("."), "application/octet-stream")
+
+
+def _gravar_json(itens: Iterable[Dict], saida_path: str) -> None:
+    with open(saida_path, 'w', encoding='utf-8') as f:
+        separador = "[\n"
+        for item in itens:
+            f.write(separador)
+            f.write(textwrap.indent(json.dumps(item, ensure_ascii=False, indent=2), "  "))
+            separador = ",\n"
+        f.write("[]" if separador == "[\n" else "\n]")
+
+
+def _gravar_jsonl(itens: Iterable[Dict], saida_path: str) -> None:
+    with open(saida_path, 'w', encoding='utf-8') as f:
+        for item in itens:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+def _linha_tabular(item: Dict) -> Dict:
+    return {**{c: item.get(c) for c in COLUNAS_SAIDA}, "findings": json.dumps(item.get("findings") or [], ensure_ascii=False)}
+
+
+def _gravar_csv(itens: Iterable[Dict], saida_path: str) -> None:
+    with open(saida_path, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS_SAIDA)
+        escritor.writeheader()
+        for item in itens:
+            escritor.writerow(_linha_tabular(item))
+
+
+def _gravar_parquet(itens: Iterable[Dict], saida_path: str) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Saída parquet requer o pacote pyarrow")
+    esquema = pa.schema([
+        ("linha", pa.int64()), ("texto", pa.string()), ("is_pii", pa.bool_()),
+        ("nivel_risco", pa.string()), ("confianca", pa.float64()), ("findings", pa.string()),
+    ])
+
+    def grupo_de(linhas):
+        return pa.Table.from_pylist(linhas, schema=esquema)
+
+    with pq.ParquetWriter(saida_path, esquema) as escritor:
+        grupo = []
+        for item in itens:
+            linha = _linha_tabular(item)
+            linha["texto"] = None if linha["texto"] is None else str(linha["texto"])
+            grupo.append(linha)
+            if len(grupo) >= PARQUET_LINHAS_POR_GRUPO:
+                escritor.write_table(grupo_de(grupo))
+                grupo = []
+        if grupo:
+            escritor.write_table(grupo_de(grupo))
+
+
+_ESCRITORES = {"json": _gravar_json, "jsonl": _gravar_jsonl, "csv": _gravar_csv, "parquet": _gravar_parquet}
+
+
+def gravar_resultados(itens: Iterable[Dict], saida_path: str, formato: str = "json") -> None:
+    """Grava os resultados à medida que `itens` os produz."""
+    if formato not in _ESCRITORES:
+        raise ValueError(f"formato_saida deve ser um de {FORMATOS_SAIDA}, recebido: {formato!r}")
+    _ESCRITORES[formato](itens, saida_path)
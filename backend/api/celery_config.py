@@ -15,6 +15,15 @@ CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:63
 celery_app = Celery('backend', broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
 celery_app.conf.task_track_started = True
 celery_app.conf.result_expires = 3600
+# O worker_process_init carrega e aquece o detector (dezenas de segundos);
+# com o padrão de 4s o Celery mataria o processo filho antes de ele ficar pronto
+celery_app.conf.worker_proc_alive_timeout = float(os.getenv("PII_LOTE_INIT_TIMEOUT", "300"))
+# Jobs de lote confirmam a mensagem só no fim (acks_late). No Redis, mensagem
+# não confirmada volta para a fila depois do visibility_timeout: ele precisa
+# ser maior que o trecho mais demorado, senão o trecho roda em dobro
+celery_app.conf.broker_transport_options = {
+    "visibility_timeout": int(os.getenv("PII_LOTE_VISIBILITY_TIMEOUT", str(6 * 3600))),
+}
 
 # Importa tasks para registrar (com fallback para HF Spaces)
 try:
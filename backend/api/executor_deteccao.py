@@ -0,0 +1,209 @@
+"""
+Pool de execução do detector para os endpoints assíncronos.
+
+A detecção é CPU-bound (regex, NER, Presidio) e não pode rodar no event
+loop: uma requisição pesada travaria todas as outras do worker, inclusive
+o /health do healthcheck. Os endpoints entregam a detecção a este pool e
+esperam o resultado com await.
+
+O pool é limitado: no máximo `workers` detecções rodando e `max_fila`
+esperando. Com tudo ocupado, executar() levanta ExecutorSaturado na hora
+(o endpoint responde 503 com Retry-After) em vez de acumular requisições
+que só terminariam depois do timeout do cliente. Fluxos longos
+(/analyze/stream) usam `esperar=True`: aguardam vaga, sem serem recusados
+no meio.
+
+Tipos (PII_DETECT_EXECUTOR):
+    - thread (padrão): threads no mesmo processo; o PyTorch e as regex
+      compiladas liberam o GIL na maior parte do trabalho
+    - process: processos filhos; isola o GIL ao custo de memória e de
+      serializar a entrada e o resultado de cada chamada. Os filhos nascem
+      por forkserver (spawn onde não há) e não por fork: um fork da API já
+      rodando herdaria pools de threads mortos (ex.: o das etapas paralelas
+      do detector, PII_PARALLEL_STAGES) e travaria. Cada filho monta o
+      próprio detector no `inicializador`; as funções entregues ao pool
+      precisam ser de módulo (picklable) e importáveis sem a API
+      (api/worker_deteccao.py)
+
+Métricas (metricas()): ocupação, fila, recusas e tempos de espera/execução
+(p50/p95) das últimas JANELA_METRICAS chamadas.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+TIPOS_EXECUTOR = ("thread", "process")
+JANELA_METRICAS = 512    # Chamadas consideradas nos percentis
+RETRY_AFTER_MAX = 60     # Segundos (teto do Retry-After sugerido)
+
+
+class ExecutorSaturado(Exception):
+    """Pool e fila cheios; `retry_after` sugere quando tentar de novo (segundos)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Executor de detecção saturado; tente novamente em {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _cronometrar(funcao: Callable, args: tuple, kwargs: dict) -> tuple:
+    # Roda no worker: devolve início e fim (relógio de parede, comparável entre processos)
+    inicio = time.time()
+    resultado = funcao(*args, **kwargs)
+    return inicio, time.time(), resultado
+
+
+def _percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+class ExecutorDeteccao:
+    """Pool limitado (threads ou processos) com fila máxima e métricas."""
+
+    def __init__(self, workers: int, max_fila: int, tipo: str = "thread",
+                 inicializador: Optional[Callable] = None, args_inicializador: tuple = ()):
+        if tipo not in TIPOS_EXECUTOR:
+            raise ValueError(f"tipo deve ser um de {TIPOS_EXECUTOR}, recebido: {tipo!r}")
+        self.tipo = tipo
+        self.workers = max(1, workers)
+        self.max_fila = max(0, max_fila)
+        # Roda uma vez em cada processo filho (modo process) antes da primeira chamada
+        self._inicializador = inicializador
+        self._args_inicializador = args_inicializador
+        self._pool = self._criar_pool()
+        self._vagas: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._aguardando = 0
+        self._concluidas = 0
+        self._rejeitadas = 0
+        self._falhas = 0
+        self._esperas: deque = deque(maxlen=JANELA_METRICAS)
+        self._duracoes: deque = deque(maxlen=JANELA_METRICAS)
+
+    @classmethod
+    def de_env(cls, inicializador: Optional[Callable] = None, args_inicializador: tuple = ()) -> "ExecutorDeteccao":
+        """Executor configurado por PII_DETECT_EXECUTOR, PII_DETECT_WORKERS e PII_DETECT_QUEUE_MAX."""
+        tipo = os.getenv("PII_DETECT_EXECUTOR", "thread").strip().lower()
+        workers = int(os.getenv("PII_DETECT_WORKERS", str(min(4, os.cpu_count() or 1))))
+        max_fila = int(os.getenv("PII_DETECT_QUEUE_MAX", str(8 * max(1, workers))))
+        return cls(workers, max_fila, tipo, inicializador, args_inicializador)
+
+    @property
+    def capacidade(self) -> int:
+        return self.workers + self.max_fila
+
+    def _criar_pool(self):
+        if self.tipo == "process":
+            metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            return ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context(metodo),
+                initializer=self._inicializador,
+                initargs=self._args_inicializador,
+            )
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="deteccao")
+
+    def _semaforo(self) -> asyncio.Semaphore:
+        # Criado no primeiro uso, dentro do event loop que atende as requisições
+        if self._vagas is None:
+            self._vagas = asyncio.Semaphore(self.capacidade)
+        return self._vagas
+
+    def saturado(self) -> bool:
+        """Pool e fila cheios: uma chamada sem `esperar` seria recusada."""
+        with self._lock:
+            return self._pendentes + self._aguardando >= self.capacidade
+
+    def retry_after(self) -> int:
+        """Segundos até a fila andar, estimados pela duração média recente."""
+        with self._lock:
+            duracoes = list(self._duracoes)
+            pendentes = self._pendentes + self._aguardando
+        media = sum(duracoes) / len(duracoes) if duracoes else 1.0
+        return max(1, min(RETRY_AFTER_MAX, math.ceil(media * pendentes / self.workers)))
+
+    async def executar(self, funcao: Callable, *args, esperar: bool = False, **kwargs) -> Any:
+        """Roda `funcao(*args, **kwargs)` no pool e devolve o resultado.
+
+        Sem `esperar`, levanta ExecutorSaturado se não houver vaga; com
+        `esperar`, aguarda a vaga (a espera entra na métrica de espera).
+        """
+        vagas = self._semaforo()
+        if not esperar and vagas.locked():
+            with self._lock:
+                self._rejeitadas += 1
+            raise ExecutorSaturado(self.retry_after())
+
+        enviado = time.time()
+        with self._lock:
+            self._aguardando += 1
+        try:
+            await vagas.acquire()
+        except BaseException:
+            with self._lock:
+                self._aguardando -= 1
+            raise
+        with self._lock:
+            self._aguardando -= 1
+            self._pendentes += 1
+        try:
+            loop = asyncio.get_running_loop()
+            inicio, fim, resultado = await loop.run_in_executor(self._pool, _cronometrar, funcao, args, kwargs)
+        except BrokenProcessPool:
+            # Um filho morreu (OOM, sinal): o pool inteiro fica inutilizável
+            with self._lock:
+                self._falhas += 1
+            self._pool = self._criar_pool()
+            raise
+        except BaseException:
+            with self._lock:
+                self._falhas += 1
+            raise
+        finally:
+            with self._lock:
+                self._pendentes -= 1
+            vagas.release()
+        with self._lock:
+            self._concluidas += 1
+            self._esperas.append(max(0.0, inicio - enviado))
+            self._duracoes.append(fim - inicio)
+        return resultado
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            esperas = list(self._esperas)
+            duracoes = list(self._duracoes)
+            pendentes = self._pendentes
+            metricas = {
+                "tipo": self.tipo,
+                "workers": self.workers,
+                "max_fila": self.max_fila,
+                "em_execucao": min(pendentes, self.workers),
+                "na_fila": max(0, pendentes - self.workers),
+                "aguardando_vaga": self._aguardando,
+                "concluidas": self._concluidas,
+                "rejeitadas": self._rejeitadas,
+                "falhas": self._falhas,
+            }
+        metricas.update({
+            "espera_ms_p50": round(_percentil(esperas, 0.50) * 1000, 1),
+            "espera_ms_p95": round(_percentil(esperas, 0.95) * 1000, 1),
+            "espera_ms_max": round(max(esperas, default=0.0) * 1000, 1),
+            "execucao_ms_p50": round(_percentil(duracoes, 0.50) * 1000, 1),
+            "execucao_ms_p95": round(_percentil(duracoes, 0.95) * 1000, 1),
+        })
+        return metricas
+
+    def encerrar(self, esperar: bool = True) -> None:
+        self._pool.shutdown(wait=esperar, cancel_futures=not esperar)
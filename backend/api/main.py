@@ -6,9 +6,14 @@ de Dados) e LAI (Lei de Acesso à Informação).
 
 Endpoints:
     POST /analyze: Analisa texto para detecção de PII
+    POST /analyze/stream: Analisa NDJSON/CSV em fluxo, um resultado NDJSON por item
+    GET /explain/{analysis_id}: Explicações (XAI) de uma análise feita sem explain
     GET /health: Verifica status da API
+    GET /cache/stats: Métricas do cache de resultados
+    GET /executor/stats: Ocupação e latência do executor de detecção
     POST /api/lote: Enfileira processamento de lote (CSV/XLSX)
     GET /api/lote/status/{job_id}: Consulta status do processamento de lote
+    GET /api/lote/progresso/{job_id}: Acompanha o progresso do lote (Server-Sent Events)
     GET /api/lote/download/{job_id}: Faz download do resultado do lote
 
 Contexto:
@@ -49,27 +54,48 @@ try:
 except ImportError:
     pass
 
-from typing import Dict, Optional, List
+from typing import Dict, Literal, Optional, List
 from fastapi import FastAPI, UploadFile, File, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uuid
 
 # Imports com fallback para HF Spaces (sem prefixo 'backend.')
 try:
     from backend.api.celery_config import celery_app
-    from backend.src.detector import PIIDetector
+    from backend.api.tasks import processar_lote
+    from backend.api.arquivos_lote import tipo_midia
+    from backend.api.progresso_lote import progresso_job, registrar_envio
+    from backend.src.servidor_modelos import detector_do_ambiente, ServidorModelosIndisponivel
+    from backend.src.cache_resultados import CacheMemoria
+    from backend.src.contexto_explicacao import recortar, remontar
+    from backend.api.respostas import compactar_resultado, formato_resposta, resposta_json, serializar, VERSAO_COMPACTA
+    from backend.api.streaming import analisar_em_fluxo, itens_csv, itens_ndjson, ler_linhas, RespostaFullDuplex
+    from backend.api.executor_deteccao import ExecutorDeteccao, ExecutorSaturado
+    from backend.api import worker_deteccao
 except ModuleNotFoundError:
     from api.celery_config import celery_app
-    from src.detector import PIIDetector
+    from api.tasks import processar_lote
+    from api.arquivos_lote import tipo_midia
+    from api.progresso_lote import progresso_job, registrar_envio
+    from src.servidor_modelos import detector_do_ambiente, ServidorModelosIndisponivel
+    from src.cache_resultados import CacheMemoria
+    from src.contexto_explicacao import recortar, remontar
+    from api.respostas import compactar_resultado, formato_resposta, resposta_json, serializar, VERSAO_COMPACTA
+    from api.streaming import analisar_em_fluxo, itens_csv, itens_ndjson, ler_linhas, RespostaFullDuplex
+    from api.executor_deteccao import ExecutorDeteccao, ExecutorSaturado
+    from api import worker_deteccao
 
 from celery.result import AsyncResult
 import json
+import asyncio
 import threading
 from datetime import datetime
 import shutil
 import atexit
+from contextlib import aclosing
 from collections import defaultdict
 import time
 
@@ -82,6 +108,13 @@ RATE_LIMIT_REQUESTS = 300  # Máximo de requisições por minuto
 RATE_LIMIT_WINDOW = 60     # Janela de tempo em segundos (1 minuto)
 MIN_TEXT_LENGTH = 10       # Comprimento mínimo do texto para análise válida
 MAX_BATCH_SIZE = 200       # Máximo de itens por requisição batch
+DETECT_BATCH_SIZE = int(os.getenv("PII_DETECT_BATCH_SIZE", "16"))  # Textos por lote enviado aos modelos NER
+EXPLAIN_CACHE_ITENS = int(os.getenv("PII_EXPLAIN_CACHE_ITENS", "1024"))  # Análises guardadas para GET /explain
+EXPLAIN_TTL = float(os.getenv("PII_EXPLAIN_TTL", "900"))                 # Segundos até a análise expirar
+# Itens lidos e ainda não analisados em /analyze/stream (backpressure na leitura do corpo)
+STREAM_MAX_PENDENTES = int(os.getenv("PII_STREAM_MAX_PENDENTES", str(4 * DETECT_BATCH_SIZE)))
+# Caracteres por linha (e por registro CSV) em /analyze/stream; acima disso o item vira erro
+STREAM_MAX_LINHA = int(os.getenv("PII_STREAM_MAX_LINHA", "1000000"))
 
 # Armazena contagem de requisições por IP: {ip: [(timestamp, count), ...]}
 rate_limit_store: Dict[str, list] = defaultdict(list)
@@ -508,51 +541,116 @@ app.add_middleware(
 import os
 usar_gpu = os.getenv("PII_USAR_GPU", "True").lower() == "true"
 use_llm_arbitration = os.getenv("PII_USE_LLM_ARBITRATION", "False").lower() == "true"
-detector = PIIDetector(
-    usar_gpu=usar_gpu,
-    use_llm_arbitration=use_llm_arbitration
-)
+# Cache de resultados: o frontend reenvia o mesmo texto em recargas/trocas de filtro
+usar_cache = os.getenv("PII_CACHE", "True").lower() == "true"
+# Com PII_MODEL_SERVER, cliente do servidor de modelos (src/servidor_modelos.py):
+# os modelos ficam carregados uma vez no servidor, não neste processo
+configuracao_detector = {
+    "usar_gpu": usar_gpu,
+    "use_llm_arbitration": use_llm_arbitration,
+    "result_cache": usar_cache,
+}
+detector = detector_do_ambiente(**configuracao_detector)
+worker_deteccao.usar_detector(detector)
 
 
 
 from src.confidence.combiners import merge_spans_custom
 
+# Análises respondidas sem explicação: registros compactos + janelas de contexto
+# de cada finding (não o texto inteiro), por analysis_id. GET /explain/{analysis_id}
+# gera as explicações a partir daqui, sem nova detecção. Memória do processo:
+# com vários workers do uvicorn, /explain só acha a análise no worker que a fez.
+analises_para_explicar = CacheMemoria(max_itens=EXPLAIN_CACHE_ITENS, ttl=EXPLAIN_TTL)
+
+# Pool limitado que roda a detecção fora do event loop (PII_DETECT_EXECUTOR,
+# PII_DETECT_WORKERS, PII_DETECT_QUEUE_MAX). Pool e fila cheios -> 503.
+# No modo process cada filho monta o próprio detector com a mesma configuração.
+executor_deteccao = ExecutorDeteccao.de_env(worker_deteccao.inicializar, (configuracao_detector,))
+logging.info(
+    f"⚙️ Executor de detecção: {executor_deteccao.tipo} | "
+    f"workers={executor_deteccao.workers} | fila={executor_deteccao.max_fila}"
+)
 
-def analyze_single_text(text: str, request_id: Optional[str] = None, force_llm: bool = False, merge_preset: str = "f1") -> Dict:
-    """
-    Função auxiliar para analisar um único texto.
-    Usada tanto pelo /analyze quanto pelo /analyze/batch.
-    
-    Args:
-        text: Texto a ser analisado
-        request_id: ID opcional da requisição
-        force_llm: Forçar uso do árbitro LLM
-        merge_preset: Estratégia de merge de spans
-    
-    Returns:
-        Dict com resultado da análise no formato padrão
+
+# Funções entregues ao executor: de api/worker_deteccao.py (importável pelos
+# filhos do modo process sem carregar a API) e só com detecção; o resto
+# (analysis_id, formatação) fica no processo da API.
+_detectar = worker_deteccao.detectar
+_detectar_muitos = worker_deteccao.detectar_muitos
+_explicar = worker_deteccao.explicar
+
+
+def _resposta_saturado(retry_after: int):
+    """503 quando o executor de detecção está com pool e fila cheios."""
+    from fastapi.responses import JSONResponse
+    logging.warning(f"🚦 Executor de detecção saturado | Retry-After: {retry_after}s")
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "detector_busy",
+            "message": "Detector ocupado: fila de análises cheia. Tente novamente em breve.",
+            "retry_after": retry_after
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+@app.exception_handler(ServidorModelosIndisponivel)
+async def _resposta_servidor_modelos_indisponivel(request: Request, exc: ServidorModelosIndisponivel):
+    """503 quando o servidor de modelos (PII_MODEL_SERVER) não responde no PII_MODEL_SERVER_TIMEOUT."""
+    from fastapi.responses import JSONResponse
+    retry_after = executor_deteccao.retry_after()
+    logging.warning(f"🔌 {exc} | Retry-After: {retry_after}s")
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "model_server_unavailable",
+            "message": "Servidor de modelos sem resposta. Tente novamente em breve.",
+            "retry_after": retry_after
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def _resultado_texto_curto(request_id: Optional[str], text_length: int) -> Dict:
+    """Resultado padrão para textos abaixo de MIN_TEXT_LENGTH (não passam pelo detector)."""
+    return {
+        "id": request_id,
+        "analysis_id": None,
+        "has_pii": False,
+        "entities": [],
+        "risk_level": "BAIXO",
+        "confidence_all_found": 1.0,
+        "total_entities": 0,
+        "sources_used": [],
+        "classificacao": "PÚBLICO",
+        "risco": "BAIXO",
+        "confianca": 1.0,
+        "detalhes": [],
+        "_warning": f"Texto muito curto ({text_length} caracteres). Mínimo: {MIN_TEXT_LENGTH} caracteres.",
+        "_valid_for_stats": False
+    }
+
+
+def _registrar_para_explicacao(text: str, deteccao: tuple) -> Optional[str]:
+    """Guarda findings sem explicação e o contexto em volta de cada um; devolve o analysis_id.
+
+    None se não há findings. O texto da manifestação não é guardado, só as
+    janelas que a explicação lê (src/contexto_explicacao.py).
     """
-    # Validação de texto mínimo
-    text_length = len(text.strip()) if text else 0
-    if text_length < MIN_TEXT_LENGTH:
-        return {
-            "id": request_id,
-            "has_pii": False,
-            "entities": [],
-            "risk_level": "BAIXO",
-            "confidence_all_found": 1.0,
-            "total_entities": 0,
-            "sources_used": [],
-            "classificacao": "PÚBLICO",
-            "risco": "BAIXO",
-            "confianca": 1.0,
-            "detalhes": [],
-            "_warning": f"Texto muito curto ({text_length} caracteres). Mínimo: {MIN_TEXT_LENGTH} caracteres.",
-            "_valid_for_stats": False
-        }
-    
-    # Executa detecção usando detector híbrido
-    has_pii, findings, risco, confianca = detector.detect(text, force_llm=force_llm)
+    findings = deteccao[1]
+    if not findings or all("explicacao" in f for f in findings):
+        return None
+    analysis_id = uuid.uuid4().hex
+    analises_para_explicar.guardar(analysis_id, {"findings": findings, "janelas": recortar(text, findings)})
+    return analysis_id
+
+
+def _formatar_resultado(request_id: Optional[str], deteccao: tuple, merge_preset: str = "f1",
+                        analysis_id: Optional[str] = None) -> Dict:
+    """Monta o resultado no formato padrão da API a partir da tupla de detect()."""
+    has_pii, findings, risco, confianca = deteccao
     
     # Estratégias de merge (mantido para compatibilidade)
     if findings:
@@ -574,6 +672,7 @@ def analyze_single_text(text: str, request_id: Optional[str] = None, force_llm:
     
     return {
         "id": request_id,
+        "analysis_id": analysis_id,
         "has_pii": has_pii,
         "entities": findings,
         "risk_level": risco,
@@ -588,6 +687,104 @@ def analyze_single_text(text: str, request_id: Optional[str] = None, force_llm:
     }
 
 
+def analyze_single_text(text: str, request_id: Optional[str] = None, force_llm: bool = False, merge_preset: str = "f1",
+                        mode: str = "full", explain: bool = False) -> Dict:
+    """
+    Função auxiliar para analisar um único texto.
+    Usada pelo /analyze (o /analyze/batch usa analyze_many_texts).
+    
+    Args:
+        text: Texto a ser analisado
+        request_id: ID opcional da requisição
+        force_llm: Forçar uso do árbitro LLM
+        merge_preset: Estratégia de merge de spans
+        mode: "full" ou "classify" (só has_pii/classificacao, ver PIIDetector.detect)
+        explain: Incluir a explicação (XAI) de cada entidade; sem ela a resposta
+            traz um analysis_id para GET /explain/{analysis_id}
+    
+    Returns:
+        Dict com resultado da análise no formato padrão
+    """
+    # Validação de texto mínimo
+    text_length = len(text.strip()) if text else 0
+    if text_length < MIN_TEXT_LENGTH:
+        return _resultado_texto_curto(request_id, text_length)
+    
+    # Executa detecção usando detector híbrido
+    deteccao = _detectar(text, force_llm, mode, explain)
+    return _formatar_resultado(request_id, deteccao, merge_preset, _registrar_para_explicacao(text, deteccao))
+
+
+def analyze_many_texts(items: List[tuple], force_llm: bool = False, merge_preset: str = "f1",
+                       mode: str = "full", explain: bool = False) -> List[Dict]:
+    """
+    Analisa vários textos de uma vez usando detector.detect_many().
+    
+    Os modelos NER rodam uma vez por lote (DETECT_BATCH_SIZE textos) em vez de
+    uma vez por texto; o resultado de cada item é o mesmo de analyze_single_text.
+    
+    Args:
+        items: Lista de tuplas (request_id, text), na ordem de resposta
+        force_llm: Forçar uso do árbitro LLM
+        merge_preset: Estratégia de merge de spans
+        mode: "full" ou "classify" (como em analyze_single_text)
+        explain: Incluir explicações XAI (como em analyze_single_text)
+    
+    Returns:
+        Lista de Dicts no formato padrão, na mesma ordem de `items`
+    """
+    resultados, validos = _separar_textos_curtos(items)
+    deteccoes = _detectar_muitos([items[i][1] for i in validos], force_llm, mode, explain)
+    return _completar_resultados(items, resultados, validos, deteccoes, merge_preset)
+
+
+def _separar_textos_curtos(items: List[tuple]) -> tuple:
+    """Resultados já prontos dos textos curtos e índices dos que vão ao detector."""
+    resultados: List[Optional[Dict]] = [None] * len(items)
+    validos = []
+    for i, (request_id, text) in enumerate(items):
+        text_length = len(text.strip()) if text else 0
+        if text_length < MIN_TEXT_LENGTH:
+            resultados[i] = _resultado_texto_curto(request_id, text_length)
+        else:
+            validos.append(i)
+    return resultados, validos
+
+
+def _completar_resultados(items: List[tuple], resultados: List[Optional[Dict]], validos: List[int],
+                          deteccoes: List[tuple], merge_preset: str) -> List[Dict]:
+    for i, deteccao in zip(validos, deteccoes):
+        analysis_id = _registrar_para_explicacao(items[i][1], deteccao)
+        resultados[i] = _formatar_resultado(items[i][0], deteccao, merge_preset, analysis_id)
+    return resultados
+
+
+async def analisar_texto(text: str, request_id: Optional[str] = None, force_llm: bool = False,
+                         merge_preset: str = "f1", mode: str = "full", explain: bool = False) -> Dict:
+    """analyze_single_text com a detecção no executor (levanta ExecutorSaturado)."""
+    text_length = len(text.strip()) if text else 0
+    if text_length < MIN_TEXT_LENGTH:
+        return _resultado_texto_curto(request_id, text_length)
+    deteccao = await executor_deteccao.executar(_detectar, text, force_llm, mode, explain)
+    return _formatar_resultado(request_id, deteccao, merge_preset, _registrar_para_explicacao(text, deteccao))
+
+
+async def analisar_textos(items: List[tuple], force_llm: bool = False, merge_preset: str = "f1",
+                          mode: str = "full", explain: bool = False, esperar: bool = False) -> List[Dict]:
+    """analyze_many_texts com a detecção no executor.
+
+    Sem `esperar`, levanta ExecutorSaturado se o executor estiver cheio;
+    com `esperar` (micro-lotes de /analyze/stream), aguarda a vaga.
+    """
+    resultados, validos = _separar_textos_curtos(items)
+    deteccoes = []
+    if validos:
+        deteccoes = await executor_deteccao.executar(
+            _detectar_muitos, [items[i][1] for i in validos], force_llm, mode, explain, esperar=esperar
+        )
+    return _completar_resultados(items, resultados, validos, deteccoes, merge_preset)
+
+
 def check_rate_limit(ip: str) -> tuple[bool, int]:
     """
     Verifica se o IP excedeu o rate limit.
@@ -633,6 +830,18 @@ async def analyze(
     use_llm: bool = Query(
         default=False,
         description="Força uso do árbitro LLM para arbitragem de PII."
+    ),
+    mode: Literal["full", "classify"] = Query(
+        default="full",
+        description="'classify' só decide has_pii/classificacao: para no primeiro documento validado ou finding de peso alto, sem NER nem explicações."
+    ),
+    explain: bool = Query(
+        default=False,
+        description="Inclui a explicação (XAI) de cada entidade. Sem ela, use GET /explain/{analysis_id}."
+    ),
+    format: Optional[Literal["v2", "compact"]] = Query(
+        default=None,
+        description="'compact' (compact/1): cada campo uma vez, chaves curtas. Também via cabeçalho X-Response-Format."
     )
 ) -> Dict:
     """
@@ -676,7 +885,13 @@ async def analyze(
     # ═══════════════════════════════════════════════════════════════════════════
     # ANÁLISE: Usa função auxiliar para processar o texto
     # ═══════════════════════════════════════════════════════════════════════════
-    result = analyze_single_text(text, request_id, force_llm=use_llm, merge_preset=merge_preset)
+    # No executor de detecção: o event loop (e o /health) seguem livres; pool cheio -> 503
+    try:
+        result = await analisar_texto(
+            text, request_id, force_llm=use_llm, merge_preset=merge_preset, mode=mode, explain=explain
+        )
+    except ExecutorSaturado as e:
+        return _resposta_saturado(e.retry_after)
     
     # Só conta nas estatísticas se for texto válido (não-bot e tamanho mínimo)
     if result.get("_valid_for_stats") and not is_bot:
@@ -685,7 +900,9 @@ async def analyze(
     # Remove campo interno antes de retornar
     result.pop("_valid_for_stats", None)
     
-    return result
+    if formato_resposta(request, format) == "compact":
+        result = {"v": VERSAO_COMPACTA, **compactar_resultado(result)}
+    return resposta_json(request, result)
 
 
 @app.post("/analyze/batch")
@@ -699,6 +916,18 @@ async def analyze_batch(
     use_llm: bool = Query(
         default=False,
         description="Força uso do árbitro LLM para arbitragem de PII."
+    ),
+    mode: Literal["full", "classify"] = Query(
+        default="full",
+        description="'classify' só decide has_pii/classificacao: para no primeiro documento validado ou finding de peso alto, sem NER nem explicações."
+    ),
+    explain: bool = Query(
+        default=False,
+        description="Inclui a explicação (XAI) de cada entidade. Sem ela, use GET /explain/{analysis_id}."
+    ),
+    format: Optional[Literal["v2", "compact"]] = Query(
+        default=None,
+        description="'compact' (compact/1): cada campo uma vez, chaves curtas. Também via cabeçalho X-Response-Format."
     )
 ) -> Dict:
     """
@@ -746,32 +975,143 @@ async def analyze_batch(
                 headers={"Retry-After": str(RATE_LIMIT_WINDOW)}
             )
     
-    # Processa todos os itens
-    results = []
+    # Processa todos os itens (NER em lote via detect_many), no executor de detecção
+    try:
+        results = await analisar_textos(
+            [(item.get("id"), item.get("text", "")) for item in items],
+            force_llm=use_llm,
+            merge_preset=merge_preset,
+            mode=mode,
+            explain=explain
+        )
+    except ExecutorSaturado as e:
+        return _resposta_saturado(e.retry_after)
     valid_count = 0
     
-    for item in items:
-        item_id = item.get("id")
-        item_text = item.get("text", "")
-        
-        result = analyze_single_text(item_text, item_id, force_llm=use_llm, merge_preset=merge_preset)
-        
+    for result in results:
         if result.get("_valid_for_stats"):
             valid_count += 1
         
         # Remove campo interno
         result.pop("_valid_for_stats", None)
-        results.append(result)
     
     # Conta apenas textos válidos nas estatísticas
     if valid_count > 0 and not is_bot_user_agent(user_agent):
         increment_stat("classification_requests", valid_count)
     
-    return {
+    # Batch: serialização rápida e gzip se o cliente aceitar
+    if formato_resposta(request, format) == "compact":
+        return resposta_json(request, {
+            "v": VERSAO_COMPACTA,
+            "total": len(results),
+            "valid": valid_count,
+            "results": [compactar_resultado(r) for r in results]
+        }, comprimir=True)
+    return resposta_json(request, {
         "total": len(results),
         "valid_texts": valid_count,
         "results": results
-    }
+    }, comprimir=True)
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(
+    request: Request,
+    merge_preset: str = Query(
+        default="f1",
+        description="Estratégia de merge de spans: 'recall', 'precision', 'f1', 'custom'."
+    ),
+    use_llm: bool = Query(
+        default=False,
+        description="Força uso do árbitro LLM para arbitragem de PII."
+    ),
+    mode: Literal["full", "classify"] = Query(
+        default="full",
+        description="'classify' só decide has_pii/classificacao: para no primeiro documento validado ou finding de peso alto, sem NER nem explicações."
+    ),
+    explain: bool = Query(
+        default=False,
+        description="Inclui a explicação (XAI) de cada entidade. Sem ela, use GET /explain/{analysis_id}."
+    ),
+    format: Optional[Literal["v2", "compact"]] = Query(
+        default=None,
+        description="'compact' (compact/1): cada campo uma vez, chaves curtas. Também via cabeçalho X-Response-Format."
+    )
+):
+    """
+    Analisa um fluxo de itens, sem limite de quantidade, respondendo em NDJSON.
+    
+    Body (lido aos pedaços):
+        - NDJSON (padrão): {"id": "1", "text": "..."} por linha
+        - CSV (Content-Type: text/csv): cabeçalho com coluna texto/text e, opcional, id
+    
+    Resposta (application/x-ndjson): um resultado por item, na ordem de
+    entrada, no formato de cada item de /analyze/batch (ou compact/1). Os
+    itens passam pelo detector em micro-lotes (até PII_DETECT_BATCH_SIZE) e
+    cada resultado é enviado assim que o micro-lote termina. Linha ou CSV
+    inválido, ou linha acima de PII_STREAM_MAX_LINHA caracteres, vira
+    {"id", "error", "message"} e o fluxo continua.
+    
+    O cliente deve ler a resposta enquanto envia o corpo (full-duplex, ver
+    api/streaming.py). Conta como uma requisição no rate limit.
+    """
+    from fastapi.responses import JSONResponse
+    client_ip = request.client.host if request.client else "unknown"
+    user_agent = request.headers.get("user-agent", "unknown")
+    content_type = request.headers.get("content-type", "")
+    logging.info(f"🌊 POST /analyze/stream | IP: {client_ip} | Content-Type: {content_type or 'ndjson'}")
+    
+    is_allowed, _ = check_rate_limit(client_ip)
+    if not is_allowed:
+        logging.warning(f"⚠️ Rate limit excedido para IP: {client_ip} (stream)")
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": "rate_limit_exceeded",
+                "message": f"Limite de {RATE_LIMIT_REQUESTS} requisições por minuto excedido. Tente novamente em breve.",
+                "retry_after": RATE_LIMIT_WINDOW
+            },
+            headers={"Retry-After": str(RATE_LIMIT_WINDOW)}
+        )
+    
+    # O fluxo só começa com vaga no executor; depois os micro-lotes esperam a vez
+    if executor_deteccao.saturado():
+        return _resposta_saturado(executor_deteccao.retry_after())
+    
+    linhas = ler_linhas(request.stream(), STREAM_MAX_LINHA)
+    itens = itens_csv(linhas, STREAM_MAX_LINHA) if "csv" in content_type.lower() else itens_ndjson(linhas)
+    compacto = formato_resposta(request, format) == "compact"
+    contar_stats = not is_bot_user_agent(user_agent)
+    
+    async def analisar_lote(lote: List[tuple]) -> List[Dict]:
+        return await analisar_textos(
+            lote, force_llm=use_llm, merge_preset=merge_preset, mode=mode, explain=explain, esperar=True
+        )
+    
+    async def gerar():
+        validos = 0
+        fluxo = analisar_em_fluxo(itens, analisar_lote, DETECT_BATCH_SIZE, STREAM_MAX_PENDENTES)
+        async with aclosing(fluxo):
+            async for resultado in fluxo:
+                if resultado.pop("_valid_for_stats", False):
+                    validos += 1
+                if compacto and "error" not in resultado:
+                    resultado = compactar_resultado(resultado)
+                yield serializar(resultado) + b"\n"
+                # Estatísticas em blocos, não a cada item
+                if validos >= DETECT_BATCH_SIZE:
+                    if contar_stats:
+                        increment_stat("classification_requests", validos)
+                    validos = 0
+        if validos and contar_stats:
+            increment_stat("classification_requests", validos)
+    
+    return RespostaFullDuplex(
+        gerar(),
+        media_type="application/x-ndjson",
+        # Proxies (nginx) não devem segurar o fluxo em buffer
+        headers={"X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/stats")
@@ -1194,6 +1534,73 @@ async def health() -> Dict[str, str]:
     }
 
 
+@app.get("/explain/{analysis_id}")
+async def explain_analysis(analysis_id: str) -> Dict:
+    """Explicações (XAI) das entidades de uma análise respondida sem explain=true.
+    
+    Usa os registros compactos e as janelas de contexto guardados na análise
+    (por PII_EXPLAIN_TTL segundos); a detecção não roda de novo. A análise
+    fica na memória do worker que a fez: com mais de um worker do uvicorn,
+    o /explain pode cair em outro e responder 404.
+    
+    Returns:
+        Dict com analysis_id, entities (com 'explicacao') e total_entities
+    """
+    analise = analises_para_explicar.obter(analysis_id)
+    if analise is None:
+        from fastapi.responses import JSONResponse
+        return JSONResponse(
+            status_code=404,
+            content={
+                "error": "analysis_not_found",
+                "message": "Análise não encontrada ou expirada. Refaça a análise com explain=true."
+            }
+        )
+    findings = analise["findings"]
+    texto, ajustados = remontar(findings, analise["janelas"])
+    try:
+        explicados = await executor_deteccao.executar(_explicar, texto, ajustados)
+    except ExecutorSaturado as e:
+        return _resposta_saturado(e.retry_after)
+    # Offsets do texto original, não do texto remontado
+    entities = [dict(f, explicacao=e["explicacao"]) for f, e in zip(findings, explicados)]
+    return {"analysis_id": analysis_id, "entities": entities, "total_entities": len(entities)}
+
+
+@app.get("/cache/stats")
+async def cache_stats() -> Dict:
+    """Métricas do cache de resultados de detecção.
+    
+    Returns:
+        Dict com:
+            - enabled (bool): Se o cache está ligado (PII_CACHE)
+            - hits_memoria / hits_compartilhado / misses (int): Consultas por desfecho
+            - hit_rate (float): Fração de consultas atendidas pelo cache
+            - itens_memoria, removidos_lru, expirados, armazenados, erros (int)
+            - coalescencia (Dict): executadas / coalescidas / em_andamento do single-flight
+            - ner_segmentos (Dict): por modelo, hits/misses e tempo economizado da memoização do NER por linha
+            - ner_candidatos (Dict): trechos e fração de caracteres que não foram ao BERT/NuNER
+            - servidor_modelos (Dict): lotes e pedidos do servidor de modelos (só com PII_MODEL_SERVER)
+    """
+    return await run_in_threadpool(detector.metricas_cache)
+
+
+@app.get("/executor/stats")
+async def executor_stats() -> Dict:
+    """Ocupação e latência do executor de detecção.
+    
+    Returns:
+        Dict com:
+            - tipo (str): "thread" ou "process" (PII_DETECT_EXECUTOR)
+            - workers / max_fila (int): Tamanho do pool e da fila (PII_DETECT_WORKERS, PII_DETECT_QUEUE_MAX)
+            - em_execucao / na_fila / aguardando_vaga (int): Ocupação atual
+            - concluidas / rejeitadas / falhas (int): Chamadas por desfecho (rejeitadas = 503)
+            - espera_ms_p50 / espera_ms_p95 / espera_ms_max (float): Tempo na fila
+            - execucao_ms_p50 / execucao_ms_p95 (float): Tempo de detecção
+    """
+    return executor_deteccao.metricas()
+
+
 @app.get("/rate-limit/status")
 async def rate_limit_status(request: Request) -> Dict:
     """Verifica status do rate limit para o IP do cliente.
@@ -1285,23 +1692,93 @@ async def clear_suspicious_requests(key: str = Query(..., description="Chave de
 
 
 @app.post('/api/lote')
-def submit_lote(file: UploadFile = File(...)):
+def submit_lote(
+    file: UploadFile = File(...),
+    formato: Literal["json", "jsonl", "csv", "parquet"] = Query(
+        default="json",
+        description="Formato do arquivo de resultado: json (lista), jsonl, csv ou parquet."
+    )
+):
     """Enfileira processamento de lote (CSV/XLSX) e retorna job_id."""
     ext = file.filename.split('.')[-1].lower()
     tipo_arquivo = 'csv' if ext == 'csv' else 'xlsx' if ext in ['xlsx', 'xls'] else None
     if not tipo_arquivo:
         return {"erro": "Arquivo não suportado"}
-    temp_path = f'/tmp/{file.filename}'
+    # Nome único por upload: dois envios com o mesmo nome não compartilham entrada nem resultado
+    temp_path = f'/tmp/{uuid.uuid4().hex}_{os.path.basename(file.filename)}'
     with open(temp_path, 'wb') as f:
         shutil.copyfileobj(file.file, f)
-    task = celery_app.send_task('backend.celery_worker_tasks.processar_lote', args=[temp_path, tipo_arquivo])
+    # Registrado antes de enfileirar: /api/lote/progresso distingue job na fila de id desconhecido
+    job_id = str(uuid.uuid4())
+    registrar_envio(job_id)
+    # Pelo objeto da task: o nome registrado segue o módulo (api.tasks ou backend.api.tasks)
+    task = processar_lote.apply_async((temp_path, tipo_arquivo, {"formato_saida": formato}), task_id=job_id)
     return {"job_id": task.id}
 
+LOTE_SSE_INTERVALO = float(os.getenv("PII_LOTE_SSE_INTERVALO", "1.0"))  # Segundos entre consultas do SSE
+LOTE_SSE_MAX_S = float(os.getenv("PII_LOTE_SSE_MAX_S", "3600"))  # Duração máxima de uma conexão SSE
+ESTADOS_FINAIS_LOTE = ("SUCCESS", "FAILURE", "REVOKED")
+
+
 @app.get('/api/lote/status/{job_id}')
 def get_lote_status(job_id: str):
-    """Consulta status do processamento de lote."""
+    """Consulta status do processamento de lote.
+
+    `progresso` soma todos os trechos do job (api/progresso_lote.py):
+    linhas_processadas, linhas_total, percentual, linhas_por_s e eta_s.
+    Em jobs divididos em trechos, `meta` é o do último trecho que publicou
+    (com o `progresso` somado até ali).
+    """
     res = AsyncResult(job_id, app=celery_app)
-    return {"status": res.status, "result": res.result if res.successful() else None}
+    # Em andamento: metadados do job (ex.: carga/memória do detector do worker)
+    meta = res.info if res.status == "STARTED" and isinstance(res.info, dict) else None
+    return {
+        "status": res.status,
+        "result": res.result if res.successful() else None,
+        "meta": meta,
+        "progresso": progresso_job(job_id),
+    }
+
+
+@app.get('/api/lote/progresso/{job_id}')
+async def acompanhar_lote(job_id: str):
+    """Progresso do lote em Server-Sent Events.
+
+    Um evento `progresso` a cada mudança (consulta a cada
+    PII_LOTE_SSE_INTERVALO segundos, com comentário de keep-alive quando
+    nada muda) e um evento `fim` com o estado final, depois do qual o fluxo
+    fecha. O corpo de cada evento é o mesmo JSON de /api/lote/status.
+
+    Id desconhecido ou expirado (PENDING para o Celery, sem progresso
+    registrado) recebe 404. Depois de PII_LOTE_SSE_MAX_S segundos o fluxo
+    fecha com um evento `expirado`; o cliente pode reconectar.
+    """
+    estado = await run_in_threadpool(get_lote_status, job_id)
+    if estado["status"] == "PENDING" and estado["progresso"] is None:
+        raise HTTPException(status_code=404, detail="Job de lote não encontrado")
+
+    async def eventos(estado):
+        anterior = None
+        limite = time.monotonic() + LOTE_SSE_MAX_S
+        while True:
+            dados = json.dumps(estado, ensure_ascii=False, default=str)
+            if estado["status"] in ESTADOS_FINAIS_LOTE or (estado["status"] == "PENDING" and estado["progresso"] is None):
+                # Estado final, ou o progresso do job expirou durante a conexão
+                yield f"event: fim\ndata: {dados}\n\n"
+                return
+            if time.monotonic() >= limite:
+                yield f"event: expirado\ndata: {dados}\n\n"
+                return
+            yield f"event: progresso\ndata: {dados}\n\n" if dados != anterior else ": keep-alive\n\n"
+            anterior = dados
+            await asyncio.sleep(LOTE_SSE_INTERVALO)
+            estado = await run_in_threadpool(get_lote_status, job_id)
+
+    return StreamingResponse(
+        eventos(estado),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get('/api/lote/download/{job_id}')
 def download_lote_result(job_id: str):
@@ -1312,4 +1789,5 @@ def download_lote_result(job_id: str):
     path = res.result
     if not os.path.exists(path):
         return {"erro": "Arquivo não encontrado"}
-    return FileResponse(path, filename=os.path.basename(path))
+    # FileResponse envia o arquivo em blocos, sem carregá-lo em memória
+    return FileResponse(path, filename=os.path.basename(path), media_type=tipo_midia(path))
@@ -0,0 +1,141 @@
+"""
+Progresso dos jobs de lote, compartilhado entre os workers e a API.
+
+Cada trecho de um job (api/tasks.py) grava o próprio arquivo de progresso
+em PII_LOTE_PROGRESSO_DIR/<job_id>/, e progresso_job() soma os trechos:
+linhas processadas e total, vazão (linhas/s) e ETA. Como os trechos rodam
+em workers diferentes, um arquivo por trecho evita disputa de escrita; a
+troca é atômica (os.replace), então a API nunca lê um arquivo pela metade.
+
+O diretório precisa ser visível para API e workers (mesmo host ou volume
+compartilhado, como os arquivos de entrada do lote). Diretórios de jobs
+mais antigos que PII_LOTE_PROGRESSO_TTL segundos são apagados ao iniciar
+um novo job.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Optional
+
+PROGRESSO_DIR = os.getenv("PII_LOTE_PROGRESSO_DIR", os.path.join(tempfile.gettempdir(), "pii-lote-progresso"))
+PROGRESSO_TTL = float(os.getenv("PII_LOTE_PROGRESSO_TTL", "86400"))
+
+
+def _pasta(job_id: str) -> str:
+    return os.path.join(PROGRESSO_DIR, os.path.basename(job_id))
+
+
+def _gravar(caminho: str, dados: Dict) -> None:
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+    os.replace(temporario, caminho)
+
+
+def _ler(caminho: str) -> Optional[Dict]:
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _limpar_antigos() -> None:
+    if not os.path.isdir(PROGRESSO_DIR):
+        return
+    limite = time.time() - PROGRESSO_TTL
+    for nome in os.listdir(PROGRESSO_DIR):
+        pasta = os.path.join(PROGRESSO_DIR, nome)
+        try:
+            if os.path.getmtime(pasta) < limite:
+                shutil.rmtree(pasta, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def registrar_envio(job_id: str) -> None:
+    """Marca o job como enfileirado: a API passa a reconhecê-lo antes de um worker pegá-lo."""
+    _limpar_antigos()
+    _gravar(os.path.join(_pasta(job_id), "job.json"), {
+        "linhas_total": None, "partes": None, "enviado": time.time(), "tentativas": 0, "concluido": False,
+    })
+
+
+def iniciar_job(job_id: Optional[str], linhas_total: int, partes: int) -> None:
+    """Registra o total do job; numa nova tentativa o início original é mantido."""
+    if not job_id:
+        return
+    _limpar_antigos()
+    caminho = os.path.join(_pasta(job_id), "job.json")
+    anterior = _ler(caminho) or {}
+    _gravar(caminho, {
+        **anterior,
+        "linhas_total": linhas_total,
+        "partes": partes,
+        "inicio": anterior.get("inicio", time.time()),
+        "tentativas": anterior.get("tentativas", 0) + 1,
+        "concluido": False,
+    })
+
+
+def registrar_parte(job_id: Optional[str], indice: int, processadas: int, total: int,
+                    retomadas: int, inicio: float) -> None:
+    """Progresso de um trecho. `retomadas` são as linhas já feitas antes desta tentativa."""
+    if not job_id:
+        return
+    _gravar(os.path.join(_pasta(job_id), f"parte{indice:05d}.json"), {
+        "processadas": processadas,
+        "total": total,
+        "retomadas": retomadas,
+        "inicio": inicio,
+        "atualizado": time.time(),
+    })
+
+
+def concluir_job(job_id: Optional[str]) -> None:
+    if not job_id:
+        return
+    caminho = os.path.join(_pasta(job_id), "job.json")
+    job = _ler(caminho)
+    if job is not None:
+        _gravar(caminho, {**job, "concluido": True, "fim": time.time()})
+
+
+def progresso_job(job_id: str) -> Optional[Dict]:
+    """Soma dos trechos: linhas_processadas, linhas_total, percentual, linhas_por_s, eta_s.
+
+    None para job desconhecido (ou expirado); job ainda na fila vem com
+    linhas_total e percentual None.
+
+    A vazão conta só linhas processadas nesta tentativa de cada trecho (as
+    retomadas de um checkpoint não passaram pelo detector agora).
+    """
+    pasta = _pasta(job_id)
+    job = _ler(os.path.join(pasta, "job.json"))
+    if job is None:
+        return None
+    partes = [
+        p for p in (_ler(os.path.join(pasta, nome)) for nome in sorted(os.listdir(pasta))
+                    if nome.startswith("parte") and nome.endswith(".json"))
+        if p
+    ]
+    processadas = sum(p["processadas"] for p in partes)
+    novas = sum(p["processadas"] - p["retomadas"] for p in partes)
+    total = job["linhas_total"]
+    decorrido = max(p["atualizado"] for p in partes) - min(p["inicio"] for p in partes) if partes else 0.0
+    vazao = novas / decorrido if decorrido > 0 else None
+    return {
+        "linhas_processadas": processadas,
+        "linhas_total": total,
+        "percentual": None if total is None else round(100.0 * processadas / total, 1) if total else 100.0,
+        "partes": job["partes"],
+        "partes_concluidas": sum(1 for p in partes if p["processadas"] >= p["total"]),
+        "linhas_por_s": round(vazao, 1) if vazao else None,
+        "eta_s": round((total - processadas) / vazao, 1) if vazao and total and not job.get("concluido") else None,
+        "tentativas": job.get("tentativas", 1),
+        "concluido": job.get("concluido", False),
+    }
@@ -0,0 +1,131 @@
+"""
+Formato compacto e serialização rápida das respostas de /analyze e /analyze/batch.
+
+O formato padrão (v2) repete cada informação: `entities`/`detalhes`,
+`risk_level`/`risco`, `confidence_all_found`/`confianca`,
+`has_pii`/`classificacao`. Num batch de 200 itens isso mais que dobra o corpo
+da resposta. O formato compacto (`compact/1`), pedido com `?format=compact`
+ou com o cabeçalho `X-Response-Format: compact`, traz cada campo uma vez, com
+chaves curtas:
+
+    {"v": "compact/1", "id": ..., "aid": analysis_id, "pii": bool,
+     "risco": ..., "conf": ..., "ents": [{"t", "v", "c", "f", "p", "i", "e", "m", "x"}]}
+
+Nas entidades: t=tipo, v=valor, c=confianca, f=fonte, p=peso, i/e=inicio/fim,
+m=votacao_motivo, x=explicacao; campos nulos são omitidos. Texto curto
+demais traz o aviso em "w". No batch a versão fica no envelope:
+{"v", "total", "valid", "results"}.
+
+As respostas são serializadas com orjson (se instalado; senão json da
+biblioteca padrão) sem passar pelo jsonable_encoder do FastAPI. O batch é
+comprimido com gzip quando o cliente aceita e o corpo passa de GZIP_MIN_BYTES.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+VERSAO_COMPACTA = "compact/1"
+FORMATOS_RESPOSTA = ("v2", "compact")
+CABECALHO_FORMATO = "x-response-format"
+GZIP_MIN_BYTES = 1024  # Abaixo disso o gzip não compensa
+GZIP_NIVEL = 5
+
+CHAVES_ENTIDADE = {
+    "tipo": "t",
+    "valor": "v",
+    "confianca": "c",
+    "fonte": "f",
+    "peso": "p",
+    "inicio": "i",
+    "fim": "e",
+    "votacao_motivo": "m",
+    "explicacao": "x",
+}
+
+
+def formato_resposta(request: Request, formato: Optional[str]) -> str:
+    """Formato pedido: query `format`, senão cabeçalho X-Response-Format, senão v2."""
+    if formato is None:
+        formato = request.headers.get(CABECALHO_FORMATO, "v2").strip().lower()
+    return formato if formato in FORMATOS_RESPOSTA else "v2"
+
+
+def compactar_entidade(entidade: Dict) -> Dict:
+    return {CHAVES_ENTIDADE.get(k, k): v for k, v in entidade.items() if v is not None}
+
+
+def compactar_resultado(resultado: Dict) -> Dict:
+    """Item no formato compacto a partir do resultado v2 de _formatar_resultado()."""
+    compacto = {
+        "id": resultado.get("id"),
+        "aid": resultado.get("analysis_id"),
+        "pii": resultado["has_pii"],
+        "risco": resultado["risco"],
+        "conf": resultado["confianca"],
+        "ents": [compactar_entidade(e) for e in resultado.get("entities") or []],
+    }
+    if "_warning" in resultado:
+        compacto["w"] = resultado["_warning"]
+    return compacto
+
+
+def _padrao(valor: Any) -> Any:
+    # Escalares numpy (scores dos pipelines) e afins
+    if hasattr(valor, "item"):
+        return valor.item()
+    if isinstance(valor, (set, frozenset, tuple)):
+        return list(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def serializar(conteudo: Any) -> bytes:
+    """JSON em UTF-8 (sem escapar acentos), com orjson quando disponível."""
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(conteudo, ensure_ascii=False, separators=(",", ":"), default=_padrao).encode("utf-8")
+
+
+def aceita_gzip(request: Request) -> bool:
+    """Accept-Encoding inclui gzip (ou *) sem q=0."""
+    for item in request.headers.get("accept-encoding", "").split(","):
+        codificacao, _, parametros = item.strip().partition(";")
+        if codificacao.strip().lower() not in ("gzip", "*"):
+            continue
+        q = parametros.strip().lower()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class RespostaJSONRapida(Response):
+    """JSONResponse serializada com serializar() (orjson)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return serializar(content)
+
+
+def resposta_json(request: Request, conteudo: Any, comprimir: bool = False) -> Response:
+    """Resposta JSON rápida; com `comprimir`, gzip negociado pelo Accept-Encoding."""
+    if not comprimir:
+        return RespostaJSONRapida(conteudo)
+    corpo = serializar(conteudo)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(corpo) >= GZIP_MIN_BYTES and aceita_gzip(request):
+        corpo = gzip.compress(corpo, compresslevel=GZIP_NIVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(corpo, media_type="application/json", headers=headers)
@@ -0,0 +1,264 @@
+"""
+Análise em fluxo para POST /analyze/stream.
+
+O corpo da requisição (NDJSON com {"id", "text"} por linha, ou CSV com
+colunas id/texto) é lido aos pedaços, sem limite de itens. Os itens entram
+em uma fila limitada; o consumidor tira micro-lotes (o que já chegou, até
+`tamanho_lote`), entrega ao detector (pool de api/executor_deteccao.py) e devolve um resultado por item,
+na ordem de entrada, assim que o micro-lote termina.
+
+Backpressure nos dois sentidos: fila cheia para a leitura do corpo, e o
+StreamingResponse só pede o próximo resultado depois de enviar o anterior,
+então um cliente lento também segura a leitura. A memória fica limitada a
+`max_pendentes` itens mais a linha em leitura, que tem no máximo
+`max_linha` caracteres (PII_STREAM_MAX_LINHA): linha maior, ou registro CSV
+com aspas que nunca fecham, vira um erro no lugar dele e o fluxo continua.
+
+O primeiro micro-lote não espera encher: com a fila vazia ele sai com o que
+tiver, e o primeiro resultado chega logo após o primeiro item.
+
+Corpo e resposta andam juntos (full-duplex): para entradas grandes o
+cliente precisa ler a resposta enquanto envia (curl, httpx/aiohttp
+assíncronos). Um cliente que só lê depois de enviar tudo para quando os
+buffers de rede enchem, porque a leitura do corpo espera a resposta andar.
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+
+# Colunas aceitas no CSV (mesmas do processamento em lote)
+COLUNAS_TEXTO = ("texto", "text", "Texto", "Text")
+COLUNAS_ID = ("id", "ID", "Id")
+
+Item = Tuple[Optional[str], str]
+# Item com erro de leitura: vira uma linha {"id", "error", "message"} na saída
+ErroItem = Dict[str, object]
+
+_FIM = object()
+
+
+MAX_LINHA_PADRAO = 1_000_000  # Caracteres por linha (e por registro CSV) antes de virar erro
+
+
+def _linha_longa(numero: int, max_linha: int) -> ErroItem:
+    return {"id": None, "error": "line_too_long",
+            "message": f"Linha {numero} excede {max_linha} caracteres e foi ignorada"}
+
+
+async def ler_linhas(pedacos: AsyncIterator[bytes], max_linha: int = MAX_LINHA_PADRAO) -> AsyncIterator[object]:
+    """Linhas do corpo em UTF-8, sem o terminador (\\n ou \\r\\n).
+
+    Linha com mais de `max_linha` caracteres vira um ErroItem line_too_long
+    no lugar dela: o resto da linha é descartado sem ser guardado, então a
+    memória fica limitada mesmo num corpo sem quebras de linha.
+    """
+    decodificador = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    partes: List[str] = []  # Pedaços da linha em leitura (só o pedaço novo é dividido)
+    tamanho = 0
+    numero = 0
+    descartando = False
+
+    def fechar(ultimo: str) -> object:
+        nonlocal partes, tamanho, descartando
+        linha = "".join(partes) + ultimo
+        erro = descartando or len(linha) > max_linha
+        partes, tamanho, descartando = [], 0, False
+        if erro:
+            return _linha_longa(numero, max_linha)
+        return linha[:-1] if linha.endswith("\r") else linha
+
+    async for pedaco in pedacos:
+        *completas, aberta = decodificador.decode(pedaco).split("\n")
+        for parte in completas:
+            numero += 1
+            yield fechar("" if descartando else parte)
+        if descartando:
+            continue
+        tamanho += len(aberta)
+        if tamanho > max_linha:
+            partes, descartando = [], True
+        elif aberta:
+            partes.append(aberta)
+    aberta = decodificador.decode(b"", final=True)
+    if partes or aberta or descartando:
+        numero += 1
+        if not descartando and tamanho + len(aberta) > max_linha:
+            descartando = True
+        yield fechar("" if descartando else aberta)
+
+
+async def itens_ndjson(linhas: AsyncIterator[object]) -> AsyncIterator[object]:
+    """(id, texto) por linha não vazia; linha inválida vira ErroItem."""
+    numero = 0
+    async for linha in linhas:
+        numero += 1
+        if isinstance(linha, dict):  # ErroItem de ler_linhas
+            yield linha
+            continue
+        if not linha.strip():
+            continue
+        try:
+            dado = json.loads(linha)
+        except ValueError:
+            yield {"id": None, "error": "invalid_json", "message": f"Linha {numero} não é JSON válido"}
+            continue
+        if not isinstance(dado, dict):
+            yield {"id": None, "error": "invalid_item", "message": f"Linha {numero}: esperado objeto JSON"}
+            continue
+        texto = dado.get("text", "")
+        yield dado.get("id"), texto if isinstance(texto, str) else str(texto)
+
+
+def _continua_entre_aspas(linha: str, entre_aspas: bool) -> bool:
+    """Se o registro segue num campo entre aspas depois de `linha` (regras do módulo csv).
+
+    Aspas só abrem um campo no início dele; no meio de um campo sem aspas
+    (`27" com defeito`) são texto comum, e "" dentro de aspas é uma aspa.
+    """
+    i, n = 0, len(linha)
+    inicio_campo = not entre_aspas
+    while i < n:
+        if entre_aspas:
+            j = linha.find('"', i)
+            if j < 0:
+                return True
+            if linha.startswith('"', j + 1):
+                i = j + 2
+                continue
+            entre_aspas, inicio_campo, i = False, False, j + 1
+        elif inicio_campo and linha[i] == '"':
+            entre_aspas, i = True, i + 1
+        else:
+            j = linha.find(",", i)
+            if j < 0:
+                return False
+            inicio_campo, i = True, j + 1
+    return entre_aspas
+
+
+async def _registros_csv(linhas: AsyncIterator[object], max_registro: int = MAX_LINHA_PADRAO) -> AsyncIterator[object]:
+    """Junta linhas até fechar as aspas: um campo entre aspas pode ter quebras de linha.
+
+    Registro acima de `max_registro` caracteres (aspas que nunca fecham)
+    vira ErroItem e a leitura recomeça na linha seguinte.
+    """
+    registro: List[str] = []
+    tamanho = 0
+    entre_aspas = False
+    numero = inicio = 0
+    async for linha in linhas:
+        numero += 1
+        if isinstance(linha, dict):  # ErroItem de ler_linhas: o registro em curso também se perde
+            registro, tamanho, entre_aspas = [], 0, False
+            yield linha
+            continue
+        if not registro:
+            inicio = numero
+        registro.append(linha)
+        tamanho += len(linha) + 1
+        entre_aspas = _continua_entre_aspas(linha, entre_aspas)
+        if not entre_aspas:
+            yield "\n".join(registro)
+            registro, tamanho = [], 0
+        elif tamanho > max_registro:
+            yield {"id": None, "error": "record_too_long",
+                   "message": f"Registro iniciado na linha {inicio} excede {max_registro} caracteres "
+                              f"(aspas sem fechamento?) e foi ignorado"}
+            registro, tamanho, entre_aspas = [], 0, False
+    if registro:
+        yield "\n".join(registro)
+
+
+async def itens_csv(linhas: AsyncIterator[object], max_registro: int = MAX_LINHA_PADRAO) -> AsyncIterator[object]:
+    """(id, texto) por registro do CSV; a primeira linha é o cabeçalho."""
+    cabecalho: Optional[List[str]] = None
+    col_texto = col_id = None
+    async for registro in _registros_csv(linhas, max_registro):
+        if isinstance(registro, dict):
+            yield registro
+            continue
+        try:
+            campos = next(csv.reader([registro]), [])
+        except csv.Error as e:
+            yield {"id": None, "error": "invalid_csv", "message": f"Registro CSV inválido: {e}"}
+            continue
+        if cabecalho is None:
+            cabecalho = [c.strip().lstrip("﻿") for c in campos]
+            col_texto = next((cabecalho.index(c) for c in COLUNAS_TEXTO if c in cabecalho), None)
+            col_id = next((cabecalho.index(c) for c in COLUNAS_ID if c in cabecalho), None)
+            if col_texto is None:
+                yield {"id": None, "error": "missing_text_column",
+                       "message": f"CSV sem coluna de texto ({', '.join(COLUNAS_TEXTO)})"}
+                return
+            continue
+        if not any(c.strip() for c in campos):
+            continue
+        texto = campos[col_texto] if col_texto < len(campos) else ""
+        id_item = campos[col_id] if col_id is not None and col_id < len(campos) else None
+        yield id_item, texto
+
+
+async def analisar_em_fluxo(
+    itens: AsyncIterator[object],
+    analisar_lote: Callable[[List[Item]], Awaitable[List[Dict]]],
+    tamanho_lote: int,
+    max_pendentes: int,
+) -> AsyncIterator[Dict]:
+    """Resultados na ordem dos itens, micro-lote a micro-lote.
+
+    `analisar_lote` é assíncrona (tira a detecção do event loop) e recebe
+    só itens válidos; ErroItem passa direto para a saída, na sua posição.
+    """
+    fila: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pendentes))
+
+    async def produzir():
+        try:
+            async for item in itens:
+                await fila.put(item)
+        except Exception as e:  # corpo interrompido, decodificação etc.
+            await fila.put({"id": None, "error": "read_error", "message": str(e)})
+        finally:
+            await fila.put(_FIM)
+
+    produtor = asyncio.create_task(produzir())
+    try:
+        fim = False
+        while not fim:
+            # Espera o primeiro item; o resto do micro-lote é o que já está na fila
+            lote = [await fila.get()]
+            while len(lote) < tamanho_lote and not fila.empty():
+                lote.append(fila.get_nowait())
+            if lote[-1] is _FIM:
+                lote.pop()
+                fim = True
+            validos = [item for item in lote if isinstance(item, tuple)]
+            resultados = iter(await analisar_lote(validos) if validos else [])
+            for item in lote:
+                yield next(resultados) if isinstance(item, tuple) else item
+    finally:
+        produtor.cancel()
+
+
+class RespostaFullDuplex(StreamingResponse):
+    """StreamingResponse que não disputa o receive() com a leitura do corpo.
+
+    Em servidores ASGI < 2.4 o StreamingResponse do Starlette fica chamando
+    receive() para notar a desconexão do cliente, e com isso consome (e
+    descarta) os pedaços do corpo que o endpoint ainda vai ler. Aqui a
+    desconexão aparece como falha no send(), como no ASGI 2.4, ou como
+    ClientDisconnect na leitura do corpo.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
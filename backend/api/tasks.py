@@ -1,5 +1,24 @@
-"""Tasks assíncronas do Celery para processamento em lote."""
+"""Tasks assíncronas do Celery para processamento em lote.
+
+Cada processo do worker guarda um detector por configuração (usar_gpu,
+use_llm_arbitration), criado e aquecido no worker_process_init: só o
+primeiro job de uma configuração fora da padrão paga a carga dos modelos.
+Tempo de carga e memória do detector vão para o metadado do job (state
+STARTED) e para o log.
+
+Arquivos grandes são divididos em trechos de PII_LOTE_CHUNK_LINHAS linhas,
+processados em paralelo (um job por trecho, cada um com seu resultado em
+disco) e juntados na ordem original no fim. O resultado de cada trecho é
+também o seu checkpoint: um job reentregue depois de um worker cair
+continua da última linha gravada.
+"""
 import sys, os
+import itertools
+import json
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 # Adiciona diretório pai ao path para imports
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
@@ -8,52 +27,316 @@ sys.path.insert(0, os.path.dirname(backend_dir))
 # Imports com fallback para HF Spaces
 try:
     from backend.api.celery_config import celery_app
-    from backend.src.detector import PIIDetector
+    from backend.src.servidor_modelos import detector_do_ambiente
+    from backend.api.arquivos_lote import FORMATOS_SAIDA, caminho_saida, gravar_resultados, ler_linhas_lote
+    from backend.api.progresso_lote import concluir_job, iniciar_job, progresso_job, registrar_parte
 except ModuleNotFoundError:
     from api.celery_config import celery_app
-    from src.detector import PIIDetector
+    from src.servidor_modelos import detector_do_ambiente
+    from api.arquivos_lote import FORMATOS_SAIDA, caminho_saida, gravar_resultados, ler_linhas_lote
+    from api.progresso_lote import concluir_job, iniciar_job, progresso_job, registrar_parte
 
-import pandas as pd
+from celery import chord, group
+from celery.signals import worker_process_init
+from celery.utils.log import get_task_logger
 
-@celery_app.task(bind=True)
-def processar_lote(self, arquivo_path, tipo_arquivo='csv', params=None):
-    """
-    Processa um arquivo CSV/XLSX em lote usando o PIIDetector.
-    Salva o resultado em arquivo e retorna o caminho.
-    """
-    # Permitir configuração via params/env
+logger = get_task_logger(__name__)
+
+# Texto com os tipos mais comuns (nome, CPF, telefone, endereço) para o
+# aquecimento exercitar regex, NER e Presidio antes do primeiro job
+TEXTO_AQUECIMENTO = (
+    "Prezados, meu nome é Maria das Graças Silva, CPF 210.201.140-24, telefone (61) 99999-8888, "
+    "moradora da QNL 12 Conjunto B Casa 5, Taguatinga. Solicito informações sobre o processo."
+)
+
+# Linhas por trecho: arquivos maiores são divididos entre os workers (chord)
+LOTE_CHUNK_LINHAS = int(os.getenv("PII_LOTE_CHUNK_LINHAS", "2000"))
+# Linhas entre checkpoints (resultados sincronizados com o disco + progresso publicado)
+LOTE_CHECKPOINT_LINHAS = max(1, int(os.getenv("PII_LOTE_CHECKPOINT_LINHAS", "100")))
+
+# Detectores do processo, por (usar_gpu, use_llm_arbitration)
+_detectores: Dict[Tuple[bool, bool], Dict] = {}
+_detectores_lock = threading.Lock()
+
+
+def _memoria_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _config_padrao() -> Tuple[bool, bool]:
     # LLAMA-3.2-3B ÁRBITRO: Desativado por padrão para evitar custos - ative com PII_USE_LLM_ARBITRATION=True
-    import os
     usar_gpu = os.getenv("PII_USAR_GPU", "False").lower() == "true"
     use_llm_arbitration = os.getenv("PII_USE_LLM_ARBITRATION", "False").lower() == "true"
-    force_llm = False
+    return usar_gpu, use_llm_arbitration
+
+
+def _criar_detector(usar_gpu: bool, use_llm_arbitration: bool) -> Dict:
+    memoria_antes = _memoria_rss_mb()
+    inicio = time.perf_counter()
+    # Com PII_MODEL_SERVER o job usa o servidor de modelos e não carrega modelos
+    detector = detector_do_ambiente(usar_gpu=usar_gpu, use_llm_arbitration=use_llm_arbitration)
+    carga = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    detector.detect(TEXTO_AQUECIMENTO, explain=False)
+    aquecimento = time.perf_counter() - inicio
+    memoria_depois = _memoria_rss_mb()
+    info = {
+        "usar_gpu": usar_gpu,
+        "use_llm_arbitration": use_llm_arbitration,
+        "pid": os.getpid(),
+        "carga_s": round(carga, 2),
+        "aquecimento_s": round(aquecimento, 2),
+        "memoria_mb": round(memoria_depois - memoria_antes, 1) if memoria_depois and memoria_antes else None,
+        "rss_mb": round(memoria_depois, 1) if memoria_depois else None,
+    }
+    logger.info(f"🔥 Detector pronto no worker {info['pid']}: carga {info['carga_s']}s, "
+                f"aquecimento {info['aquecimento_s']}s, +{info['memoria_mb']} MB")
+    return {"detector": detector, "info": info, "jobs": 0}
+
+
+def obter_detector(usar_gpu: bool = False, use_llm_arbitration: bool = False) -> Tuple[object, Dict]:
+    """Detector do processo para a configuração, criado e aquecido na primeira chamada.
+
+    Returns:
+        (detector, info): info traz carga_s, aquecimento_s, memoria_mb, rss_mb
+        e `reutilizado` (False só no job que pagou a carga)
+    """
+    chave = (bool(usar_gpu), bool(use_llm_arbitration))
+    with _detectores_lock:
+        entrada = _detectores.get(chave)
+        criado_agora = entrada is None
+        if criado_agora:
+            entrada = _detectores[chave] = _criar_detector(*chave)
+        entrada["jobs"] += 1
+        return entrada["detector"], {**entrada["info"], "jobs": entrada["jobs"], "reutilizado": not criado_agora}
+
+
+@worker_process_init.connect
+def _aquecer_detector_do_worker(**_):
+    """Carrega o detector da configuração padrão assim que o processo do worker sobe."""
+    if os.getenv("PII_LOTE_PRELOAD", "True").lower() != "true":
+        return
+    usar_gpu, use_llm_arbitration = _config_padrao()
+    with _detectores_lock:
+        if (usar_gpu, use_llm_arbitration) not in _detectores:
+            _detectores[(usar_gpu, use_llm_arbitration)] = _criar_detector(usar_gpu, use_llm_arbitration)
+
+
+def _publicar_estado(task, meta: Dict, job_id: Optional[str] = None) -> None:
+    """Metadado do job em andamento (state STARTED), lido por /api/lote/status.
+
+    Os trechos de um job dividido publicam no id do job (`job_id`), que é o
+    consultado pelo cliente, e não no id do próprio trecho.
+    """
+    # Chamada direta ou eager (testes, CLI) não tem job no backend para atualizar
+    if task.request.id and not task.request.is_eager:
+        task.update_state(task_id=job_id or task.request.id, state="STARTED", meta=meta)
+
+
+def _opcoes_lote(params: Optional[Dict]) -> Dict:
+    """Opções do job (params sobrescrevem o ambiente)."""
+    usar_gpu, use_llm_arbitration = _config_padrao()
+    opcoes = {
+        "usar_gpu": usar_gpu,
+        "use_llm_arbitration": use_llm_arbitration,
+        "force_llm": False,
+        # "classify" basta quando a exportação só usa is_pii (ver PIIDetector.detect)
+        "mode": "full",
+        # Explicações XAI não entram no arquivo de resultado, salvo pedido explícito
+        "explain": False,
+        # NER em lote: os modelos rodam uma vez por lote de textos, não uma vez por linha
+        "batch_size": int(os.getenv("PII_DETECT_BATCH_SIZE", "16")),
+        # Linhas por trecho distribuído entre os workers
+        "chunk_size": LOTE_CHUNK_LINHAS,
+        # json, jsonl, csv ou parquet (api/arquivos_lote.py)
+        "formato_saida": "json",
+    }
     if params:
-        usar_gpu = params.get("usar_gpu", usar_gpu)
-        use_llm_arbitration = params.get("use_llm_arbitration", use_llm_arbitration)
-        force_llm = params.get("force_llm", force_llm)
-    detector = PIIDetector(usar_gpu=usar_gpu, use_llm_arbitration=use_llm_arbitration)
-    if tipo_arquivo == 'csv':
-        df = pd.read_csv(arquivo_path)
-    elif tipo_arquivo == 'xlsx':
-        df = pd.read_excel(arquivo_path)
-    else:
-        raise ValueError('Tipo de arquivo não suportado')
-
-    resultados = []
-    for idx, row in df.iterrows():
-        texto = row.get('texto') or row.get('Texto') or str(row)
-        is_pii, findings, nivel_risco, confianca = detector.detect(texto, force_llm=force_llm)
-        resultados.append({
+        opcoes.update({k: params[k] for k in opcoes if k in params})
+    return opcoes
+
+
+def _detectar_linhas(linhas: Iterable[Tuple[int, object]], opcoes: Dict, detector) -> Iterator[Dict]:
+    """Resultado de cada linha, na ordem, com o NER em lotes de opcoes['batch_size']."""
+    linhas, textos = itertools.tee(linhas)
+    deteccoes = detector.iter_detect_many(
+        (texto for _, texto in textos), batch_size=opcoes["batch_size"],
+        force_llm=opcoes["force_llm"], mode=opcoes["mode"], explain=opcoes["explain"]
+    )
+    for (idx, texto), (is_pii, findings, nivel_risco, confianca) in zip(linhas, deteccoes):
+        yield {
             'linha': idx,
             'texto': texto,
             'is_pii': is_pii,
             'findings': findings,
             'nivel_risco': nivel_risco,
             'confianca': confianca
-        })
-    # Salva resultado
-    saida_path = arquivo_path + '.resultado.json'
-    import json
-    with open(saida_path, 'w', encoding='utf-8') as f:
-        json.dump(resultados, f, ensure_ascii=False, indent=2)
+        }
+
+
+def _gravar_partes(linhas: Iterable[Tuple[int, object]], prefixo: str, tamanho: int) -> Tuple[List[str], int]:
+    """Divide as linhas em arquivos JSONL de `tamanho` linhas, um por trecho; devolve (partes, total de linhas).
+
+    `prefixo` identifica o job (ver _prefixo_job): trechos e checkpoints de
+    outro job, mesmo com o mesmo arquivo de entrada, nunca são reaproveitados.
+    """
+    partes = []
+    total = 0
+    linhas = iter(linhas)
+    while True:
+        trecho = list(itertools.islice(linhas, tamanho))
+        if not trecho:
+            return partes, total
+        parte_path = f"{prefixo}.parte{len(partes):05d}.jsonl"
+        with open(parte_path, 'w', encoding='utf-8') as f:
+            for idx, texto in trecho:
+                f.write(json.dumps([int(idx), texto], ensure_ascii=False) + "\n")
+        partes.append(parte_path)
+        total += len(trecho)
+
+
+def _prefixo_job(arquivo_path: str, job_id: Optional[str]) -> str:
+    """Prefixo dos trechos e checkpoints: o id do job, ou um uuid sem job (chamada direta)."""
+    return f"{arquivo_path}.{os.path.basename(job_id) if job_id else uuid.uuid4().hex}"
+
+
+def _retomar_checkpoint(resultados_path: str) -> int:
+    """Linhas já gravadas no JSONL de resultados de uma tentativa anterior.
+
+    Uma linha incompleta no fim (worker morto no meio da escrita) é descartada.
+    """
+    if not os.path.exists(resultados_path):
+        return 0
+    with open(resultados_path, 'r+b') as f:
+        conteudo = f.read()
+        completas = conteudo.rfind(b"\n") + 1
+        if completas < len(conteudo):
+            f.truncate(completas)
+    return conteudo.count(b"\n", 0, completas)
+
+
+def _processar_parte(task, parte_path: str, opcoes: Dict, job_id: Optional[str] = None, indice: int = 0) -> str:
+    """Processa um trecho com checkpoint; devolve o JSONL de resultados do trecho.
+
+    Os resultados são acrescentados ao JSONL e sincronizados com o disco a
+    cada LOTE_CHECKPOINT_LINHAS linhas. Numa nova tentativa (worker
+    reiniciado, mensagem reentregue) as linhas já gravadas são puladas: a
+    inferência recomeça de onde parou.
+    """
+    resultados_path = parte_path + '.resultado.jsonl'
+    if not os.path.exists(parte_path):
+        # Tentativa anterior terminou o trecho e já apagou a entrada
+        return resultados_path
+    with open(parte_path, encoding='utf-8') as f:
+        total = sum(1 for _ in f)
+    feitas = _retomar_checkpoint(resultados_path)
+    inicio = time.time()
+    processadas = feitas
+
+    def checkpoint():
+        registrar_parte(job_id, indice, processadas, total, feitas, inicio)
+        _publicar_estado(task, {"detector": info_detector, "parte": parte_path,
+                                "progresso": progresso_job(job_id) if job_id else None}, job_id)
+
+    if feitas:
+        logger.info(f"♻️ Trecho {parte_path}: retomando do checkpoint ({feitas}/{total} linhas)")
+    detector, info_detector = obter_detector(opcoes["usar_gpu"], opcoes["use_llm_arbitration"])
+    checkpoint()
+    with open(parte_path, encoding='utf-8') as f, open(resultados_path, 'a', encoding='utf-8') as saida:
+        linhas = itertools.islice((tuple(json.loads(linha)) for linha in f), feitas, None)
+        for resultado in _detectar_linhas(linhas, opcoes, detector):
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            processadas += 1
+            if processadas % LOTE_CHECKPOINT_LINHAS == 0:
+                saida.flush()
+                os.fsync(saida.fileno())
+                checkpoint()
+        saida.flush()
+        os.fsync(saida.fileno())
+    checkpoint()
+    # O trecho já tem seu resultado persistido; a entrada não é mais necessária
+    os.remove(parte_path)
+    return resultados_path
+
+
+def _juntar_partes(resultados_partes: List[str], saida_path: str, formato: str, job_id: Optional[str] = None) -> str:
+    if os.path.exists(saida_path) and not all(os.path.exists(p) for p in resultados_partes):
+        # Tentativa anterior já juntou e apagou os trechos
+        return saida_path
+
+    def itens():
+        for resultados_path in resultados_partes:
+            with open(resultados_path, encoding='utf-8') as f:
+                for linha in f:
+                    yield json.loads(linha)
+
+    # Grava ao lado e troca no fim: o download nunca vê um arquivo pela metade
+    temporario = f"{saida_path}.{os.getpid()}.tmp"
+    gravar_resultados(itens(), temporario, formato)
+    os.replace(temporario, saida_path)
+    for resultados_path in resultados_partes:
+        os.remove(resultados_path)
+    concluir_job(job_id)
     return saida_path
+
+
+# acks_late + reject_on_worker_lost: se o worker morre no meio do job, a
+# mensagem volta para a fila e a nova tentativa retoma dos checkpoints
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def processar_lote(self, arquivo_path, tipo_arquivo='csv', params=None):
+    """
+    Processa um arquivo CSV/XLSX em lote usando o PIIDetector.
+    Salva o resultado em arquivo e retorna o caminho.
+
+    Entrada lida e resultados gravados em fluxo (api/arquivos_lote.py), no
+    formato de params['formato_saida']: json (padrão), jsonl, csv ou parquet.
+
+    Arquivos com mais de `chunk_size` linhas (PII_LOTE_CHUNK_LINHAS) são
+    divididos em trechos, processados em paralelo pelos workers
+    (processar_parte_lote) e juntados na ordem (juntar_partes_lote) num
+    chord que substitui este job: o job_id continua valendo para status,
+    progresso e download.
+
+    Progresso (linhas processadas/total, vazão, ETA) vai para
+    api/progresso_lote.py e para o metadado STARTED; cada trecho guarda
+    checkpoint dos resultados, e uma nova tentativa não repete inferência.
+    """
+    opcoes = _opcoes_lote(params)
+    tamanho = max(1, int(opcoes["chunk_size"]))
+    formato = opcoes["formato_saida"]
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"formato_saida deve ser um de {FORMATOS_SAIDA}, recebido: {formato!r}")
+    saida_path = caminho_saida(arquivo_path, formato)
+    job_id = self.request.id
+    if job_id and os.path.exists(saida_path) and (progresso_job(job_id) or {}).get("concluido"):
+        # Mensagem reentregue depois que este mesmo job já terminou
+        return saida_path
+
+    # A divisão é determinística: numa nova tentativa do mesmo job os trechos
+    # saem iguais e os checkpoints de resultados continuam valendo
+    partes, total = _gravar_partes(ler_linhas_lote(arquivo_path, tipo_arquivo), _prefixo_job(arquivo_path, job_id), tamanho)
+    iniciar_job(job_id, total, len(partes))
+    if len(partes) <= 1:
+        # Cabe num trecho só: processa aqui mesmo, sem custo de distribuição
+        resultados = [_processar_parte(self, parte, opcoes, job_id) for parte in partes]
+        return _juntar_partes(resultados, saida_path, formato, job_id)
+
+    logger.info(f"📦 Lote {arquivo_path}: {len(partes)} trechos de até {tamanho} linhas ({total} linhas)")
+    trechos = group(processar_parte_lote.s(parte, params, job_id, indice) for indice, parte in enumerate(partes))
+    return self.replace(chord(trechos, juntar_partes_lote.s(saida_path, formato, job_id)))
+
+
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def processar_parte_lote(self, parte_path, params=None, job_id=None, indice=0):
+    """Processa um trecho gravado por _gravar_partes; devolve o JSONL de resultados do trecho."""
+    return _processar_parte(self, parte_path, _opcoes_lote(params), job_id, indice)
+
+
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
+def juntar_partes_lote(resultados_partes, saida_path, formato="json", job_id=None):
+    """Junta os resultados dos trechos, na ordem, no arquivo final do lote."""
+    return _juntar_partes(resultados_partes, saida_path, formato, job_id)
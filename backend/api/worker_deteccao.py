@@ -0,0 +1,44 @@
+"""
+Funções de detecção entregues ao executor (api/executor_deteccao.py).
+
+Ficam fora de api/main.py para que os filhos do modo process (iniciados com
+forkserver/spawn, sem herdar threads da API) importem só este módulo ao
+receber uma chamada. No filho, inicializar() monta o detector com a mesma
+configuração da API; no processo da API, usar_detector() aponta para o
+detector já carregado (modo thread e chamadas diretas).
+"""
+
+import os
+from typing import Dict, List, Optional
+
+try:
+    from backend.src.servidor_modelos import detector_do_ambiente
+except ModuleNotFoundError:
+    from src.servidor_modelos import detector_do_ambiente
+
+DETECT_BATCH_SIZE = int(os.getenv("PII_DETECT_BATCH_SIZE", "16"))  # Textos por lote enviado aos modelos NER
+
+detector = None
+
+
+def usar_detector(detector_carregado) -> None:
+    """Usa um detector já carregado (processo da API)."""
+    global detector
+    detector = detector_carregado
+
+
+def inicializar(configuracao: Optional[Dict] = None) -> None:
+    """Inicializador dos filhos do modo process: carrega o detector do filho."""
+    usar_detector(detector_do_ambiente(**(configuracao or {})))
+
+
+def detectar(text: str, force_llm: bool, mode: str, explain: bool) -> tuple:
+    return detector.detect(text, force_llm=force_llm, mode=mode, explain=explain)
+
+
+def detectar_muitos(textos: List[str], force_llm: bool, mode: str, explain: bool) -> List[tuple]:
+    return detector.detect_many(textos, batch_size=DETECT_BATCH_SIZE, force_llm=force_llm, mode=mode, explain=explain)
+
+
+def explicar(text: str, findings: List[Dict]) -> List[Dict]:
+    return detector.explicar(text, findings)
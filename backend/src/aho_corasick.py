@@ -0,0 +1,123 @@
+"""
+Autômato Aho-Corasick para busca de muitos termos em uma única passada.
+
+Usa a extensão C `pyahocorasick` quando instalada e, caso contrário, uma
+implementação em Python puro com a mesma interface. Os termos são buscados
+como substrings exatas (sem normalização): quem chama decide a forma
+canônica (maiúsculas, sem acento etc.) dos termos e do texto.
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+class _AutomatoPython:
+    """Aho-Corasick em Python puro (fallback sem pyahocorasick)."""
+
+    def __init__(self, termos: Iterable[Tuple[str, Hashable]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._falha: List[int] = [0]
+        self._saidas: List[List[Tuple[str, Hashable]]] = [[]]
+        for termo, valor in termos:
+            self._adicionar(termo, valor)
+        self._construir_falhas()
+
+    def _adicionar(self, termo: str, valor: Hashable) -> None:
+        no = 0
+        for ch in termo:
+            proximo = self._goto[no].get(ch)
+            if proximo is None:
+                proximo = len(self._goto)
+                self._goto[no][ch] = proximo
+                self._goto.append({})
+                self._falha.append(0)
+                self._saidas.append([])
+            no = proximo
+        self._saidas[no].append((termo, valor))
+
+    def _construir_falhas(self) -> None:
+        fila = deque(self._goto[0].values())
+        while fila:
+            no = fila.popleft()
+            for ch, filho in self._goto[no].items():
+                fila.append(filho)
+                f = self._falha[no]
+                while f and ch not in self._goto[f]:
+                    f = self._falha[f]
+                destino = self._goto[f].get(ch, 0)
+                self._falha[filho] = destino if destino != filho else 0
+                self._saidas[filho] = self._saidas[filho] + self._saidas[self._falha[filho]]
+
+    def iter(self, texto: str) -> Iterator[Tuple[int, Tuple[str, Hashable]]]:
+        """Mesma convenção do pyahocorasick: (índice do último caractere, (termo, valor))."""
+        no = 0
+        goto, falha, saidas = self._goto, self._falha, self._saidas
+        for i, ch in enumerate(texto):
+            while no and ch not in goto[no]:
+                no = falha[no]
+            no = goto[no].get(ch, 0)
+            for saida in saidas[no]:
+                yield i, saida
+
+
+class AutomatoAhoCorasick:
+    """Conjunto imutável de termos com busca multi-padrão em O(len(texto) + ocorrências).
+
+    Args:
+        termos: Iterável de termos ou de pares (termo, valor). O valor é
+            devolvido junto com cada ocorrência (ex.: a categoria do termo).
+    """
+
+    def __init__(self, termos: Iterable):
+        pares: Dict[Tuple[str, Hashable], None] = {}
+        for item in termos:
+            termo, valor = item if isinstance(item, tuple) else (item, None)
+            pares[(termo, valor)] = None
+        # String vazia é substring de qualquer texto: tratada à parte
+        self._tem_vazio = any(termo == "" for termo, _ in pares)
+        validos = [(t, v) for t, v in pares if t]
+        self.termos = frozenset(t for t, _ in validos)
+        self._automato = self._construir(validos) if validos else None
+
+    @staticmethod
+    def _construir(pares: List[Tuple[str, Hashable]]):
+        if not AHOCORASICK_AVAILABLE:
+            return _AutomatoPython(pares)
+        automato = ahocorasick.Automaton()
+        saidas: Dict[str, List[Tuple[str, Hashable]]] = {}
+        for termo, valor in pares:
+            saidas.setdefault(termo, []).append((termo, valor))
+        for termo, lista in saidas.items():
+            automato.add_word(termo, tuple(lista))
+        automato.make_automaton()
+        return automato
+
+    def __len__(self) -> int:
+        return len(self.termos) + (1 if self._tem_vazio else 0)
+
+    def encontrar(self, texto: str) -> Iterator[Tuple[int, int, str, Optional[Hashable]]]:
+        """Gera (inicio, fim, termo, valor) para cada ocorrência, em ordem de fim."""
+        if self._automato is None or not texto:
+            return
+        if AHOCORASICK_AVAILABLE and not isinstance(self._automato, _AutomatoPython):
+            for fim, saidas in self._automato.iter(texto):
+                for termo, valor in saidas:
+                    yield fim - len(termo) + 1, fim + 1, termo, valor
+        else:
+            for fim, (termo, valor) in self._automato.iter(texto):
+                yield fim - len(termo) + 1, fim + 1, termo, valor
+
+    def contem_algum(self, texto: str) -> bool:
+        """Equivale a `any(termo in texto for termo in termos)`."""
+        if self._tem_vazio:
+            return True
+        for _ in self.encontrar(texto):
+            return True
+        return False
@@ -13,6 +13,7 @@ Listas disponíveis:
 5. CARGOS_AUTORIDADE: Cargos que conferem imunidade em contexto funcional
 6. GATILHOS_CONTATO: Termos que ANULAM imunidade (indicam contato pessoal)
 7. CONTEXTOS_PII: Contextos que indicam informação pessoal
+8. CONTEXTOS_POSITIVOS_CPF: Contextos que confirmam um número como CPF
 
 Exemplos:
     - "Distrito Federal" → Não é PII (lugar)
@@ -421,6 +422,21 @@ CONFIANCA_BASE: Dict[str, float] = {
 }
 
 
+# ============================================================================
+# CONTEXTOS_POSITIVOS_CPF: Contextos (minúsculas) que confirmam um CPF
+# Buscados como substring na janela de ±60 caracteres em volta do número
+# ============================================================================
+
+CONTEXTOS_POSITIVOS_CPF: List[str] = [
+    "meu cpf", "minha cpf", "conforme cadastro", "precisa ser verificado",
+    "cpf do titular", "cpf contribuinte", "cadastrado com cpf", "cpf formato real",
+    "cpf com dígito", "cpf com dv", "cpf:", "contribuinte cpf", "titular do cpf",
+    "contribuinte", "titular", "o cpf", "seu cpf", "informou seu cpf",
+    "nome:", "e-mail:", "email:", "telefone:", "fone:", "celular:", "endereço:",
+    "cpf da mãe", "cpf do pai", "cpf mãe", "cpf pai", "filiação",
+]
+
+
 # ============================================================================
 # PREFIXOS_TELEFONE_INSTITUCIONAL: Prefixos de telefones fixos do GDF
 # Telefones que começam com esses prefixos são institucionais (não são PII)
@@ -0,0 +1,261 @@
+"""
+Cache de resultados de detecção em dois níveis.
+
+O frontend reenvia o mesmo texto a cada recarga de página ou troca de
+filtro, e cada envio refazia regex + NER + votação (centenas de ms). Aqui o
+resultado de `detect()` é guardado por uma chave que não contém o texto:
+
+    chave = HMAC-SHA256(salt, assinatura da configuração + texto)
+
+A assinatura cobre tudo que muda o resultado para o mesmo texto (force_llm,
+thresholds, etapas/modelos carregados, backend e versão dos modelos,
+patterns), então trocar a configuração invalida as entradas antigas sem
+limpeza explícita. O salt (`PII_CACHE_SALT`) impede que alguém com acesso ao
+Redis confirme se um texto conhecido foi analisado recalculando o hash.
+
+Níveis:
+
+1. Memória do processo: LRU com TTL (`PII_CACHE_MAX_ITENS`, `PII_CACHE_TTL`).
+2. Compartilhado (opcional): Redis em `PII_CACHE_REDIS_URL`, com o mesmo TTL,
+   para que réplicas/workers aproveitem o que outro já calculou. Acerto no
+   nível 2 é promovido ao nível 1. `CacheCompartilhadoMemoria` faz o papel do
+   Redis nos testes.
+
+O valor guardado é o resultado (que contém os trechos detectados); o TTL
+limita por quanto tempo ele fica armazenado. Falha no Redis nunca derruba a
+detecção: o nível 2 é desligado para a operação e contado em `erros`.
+"""
+
+import copy
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+MAX_ITENS_PADRAO = 2048
+TTL_PADRAO = 3600.0
+
+
+class CacheMemoria:
+    """LRU com TTL, thread-safe. Valores são guardados e devolvidos como cópias."""
+
+    def __init__(self, max_itens: int = MAX_ITENS_PADRAO, ttl: float = TTL_PADRAO, relogio=time.monotonic):
+        self.max_itens = max(1, int(max_itens))
+        self.ttl = ttl
+        self._relogio = relogio
+        self._itens: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.removidos = 0
+        self.expirados = 0
+
+    def obter(self, chave: str) -> Optional[Any]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira, valor = item
+            if expira <= self._relogio():
+                del self._itens[chave]
+                self.expirados += 1
+                return None
+            self._itens.move_to_end(chave)
+        return copy.deepcopy(valor)
+
+    def guardar(self, chave: str, valor: Any) -> None:
+        valor = copy.deepcopy(valor)
+        with self._lock:
+            self._itens[chave] = (self._relogio() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.removidos += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+
+class CacheCompartilhadoMemoria:
+    """Substituto em processo do Redis (mesma interface de CacheRedis), para testes."""
+
+    def __init__(self, relogio=time.monotonic):
+        self._relogio = relogio
+        self._itens: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[0] <= self._relogio():
+                self._itens.pop(chave, None)
+                return None
+            return item[1]
+
+    def guardar(self, chave: str, valor: bytes, ttl: float) -> None:
+        with self._lock:
+            self._itens[chave] = (self._relogio() + ttl, valor)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+
+class CacheRedis:
+    """Nível compartilhado em Redis (chaves com prefixo, expiração pelo próprio Redis)."""
+
+    def __init__(self, url: str, prefixo: str = "pii:resultado:"):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis não instalado")
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.2)
+        self._prefixo = prefixo
+
+    def obter(self, chave: str) -> Optional[bytes]:
+        return self._cliente.get(self._prefixo + chave)
+
+    def guardar(self, chave: str, valor: bytes, ttl: float) -> None:
+        self._cliente.set(self._prefixo + chave, valor, px=max(1, int(ttl * 1000)))
+
+    def limpar(self) -> None:
+        for chave in self._cliente.scan_iter(self._prefixo + "*"):
+            self._cliente.delete(chave)
+
+
+def _serializar(valor: Any) -> bytes:
+    return json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _desserializar(dados: bytes) -> Any:
+    return json.loads(dados)
+
+
+class CacheResultados:
+    """Cache de dois níveis com chave HMAC do texto e métricas de acerto.
+
+    Args:
+        salt: segredo do HMAC (bytes ou str). Sem salt, um aleatório por
+            processo é usado e o nível compartilhado fica inútil entre
+            processos (cada um gera chaves diferentes).
+        max_itens / ttl: limites do nível em memória (ttl vale também no Redis)
+        compartilhado: nível 2 (CacheRedis, CacheCompartilhadoMemoria ou None)
+    """
+
+    def __init__(self, salt=None, max_itens: int = MAX_ITENS_PADRAO, ttl: float = TTL_PADRAO,
+                 compartilhado=None, relogio=time.monotonic):
+        if isinstance(salt, str):
+            salt = salt.encode("utf-8")
+        if not salt:
+            salt = secrets.token_bytes(32)
+            if compartilhado is not None:
+                logger.warning("⚠️ PII_CACHE_SALT não definido: nível compartilhado do cache não será reaproveitado entre processos")
+        self._salt = salt
+        self.ttl = ttl
+        self.memoria = CacheMemoria(max_itens, ttl, relogio)
+        self.compartilhado = compartilhado
+        self._lock = threading.Lock()
+        self._contadores = {"hits_memoria": 0, "hits_compartilhado": 0, "misses": 0, "armazenados": 0, "erros": 0}
+
+    @classmethod
+    def de_env(cls) -> "CacheResultados":
+        """Cria o cache a partir de PII_CACHE_SALT/MAX_ITENS/TTL/REDIS_URL."""
+        def ler(nome, padrao, tipo):
+            try:
+                return tipo(os.getenv(nome, padrao))
+            except ValueError:
+                logger.warning(f"⚠️ {nome} inválido, usando {padrao}")
+                return padrao
+
+        compartilhado = None
+        url = os.getenv("PII_CACHE_REDIS_URL", "")
+        if url:
+            try:
+                compartilhado = CacheRedis(url)
+                logger.info("✅ Cache de resultados compartilhado via Redis")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis indisponível para o cache de resultados: {e}")
+        return cls(
+            salt=os.getenv("PII_CACHE_SALT"),
+            max_itens=ler("PII_CACHE_MAX_ITENS", MAX_ITENS_PADRAO, int),
+            ttl=ler("PII_CACHE_TTL", TTL_PADRAO, float),
+            compartilhado=compartilhado,
+        )
+
+    def _contar(self, nome: str) -> None:
+        with self._lock:
+            self._contadores[nome] += 1
+
+    def chave(self, texto: str, assinatura: str) -> str:
+        """HMAC-SHA256 hexadecimal de assinatura + texto (o texto nunca é usado como chave)."""
+        mensagem = assinatura.encode("utf-8") + b"\x00" + str(texto).encode("utf-8", "surrogatepass")
+        return hmac.new(self._salt, mensagem, hashlib.sha256).hexdigest()
+
+    def obter(self, chave: str) -> Optional[Any]:
+        """Valor da chave (memória, depois compartilhado) ou None; conta hit/miss."""
+        valor = self.memoria.obter(chave)
+        if valor is not None:
+            self._contar("hits_memoria")
+            return valor
+        if self.compartilhado is not None:
+            try:
+                dados = self.compartilhado.obter(chave)
+            except Exception as e:
+                logger.debug(f"Cache compartilhado indisponível: {e}")
+                self._contar("erros")
+                dados = None
+            if dados is not None:
+                valor = _desserializar(dados)
+                self.memoria.guardar(chave, valor)
+                self._contar("hits_compartilhado")
+                return valor
+        self._contar("misses")
+        return None
+
+    def guardar(self, chave: str, valor: Any) -> None:
+        self.memoria.guardar(chave, valor)
+        if self.compartilhado is not None:
+            try:
+                self.compartilhado.guardar(chave, _serializar(valor), self.ttl)
+            except Exception as e:
+                logger.debug(f"Cache compartilhado indisponível: {e}")
+                self._contar("erros")
+        self._contar("armazenados")
+
+    def limpar(self) -> None:
+        """Esvazia os dois níveis (as métricas continuam)."""
+        self.memoria.limpar()
+        if self.compartilhado is not None:
+            try:
+                self.compartilhado.limpar()
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao limpar cache compartilhado: {e}")
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            dados = dict(self._contadores)
+        consultas = dados["hits_memoria"] + dados["hits_compartilhado"] + dados["misses"]
+        dados.update({
+            "consultas": consultas,
+            "hit_rate": round((consultas - dados["misses"]) / consultas, 4) if consultas else 0.0,
+            "itens_memoria": len(self.memoria),
+            "removidos_lru": self.memoria.removidos,
+            "expirados": self.memoria.expirados,
+            "compartilhado": type(self.compartilhado).__name__ if self.compartilhado is not None else None,
+        })
+        return dados
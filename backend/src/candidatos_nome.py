@@ -0,0 +1,120 @@
+"""
+Filtro barato de trechos que podem conter nome de pessoa, aplicado antes do
+BERT/NuNER.
+
+Um NOME dos transformers só sobrevive ao pós-processamento se tiver pelo
+menos duas palavras e passar por `_deve_ignorar_entidade`. Na prática isso
+exige duas palavras capitalizadas em sequência (conectores como "da", "dos"
+no meio), nenhuma delas em BLOCK_IF_CONTAINS. Um trecho sem nenhum par assim
+("Solicito cópia do cadastro...", "Prezados senhores, boa tarde") não vai ao
+modelo.
+
+Um par é descartado só quando toda entidade que o contém seria ignorada:
+
+- uma das palavras está em BLOCK_IF_CONTAINS (regra 2 de _deve_ignorar_entidade);
+- o par normalizado contém termo seguro ou do gazetteer (regras 3 e 4, que
+  casam por substring: continuam casando em qualquer entidade maior);
+- a sequência capitalizada inteira tem só esse par e é exatamente um termo da
+  BLOCKLIST_TOTAL (a única entidade possível é ela mesma).
+
+Limitação conhecida: nome todo em minúsculas ("meu nome é joão da silva")
+não forma par capitalizado, então a linha não vai ao BERT/NuNER e esse nome
+só é achado se outra camada (gatilhos, spaCy) o pegar. É a troca do filtro:
+manifestações escritas sem maiúsculas perdem recall de NOME em favor de não
+rodar os transformers em texto institucional. Com entradas assim, use
+PII_NER_GATE=false. tests/test_candidatos_nome.py compara os NOME do
+detect() no DATASET_LGPD com e sem o filtro.
+
+As métricas dizem quantos trechos e que fração dos caracteres deixaram de ir
+aos transformers.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+# Palavra: letras (com acento), hífen e apóstrofo internos
+_RE_PALAVRA = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+# Partículas que aparecem em minúsculas no meio de nomes
+CONECTORES = frozenset({"da", "de", "do", "das", "dos", "e", "d", "di", "du", "del", "della", "van", "von", "y"})
+
+
+class FiltroCandidatosNome:
+    """Decide se um trecho pode render um NOME dos transformers.
+
+    Args:
+        bloqueados: palavras normalizadas de BLOCK_IF_CONTAINS
+        blocklist: entidades normalizadas ignoradas por igualdade (BLOCKLIST_TOTAL)
+        normalizar: mesma normalização de _deve_ignorar_entidade
+        termo_ignorado: True se o texto normalizado contém termo seguro/do gazetteer
+    """
+
+    def __init__(self, bloqueados: FrozenSet[str], blocklist: FrozenSet[str],
+                 normalizar: Callable[[str], str], termo_ignorado: Callable[[str], bool]):
+        self.bloqueados = bloqueados
+        self.blocklist = blocklist
+        self._normalizar = normalizar
+        self._termo_ignorado = termo_ignorado
+        self._lock = threading.Lock()
+        self._contadores = {"trechos": 0, "trechos_ignorados": 0, "caracteres": 0, "caracteres_ignorados": 0}
+
+    def _sequencias(self, trecho: str) -> List[List[Tuple[int, int]]]:
+        """Sequências de palavras capitalizadas (spans), unidas por espaços e conectores."""
+        sequencias: List[List[Tuple[int, int]]] = []
+        atual: List[Tuple[int, int]] = []
+        fim_anterior = 0
+        for m in _RE_PALAVRA.finditer(trecho):
+            palavra = m.group()
+            separador = trecho[fim_anterior:m.start()]
+            if palavra[0].isupper():
+                if atual and separador.strip():
+                    sequencias.append(atual)
+                    atual = []
+                atual.append(m.span())
+                fim_anterior = m.end()
+            elif atual and palavra in CONECTORES and not separador.strip():
+                fim_anterior = m.end()  # conector: a sequência continua
+            else:
+                if atual:
+                    sequencias.append(atual)
+                atual = []
+                fim_anterior = m.end()
+        if atual:
+            sequencias.append(atual)
+        return [s for s in sequencias if len(s) >= 2]
+
+    def pode_conter_nome(self, trecho: str) -> bool:
+        """Há par de palavras capitalizadas que pode ser (parte de) um nome."""
+        for sequencia in self._sequencias(trecho):
+            normalizadas = [self._normalizar(trecho[a:b]) for a, b in sequencia]
+            if len(sequencia) == 2:
+                inteira = self._normalizar(trecho[sequencia[0][0]:sequencia[1][1]])
+                if inteira in self.blocklist:
+                    continue
+            for i in range(len(sequencia) - 1):
+                if normalizadas[i] in self.bloqueados or normalizadas[i + 1] in self.bloqueados:
+                    continue
+                par = self._normalizar(trecho[sequencia[i][0]:sequencia[i + 1][1]])
+                if self._termo_ignorado(par):
+                    continue
+                return True
+        return False
+
+    def filtrar(self, trecho: str) -> bool:
+        """pode_conter_nome() contabilizando o que deixou de ir ao modelo."""
+        passa = self.pode_conter_nome(trecho)
+        with self._lock:
+            self._contadores["trechos"] += 1
+            self._contadores["caracteres"] += len(trecho)
+            if not passa:
+                self._contadores["trechos_ignorados"] += 1
+                self._contadores["caracteres_ignorados"] += len(trecho)
+        return passa
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            dados = dict(self._contadores)
+        dados["fracao_ignorada"] = (
+            round(dados["caracteres_ignorados"] / dados["caracteres"], 4) if dados["caracteres"] else 0.0
+        )
+        return dados
@@ -0,0 +1,83 @@
+"""
+Coalescência ("single-flight") de detecções idênticas simultâneas.
+
+Rajadas com o mesmo texto (bot repetindo a requisição, duplo envio do
+frontend) rodavam o ensemble inteiro uma vez por requisição. Com o
+SingleFlight, a primeira chamada de uma chave vira a "líder" e calcula; as
+que chegam com a mesma chave enquanto ela está em andamento esperam e
+recebem uma cópia do mesmo resultado (ou a mesma exceção).
+
+A chave é a mesma do cache de resultados (hash do texto + assinatura da
+configuração), então só coalescem chamadas que teriam o mesmo resultado. Ao
+terminar, a chave sai da tabela: chamadas posteriores calculam de novo (ou
+acertam o cache, se ligado).
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Voo:
+    """Cálculo em andamento de uma chave."""
+    __slots__ = ("evento", "resultado", "erro", "seguidores")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado: Any = None
+        self.erro: BaseException = None
+        self.seguidores = 0
+
+
+class SingleFlight:
+    """Executa no máximo um cálculo por chave ao mesmo tempo; thread-safe."""
+
+    def __init__(self):
+        self._voos: Dict[str, _Voo] = {}
+        self._lock = threading.Lock()
+        self._contadores = {"executadas": 0, "coalescidas": 0}
+
+    def executar(self, chave: str, funcao: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Roda `funcao()` ou espera o cálculo em andamento da mesma chave.
+
+        Returns:
+            (resultado, coalescida): coalescida=True se o resultado veio de outra chamada
+        """
+        with self._lock:
+            voo = self._voos.get(chave)
+            lider = voo is None
+            if lider:
+                voo = self._voos[chave] = _Voo()
+                self._contadores["executadas"] += 1
+            else:
+                voo.seguidores += 1
+                self._contadores["coalescidas"] += 1
+
+        if not lider:
+            voo.evento.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return copy.deepcopy(voo.resultado), True
+
+        try:
+            resultado = funcao()
+        except BaseException as e:
+            voo.erro = e
+            raise
+        else:
+            voo.resultado = resultado
+        finally:
+            with self._lock:
+                del self._voos[chave]
+                seguidores = voo.seguidores
+            if seguidores and voo.erro is None:
+                # Os seguidores copiam de um snapshot: o líder pode alterar o seu resultado
+                voo.resultado = copy.deepcopy(resultado)
+            voo.evento.set()
+        return resultado, False
+
+    def metricas(self) -> Dict[str, int]:
+        with self._lock:
+            dados = dict(self._contadores)
+            dados["em_andamento"] = len(self._voos)
+        return dados
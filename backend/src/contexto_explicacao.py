@@ -0,0 +1,50 @@
+"""
+Recorte do texto guardado para explicar uma análise depois (GET /explain).
+
+A explicação de um finding (PIIDetector._gerar_explicacao) só lê do texto as
+JANELA_CONTEXTO caracteres antes e depois dele. Em vez da manifestação
+inteira, a API guarda só essas janelas (recortar) e, na hora de explicar,
+monta um texto substituto com elas (remontar): cada finding fica entre as
+suas janelas, separado dos outros por JANELA_CONTEXTO espaços, e o trecho do
+próprio finding vira espaços. A explicação sai igual à do texto original.
+"""
+
+from typing import Dict, List, Tuple
+
+JANELA_CONTEXTO = 50  # Caracteres antes/depois do finding lidos pela explicação
+
+
+def _offsets(finding: Dict) -> Tuple[int, int]:
+    # Mesmos defaults de _gerar_explicacao
+    inicio = finding.get("inicio") or 0
+    fim = finding.get("fim")
+    return inicio, len(finding.get("valor") or "") if fim is None else fim
+
+
+def recortar(texto: str, findings: List[Dict]) -> List[Dict]:
+    """Janelas de contexto de cada finding: o único trecho do texto que a explicação usa."""
+    janelas = []
+    for f in findings:
+        inicio, fim = _offsets(f)
+        janelas.append({
+            "antes": texto[max(0, inicio - JANELA_CONTEXTO):inicio],
+            "depois": texto[fim:fim + JANELA_CONTEXTO],
+            "tamanho": max(0, fim - inicio),
+        })
+    return janelas
+
+
+def remontar(findings: List[Dict], janelas: List[Dict]) -> Tuple[str, List[Dict]]:
+    """Texto substituto e findings com offsets nele, para PIIDetector.explicar()."""
+    # Espaços não casam com nenhum gatilho de contexto
+    separador = " " * JANELA_CONTEXTO
+    partes: List[str] = [separador]
+    ajustados: List[Dict] = []
+    posicao = len(separador)
+    for f, janela in zip(findings, janelas):
+        inicio = posicao + len(janela["antes"])
+        ajustados.append(dict(f, inicio=inicio, fim=inicio + janela["tamanho"]))
+        trecho = janela["antes"] + " " * janela["tamanho"] + janela["depois"] + separador
+        partes.append(trecho)
+        posicao += len(trecho)
+    return "".join(partes), ajustados
@@ -91,12 +91,36 @@ CONFIGURAÇÃO
 • use_llm_arbitration: True (padrão) - requer HF_TOKEN
 • PII_USE_LLM_ARBITRATION: variável de ambiente para desativar em CI/testes
 • HF_MODEL: modelo LLM (padrão: meta-llama/Llama-3.2-3B-Instruct)
+• PII_PARALLEL_STAGES: true roda as etapas 1-4 em paralelo (padrão: false)
+• PII_STAGE_WORKERS / PII_STAGE_TIMEOUT[_<ETAPA>]: executor e timeouts por etapa
+• PII_REGEX_PREFILTRO: false desliga o pré-filtro de literais/dígitos dos patterns (padrão: true)
+• PII_NER_CHUNK_TOKENS / PII_NER_CHUNK_OVERLAP: fragmentos (em tokens) de documentos longos no NER (padrão: 400 / 64)
+• PII_CACHE: true guarda os resultados de detect() (padrão: false; a API liga) - ver src/cache_resultados.py
+• PII_COALESCE: false desliga a coalescência de detect() simultâneos do mesmo texto (padrão: true)
+• PII_NER_SEGMENT_CACHE[_ITENS]: memoização do NER por linha do documento (padrão: true / 8192)
+• PII_NER_GATE: false manda todas as linhas ao BERT/NuNER, mesmo sem candidato a nome (padrão: true)
+
+MODOS DE DETECÇÃO (parâmetro `mode` de detect()/detect_many())
+=================
+• "full" (padrão): todas as etapas; explicação (XAI) por finding se explain=True
+• "classify": só decide has_pii. Regex e gatilhos rodam primeiro; um finding
+  aceito pela votação, de TIPOS_ALTA_CONFIANCA ou com peso ≥ 4, encerra a
+  detecção sem NER, Presidio nem explicações. Sem ele, segue o caminho
+  completo, ainda sem explicações.
+• explain=False: findings só com o registro compacto (tipo, valor, fonte, peso,
+  offsets, motivo da votação); explicar(texto, findings) gera as explicações
+  depois, sem repetir a detecção.
 """
 
 import re
 import os
+import json
+import time
+import hashlib
 import logging
-from typing import List, Dict, Tuple, Optional, Set
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Callable, List, Dict, Tuple, Optional, Set, Iterable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import lru_cache
@@ -115,6 +139,13 @@ logging.getLogger("presidio-analyzer").setLevel(logging.ERROR)
 # Device para pipelines transformers (GPU se disponível, senão CPU)
 DEVICE = 0 if torch.cuda.is_available() else -1
 
+# Etapas independentes de detect(), na ordem em que os findings são concatenados
+ESTAGIOS_DETECCAO = ("regex", "gatilho", "bert", "nuner", "spacy", "presidio")
+# Modos de detect(): "full" (findings completos) e "classify" (só has_pii)
+MODOS_DETECCAO = ("full", "classify")
+# Etapas baratas, na ordem em que o modo "classify" tenta decidir antes do NER
+ESTAGIOS_CLASSIFICACAO = ("regex", "gatilho")
+
 # === IMPORTS DO PROJETO ===
 try:
     from .allow_list import (
@@ -133,6 +164,52 @@ except ImportError:
     CONFIANCA_BASE = {}
     ALLOW_LIST_AVAILABLE = False
 
+try:
+    from .vocabulario import (
+        criar_motores_vocabulario, TERMO_SEGURO, GATILHO_CONTATO,
+        INDICADOR_SERVIDOR, CARGO_AUTORIDADE, CONTEXTO_POSITIVO_CPF
+    )
+except ImportError:
+    from vocabulario import (
+        criar_motores_vocabulario, TERMO_SEGURO, GATILHO_CONTATO,
+        INDICADOR_SERVIDOR, CARGO_AUTORIDADE, CONTEXTO_POSITIVO_CPF
+    )
+
+try:
+    from .documento import DocumentContext
+except ImportError:
+    from documento import DocumentContext
+
+try:
+    from .varredura_regex import VarreduraRegex
+except ImportError:
+    from varredura_regex import VarreduraRegex
+
+try:
+    from .prefiltro_regex import PrefiltroRegex
+except ImportError:
+    from prefiltro_regex import PrefiltroRegex
+
+try:
+    from .cache_resultados import CacheResultados
+except ImportError:
+    from cache_resultados import CacheResultados
+
+try:
+    from .coalescencia import SingleFlight
+except ImportError:
+    from coalescencia import SingleFlight
+
+try:
+    from .candidatos_nome import FiltroCandidatosNome
+except ImportError:
+    from candidatos_nome import FiltroCandidatosNome
+
+try:
+    from .contexto_explicacao import JANELA_CONTEXTO
+except ImportError:
+    from contexto_explicacao import JANELA_CONTEXTO
+
 # BLOCK_IF_CONTAINS - termos que invalidam nome se presentes
 BLOCK_IF_CONTAINS = {
     "SECRETARIA", "MINISTÉRIO", "MINISTERIO", "GOVERNO", "FEDERAL",
@@ -146,12 +223,13 @@ BLOCK_IF_CONTAINS = {
 }
 
 try:
-    from .gazetteer.gazetteer_gdf import carregar_gazetteer_gdf
+    from .gazetteer.gazetteer_gdf import carregar_gazetteer_gdf, obter_indice_gazetteer
 except ImportError:
     try:
-        from gazetteer.gazetteer_gdf import carregar_gazetteer_gdf
+        from gazetteer.gazetteer_gdf import carregar_gazetteer_gdf, obter_indice_gazetteer
     except ImportError:
         import sys, os, json
+        obter_indice_gazetteer = None
         def carregar_gazetteer_gdf():
             base_dir = os.path.dirname(os.path.abspath(__file__))
             json_path = os.path.join(base_dir, 'gazetteer', 'gazetteer_gdf.json')
@@ -185,6 +263,37 @@ try:
 except ImportError:
     PIIFinding = dict
 
+try:
+    from .inference.onnx_backend import (
+        MODELOS_NER, BACKEND_ONNX, obter_backend_ner, criar_pipeline_ner_onnx
+    )
+except ImportError:
+    MODELOS_NER = {
+        "bert": {"model_id": "Davlan/bert-base-multilingual-cased-ner-hrl"},
+        "nuner": {"model_id": "monilouise/ner_news_portuguese"},
+    }
+    BACKEND_ONNX = "onnx"
+    obter_backend_ner = lambda: "torch"
+    criar_pipeline_ner_onnx = None
+
+try:
+    from .inference.quantizacao import quantizacao_int8_habilitada, int8_aprovado, quantizar_pipeline_torch
+except ImportError:
+    quantizacao_int8_habilitada = lambda backend: False
+    int8_aprovado = lambda backend: False
+    quantizar_pipeline_torch = None
+
+try:
+    from .inference.fragmentacao import (
+        obter_config_fragmentacao, criar_medidor, fragmentar_texto, mesclar_entidades
+    )
+    from .inference.segmentos_ner import CacheSegmentosNER, MAX_SEGMENTOS_PADRAO
+except ImportError:
+    from inference.fragmentacao import (
+        obter_config_fragmentacao, criar_medidor, fragmentar_texto, mesclar_entidades
+    )
+    from inference.segmentos_ner import CacheSegmentosNER, MAX_SEGMENTOS_PADRAO
+
 # === INTEGRAÇÃO PRESIDIO FRAMEWORK ===
 try:
     from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer, EntityRecognizer
@@ -215,6 +324,10 @@ def arbitrate_with_llama(texto: str, achados: List[Dict], contexto_extra: str =
         Tuple[str, str]: (decisão, explicação)
             - decisão: 'PII', 'Público' ou 'Indefinido'
             - explicação: Justificativa do LLM
+    
+    Raises:
+        RuntimeError: sem HF_TOKEN; erros da chamada (biblioteca ausente, API)
+            também sobem, para o detector marcar o resultado como degradado
     """
     HF_TOKEN = os.getenv("HF_TOKEN")
     if not HF_TOKEN:
@@ -321,23 +434,62 @@ ACHADOS DO SISTEMA AUTOMÁTICO:
         
     except ImportError:
         logger.warning("huggingface_hub não instalado. Execute: pip install huggingface_hub")
-        return "Indefinido", "Biblioteca huggingface_hub não instalada"
+        raise
     except Exception as e:
         logger.warning(f"Erro na chamada ao LLM ({model}): {e}")
-        return "Indefinido", f"Erro na API: {str(e)}"
+        raise
+
+
+@dataclass
+class ContextoDeteccao:
+    """Estado de uma única chamada de detecção.
+    
+    Tudo que muda durante uma chamada de detect() vive aqui, e não no
+    PIIDetector, para que várias threads possam usar a mesma instância.
+    """
+    texto: str
+    force_llm: bool = False
+    # "full" ou "classify" (ver MODOS_DETECCAO)
+    modo: str = "full"
+    # Texto normalizado + mapa de offsets, compartilhado por todas as etapas
+    documento: Optional[DocumentContext] = None
+    # Itens de baixa confiança da votação, candidatos ao árbitro LLM
+    pendentes_llm: List[Dict] = field(default_factory=list)
+    # Etapas que estouraram o timeout ou falharam no modo paralelo ("llm":
+    # árbitro LLM com erro); resultado degradado não vai para o cache
+    estagios_degradados: List[str] = field(default_factory=list)
+    # Patterns regex descartados pelo pré-filtro neste documento
+    patterns_regex_ignorados: int = 0
+    # Findings de etapas já executadas (modo "classify"), que não rodam de novo
+    estagios: Dict[str, List[Dict]] = field(default_factory=dict)
 
 
 class PIIDetector:
-    def _aplicar_votacao(self, findings: list) -> list:
+    """Detector híbrido de PII (regex + gatilhos + NER + Presidio + LLM).
+    
+    Contrato de thread-safety:
+    - Após o __init__, a instância só é lida por detect(), detect_extended(),
+      detect_many() e iter_detect_many(); o estado de cada chamada fica em um
+      ContextoDeteccao próprio. Uma instância pode atender várias threads.
+    - Os modelos (pipelines HF, spaCy, Presidio) são compartilhados e usados
+      só para inferência; o executor de etapas é criado sob lock.
+    - Reconfigurar a instância (recarregar_ner, alterar atributos) NÃO é
+      seguro com chamadas em andamento: faça isso antes de servir requisições.
+    """
+    
+    # Tipos com validação de DV - SEMPRE aceitos na votação
+    TIPOS_ALTA_CONFIANCA = frozenset({'CPF', 'CNPJ', 'PIS', 'CNS', 'TITULO_ELEITOR', 'RG', 'CNH', 'PASSAPORTE', 'CTPS'})
+    
+    def _aplicar_votacao(self, findings: list, ctx: Optional[ContextoDeteccao] = None) -> list:
         """
         Votação PERMISSIVA - prioriza não perder PII (minimizar FN).
         Filosofia: É melhor ter um FP do que um FN (critério de desempate).
+        
+        Itens de baixa confiança vão para `ctx.pendentes_llm` (se houver contexto).
         """
         if not findings:
             return []
 
-        # Tipos com validação de DV - SEMPRE aceitar
-        TIPOS_ALTA_CONFIANCA = {'CPF', 'CNPJ', 'PIS', 'CNS', 'TITULO_ELEITOR', 'RG', 'CNH', 'PASSAPORTE', 'CTPS'}
         # Tipos sensíveis LGPD - SEMPRE aceitar (peso 5)
         TIPOS_SENSIVEIS = {'DADO_SAUDE', 'DADO_BIOMETRICO', 'MENOR_IDENTIFICADO'}
 
@@ -370,7 +522,7 @@ class PIIDetector:
             motivo = ""
 
             # REGRA 1: Documentos com DV - SEMPRE aceitar
-            if tipo in TIPOS_ALTA_CONFIANCA:
+            if tipo in self.TIPOS_ALTA_CONFIANCA:
                 aceitar = True
                 motivo = "documento_validado"
             # REGRA 2: Dados sensíveis - SEMPRE aceitar
@@ -407,7 +559,8 @@ class PIIDetector:
                 confirmados.append(melhor)
 
         # Itens rejeitados podem ser recuperados pelo LLM
-        self._pendentes_llm = rejeitados_para_llm
+        if ctx is not None:
+            ctx.pendentes_llm = rejeitados_para_llm
         return confirmados
 
     def _deduplicate_findings(self, findings: List[Dict]) -> List[Dict]:
@@ -747,8 +900,8 @@ class PIIDetector:
         
         # === ANÁLISE DE CONTEXTO ===
         if inicio > 0 or fim < len(texto):
-            ctx_antes = texto[max(0, inicio-50):inicio].lower()
-            ctx_depois = texto[fim:min(len(texto), fim+50)].lower()
+            ctx_antes = texto[max(0, inicio-JANELA_CONTEXTO):inicio].lower()
+            ctx_depois = texto[fim:min(len(texto), fim+JANELA_CONTEXTO)].lower()
             
             # Detectar gatilhos de contexto
             gatilhos_pessoais = ['meu', 'minha', 'moro', 'resido', 'telefone', 'celular', 'contato', 'cpf', 'email']
@@ -797,17 +950,31 @@ class PIIDetector:
             'peso': peso
         }
 
-    def _adicionar_explicacoes(self, findings: List[Dict], texto: str) -> List[Dict]:
-        """Adiciona explicações a todos os findings."""
+    def explicar(self, texto: str, findings: List[Dict]) -> List[Dict]:
+        """
+        Devolve cópias dos findings de detect() com o campo 'explicacao' (XAI).
+        
+        Não repete a detecção: a explicação sai do registro compacto de cada
+        finding (tipo, valor, fonte, peso, offsets, motivo da votação) e do
+        texto original, então pode ser pedida depois da resposta (ex.: GET
+        /explain/{analysis_id} na API).
+        """
+        explicados = []
         for f in findings:
-            f['explicacao'] = self._gerar_explicacao(f, texto)
-        return findings
+            # _gerar_explicacao usa 'source' e defaults para campos ausentes
+            registro = {k: v for k, v in f.items() if v is not None}
+            registro['source'] = registro.get('fonte', 'unknown')
+            explicados.append(dict(f, explicacao=self._gerar_explicacao(registro, texto)))
+        return explicados
 
     def __init__(
         self,
         usar_gpu: bool = True,
         use_probabilistic_confidence: bool = True,
-        use_llm_arbitration: bool = True
+        use_llm_arbitration: bool = True,
+        parallel_stages: Optional[bool] = None,
+        stage_executor: Optional[Executor] = None,
+        result_cache: Optional[bool] = None
     ):
         """
         Inicializa o detector de PII.
@@ -816,12 +983,30 @@ class PIIDetector:
             usar_gpu: Se deve usar GPU para modelos NER
             use_probabilistic_confidence: Se deve usar sistema de confiança probabilística
             use_llm_arbitration: Se deve usar Llama-3.2-3B para arbitrar casos ambíguos (ATIVADO por padrão - requer HF_TOKEN)
+            parallel_stages: Roda regex, gatilhos, BERT, NuNER, spaCy e Presidio em paralelo
+                (None = lê PII_PARALLEL_STAGES, padrão False)
+            stage_executor: Executor usado no modo paralelo (None = ThreadPoolExecutor próprio
+                com PII_STAGE_WORKERS threads, criado sob demanda)
+            result_cache: Guarda o resultado de detect()/detect_many() por hash do texto
+                (None = lê PII_CACHE, padrão False)
         """
         # Configurações
         self.usar_gpu = usar_gpu
         self.use_probabilistic_confidence = use_probabilistic_confidence
         self.use_llm_arbitration = use_llm_arbitration
         
+        # Execução paralela das etapas independentes (regex, gatilhos, NER, Presidio)
+        if parallel_stages is None:
+            parallel_stages = os.getenv("PII_PARALLEL_STAGES", "false").lower() == "true"
+        self.parallel_stages = parallel_stages
+        self.stage_timeouts = self._carregar_timeouts_estagios()
+        self._stage_executor = stage_executor
+        self._stage_executor_lock = threading.Lock()
+        # Threads do executor próprio (None com executor injetado) e etapas que
+        # estouraram o timeout mas ainda ocupam uma delas
+        self._stage_workers: Optional[int] = None
+        self._estagios_atrasados = 0
+        
         # Thresholds dinâmicos por tipo de PII
         self.THRESHOLDS_DINAMICOS = {
             "CPF": {"peso_min": 3, "confianca_min": 0.60},  # Mais permissivo - LGPD aceita formato
@@ -861,6 +1046,21 @@ class PIIDetector:
         self.nlp_bert = None
         self.nlp_nuner = None
         self.nlp_spacy = None
+        # Incrementada a cada carga de BERT/NuNER: entra na chave do cache de segmentos
+        self._geracao_ner = 0
+        # Documentos longos vão ao BERT/NuNER em fragmentos (tokens, sobreposição)
+        self.ner_fragmento_tokens, self.ner_sobreposicao_tokens = obter_config_fragmentacao()
+        # Saída do NER memoizada por segmento (boilerplate repetido não volta ao modelo)
+        self.cache_segmentos_ner: Dict[str, CacheSegmentosNER] = {}
+        if os.getenv("PII_NER_SEGMENT_CACHE", "true").lower() == "true":
+            try:
+                max_segmentos = int(os.getenv("PII_NER_SEGMENT_CACHE_ITENS", MAX_SEGMENTOS_PADRAO))
+            except ValueError:
+                logger.warning(f"⚠️ PII_NER_SEGMENT_CACHE_ITENS inválido, usando {MAX_SEGMENTOS_PADRAO}")
+                max_segmentos = MAX_SEGMENTOS_PADRAO
+            self.cache_segmentos_ner = {
+                modelo: CacheSegmentosNER(modelo, max_segmentos) for modelo in ("bert", "nuner", "spacy")
+            }
         
         # Validador de DV
         if DVValidator:
@@ -883,6 +1083,16 @@ class PIIDetector:
         # Inicializa Presidio se disponível
         if PRESIDIO_AVAILABLE:
             self._inicializar_presidio()
+        
+        # Cache de resultados (memória LRU+TTL e, opcionalmente, Redis)
+        if result_cache is None:
+            result_cache = os.getenv("PII_CACHE", "false").lower() == "true"
+        self.cache_resultados: Optional[CacheResultados] = CacheResultados.de_env() if result_cache else None
+        # Chamadas simultâneas de detect() com o mesmo texto/opções compartilham um cálculo
+        self.coalescencia: Optional[SingleFlight] = None
+        if os.getenv("PII_COALESCE", "true").lower() == "true":
+            self.coalescencia = SingleFlight()
+        self._assinatura_base = self._calcular_assinatura_base()
     
     def _inicializar_vocabularios(self) -> None:
         """Inicializa todos os vocabulários e listas de contexto."""
@@ -895,6 +1105,25 @@ class PIIDetector:
         self.contextos_pii: Set[str] = CONTEXTOS_PII.copy() if CONTEXTOS_PII else set()
         self.pesos_pii: Dict[str, int] = PESOS_PII.copy() if PESOS_PII else {}
         
+        # Motores Aho-Corasick (uma passada por texto em vez de any(t in texto ...))
+        self.vocabulario, self.vocabulario_cpf = criar_motores_vocabulario(
+            termos_seguros=self.termos_seguros,
+            gatilhos_contato=self.gatilhos_contato,
+            indicadores_servidor=self.indicadores_servidor,
+            cargos_autoridade=self.cargos_autoridade,
+        )
+        self.block_if_contains_norm = frozenset(self._normalizar(b) for b in BLOCK_IF_CONTAINS)
+        
+        # Só trechos com par de palavras capitalizadas que pode ser nome vão ao BERT/NuNER
+        self.filtro_nome: Optional[FiltroCandidatosNome] = None
+        if os.getenv("PII_NER_GATE", "true").lower() == "true":
+            self.filtro_nome = FiltroCandidatosNome(
+                bloqueados=self.block_if_contains_norm,
+                blocklist=frozenset(self.blocklist_total),
+                normalizar=self._normalizar,
+                termo_ignorado=self._contem_termo_ignorado,
+            )
+        
         # Confiança base por tipo
         self.confianca_base: Dict[str, float] = CONFIANCA_BASE.copy() if CONFIANCA_BASE else {
             "CPF": 0.95,
@@ -1441,45 +1670,111 @@ class PIIDetector:
                 self.patterns_compilados[nome] = re.compile(regex, flags)
             except re.error as e:
                 logger.error(f"Erro compilando pattern {nome}: {e}")
+        
+        # Varredura única: despacha todos os patterns em uma passada sobre o texto
+        self.varredura_regex = VarreduraRegex(self.patterns_compilados)
+        
+        # Heurísticas regex fora da tabela, sujeitas ao mesmo pré-filtro
+        self.heuristicas_regex: Dict[str, re.Pattern] = {
+            # Nome + menção de CPF/documento (sem número)
+            'NOME_MENCAO_CPF': re.compile(
+                r'([A-Za-zÀ-ÿ]+(?:\s+[A-Za-zÀ-ÿ]+)+)[^.]{0,50}(?:seu\s+cpf|seu\s+documento|informou\s+(?:seu\s+)?cpf)',
+                re.IGNORECASE
+            ),
+        }
+        
+        # Pré-filtro: pula patterns cujos literais/dígitos obrigatórios não estão no texto
+        self.prefiltro_regex: Optional[PrefiltroRegex] = None
+        if os.getenv("PII_REGEX_PREFILTRO", "true").lower() == "true":
+            self.prefiltro_regex = PrefiltroRegex({**self.patterns_compilados, **self.heuristicas_regex})
     
     def _carregar_modelos_ner(self) -> None:
-        """Carrega modelos NER (BERT, NuNER, spaCy)."""
-        device = 0 if torch.cuda.is_available() and self.usar_gpu else -1
+        """Carrega modelos NER (BERT, NuNER, spaCy).
+
+        BERT e NuNER usam o backend definido em PII_NER_BACKEND: "torch"
+        (transformers) ou "onnx" (ONNX Runtime, modelos em models/*_ner_onnx).
+        Se o ONNX falhar, cai para o pipeline PyTorch.
         
-        # BERT Davlan (multilíngue)
+        Com PII_NER_QUANTIZACAO=int8, os pesos INT8 só são usados se a guarda
+        de recall (src/inference/quantizacao.py) tiver aprovado o backend.
+        """
+        self.ner_backend = obter_backend_ner()
+        self.ner_int8 = quantizacao_int8_habilitada(self.ner_backend)
+        self._carregar_pipelines_transformers()
+        
+        # spaCy (backup)
         try:
-            self.nlp_bert = pipeline(
-                "ner",
-                model="Davlan/bert-base-multilingual-cased-ner-hrl",
-                aggregation_strategy="simple",
-                device=device
-            )
-            logger.info("✅ BERT Davlan NER multilíngue carregado")
+            import spacy
+            self.nlp_spacy = spacy.load("pt_core_news_lg")
+            logger.info("✅ spaCy pt_core_news_lg carregado")
         except Exception as e:
-            self.nlp_bert = None
-            logger.warning(f"⚠️ BERT NER indisponível: {e}")
+            self.nlp_spacy = None
+            logger.warning(f"⚠️ spaCy indisponível: {e}")
+    
+    def _carregar_pipelines_transformers(self) -> None:
+        """Carrega BERT e NuNER no backend/precisão atuais."""
+        self._geracao_ner += 1
+        device = 0 if torch.cuda.is_available() and self.usar_gpu else -1
+        
+        # BERT Davlan (multilíngue)
+        self.nlp_bert = self._criar_pipeline_ner("bert", "BERT Davlan NER multilíngue", device)
         
         # NuNER pt-BR (especializado português)
+        self.nlp_nuner = self._criar_pipeline_ner("nuner", "NuNER pt-BR", device)
+    
+    def recarregar_ner(self, int8: bool) -> None:
+        """Recarrega BERT/NuNER em fp32 ou INT8, ignorando a guarda de recall.
+        
+        Usado pela validação em src/inference/quantizacao.py para medir o
+        INT8 antes de aprová-lo; em produção a precisão vem do construtor.
+        """
+        self.ner_int8 = int8
+        self._carregar_pipelines_transformers()
+        # Saídas e resultados da precisão anterior não valem para a nova
+        for modelo in ("bert", "nuner"):
+            if modelo in self.cache_segmentos_ner:
+                self.cache_segmentos_ner[modelo].limpar()
+        self._assinatura_base = self._calcular_assinatura_base()
+    
+    def _versao_ner(self, modelo: str) -> str:
+        """Rótulo estável do modelo carregado, para o cache de segmentos."""
+        if modelo == "spacy":
+            return "spacy"
+        precisao = "int8" if getattr(self, "ner_int8", False) else "fp32"
+        return f"{modelo}:{getattr(self, 'ner_backend', None)}:{precisao}:{self._geracao_ner}"
+    
+    def _criar_pipeline_ner(self, chave: str, descricao: str, device: int):
+        """Cria o pipeline NER da chave ("bert"/"nuner") no backend configurado."""
+        precisao = "INT8" if self.ner_int8 else "fp32"
+        int8_torch = self.ner_int8
+        if self.ner_backend == BACKEND_ONNX and criar_pipeline_ner_onnx:
+            try:
+                nlp = criar_pipeline_ner_onnx(chave, device, int8=self.ner_int8)
+                logger.info(f"✅ {descricao} carregado (ONNX Runtime, {precisao})")
+                return nlp
+            except Exception as e:
+                logger.warning(f"⚠️ {descricao} ONNX indisponível, usando PyTorch: {e}")
+                # A aprovação do INT8 é por backend: o fallback precisa da sua própria
+                int8_torch = self.ner_int8 and int8_aprovado("torch")
+        
         try:
-            self.nlp_nuner = pipeline(
+            nlp = pipeline(
                 "ner",
-                model="monilouise/ner_news_portuguese",
+                model=MODELOS_NER[chave]["model_id"],
                 aggregation_strategy="simple",
                 device=device
             )
-            logger.info("✅ NuNER pt-BR carregado")
-        except Exception as e:
-            self.nlp_nuner = None
-            logger.warning(f"⚠️ NuNER indisponível: {e}")
-        
-        # spaCy (backup)
-        try:
-            import spacy
-            self.nlp_spacy = spacy.load("pt_core_news_lg")
-            logger.info("✅ spaCy pt_core_news_lg carregado")
+            if int8_torch and quantizar_pipeline_torch:
+                if device == -1:
+                    nlp = quantizar_pipeline_torch(nlp)
+                    logger.info(f"✅ {descricao} carregado (PyTorch, INT8 dinâmico)")
+                    return nlp
+                logger.warning(f"⚠️ INT8 dinâmico só é suportado em CPU; {descricao} em fp32")
+            logger.info(f"✅ {descricao} carregado")
+            return nlp
         except Exception as e:
-            self.nlp_spacy = None
-            logger.warning(f"⚠️ spaCy indisponível: {e}")
+            logger.warning(f"⚠️ {descricao} indisponível: {e}")
+            return None
     
     def _inicializar_presidio(self) -> None:
         """Inicializa o Presidio Analyzer para entidades complementares.
@@ -1524,6 +1819,18 @@ class PIIDetector:
         """Normaliza texto para comparação (com cache)."""
         return unidecode(texto).upper().strip() if texto else ""
     
+    def _normalizar_trecho(self, texto: str, inicio: int, fim: int) -> str:
+        """Equivale a `_normalizar(texto[inicio:fim])`, lendo do DocumentContext quando houver."""
+        if isinstance(texto, DocumentContext):
+            return texto.normalizar_trecho(inicio, fim)
+        return self._normalizar(texto[inicio:fim])
+    
+    def _minusculo_trecho(self, texto: str, inicio: int, fim: int) -> str:
+        """Equivale a `unidecode(texto[inicio:fim]).lower()`, lendo do DocumentContext quando houver."""
+        if isinstance(texto, DocumentContext):
+            return texto.minusculo_trecho(inicio, fim)
+        return unidecode(texto[inicio:fim]).lower()
+    
     def _deve_ignorar_entidade(self, texto_entidade: str) -> bool:
         """Decide se uma entidade detectada deve ser ignorada (não é PII)."""
         if not texto_entidade or len(texto_entidade) < 3:
@@ -1542,23 +1849,12 @@ class PIIDetector:
             return True
         
         # 2. BLOCK_IF_CONTAINS
-        palavras_nome = set(t_norm.split())
-        for blocked in BLOCK_IF_CONTAINS:
-            blocked_norm = self._normalizar(blocked)
-            if blocked_norm in palavras_nome:
-                return True
-        
-        # 3. Termos seguros (match parcial)
-        if any(ts in t_norm for ts in self.termos_seguros):
+        if not self.block_if_contains_norm.isdisjoint(t_norm.split()):
             return True
         
-        # 4. Gazetteer GDF
-        termos_gazetteer = carregar_gazetteer_gdf()
-        if t_norm in termos_gazetteer:
+        # 3-4. Termos seguros e gazetteer GDF (match parcial)
+        if self._contem_termo_ignorado(t_norm):
             return True
-        for termo_gdf in termos_gazetteer:
-            if termo_gdf in t_norm:
-                return True
         
         # 5. Só números/símbolos
         if re.match(r'^[\d/\.\-\s]+$', texto_entidade):
@@ -1566,9 +1862,24 @@ class PIIDetector:
         
         return False
     
+    def _contem_termo_ignorado(self, t_norm: str) -> bool:
+        """Texto normalizado contém termo seguro ou do gazetteer GDF (substring)."""
+        # Termos seguros (match parcial)
+        if self.vocabulario.contem(t_norm, TERMO_SEGURO):
+            return True
+        
+        # Gazetteer GDF (índice em cache + Aho-Corasick para match parcial)
+        if obter_indice_gazetteer is not None:
+            indice_gdf = obter_indice_gazetteer()
+            return indice_gdf.contem(t_norm) or indice_gdf.algum_termo_em(t_norm)
+        termos_gazetteer = carregar_gazetteer_gdf()
+        if t_norm in termos_gazetteer:
+            return True
+        return any(termo_gdf in t_norm for termo_gdf in termos_gazetteer)
+    
     def _contexto_negativo_cpf(self, texto: str, cpf_valor: str) -> bool:
         """Verifica se CPF está em contexto que invalida (exemplo, fictício, etc)."""
-        idx = texto.find(cpf_valor)
+        idx = texto.primeira_posicao(cpf_valor) if isinstance(texto, DocumentContext) else texto.find(cpf_valor)
         if idx == -1:
             return False
         
@@ -1590,8 +1901,8 @@ class PIIDetector:
     def _calcular_fator_contexto(self, texto: str, inicio: int, fim: int, tipo: str) -> float:
         """Calcula fator multiplicador de confiança baseado no contexto."""
         janela = 60
-        pre = self._normalizar(texto[max(0, inicio-janela):inicio])
-        pos = self._normalizar(texto[fim:min(len(texto), fim+janela)])
+        pre = self._normalizar_trecho(texto, max(0, inicio-janela), inicio)
+        pos = self._normalizar_trecho(texto, fim, min(len(texto), fim+janela))
         contexto_completo = pre + " " + pos
         
         fator = 1.0
@@ -1617,10 +1928,8 @@ class PIIDetector:
             fator += 0.05
         
         if tipo == "NOME":
-            for gatilho in self.gatilhos_contato:
-                if gatilho in pre:
-                    fator += 0.10
-                    break
+            if self.vocabulario.contem(pre, GATILHO_CONTATO):
+                fator += 0.10
         
         # === PENALIDADES ===
         if re.search(r'\b(EXEMPLO|TESTE|FICTICIO|FICTÍCIO|FAKE|GENERICO|GENÉRICO)\b', contexto_completo):
@@ -1699,925 +2008,923 @@ class PIIDetector:
         d2 = 0 if resto < 2 else 11 - resto
         return int(numeros[13]) == d2
     
-    def _detectar_regex(self, texto: str) -> List[Dict]:
+    def _detectar_regex(self, texto: str, ctx: Optional[ContextoDeteccao] = None) -> List[Dict]:
         """Detecção por regex com validação de dígito verificador."""
         findings = []
-        for tipo, pattern in self.patterns_compilados.items():
-            for match in pattern.finditer(texto):
-                # Para tipos bancários, reconstruir valor a partir de todos os grupos capturados
-                if tipo in ['DADOS_BANCARIOS', 'CONTA_BANCARIA']:
-                    grupos = [g for g in match.groups() if g]
-                    if grupos:
-                        # Monta string legível (ex: Conta 12345-6 Ag 1234)
-                        if tipo == 'DADOS_BANCARIOS':
-                            if len(grupos) == 4:
-                                valor = f"Conta {grupos[2]} Ag {grupos[3]}"
-                            elif len(grupos) == 2:
-                                valor = f"Agência {grupos[0]} Conta {grupos[1]}"
-                            elif len(grupos) == 3:
-                                valor = f"Depósito/Transferência Ag {grupos[0]} CC {grupos[2]}"
-                            else:
-                                valor = ' '.join(grupos)
+        perfil = self.prefiltro_regex.perfil(texto) if self.prefiltro_regex else None
+        possiveis = None
+        if perfil is not None:
+            possiveis = self.prefiltro_regex.possiveis(perfil, self.patterns_compilados)
+            ignorados = len(self.patterns_compilados) - len(possiveis)
+            if ctx is not None:
+                ctx.patterns_regex_ignorados = ignorados
+            logger.debug(f"Pré-filtro regex: {ignorados}/{len(self.patterns_compilados)} patterns ignorados")
+        for tipo, match in self.varredura_regex.iterar(texto, possiveis):
+            # Para tipos bancários, reconstruir valor a partir de todos os grupos capturados
+            if tipo in ['DADOS_BANCARIOS', 'CONTA_BANCARIA']:
+                grupos = [g for g in match.groups() if g]
+                if grupos:
+                    # Monta string legível (ex: Conta 12345-6 Ag 1234)
+                    if tipo == 'DADOS_BANCARIOS':
+                        if len(grupos) == 4:
+                            valor = f"Conta {grupos[2]} Ag {grupos[3]}"
+                        elif len(grupos) == 2:
+                            valor = f"Agência {grupos[0]} Conta {grupos[1]}"
+                        elif len(grupos) == 3:
+                            valor = f"Depósito/Transferência Ag {grupos[0]} CC {grupos[2]}"
                         else:
                             valor = ' '.join(grupos)
                     else:
-                        valor = match.group()
-                    inicio, fim = match.start(), match.end()
+                        valor = ' '.join(grupos)
                 else:
-                    # Para telefones, usar match completo ao invés do grupo capturado
-                    # Isso evita pegar só o DDD ao invés do número completo
-                    if tipo in ['CELULAR', 'TELEFONE_FIXO', 'TELEFONE_DDI', 'TELEFONE_DDD_ESPACO', 
-                                'TELEFONE_LOCAL', 'TELEFONE_INTERNACIONAL', 'TELEFONE_CURTO',
-                                'TELEFONE_DDD_HIFEN', 'CELULAR_SEM_FORMATACAO', 'TELEFONE_DDD_ZERO']:
-                        valor = match.group()
-                    # Para ENDERECO_SETOR_DF, usar match completo (grupo 1 é só a sigla)
-                    elif tipo == 'ENDERECO_SETOR_DF':
-                        valor = match.group()
-                    # Para DATA_NASCIMENTO, pegar o grupo que não é None
-                    elif tipo == 'DATA_NASCIMENTO':
-                        valor = match.group(1) or match.group(2) or match.group()
-                    # Para REGISTRO_PROFISSIONAL (OAB/CRM/etc), montar valor completo
-                    elif tipo == 'REGISTRO_PROFISSIONAL':
-                        grupos = match.groups()  # (tipo_registro, uf, numero)
-                        tipo_reg = grupos[0].upper() if grupos[0] else ''
-                        uf = grupos[1].upper() if grupos[1] else ''
-                        numero = grupos[2] if grupos[2] else ''
-                        if uf and numero:
-                            valor = f"{tipo_reg}/{uf} {numero}"
-                        elif numero:
-                            valor = f"{tipo_reg} {numero}"
-                        else:
-                            valor = match.group()
+                    valor = match.group()
+                inicio, fim = match.start(), match.end()
+            else:
+                # Para telefones, usar match completo ao invés do grupo capturado
+                # Isso evita pegar só o DDD ao invés do número completo
+                if tipo in ['CELULAR', 'TELEFONE_FIXO', 'TELEFONE_DDI', 'TELEFONE_DDD_ESPACO', 
+                            'TELEFONE_LOCAL', 'TELEFONE_INTERNACIONAL', 'TELEFONE_CURTO',
+                            'TELEFONE_DDD_HIFEN', 'CELULAR_SEM_FORMATACAO', 'TELEFONE_DDD_ZERO']:
+                    valor = match.group()
+                # Para ENDERECO_SETOR_DF, usar match completo (grupo 1 é só a sigla)
+                elif tipo == 'ENDERECO_SETOR_DF':
+                    valor = match.group()
+                # Para DATA_NASCIMENTO, pegar o grupo que não é None
+                elif tipo == 'DATA_NASCIMENTO':
+                    valor = match.group(1) or match.group(2) or match.group()
+                # Para REGISTRO_PROFISSIONAL (OAB/CRM/etc), montar valor completo
+                elif tipo == 'REGISTRO_PROFISSIONAL':
+                    grupos = match.groups()  # (tipo_registro, uf, numero)
+                    tipo_reg = grupos[0].upper() if grupos[0] else ''
+                    uf = grupos[1].upper() if grupos[1] else ''
+                    numero = grupos[2] if grupos[2] else ''
+                    if uf and numero:
+                        valor = f"{tipo_reg}/{uf} {numero}"
+                    elif numero:
+                        valor = f"{tipo_reg} {numero}"
                     else:
-                        valor = match.group(1) if match.lastindex else match.group()
-                    inicio, fim = match.start(), match.end()
+                        valor = match.group()
+                else:
+                    valor = match.group(1) if match.lastindex else match.group()
+                inicio, fim = match.start(), match.end()
 
-                # --- PATCH: INSCRICAO_IMOVEL ---
-                if tipo in ['INSCRICAO_IMOVEL_15', 'INSCRICAO_IMOVEL_LABEL']:
-                    findings.append({
-                        "tipo": "INSCRICAO_IMOVEL", "valor": valor,
-                        "confianca": self._calcular_confianca("INSCRICAO_IMOVEL", texto, inicio, fim) if hasattr(self, '_calcular_confianca') else 0.85,
-                        "peso": 4, "inicio": inicio, "fim": fim
-                    })
-                    continue
+            # --- PATCH: INSCRICAO_IMOVEL ---
+            if tipo in ['INSCRICAO_IMOVEL_15', 'INSCRICAO_IMOVEL_LABEL']:
+                findings.append({
+                    "tipo": "INSCRICAO_IMOVEL", "valor": valor,
+                    "confianca": self._calcular_confianca("INSCRICAO_IMOVEL", texto, inicio, fim) if hasattr(self, '_calcular_confianca') else 0.85,
+                    "peso": 4, "inicio": inicio, "fim": fim
+                })
+                continue
 
-                # --- HEURÍSTICA CPF ---
-                if tipo == 'CPF':
-                    contexto = texto[max(0, inicio-60):fim+60].lower()
-                    contexto_positivo = any(
-                        kw in contexto for kw in [
-                            "meu cpf", "minha cpf", "conforme cadastro", "precisa ser verificado", 
-                            "cpf do titular", "cpf contribuinte", "cadastrado com cpf", "cpf formato real", 
-                            "cpf com dígito", "cpf com dv", "cpf:", "contribuinte cpf", "titular do cpf",
-                            "contribuinte", "titular", "o cpf", "seu cpf", "informou seu cpf",
-                            "nome:", "e-mail:", "email:", "telefone:", "fone:", "celular:", "endereço:",
-                            "cpf da mãe", "cpf do pai", "cpf mãe", "cpf pai", "filiação"
-                        ]
-                    )
-                    contexto_negativo = self._contexto_negativo_cpf(texto, valor)
-                    
-                    # PATCH: Se o contexto imediatamente antes é "processo", não é CPF - é número de processo
-                    contexto_antes = texto[max(0, inicio-20):inicio].lower()
-                    if re.search(r'\bprocesso\s*$', contexto_antes):
-                        logger.debug(f"[CPF] Ignorado por contexto 'processo': {valor}")
-                        continue
-                    
-                    # Nunca marca exemplos/fictícios como PII
-                    if contexto_negativo:
-                        continue
-                    # LGPD: Detectar CPF pelo FORMATO mesmo se matematicamente inválido
-                    # CPFs com formato XX.XXX.XXX-XX são PII independente dos dígitos verificadores
-                    cpf_valido = self._validar_cpf(valor)
-                    cpf_limpo = re.sub(r'\D', '', valor)
-                    formato_correto = len(cpf_limpo) == 11 and cpf_limpo != cpf_limpo[0] * 11
-                    
-                    # Aceita se: formato correto OU contexto positivo
-                    if not formato_correto and not contexto_positivo:
-                        continue
-                    
-                    # Calcula confiança baseada em validação + contexto
-                    confianca = self._calcular_confianca("CPF", texto, inicio, fim)
-                    if not cpf_valido:
-                        confianca = max(0.6, confianca * 0.8)  # Reduz mas mantém detectável
-                    
-                    findings.append({
-                        "tipo": "CPF", "valor": valor, "confianca": confianca,
-                        "peso": 5 if cpf_valido else 3, "inicio": inicio, "fim": fim
-                    })
+            # --- HEURÍSTICA CPF ---
+            if tipo == 'CPF':
+                contexto = texto[max(0, inicio-60):fim+60].lower()
+                contexto_positivo = self.vocabulario_cpf.contem(contexto, CONTEXTO_POSITIVO_CPF)
+                contexto_negativo = self._contexto_negativo_cpf(texto, valor)
+                
+                # PATCH: Se o contexto imediatamente antes é "processo", não é CPF - é número de processo
+                contexto_antes = texto[max(0, inicio-20):inicio].lower()
+                if re.search(r'\bprocesso\s*$', contexto_antes):
+                    logger.debug(f"[CPF] Ignorado por contexto 'processo': {valor}")
+                    continue
+                
+                # Nunca marca exemplos/fictícios como PII
+                if contexto_negativo:
+                    continue
+                # LGPD: Detectar CPF pelo FORMATO mesmo se matematicamente inválido
+                # CPFs com formato XX.XXX.XXX-XX são PII independente dos dígitos verificadores
+                cpf_valido = self._validar_cpf(valor)
+                cpf_limpo = re.sub(r'\D', '', valor)
+                formato_correto = len(cpf_limpo) == 11 and cpf_limpo != cpf_limpo[0] * 11
+                
+                # Aceita se: formato correto OU contexto positivo
+                if not formato_correto and not contexto_positivo:
+                    continue
+                
+                # Calcula confiança baseada em validação + contexto
+                confianca = self._calcular_confianca("CPF", texto, inicio, fim)
+                if not cpf_valido:
+                    confianca = max(0.6, confianca * 0.8)  # Reduz mas mantém detectável
+                
+                findings.append({
+                    "tipo": "CPF", "valor": valor, "confianca": confianca,
+                    "peso": 5 if cpf_valido else 3, "inicio": inicio, "fim": fim
+                })
 
-                # --- HEURÍSTICA PROCESSO SEI ---
-                elif tipo in ['PROCESSO_SEI', 'PROTOCOLO_LAI', 'PROTOCOLO_OUV', 'PROTOCOLO_EXTRA', 'PROTOCOLO_GENERICO']:
-                    from text_unidecode import unidecode
-                    contexto = texto[max(0, inicio-120):fim+120]
-                    texto_norm = unidecode(texto).lower()
-                    contexto_norm = unidecode(contexto).lower()
-                    
-                    # NOVO: Ignorar se é referência legal (Decreto, Lei, Portaria, Resolução)
-                    ctx_antes = texto[max(0, inicio-30):inicio].lower()
-                    referencias_legais = ['decreto', 'lei ', 'lei:', 'portaria', 'resolução', 'resolucao', 
-                                         'instrução normativa', 'instrucao normativa', 'edital']
-                    if any(ref in ctx_antes for ref in referencias_legais):
-                        continue  # Não é processo SEI, é número de referência legal
-                    
-                    # NOVO: Ignorar se é processo de órgão FEDERAL (não é GDF, é referência administrativa)
-                    orgaos_federais = ['cgu', 'tcu', 'stf', 'stj', 'pgr', 'mpu', 'advocacia geral', 
-                                       'ministerio', 'ministério', 'receita federal', 'inss', 'ibama',
-                                       'anatel', 'anvisa', 'ana ', ' ana,', 'caixa federal']
-                    ctx_depois = texto[fim:min(len(texto), fim+50)].lower()
-                    # Verifica se menciona órgão federal antes ou depois do número
-                    if any(org in ctx_antes for org in orgaos_federais) or any(org in ctx_depois for org in orgaos_federais):
-                        continue  # É processo de órgão federal, não GDF
-                    
-                    # NOVO: Ignorar se é referência genérica ("Referência:", "ref:", "conforme", etc.)
-                    indicadores_referencia = ['referência:', 'referencia:', 'ref:', 'conforme ', 
-                                              'conforme o ', 'considerando o processo', 'proc.']
-                    if any(ref in ctx_antes.lower() for ref in indicadores_referencia):
-                        continue  # É apenas referência administrativa, não PII
-                    
-                    # Protocolos LAI/OUV explícitos: sempre PII, exceto se contexto negativo
-                    if tipo in ['PROTOCOLO_LAI', 'PROTOCOLO_OUV']:
-                        label_explicito = any(lbl in contexto_norm for lbl in ['protocolo lai', 'protocolo ouv', 'lai-', 'ouv-'])
-                        frases_negativas = [
-                            "exemplo", "referencia", "referência", "só referência", "só exemplo", "não é protocolo", "nao é protocolo", "não protocolo", "nao protocolo", "não é válido", "nao e valido"
-                        ]
-                        contexto_negativo = any(kw in contexto_norm for kw in frases_negativas) or any(kw in texto_norm for kw in frases_negativas)
-                        if label_explicito and not contexto_negativo:
-                            findings.append({
-                                "tipo": tipo, "valor": valor,
-                                "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
-                                "peso": 3, "inicio": inicio, "fim": fim
-                            })
-                            continue
-                    
-                    # LGPD: Processos SEI são SEMPRE PIIs quando mencionados em contextos LAI
-                    # Qualquer processo SEI em uma solicitação de acesso é dado pessoal
-                    # pois vincula o cidadão a um procedimento administrativo
-                    
-                    # Frases que indicam que NÃO é PII (exemplos genéricos)
-                    frases_negativas_reais = [
-                        "nao e um processo", "não é um processo", "exemplo de processo", 
-                        "exemplo de protocolo", "número similar", "número ficticio", 
-                        "não é válido", "nao e valido", "formatação de processo"
-                    ]
-                    contexto_negativo = any(kw in contexto_norm for kw in frases_negativas_reais)
-                    
-                    if contexto_negativo:
-                        continue
-                    
-                    # Processo SEI com label explícito: sempre PII
-                    labels_processo = ['processo sei', 'processo nº', 'processo no', 'processo n°', 
-                                       'processo administrativo', 'autos do processo', 'sei nº', 'sei n°',
-                                       'acesso ao processo', 'processo de nº']
-                    tem_label = any(lbl in contexto_norm for lbl in labels_processo)
-                    
-                    if tem_label:
-                        findings.append({
-                            "tipo": tipo, "valor": valor,
-                            "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
-                            "peso": 3, "inicio": inicio, "fim": fim
-                        })
-                        continue
-                    
-                    # Frases que indicam contexto de posse/interesse
-                    frases_posse = [
-                        "meu processo", "meu número", "minha processo", "do requerente", "do cidadao", 
-                        "do solicitante", "do interessado", "do titular", "do usuario", "do paciente", 
-                        "do denunciante", "do autor", "do beneficiario", "do responsavel", 
-                        "referente ao processo", "processo do", "processo da", "solicito acesso",
-                        "solicito cópia", "gostaria de acesso", "acesso aos autos", "acesso externo",
-                        "informações sobre o processo", "consultar o andamento"
+            # --- HEURÍSTICA PROCESSO SEI ---
+            elif tipo in ['PROCESSO_SEI', 'PROTOCOLO_LAI', 'PROTOCOLO_OUV', 'PROTOCOLO_EXTRA', 'PROTOCOLO_GENERICO']:
+                from text_unidecode import unidecode
+                contexto = texto[max(0, inicio-120):fim+120]
+                texto_norm = self._minusculo_trecho(texto, 0, len(texto))
+                contexto_norm = self._minusculo_trecho(texto, max(0, inicio-120), fim+120)
+                
+                # NOVO: Ignorar se é referência legal (Decreto, Lei, Portaria, Resolução)
+                ctx_antes = texto[max(0, inicio-30):inicio].lower()
+                referencias_legais = ['decreto', 'lei ', 'lei:', 'portaria', 'resolução', 'resolucao', 
+                                     'instrução normativa', 'instrucao normativa', 'edital']
+                if any(ref in ctx_antes for ref in referencias_legais):
+                    continue  # Não é processo SEI, é número de referência legal
+                
+                # NOVO: Ignorar se é processo de órgão FEDERAL (não é GDF, é referência administrativa)
+                orgaos_federais = ['cgu', 'tcu', 'stf', 'stj', 'pgr', 'mpu', 'advocacia geral', 
+                                   'ministerio', 'ministério', 'receita federal', 'inss', 'ibama',
+                                   'anatel', 'anvisa', 'ana ', ' ana,', 'caixa federal']
+                ctx_depois = texto[fim:min(len(texto), fim+50)].lower()
+                # Verifica se menciona órgão federal antes ou depois do número
+                if any(org in ctx_antes for org in orgaos_federais) or any(org in ctx_depois for org in orgaos_federais):
+                    continue  # É processo de órgão federal, não GDF
+                
+                # NOVO: Ignorar se é referência genérica ("Referência:", "ref:", "conforme", etc.)
+                indicadores_referencia = ['referência:', 'referencia:', 'ref:', 'conforme ', 
+                                          'conforme o ', 'considerando o processo', 'proc.']
+                if any(ref in ctx_antes.lower() for ref in indicadores_referencia):
+                    continue  # É apenas referência administrativa, não PII
+                
+                # Protocolos LAI/OUV explícitos: sempre PII, exceto se contexto negativo
+                if tipo in ['PROTOCOLO_LAI', 'PROTOCOLO_OUV']:
+                    label_explicito = any(lbl in contexto_norm for lbl in ['protocolo lai', 'protocolo ouv', 'lai-', 'ouv-'])
+                    frases_negativas = [
+                        "exemplo", "referencia", "referência", "só referência", "só exemplo", "não é protocolo", "nao é protocolo", "não protocolo", "nao protocolo", "não é válido", "nao e valido"
                     ]
-                    contexto_posse = any(kw in contexto_norm for kw in frases_posse) or any(kw in texto_norm for kw in frases_posse)
-                    
-                    # Se tem contexto de posse/interesse, marca como PII
-                    if contexto_posse:
+                    contexto_negativo = any(kw in contexto_norm for kw in frases_negativas) or any(kw in texto_norm for kw in frases_negativas)
+                    if label_explicito and not contexto_negativo:
                         findings.append({
                             "tipo": tipo, "valor": valor,
                             "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
                             "peso": 3, "inicio": inicio, "fim": fim
                         })
-                    # IMPORTANTE: SEM contexto de posse, processos são apenas referências administrativas
-                    # Não são PII por si só - apenas quando vinculados a pessoa específica
-                    # Exemplo: "SEI 00040-00098765/2025-00" sem contexto = NÃO é PII
-                    # Exemplo: "Meu processo SEI 00040-00098765/2025-00" = É PII
-                    else:
-                        # Não adiciona ao findings - processo sem contexto de posse não é PII
-                        continue
-
-                elif tipo in ['PROTOCOLO_LAI', 'PROTOCOLO_OUV', 'PROTOCOLO_GENERICO']:
-                    contexto = texto[max(0, inicio-100):fim+100].lower()
-                    contexto_negativo = any(
-                        kw in contexto for kw in [
-                            "exemplo", "referência", "referencia", "só referência", "só exemplo", "não é protocolo", "nao é protocolo"
-                        ]
-                    )
-                    if contexto_negativo:
                         continue
-                    # PROTOCOLO_GENERICO vai como PROTOCOLO_LAI
-                    tipo_final = 'PROTOCOLO_LAI' if tipo == 'PROTOCOLO_GENERICO' else tipo
+                
+                # LGPD: Processos SEI são SEMPRE PIIs quando mencionados em contextos LAI
+                # Qualquer processo SEI em uma solicitação de acesso é dado pessoal
+                # pois vincula o cidadão a um procedimento administrativo
+                
+                # Frases que indicam que NÃO é PII (exemplos genéricos)
+                frases_negativas_reais = [
+                    "nao e um processo", "não é um processo", "exemplo de processo", 
+                    "exemplo de protocolo", "número similar", "número ficticio", 
+                    "não é válido", "nao e valido", "formatação de processo"
+                ]
+                contexto_negativo = any(kw in contexto_norm for kw in frases_negativas_reais)
+                
+                if contexto_negativo:
+                    continue
+                
+                # Processo SEI com label explícito: sempre PII
+                labels_processo = ['processo sei', 'processo nº', 'processo no', 'processo n°', 
+                                   'processo administrativo', 'autos do processo', 'sei nº', 'sei n°',
+                                   'acesso ao processo', 'processo de nº']
+                tem_label = any(lbl in contexto_norm for lbl in labels_processo)
+                
+                if tem_label:
                     findings.append({
-                        "tipo": tipo_final, "valor": valor,
+                        "tipo": tipo, "valor": valor,
                         "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
                         "peso": 3, "inicio": inicio, "fim": fim
                     })
-
-                elif tipo == 'OCORRENCIA_POLICIAL':
-                    contexto = texto[max(0, inicio-100):fim+100].lower()
-                    contexto_negativo = any(
-                        kw in contexto for kw in [
-                            "exemplo", "referência", "referencia", "só referência", "só exemplo", "não é ocorrência", "nao é ocorrência"
-                        ]
-                    )
-                    if contexto_negativo:
-                        continue
+                    continue
+                
+                # Frases que indicam contexto de posse/interesse
+                frases_posse = [
+                    "meu processo", "meu número", "minha processo", "do requerente", "do cidadao", 
+                    "do solicitante", "do interessado", "do titular", "do usuario", "do paciente", 
+                    "do denunciante", "do autor", "do beneficiario", "do responsavel", 
+                    "referente ao processo", "processo do", "processo da", "solicito acesso",
+                    "solicito cópia", "gostaria de acesso", "acesso aos autos", "acesso externo",
+                    "informações sobre o processo", "consultar o andamento"
+                ]
+                contexto_posse = any(kw in contexto_norm for kw in frases_posse) or any(kw in texto_norm for kw in frases_posse)
+                
+                # Se tem contexto de posse/interesse, marca como PII
+                if contexto_posse:
                     findings.append({
-                        "tipo": "OCORRENCIA_POLICIAL", "valor": valor,
-                        "confianca": self._calcular_confianca("OCORRENCIA_POLICIAL", texto, inicio, fim),
+                        "tipo": tipo, "valor": valor,
+                        "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
                         "peso": 3, "inicio": inicio, "fim": fim
                     })
+                # IMPORTANTE: SEM contexto de posse, processos são apenas referências administrativas
+                # Não são PII por si só - apenas quando vinculados a pessoa específica
+                # Exemplo: "SEI 00040-00098765/2025-00" sem contexto = NÃO é PII
+                # Exemplo: "Meu processo SEI 00040-00098765/2025-00" = É PII
+                else:
+                    # Não adiciona ao findings - processo sem contexto de posse não é PII
+                    continue
 
-                elif tipo == 'CNPJ':
-                    # LGPD: Detectar CNPJ pelo FORMATO mesmo se matematicamente inválido
-                    cnpj_valido = self._validar_cnpj(valor)
-                    cnpj_limpo = re.sub(r'\D', '', valor)
-                    formato_correto = len(cnpj_limpo) == 14 and cnpj_limpo != cnpj_limpo[0] * 14
-                    
-                    if not formato_correto:
-                        continue
-                    
-                    # IMPORTANTE: Verificar se faz parte de PROCESSO_SEI
-                    # Formato típico de processo: XXXXX-XXXXXXXX/YYYY-XX
-                    # Se há prefixo de processo antes do "CNPJ", é processo, não CNPJ
-                    contexto_antes = texto[max(0, inicio-10):inicio]
-                    eh_parte_processo = bool(re.search(r'\d{4,5}[-\s]$', contexto_antes))
-                    if eh_parte_processo:
-                        continue  # Pula - é parte de um processo SEI
-                        
-                    contexto = texto[max(0, inicio-50):fim+50].upper()
+            elif tipo in ['PROTOCOLO_LAI', 'PROTOCOLO_OUV', 'PROTOCOLO_GENERICO']:
+                contexto = texto[max(0, inicio-100):fim+100].lower()
+                contexto_negativo = any(
+                    kw in contexto for kw in [
+                        "exemplo", "referência", "referencia", "só referência", "só exemplo", "não é protocolo", "nao é protocolo"
+                    ]
+                )
+                if contexto_negativo:
+                    continue
+                # PROTOCOLO_GENERICO vai como PROTOCOLO_LAI
+                tipo_final = 'PROTOCOLO_LAI' if tipo == 'PROTOCOLO_GENERICO' else tipo
+                findings.append({
+                    "tipo": tipo_final, "valor": valor,
+                    "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo == 'OCORRENCIA_POLICIAL':
+                contexto = texto[max(0, inicio-100):fim+100].lower()
+                contexto_negativo = any(
+                    kw in contexto for kw in [
+                        "exemplo", "referência", "referencia", "só referência", "só exemplo", "não é ocorrência", "nao é ocorrência"
+                    ]
+                )
+                if contexto_negativo:
+                    continue
+                findings.append({
+                    "tipo": "OCORRENCIA_POLICIAL", "valor": valor,
+                    "confianca": self._calcular_confianca("OCORRENCIA_POLICIAL", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo == 'CNPJ':
+                # LGPD: Detectar CNPJ pelo FORMATO mesmo se matematicamente inválido
+                cnpj_valido = self._validar_cnpj(valor)
+                cnpj_limpo = re.sub(r'\D', '', valor)
+                formato_correto = len(cnpj_limpo) == 14 and cnpj_limpo != cnpj_limpo[0] * 14
+                
+                if not formato_correto:
+                    continue
+                
+                # IMPORTANTE: Verificar se faz parte de PROCESSO_SEI
+                # Formato típico de processo: XXXXX-XXXXXXXX/YYYY-XX
+                # Se há prefixo de processo antes do "CNPJ", é processo, não CNPJ
+                contexto_antes = texto[max(0, inicio-10):inicio]
+                eh_parte_processo = bool(re.search(r'\d{4,5}[-\s]$', contexto_antes))
+                if eh_parte_processo:
+                    continue  # Pula - é parte de um processo SEI
                     
-                    # Verificar contexto negativo (processos)
-                    contexto_negativo_processo = any(p in contexto for p in [
-                        "PROCESSO SEI", "PROCESSO Nº", "PROCESSO N°", "PROCESSO NUMERO", 
-                        "AUTOS DO PROCESSO", "PROCESSO ADMINISTRATIVO", "SEI Nº", "SEI N°"
+                contexto = texto[max(0, inicio-50):fim+50].upper()
+                
+                # Verificar contexto negativo (processos)
+                contexto_negativo_processo = any(p in contexto for p in [
+                    "PROCESSO SEI", "PROCESSO Nº", "PROCESSO N°", "PROCESSO NUMERO", 
+                    "AUTOS DO PROCESSO", "PROCESSO ADMINISTRATIVO", "SEI Nº", "SEI N°"
+                ])
+                if contexto_negativo_processo:
+                    # Verificar se há indicação explícita de CNPJ
+                    contexto_positivo_cnpj = any(p in contexto for p in [
+                        "CNPJ", "EMPRESA", "RAZÃO SOCIAL", "MEI", "PESSOA JURÍDICA"
                     ])
-                    if contexto_negativo_processo:
-                        # Verificar se há indicação explícita de CNPJ
-                        contexto_positivo_cnpj = any(p in contexto for p in [
-                            "CNPJ", "EMPRESA", "RAZÃO SOCIAL", "MEI", "PESSOA JURÍDICA"
-                        ])
-                        if not contexto_positivo_cnpj:
-                            continue  # É processo, não CNPJ
-                    
-                    # Calcula confiança baseada em validação
-                    confianca = self._calcular_confianca("CNPJ", texto, inicio, fim)
-                    if not cnpj_valido:
-                        confianca = max(0.6, confianca * 0.8)  # Reduz mas mantém detectável
-                    
-                    if any(p in contexto for p in ["MEU CNPJ", "MINHA EMPRESA", "SOU MEI"]):
-                        findings.append({
-                            "tipo": "CNPJ_PESSOAL", "valor": valor,
-                            "confianca": confianca,
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
-                    else:
-                        findings.append({
-                            "tipo": "CNPJ", "valor": valor,
-                            "confianca": confianca,
-                            "peso": 3, "inicio": inicio, "fim": fim
-                        })
-
-                elif tipo == 'NIRE':
-                    # NIRE - Número de Identificação do Registro de Empresa
+                    if not contexto_positivo_cnpj:
+                        continue  # É processo, não CNPJ
+                
+                # Calcula confiança baseada em validação
+                confianca = self._calcular_confianca("CNPJ", texto, inicio, fim)
+                if not cnpj_valido:
+                    confianca = max(0.6, confianca * 0.8)  # Reduz mas mantém detectável
+                
+                if any(p in contexto for p in ["MEU CNPJ", "MINHA EMPRESA", "SOU MEI"]):
                     findings.append({
-                        "tipo": "NIRE", "valor": valor,
-                        "confianca": self._calcular_confianca("NIRE", texto, inicio, fim),
-                        "peso": 3, "inicio": inicio, "fim": fim
+                        "tipo": "CNPJ_PESSOAL", "valor": valor,
+                        "confianca": confianca,
+                        "peso": 4, "inicio": inicio, "fim": fim
                     })
-
-                elif tipo == 'MATRICULA_IMOVEL':
-                    # Matrícula de imóvel em cartório
+                else:
                     findings.append({
-                        "tipo": "MATRICULA_IMOVEL", "valor": valor,
-                        "confianca": self._calcular_confianca("MATRICULA_IMOVEL", texto, inicio, fim),
+                        "tipo": "CNPJ", "valor": valor,
+                        "confianca": confianca,
                         "peso": 3, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo in ['CDA', 'CDA_ADICIONAL']:
-                    # CDA - Certidão de Dívida Ativa
-                    findings.append({
-                        "tipo": "CDA", "valor": valor,
-                        "confianca": self._calcular_confianca("CDA", texto, inicio, fim),
-                        "peso": 3, "inicio": inicio, "fim": fim
-                    })
+            elif tipo == 'NIRE':
+                # NIRE - Número de Identificação do Registro de Empresa
+                findings.append({
+                    "tipo": "NIRE", "valor": valor,
+                    "confianca": self._calcular_confianca("NIRE", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo == 'AUTO_INFRACAO':
-                    # Auto de Infração GDF
-                    findings.append({
-                        "tipo": "AUTO_INFRACAO", "valor": valor,
-                        "confianca": self._calcular_confianca("AUTO_INFRACAO", texto, inicio, fim),
-                        "peso": 3, "inicio": inicio, "fim": fim
-                    })
+            elif tipo == 'MATRICULA_IMOVEL':
+                # Matrícula de imóvel em cartório
+                findings.append({
+                    "tipo": "MATRICULA_IMOVEL", "valor": valor,
+                    "confianca": self._calcular_confianca("MATRICULA_IMOVEL", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo == 'PROTOCOLO_DFP':
-                    # Protocolo DFP (Junta Comercial)
-                    findings.append({
-                        "tipo": "PROTOCOLO_DFP", "valor": valor,
-                        "confianca": self._calcular_confianca("PROTOCOLO_DFP", texto, inicio, fim),
-                        "peso": 3, "inicio": inicio, "fim": fim
-                    })
+            elif tipo in ['CDA', 'CDA_ADICIONAL']:
+                # CDA - Certidão de Dívida Ativa
+                findings.append({
+                    "tipo": "CDA", "valor": valor,
+                    "confianca": self._calcular_confianca("CDA", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo == 'EMAIL_PESSOAL':
-                    email_lower = valor.lower()
-                    if any(d in email_lower for d in ['.gov.br', '.org.br', '.edu.br']):
-                        continue
-                    findings.append({
-                        "tipo": "EMAIL_PESSOAL", "valor": valor,
-                        "confianca": self._calcular_confianca("EMAIL_PESSOAL", texto, inicio, fim),
-                        "peso": 4, "inicio": inicio, "fim": fim
-                    })
+            elif tipo == 'AUTO_INFRACAO':
+                # Auto de Infração GDF
+                findings.append({
+                    "tipo": "AUTO_INFRACAO", "valor": valor,
+                    "confianca": self._calcular_confianca("AUTO_INFRACAO", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo in ['CELULAR', 'TELEFONE_FIXO', 'TELEFONE_DDI', 'TELEFONE_DDD_ESPACO', 
-                              'TELEFONE_LOCAL', 'TELEFONE_INTERNACIONAL', 'TELEFONE_CURTO',
-                              'TELEFONE_DDD_HIFEN', 'CELULAR_SEM_FORMATACAO', 'TELEFONE_DDD_ZERO']:
-                    
-                    # IMPORTANTE: Verificar se é número de processo ou protocolo (não telefone)
-                    # Números como "0032185265/2024", "000025483" podem ser processos/protocolos
-                    contexto_amplo = texto[max(0, inicio-30):min(len(texto), fim+30)].upper()
-                    eh_processo_protocolo = any(p in contexto_amplo for p in [
-                        "PROCESSO", "PROTOCOLO", "SEI", "AUTUAÇÃO", "AUTUACAO", "NIRE", 
-                        "Nº DE PROCESSO", "N° DE PROCESSO", "Nº DO PROCESSO"
-                    ])
-                    if eh_processo_protocolo and not any(p in contexto_amplo for p in ["TEL", "FONE", "CELULAR", "CONTATO"]):
-                        continue  # É processo/protocolo, não telefone
-                    
-                    # NOVO: Contextos que indicam que NÃO é telefone (código, referência, etc.)
-                    contexto_nao_telefone = texto[max(0, inicio-40):min(len(texto), fim+40)].lower()
-                    termos_nao_telefone = [
-                        'código', 'codigo', 'referência', 'referencia', 'ref:', 'ref.',
-                        'número do pedido', 'numero do pedido', 'nº pedido', 'n° pedido',
-                        'ordem de serviço', 'ordem de servico', 'o.s.:', 'o.s. n',
-                        'ticket', 'chamado', 'solicitação nº', 'solicitacao n',
-                        'versão', 'versao', 'modelo', 'série', 'serie',
-                        'lote nº', 'lote n°', 'item nº', 'item n°', 'artigo', 'parágrafo', 'paragrafo',
-                    ]
-                    if any(t in contexto_nao_telefone for t in termos_nao_telefone):
-                        # Verifica se realmente tem contexto de telefone que sobrescreve
-                        if not any(p in contexto_nao_telefone for p in ['tel', 'fone', 'celular', 'contato', 'ligar', 'whats']):
-                            continue  # É código/referência, não telefone
-                    
-                    # IMPORTANTE: Número sem formatação típica (sem hífen, parênteses) pode ser processo
-                    # Se começa com muitos zeros, provavelmente é número de protocolo
-                    valor_limpo = re.sub(r'\D', '', valor)
-                    if valor_limpo.startswith('000') or valor_limpo.startswith('0000'):
-                        # Provavelmente é número de protocolo ou autuação
-                        continue
-                        
-                    ctx_antes = texto[max(0, inicio-80):inicio].lower()
-                    ctx_depois = texto[fim:min(len(texto), fim+80)].lower()
+            elif tipo == 'PROTOCOLO_DFP':
+                # Protocolo DFP (Junta Comercial)
+                findings.append({
+                    "tipo": "PROTOCOLO_DFP", "valor": valor,
+                    "confianca": self._calcular_confianca("PROTOCOLO_DFP", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
 
-                    termos_institucionais = [
-                        'institucional', 'fixo', 'ramal', 'central', 'sac', 'atendimento', 'ouvidoria', 'departamento', 'setor', 'secretaria', 'empresa', 'comercial', 'pabx', '0800', '4003', '3312', '3105', '3325', '3961', '3214', '3411', '3344', '3048', '3349', '3346', '3462', '3190', '3901', '3326', '3348', 'disque', 'contato institucional', 'serviço', 'servico', 'suporte', 'helpdesk', 'callcenter', 'ramal interno', 'ramal:', 'ramal '
-                    ]
+            elif tipo == 'EMAIL_PESSOAL':
+                email_lower = valor.lower()
+                if any(d in email_lower for d in ['.gov.br', '.org.br', '.edu.br']):
+                    continue
+                findings.append({
+                    "tipo": "EMAIL_PESSOAL", "valor": valor,
+                    "confianca": self._calcular_confianca("EMAIL_PESSOAL", texto, inicio, fim),
+                    "peso": 4, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo in ['CELULAR', 'TELEFONE_FIXO', 'TELEFONE_DDI', 'TELEFONE_DDD_ESPACO', 
+                          'TELEFONE_LOCAL', 'TELEFONE_INTERNACIONAL', 'TELEFONE_CURTO',
+                          'TELEFONE_DDD_HIFEN', 'CELULAR_SEM_FORMATACAO', 'TELEFONE_DDD_ZERO']:
+                
+                # IMPORTANTE: Verificar se é número de processo ou protocolo (não telefone)
+                # Números como "0032185265/2024", "000025483" podem ser processos/protocolos
+                contexto_amplo = texto[max(0, inicio-30):min(len(texto), fim+30)].upper()
+                eh_processo_protocolo = any(p in contexto_amplo for p in [
+                    "PROCESSO", "PROTOCOLO", "SEI", "AUTUAÇÃO", "AUTUACAO", "NIRE", 
+                    "Nº DE PROCESSO", "N° DE PROCESSO", "Nº DO PROCESSO"
+                ])
+                if eh_processo_protocolo and not any(p in contexto_amplo for p in ["TEL", "FONE", "CELULAR", "CONTATO"]):
+                    continue  # É processo/protocolo, não telefone
+                
+                # NOVO: Contextos que indicam que NÃO é telefone (código, referência, etc.)
+                contexto_nao_telefone = texto[max(0, inicio-40):min(len(texto), fim+40)].lower()
+                termos_nao_telefone = [
+                    'código', 'codigo', 'referência', 'referencia', 'ref:', 'ref.',
+                    'número do pedido', 'numero do pedido', 'nº pedido', 'n° pedido',
+                    'ordem de serviço', 'ordem de servico', 'o.s.:', 'o.s. n',
+                    'ticket', 'chamado', 'solicitação nº', 'solicitacao n',
+                    'versão', 'versao', 'modelo', 'série', 'serie',
+                    'lote nº', 'lote n°', 'item nº', 'item n°', 'artigo', 'parágrafo', 'paragrafo',
+                ]
+                if any(t in contexto_nao_telefone for t in termos_nao_telefone):
+                    # Verifica se realmente tem contexto de telefone que sobrescreve
+                    if not any(p in contexto_nao_telefone for p in ['tel', 'fone', 'celular', 'contato', 'ligar', 'whats']):
+                        continue  # É código/referência, não telefone
+                
+                # IMPORTANTE: Número sem formatação típica (sem hífen, parênteses) pode ser processo
+                # Se começa com muitos zeros, provavelmente é número de protocolo
+                valor_limpo = re.sub(r'\D', '', valor)
+                if valor_limpo.startswith('000') or valor_limpo.startswith('0000'):
+                    # Provavelmente é número de protocolo ou autuação
+                    continue
                     
-                    # NOVO: Verificar se o telefone começa com prefixo institucional (fixo GDF)
-                    # Telefones fixos do DF começam com 61 3xxx, se o número começa com 3xxx, verificar prefixo
-                    valor_limpo = re.sub(r'[^\d]', '', valor)  # Remove tudo exceto dígitos
-                    if len(valor_limpo) >= 8:
-                        # Se tem 10-11 dígitos, pegar os 4 dígitos após o DDD
-                        prefixo = valor_limpo[2:6] if len(valor_limpo) >= 10 else valor_limpo[:4]
-                        prefixos_institucionais = {'3105', '3312', '3325', '3961', '3214', '3411', '3344', '3048', '3349', '3346', '3462', '3190', '3901', '3326', '3348'}
-                        if prefixo in prefixos_institucionais:
-                            continue  # Telefone institucional do GDF
-                    # Filtro: se label anterior ao número contém termo institucional, ignora
-                    from text_unidecode import unidecode
-                    label_pre = unidecode(texto[max(0, inicio-40):inicio]).lower()
-                    label_full = unidecode(texto[max(0, inicio-60):inicio]).lower()
-                    ctx_antes_norm = unidecode(ctx_antes)
-                    ctx_depois_norm = unidecode(ctx_depois)
-                    # Filtro ultra: ignora se qualquer contexto anterior ou label contém explicitamente 'telefone institucional' ou 'fixo institucional'
-                    if (
-                        'telefone institucional' in label_pre
-                        or 'telefone institucional' in label_full
-                        or 'fixo institucional' in label_pre
-                        or 'fixo institucional' in label_full
-                        or 'ramal institucional' in label_pre
-                        or 'ramal institucional' in label_full
-                        or 'telefone institucional' in ctx_antes_norm
-                        or 'fixo institucional' in ctx_antes_norm
-                        or 'telefone institucional' in ctx_depois_norm
-                        or 'fixo institucional' in ctx_depois_norm
-                        or 'institucional' in label_pre
-                        or 'institucional' in label_full
-                        or any(term in label_pre for term in termos_institucionais)
-                        or any(term in ctx_antes_norm or term in ctx_depois_norm for term in termos_institucionais)
-                    ):
-                        import logging
-                        logging.warning(f"[PII-DEBUG] Ignorando telefone institucional: {valor} | contexto: {label_pre} | {label_full} | {ctx_antes_norm} | {ctx_depois_norm}")
-                        continue
+                ctx_antes = texto[max(0, inicio-80):inicio].lower()
+                ctx_depois = texto[fim:min(len(texto), fim+80)].lower()
 
-                    # Boost: se contexto pessoal explícito, aumenta peso/confiança
-                    termos_pessoais = ['meu', 'minha', 'celular', 'telefone', 'contato', 'whatsapp', 'pessoal', 'falar com', 'ligar para', 'recado', 'urgente', 'residencial', 'para retorno', 'para contato']
-                    boost = 0.0
-                    if any(tp in ctx_antes or tp in ctx_depois for tp in termos_pessoais):
-                        boost = 0.10
+                termos_institucionais = [
+                    'institucional', 'fixo', 'ramal', 'central', 'sac', 'atendimento', 'ouvidoria', 'departamento', 'setor', 'secretaria', 'empresa', 'comercial', 'pabx', '0800', '4003', '3312', '3105', '3325', '3961', '3214', '3411', '3344', '3048', '3349', '3346', '3462', '3190', '3901', '3326', '3348', 'disque', 'contato institucional', 'serviço', 'servico', 'suporte', 'helpdesk', 'callcenter', 'ramal interno', 'ramal:', 'ramal '
+                ]
+                
+                # NOVO: Verificar se o telefone começa com prefixo institucional (fixo GDF)
+                # Telefones fixos do DF começam com 61 3xxx, se o número começa com 3xxx, verificar prefixo
+                valor_limpo = re.sub(r'[^\d]', '', valor)  # Remove tudo exceto dígitos
+                if len(valor_limpo) >= 8:
+                    # Se tem 10-11 dígitos, pegar os 4 dígitos após o DDD
+                    prefixo = valor_limpo[2:6] if len(valor_limpo) >= 10 else valor_limpo[:4]
+                    prefixos_institucionais = {'3105', '3312', '3325', '3961', '3214', '3411', '3344', '3048', '3349', '3346', '3462', '3190', '3901', '3326', '3348'}
+                    if prefixo in prefixos_institucionais:
+                        continue  # Telefone institucional do GDF
+                # Filtro: se label anterior ao número contém termo institucional, ignora
+                from text_unidecode import unidecode
+                label_pre = self._minusculo_trecho(texto, max(0, inicio-40), inicio)
+                label_full = self._minusculo_trecho(texto, max(0, inicio-60), inicio)
+                ctx_antes_norm = unidecode(ctx_antes)
+                ctx_depois_norm = unidecode(ctx_depois)
+                # Filtro ultra: ignora se qualquer contexto anterior ou label contém explicitamente 'telefone institucional' ou 'fixo institucional'
+                if (
+                    'telefone institucional' in label_pre
+                    or 'telefone institucional' in label_full
+                    or 'fixo institucional' in label_pre
+                    or 'fixo institucional' in label_full
+                    or 'ramal institucional' in label_pre
+                    or 'ramal institucional' in label_full
+                    or 'telefone institucional' in ctx_antes_norm
+                    or 'fixo institucional' in ctx_antes_norm
+                    or 'telefone institucional' in ctx_depois_norm
+                    or 'fixo institucional' in ctx_depois_norm
+                    or 'institucional' in label_pre
+                    or 'institucional' in label_full
+                    or any(term in label_pre for term in termos_institucionais)
+                    or any(term in ctx_antes_norm or term in ctx_depois_norm for term in termos_institucionais)
+                ):
+                    import logging
+                    logging.warning(f"[PII-DEBUG] Ignorando telefone institucional: {valor} | contexto: {label_pre} | {label_full} | {ctx_antes_norm} | {ctx_depois_norm}")
+                    continue
 
-                    findings.append({
-                        "tipo": "TELEFONE", "valor": valor,
-                        "confianca": min(1.0, self._calcular_confianca("TELEFONE", texto, inicio, fim) + boost),
-                        "peso": 4 if boost > 0 else 3, "inicio": inicio, "fim": fim
-                    })
+                # Boost: se contexto pessoal explícito, aumenta peso/confiança
+                termos_pessoais = ['meu', 'minha', 'celular', 'telefone', 'contato', 'whatsapp', 'pessoal', 'falar com', 'ligar para', 'recado', 'urgente', 'residencial', 'para retorno', 'para contato']
+                boost = 0.0
+                if any(tp in ctx_antes or tp in ctx_depois for tp in termos_pessoais):
+                    boost = 0.10
+
+                findings.append({
+                    "tipo": "TELEFONE", "valor": valor,
+                    "confianca": min(1.0, self._calcular_confianca("TELEFONE", texto, inicio, fim) + boost),
+                    "peso": 4 if boost > 0 else 3, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo in ['RG', 'RG_ORGAO']:
+                findings.append({
+                    "tipo": "RG", "valor": valor,
+                    "confianca": self._calcular_confianca("RG", texto, inicio, fim),
+                    "peso": 5, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo in ['RG', 'RG_ORGAO']:
+            elif tipo == 'CNH':
+                contexto = texto[max(0, inicio-80):fim+80].lower()
+                # Contexto negativo: código de barras, boleto, ocorrência, CDA, NIS, conta
+                contexto_negativo = re.search(
+                    r'c[oó]digo\s+de\s+barras|boleto|linha\s+digit[aá]vel|'
+                    r'ocorr[eê]ncia|pmdf|pcdf|cbmdf|boletim|'
+                    r'cda|d[ií]vida\s+ativa|certid[ãa]o|'
+                    r'nis|pis|pasep|benefici[aá]rio|'
+                    r'conta|ag[eê]ncia|dep[oó]sito|transfer[eê]ncia|'
+                    r'processo\s+n|protocolo|sei\s*n|'
+                    r'inscri[çc][aã]o|im[oó]vel|cart[aã]o|nota\s+fiscal',
+                    contexto
+                )
+                if contexto_negativo:
+                    continue  # Ignora CNH em contexto de código de barras, ocorrência, CDA, NIS, etc
+                
+                # Aceita CNH se tiver contexto positivo ou se o texto tem "CNH" como label
+                labels_cnh = [
+                    "minha cnh", "cnh do titular", "cnh cadastrada", "habilitação", "habilitacao",
+                    "carteira de motorista", "cnh:", "cnh ", "minha carteira", "carteira de habilitação",
+                    "carteira de habilitacao", "numero da cnh", "n da cnh"
+                ]
+                contexto_positivo = any(kw in contexto for kw in labels_cnh)
+                
+                # Só aceita CNH se houver contexto positivo explícito de habilitação/CNH
+                if contexto_positivo and len(valor) >= 9:
                     findings.append({
-                        "tipo": "RG", "valor": valor,
-                        "confianca": self._calcular_confianca("RG", texto, inicio, fim),
+                        "tipo": "CNH", "valor": valor,
+                        "confianca": self._calcular_confianca("CNH", texto, inicio, fim),
                         "peso": 5, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo == 'CNH':
-                    contexto = texto[max(0, inicio-80):fim+80].lower()
-                    # Contexto negativo: código de barras, boleto, ocorrência, CDA, NIS, conta
-                    contexto_negativo = re.search(
-                        r'c[oó]digo\s+de\s+barras|boleto|linha\s+digit[aá]vel|'
-                        r'ocorr[eê]ncia|pmdf|pcdf|cbmdf|boletim|'
-                        r'cda|d[ií]vida\s+ativa|certid[ãa]o|'
-                        r'nis|pis|pasep|benefici[aá]rio|'
-                        r'conta|ag[eê]ncia|dep[oó]sito|transfer[eê]ncia|'
-                        r'processo\s+n|protocolo|sei\s*n|'
-                        r'inscri[çc][aã]o|im[oó]vel|cart[aã]o|nota\s+fiscal',
-                        contexto
-                    )
-                    if contexto_negativo:
-                        continue  # Ignora CNH em contexto de código de barras, ocorrência, CDA, NIS, etc
-                    
-                    # Aceita CNH se tiver contexto positivo ou se o texto tem "CNH" como label
-                    labels_cnh = [
-                        "minha cnh", "cnh do titular", "cnh cadastrada", "habilitação", "habilitacao",
-                        "carteira de motorista", "cnh:", "cnh ", "minha carteira", "carteira de habilitação",
-                        "carteira de habilitacao", "numero da cnh", "n da cnh"
-                    ]
-                    contexto_positivo = any(kw in contexto for kw in labels_cnh)
-                    
-                    # Só aceita CNH se houver contexto positivo explícito de habilitação/CNH
-                    if contexto_positivo and len(valor) >= 9:
-                        findings.append({
-                            "tipo": "CNH", "valor": valor,
-                            "confianca": self._calcular_confianca("CNH", texto, inicio, fim),
-                            "peso": 5, "inicio": inicio, "fim": fim
-                        })
-
 
-                elif tipo in ['ENDERECO_RESIDENCIAL', 'ENDERECO_BRASILIA', 'ENDERECO_SHIN_SHIS', 'ENDERECO_DF_RESIDENCIAL', 'ENDERECO_MORO_EM', 'ENDERECO_LABEL', 'ENDERECO_SETOR_DF', 'ENDERECO_CONTEXTO_PESSOAL']:
-                    from text_unidecode import unidecode
-                    import logging
-                    contexto = unidecode(texto[max(0, inicio-120):fim+120]).lower()
-                    valor_norm = unidecode(valor).lower() if valor else ""
-                    
-                    # Gatilhos que indicam RESIDENCIAL - mesmo que o endereço pareça comercial
-                    gatilhos_residenciais = [
-                        "inquilina", "inquilino", "imóvel localizado", "imovel localizado", 
-                        "moro", "resido", "minha casa", "meu endere", "minha resid",
-                        "mora na", "mora no", "moradora", "morador", "endereco:",
-                        "residencia", "residencial", "me encontrar", "entrega", "buscar"
-                    ]
-                    tem_contexto_residencial = any(g in contexto for g in gatilhos_residenciais)
-                    
-                    # PATCH: ENDERECO_MORO_EM, ENDERECO_LABEL e ENDERECO_CONTEXTO_PESSOAL sempre aceitos
-                    if tipo in ['ENDERECO_MORO_EM', 'ENDERECO_LABEL', 'ENDERECO_CONTEXTO_PESSOAL']:
-                        findings.append({
-                            "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
-                            "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
-                        continue
-                    
-                    # PATCH: Ignora siglas de quadras comerciais do DF sem contexto residencial
-                    siglas_comerciais_df = ['crn', 'cln', 'cls', 'scln', 'scrn', 'scrs', 'scls', 'sbs', 'scs', 'sds', 'shs', 'sep']
-                    if any(valor_norm.strip() == sigla or valor_norm.strip().startswith(sigla + ' ') for sigla in siglas_comerciais_df):
-                        # Quadra comercial: só aceita se tiver contexto residencial explícito
-                        if not tem_contexto_residencial:
-                            logger.debug(f"[DEDUP] Endereço comercial ignorado: {valor}")
-                            continue
-                    
-                    # Se tem contexto residencial explícito, aceita direto
-                    if tem_contexto_residencial:
-                        findings.append({
-                            "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
-                            "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
+            elif tipo in ['ENDERECO_RESIDENCIAL', 'ENDERECO_BRASILIA', 'ENDERECO_SHIN_SHIS', 'ENDERECO_DF_RESIDENCIAL', 'ENDERECO_MORO_EM', 'ENDERECO_LABEL', 'ENDERECO_SETOR_DF', 'ENDERECO_CONTEXTO_PESSOAL']:
+                from text_unidecode import unidecode
+                import logging
+                contexto = self._minusculo_trecho(texto, max(0, inicio-120), fim+120)
+                valor_norm = unidecode(valor).lower() if valor else ""
+                
+                # Gatilhos que indicam RESIDENCIAL - mesmo que o endereço pareça comercial
+                gatilhos_residenciais = [
+                    "inquilina", "inquilino", "imóvel localizado", "imovel localizado", 
+                    "moro", "resido", "minha casa", "meu endere", "minha resid",
+                    "mora na", "mora no", "moradora", "morador", "endereco:",
+                    "residencia", "residencial", "me encontrar", "entrega", "buscar"
+                ]
+                tem_contexto_residencial = any(g in contexto for g in gatilhos_residenciais)
+                
+                # PATCH: ENDERECO_MORO_EM, ENDERECO_LABEL e ENDERECO_CONTEXTO_PESSOAL sempre aceitos
+                if tipo in ['ENDERECO_MORO_EM', 'ENDERECO_LABEL', 'ENDERECO_CONTEXTO_PESSOAL']:
+                    findings.append({
+                        "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
+                        "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
+                        "peso": 4, "inicio": inicio, "fim": fim
+                    })
+                    continue
+                
+                # PATCH: Ignora siglas de quadras comerciais do DF sem contexto residencial
+                siglas_comerciais_df = ['crn', 'cln', 'cls', 'scln', 'scrn', 'scrs', 'scls', 'sbs', 'scs', 'sds', 'shs', 'sep']
+                if any(valor_norm.strip() == sigla or valor_norm.strip().startswith(sigla + ' ') for sigla in siglas_comerciais_df):
+                    # Quadra comercial: só aceita se tiver contexto residencial explícito
+                    if not tem_contexto_residencial:
+                        logger.debug(f"[DEDUP] Endereço comercial ignorado: {valor}")
                         continue
-                    
-                    # Se padrão SHIN/SHIS/SHLP/SHLN/SHDF + Bloco/Apto = residencial
-                    # Ou ENDERECO_SETOR_DF com setor habitacional (SH*)
-                    # MAS: se contexto é de serviço público (fiscalização, denúncia), NÃO é PII
-                    contexto_servico_publico = any(g in contexto for g in [
-                        'fiscaliza', 'denuncia', 'denúncia', 'reclama', 'solicita', 
-                        'melhoria', 'conserto', 'buraco', 'calcada', 'calçada',
-                        'ilumina', 'limpeza', 'coleta', 'lixo', 'esgoto', 'agua',
-                        'asfalto', 'pavimento', 'sinalizacao', 'sinalização'
-                    ])
-                    
-                    padroes_residenciais_brasilia = ["shin", "shis", "shlp", "shln", "sqn", "sqs", "shdf", "shce", "shcg", "shn", "shs"]
-                    if any(p in valor_norm for p in padroes_residenciais_brasilia):
-                        # Se é contexto de serviço público, não é PII - é só localização do problema
-                        if contexto_servico_publico:
-                            logger.debug(f"[DEDUP] Endereço em contexto de serviço público ignorado: {valor}")
-                            continue
-                        
-                        # PATCH: Se não há contexto residencial explícito E não há outros PIIs,
-                        # endereço habitacional genérico (só quadra/bloco) não identifica pessoa
-                        # Precisa de: "moro na", "minha casa", "endereço:", etc.
-                        if not tem_contexto_residencial:
-                            # Verifica se tem indicadores de moradia específica (apt, casa, etc)
-                            indicadores_moradia = ['apt', 'apartamento', 'casa', 'residência', 'residencia', 
-                                                   'moro', 'resido', 'minha', 'meu']
-                            tem_indicador_moradia = any(i in contexto for i in indicadores_moradia)
-                            if not tem_indicador_moradia:
-                                logger.debug(f"[DEDUP] Endereço habitacional genérico ignorado (sem contexto): {valor}")
-                                continue
-                        
-                        # Setor habitacional com contexto - aceita como endereço residencial
-                        findings.append({
-                            "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
-                            "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
+                
+                # Se tem contexto residencial explícito, aceita direto
+                if tem_contexto_residencial:
+                    findings.append({
+                        "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
+                        "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
+                        "peso": 4, "inicio": inicio, "fim": fim
+                    })
+                    continue
+                
+                # Se padrão SHIN/SHIS/SHLP/SHLN/SHDF + Bloco/Apto = residencial
+                # Ou ENDERECO_SETOR_DF com setor habitacional (SH*)
+                # MAS: se contexto é de serviço público (fiscalização, denúncia), NÃO é PII
+                contexto_servico_publico = any(g in contexto for g in [
+                    'fiscaliza', 'denuncia', 'denúncia', 'reclama', 'solicita', 
+                    'melhoria', 'conserto', 'buraco', 'calcada', 'calçada',
+                    'ilumina', 'limpeza', 'coleta', 'lixo', 'esgoto', 'agua',
+                    'asfalto', 'pavimento', 'sinalizacao', 'sinalização'
+                ])
+                
+                padroes_residenciais_brasilia = ["shin", "shis", "shlp", "shln", "sqn", "sqs", "shdf", "shce", "shcg", "shn", "shs"]
+                if any(p in valor_norm for p in padroes_residenciais_brasilia):
+                    # Se é contexto de serviço público, não é PII - é só localização do problema
+                    if contexto_servico_publico:
+                        logger.debug(f"[DEDUP] Endereço em contexto de serviço público ignorado: {valor}")
                         continue
                     
-                    # Setores administrativos (SAS, SCS, SDS, etc) - só aceita com contexto residencial explícito
-                    setores_administrativos = ["sas", "scs", "sds", "sbs", "scn", "sen", "sgo", "sia", "sig"]
-                    if any(p in valor_norm for p in setores_administrativos):
-                        # PRIMEIRO: Verificar se é contexto institucional (Secretaria, Hospital, etc)
-                        gatilhos_institucionais = [
-                            "secretaria", "hospital", "escola", "orgao", "empresa", "administracao", 
-                            "departamento", "diretoria", "coordenacao", "tribunal", "camara", "senado", 
-                            "autarquia", "fundacao", "instituto", "agencia", "conselho", "comissao", 
-                            "gdf", "seedf", "sesdf", "sedf", "sejus", "pcdf", "pmdf", "cbmdf", 
-                            "detran", "caesb", "ceb", "novacap", "terracap", "brb", "metro", 
-                            "ubs", "upa", "posto", "servico", "servicos", "bloco institucional", 
-                            "administração regional", "administracao regional", "orgao publico",
-                            "endereco da", "endereço da", "endereco do", "endereço do"
-                        ]
-                        if any(g in contexto for g in gatilhos_institucionais):
-                            logger.debug(f"[DEDUP] Endereço institucional ignorado: {valor}")
-                            continue
-                        
-                        # Setor administrativo: só aceita se tiver contexto residencial
-                        if not tem_contexto_residencial:
-                            # Ignora setores administrativos sem contexto residencial
+                    # PATCH: Se não há contexto residencial explícito E não há outros PIIs,
+                    # endereço habitacional genérico (só quadra/bloco) não identifica pessoa
+                    # Precisa de: "moro na", "minha casa", "endereço:", etc.
+                    if not tem_contexto_residencial:
+                        # Verifica se tem indicadores de moradia específica (apt, casa, etc)
+                        indicadores_moradia = ['apt', 'apartamento', 'casa', 'residência', 'residencia', 
+                                               'moro', 'resido', 'minha', 'meu']
+                        tem_indicador_moradia = any(i in contexto for i in indicadores_moradia)
+                        if not tem_indicador_moradia:
+                            logger.debug(f"[DEDUP] Endereço habitacional genérico ignorado (sem contexto): {valor}")
                             continue
-                        findings.append({
-                            "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
-                            "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
-                        continue
-                    
-                    # Gatilhos institucionais - se presente, ignora (fallback para outros tipos)
-                    gatilhos_institucionais = [
-                        "secretaria", "hospital", "escola", "orgao", "empresa", "administracao", "departamento", "diretoria", "coordenacao", "tribunal", "camara", "senado", "autarquia", "fundacao", "instituto", "agencia", "conselho", "comissao", "gdf", "seedf", "sesdf", "sedf", "sejus", "pcdf", "pmdf", "cbmdf", "detran", "caesb", "ceb", "novacap", "terracap", "brb", "metro", "ubs", "upa", "posto", "servico", "servicos", "setor", "bloco institucional", "administração regional", "administracao regional", "orgao publico"
-                    ]
-                    if any(g in contexto for g in gatilhos_institucionais):
-                        continue
-                    
-                    # Caso geral: só marca se tiver padrão residencial explícito no valor
-                    contexto_residencial = re.search(r'moro|resido|minha\s+casa|meu\s+endere|minha\s+resid|residencia\s*:', contexto)
-                    if contexto_residencial:
-                        findings.append({
-                            "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
-                            "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
-
-                elif tipo in ['CONTA_BANCARIA', 'DADOS_BANCARIOS', 'CARTAO_CREDITO', 'CARTAO_FINAL']:
-                    contexto = texto[max(0, inicio-80):fim+80].lower()
-                    valor_norm = valor.lower() if valor else ""
-                    
-                    # PATCH: Aceita dados bancários com diversos contextos
-                    contexto_pessoal = re.search(
-                        r'minha\s+conta|meu\s+banco|depositar|transferir|'
-                        r'pix|minha\s+ag[êe]ncia|receber\s+em|'
-                        r'pagamento|meu\s+cart[ãa]o|cart[ãa]o\s+final|'
-                        r'dep[óo]sito|ag[êe]ncia|ag\s*\d|cc\s*\d|'
-                        r'conta\s*corrente|conta\s*:',
-                        contexto
-                    )
-                    
-                    # Ignora números isolados que parecem ser outros identificadores
-                    # Números de processo, ocorrência, protocolo frequentemente parecem dados bancários
-                    contexto_negativo = re.search(
-                        r'processo|protocolo|ocorr[êe]ncia|sei\s*n|nota\s+fiscal|'
-                        r'empenho|documento|n[ºo°]\s*\d',
-                        contexto
-                    )
-                    if contexto_negativo and not contexto_pessoal:
-                        continue
                     
+                    # Setor habitacional com contexto - aceita como endereço residencial
+                    findings.append({
+                        "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
+                        "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
+                        "peso": 4, "inicio": inicio, "fim": fim
+                    })
+                    continue
+                
+                # Setores administrativos (SAS, SCS, SDS, etc) - só aceita com contexto residencial explícito
+                setores_administrativos = ["sas", "scs", "sds", "sbs", "scn", "sen", "sgo", "sia", "sig"]
+                if any(p in valor_norm for p in setores_administrativos):
+                    # PRIMEIRO: Verificar se é contexto institucional (Secretaria, Hospital, etc)
                     gatilhos_institucionais = [
-                        "agência institucional", "agencia institucional", "conta institucional", "conta corporativa", "conta empresa", "conta comercial", "conta governo"
+                        "secretaria", "hospital", "escola", "orgao", "empresa", "administracao", 
+                        "departamento", "diretoria", "coordenacao", "tribunal", "camara", "senado", 
+                        "autarquia", "fundacao", "instituto", "agencia", "conselho", "comissao", 
+                        "gdf", "seedf", "sesdf", "sedf", "sejus", "pcdf", "pmdf", "cbmdf", 
+                        "detran", "caesb", "ceb", "novacap", "terracap", "brb", "metro", 
+                        "ubs", "upa", "posto", "servico", "servicos", "bloco institucional", 
+                        "administração regional", "administracao regional", "orgao publico",
+                        "endereco da", "endereço da", "endereco do", "endereço do"
                     ]
-                    # Se contexto institucional, nunca marca como PII
                     if any(g in contexto for g in gatilhos_institucionais):
+                        logger.debug(f"[DEDUP] Endereço institucional ignorado: {valor}")
                         continue
                     
-                    # Marca como PII se tiver contexto bancário ou pessoal
-                    if contexto_pessoal:
-                        findings.append({
-                            "tipo": "DADOS_BANCARIOS", "valor": valor,
-                            "confianca": self._calcular_confianca("CONTA_BANCARIA", texto, inicio, fim),
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
-
-                elif tipo == 'DADO_BIOMETRICO':
-                    contexto = texto[max(0, inicio-60):fim+60].lower()
-                    gatilhos = ["impressão digital", "impressao digital", "foto 3x4", "reconhecimento facial", "biometria", "biométrico", "biometrico"]
-                    if any(g in contexto for g in gatilhos) or valor:
-                        findings.append({
-                            "tipo": "DADO_BIOMETRICO", "valor": valor,
-                            "confianca": self._calcular_confianca("DADO_BIOMETRICO", texto, inicio, fim),
-                            "peso": 5, "inicio": inicio, "fim": fim
-                        })
-
-                # PATCH ULTRA: qualquer referência a menor, estudante, aluno, idade, etc., é PII, exceto se contexto genérico/institucional
-                elif tipo == 'MENOR_IDENTIFICADO':
-                    contexto = texto[max(0, inicio-60):fim+60].lower()
-                    contextos_genericos = [
-                        'solicitação genérica', 'solicito informações', 'benefício geral', 'aposentadoria', 'requerimento genérico', 'dados epidemiológicos', 'dados epidemiologicos', 'dados estatísticos', 'dados estatisticos', 'estatística geral', 'secretaria de educação', 'secretaria de educacao', 'informação institucional', 'dados públicos', 'dados publicos'
-                    ]
-                    # Só ignora se contexto genérico/institucional
-                    if any(cg in contexto for cg in contextos_genericos):
-                        continue
-                    # Tenta reconstruir valor a partir dos grupos e validar idade < 18
-                    idade = None
-                    if match.groups():
-                        grupos = [g for g in match.groups() if g]
-                        # Extrai idade dos grupos (números de 1-2 dígitos)
-                        for g in grupos:
-                            if g and g.isdigit() and len(g) <= 2:
-                                idade = int(g)
-                                break
-                        if grupos:
-                            valor = ' '.join(grupos)
-                    # Só considera se idade < 18 (é menor de idade)
-                    if idade is not None and idade >= 18:
+                    # Setor administrativo: só aceita se tiver contexto residencial
+                    if not tem_contexto_residencial:
+                        # Ignora setores administrativos sem contexto residencial
                         continue
                     findings.append({
-                        "tipo": "MENOR_IDENTIFICADO", "valor": valor or match.group(),
-                        "confianca": self._calcular_confianca("MENOR_IDENTIFICADO", texto, inicio, fim),
-                        "peso": 5, "inicio": inicio, "fim": fim
+                        "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
+                        "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
+                        "peso": 4, "inicio": inicio, "fim": fim
+                    })
+                    continue
+                
+                # Gatilhos institucionais - se presente, ignora (fallback para outros tipos)
+                gatilhos_institucionais = [
+                    "secretaria", "hospital", "escola", "orgao", "empresa", "administracao", "departamento", "diretoria", "coordenacao", "tribunal", "camara", "senado", "autarquia", "fundacao", "instituto", "agencia", "conselho", "comissao", "gdf", "seedf", "sesdf", "sedf", "sejus", "pcdf", "pmdf", "cbmdf", "detran", "caesb", "ceb", "novacap", "terracap", "brb", "metro", "ubs", "upa", "posto", "servico", "servicos", "setor", "bloco institucional", "administração regional", "administracao regional", "orgao publico"
+                ]
+                if any(g in contexto for g in gatilhos_institucionais):
+                    continue
+                
+                # Caso geral: só marca se tiver padrão residencial explícito no valor
+                contexto_residencial = re.search(r'moro|resido|minha\s+casa|meu\s+endere|minha\s+resid|residencia\s*:', contexto)
+                if contexto_residencial:
+                    findings.append({
+                        "tipo": "ENDERECO_RESIDENCIAL", "valor": valor,
+                        "confianca": self._calcular_confianca("ENDERECO_RESIDENCIAL", texto, inicio, fim),
+                        "peso": 4, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo in ['TELEFONE', 'TELEFONE_DDI', 'TELEFONE_FIXO', 'TELEFONE_LOCAL', 'TELEFONE_CURTO', 'CELULAR']:
-                    contexto = texto[max(0, inicio-60):fim+60].lower()
-                    if any(g in contexto for g in ["meu tel", "meu telefone", "celular", "telefone", "contato"]):
-                        findings.append({
-                            "tipo": "TELEFONE", "valor": valor,
-                            "confianca": self._calcular_confianca("TELEFONE", texto, inicio, fim),
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
-
-                elif tipo == 'REGISTRO_PROFISSIONAL':
-                    contexto = texto[max(0, inicio-60):fim+60].lower()
-                    if any(g in contexto for g in ["oab", "crm", "crea", "cro", "crp", "crf", "coren", "crc"]):
-                        findings.append({
-                            "tipo": "OAB", "valor": valor,
-                            "confianca": 0.85,
-                            "peso": 4, "inicio": inicio, "fim": fim
-                        })
-
-                # PATCH ULTRA: qualquer referência a prontuário, tratamento, diagnóstico, CID, paciente, etc., é PII, exceto se contexto genérico/institucional
-                elif tipo == 'DADO_SAUDE':
-                    contexto = texto[max(0, inicio-100):fim+50].upper()
-                    contextos_genericos = [
-                        'ISENÇÃO', 'IMPOSTO DE RENDA', 'APOSENTADO', 'SOLICITAÇÃO', 'SOLICITO', 'PEDIDO', 'BENEFÍCIO', 'BENEFICIO', 'AUXÍLIO', 'AUXILIO', 'APOSENTADORIA', 'REQUERIMENTO', 'GENÉRICO', 'GENERICA', 'GENÉRICA', 'GENERICAMENTE', 'PARA', 'SOBRE', 'REFERENTE', 'REFERÊNCIA', 'REFERENCIA', 'INFORMAÇÃO', 'INFORMACAO', 'INFORMAÇÕES', 'INFORMACOES', 'DADOS EPIDEMIOLÓGICOS', 'DADOS EPIDEMIOLOGICOS', 'DADOS ESTATÍSTICOS', 'DADOS ESTATISTICOS', 'ESTATÍSTICA', 'ESTATISTICA', 'ESTATÍSTICAS', 'ESTATISTICAS', 'PÚBLICO', 'PUBLICO', 'SES-DF', 'SECRETARIA', 'SECRETARIA DE SAÚDE', 'SECRETARIA DE SAUDE', 'GDF', 'PÚBLICA', 'PUBLICA', 'PÚBLICO', 'PUBLICO', 'HOSPITAL', 'CLÍNICA', 'CLINICA', 'UNIDADE', 'UBS', 'UPA', 'POSTO', 'SERVIÇO', 'SERVICO', 'SERVIÇOS', 'SERVICOS', 'GENÉRICO', 'GENERICA', 'GENÉRICA', 'GENERICAMENTE'
-                    ]
-                    # Só ignora se contexto genérico/institucional
-                    if any(cg in contexto for cg in contextos_genericos):
-                        continue
+            elif tipo in ['CONTA_BANCARIA', 'DADOS_BANCARIOS', 'CARTAO_CREDITO', 'CARTAO_FINAL']:
+                contexto = texto[max(0, inicio-80):fim+80].lower()
+                valor_norm = valor.lower() if valor else ""
+                
+                # PATCH: Aceita dados bancários com diversos contextos
+                contexto_pessoal = re.search(
+                    r'minha\s+conta|meu\s+banco|depositar|transferir|'
+                    r'pix|minha\s+ag[êe]ncia|receber\s+em|'
+                    r'pagamento|meu\s+cart[ãa]o|cart[ãa]o\s+final|'
+                    r'dep[óo]sito|ag[êe]ncia|ag\s*\d|cc\s*\d|'
+                    r'conta\s*corrente|conta\s*:',
+                    contexto
+                )
+                
+                # Ignora números isolados que parecem ser outros identificadores
+                # Números de processo, ocorrência, protocolo frequentemente parecem dados bancários
+                contexto_negativo = re.search(
+                    r'processo|protocolo|ocorr[êe]ncia|sei\s*n|nota\s+fiscal|'
+                    r'empenho|documento|n[ºo°]\s*\d',
+                    contexto
+                )
+                if contexto_negativo and not contexto_pessoal:
+                    continue
+                
+                gatilhos_institucionais = [
+                    "agência institucional", "agencia institucional", "conta institucional", "conta corporativa", "conta empresa", "conta comercial", "conta governo"
+                ]
+                # Se contexto institucional, nunca marca como PII
+                if any(g in contexto for g in gatilhos_institucionais):
+                    continue
+                
+                # Marca como PII se tiver contexto bancário ou pessoal
+                if contexto_pessoal:
                     findings.append({
-                        "tipo": "DADO_SAUDE", "valor": valor,
-                        "confianca": self._calcular_confianca("DADO_SAUDE", texto, inicio, fim),
-                        "peso": 5, "inicio": inicio, "fim": fim
+                        "tipo": "DADOS_BANCARIOS", "valor": valor,
+                        "confianca": self._calcular_confianca("CONTA_BANCARIA", texto, inicio, fim),
+                        "peso": 4, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo == 'MENOR_IDENTIFICADO':
+            elif tipo == 'DADO_BIOMETRICO':
+                contexto = texto[max(0, inicio-60):fim+60].lower()
+                gatilhos = ["impressão digital", "impressao digital", "foto 3x4", "reconhecimento facial", "biometria", "biométrico", "biometrico"]
+                if any(g in contexto for g in gatilhos) or valor:
                     findings.append({
-                        "tipo": "MENOR_IDENTIFICADO", "valor": valor,
-                        "confianca": self._calcular_confianca("MENOR_IDENTIFICADO", texto, inicio, fim),
+                        "tipo": "DADO_BIOMETRICO", "valor": valor,
+                        "confianca": self._calcular_confianca("DADO_BIOMETRICO", texto, inicio, fim),
                         "peso": 5, "inicio": inicio, "fim": fim
                     })
 
-                # NOVO: Conta bancária com contexto explícito (não confundir com "conta de luz")
-                elif tipo == 'CONTA_BANCARIA_CONTEXTUAL':
-                    # Extrai conta e agência dos grupos
+            # PATCH ULTRA: qualquer referência a menor, estudante, aluno, idade, etc., é PII, exceto se contexto genérico/institucional
+            elif tipo == 'MENOR_IDENTIFICADO':
+                contexto = texto[max(0, inicio-60):fim+60].lower()
+                contextos_genericos = [
+                    'solicitação genérica', 'solicito informações', 'benefício geral', 'aposentadoria', 'requerimento genérico', 'dados epidemiológicos', 'dados epidemiologicos', 'dados estatísticos', 'dados estatisticos', 'estatística geral', 'secretaria de educação', 'secretaria de educacao', 'informação institucional', 'dados públicos', 'dados publicos'
+                ]
+                # Só ignora se contexto genérico/institucional
+                if any(cg in contexto for cg in contextos_genericos):
+                    continue
+                # Tenta reconstruir valor a partir dos grupos e validar idade < 18
+                idade = None
+                if match.groups():
                     grupos = [g for g in match.groups() if g]
-                    conta = grupos[0] if grupos else valor
-                    agencia = grupos[1] if len(grupos) > 1 else None
-                    # Valida que conta tem ao menos 4 dígitos
-                    digitos_conta = ''.join(c for c in conta if c.isdigit())
-                    if len(digitos_conta) >= 4:
-                        valor_completo = f"Conta {conta}"
-                        if agencia:
-                            valor_completo += f" Ag {agencia}"
-                        findings.append({
-                            "tipo": "CONTA_BANCARIA", "valor": valor_completo,
-                            "confianca": 0.92,
-                            "peso": 5, "inicio": inicio, "fim": fim
-                        })
+                    # Extrai idade dos grupos (números de 1-2 dígitos)
+                    for g in grupos:
+                        if g and g.isdigit() and len(g) <= 2:
+                            idade = int(g)
+                            break
+                    if grupos:
+                        valor = ' '.join(grupos)
+                # Só considera se idade < 18 (é menor de idade)
+                if idade is not None and idade >= 18:
+                    continue
+                findings.append({
+                    "tipo": "MENOR_IDENTIFICADO", "valor": valor or match.group(),
+                    "confianca": self._calcular_confianca("MENOR_IDENTIFICADO", texto, inicio, fim),
+                    "peso": 5, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo in ['NOME_TITULO', 'NOME_ASSINATURA', 'NOME_CARGO', 'NOME_CONDOMINIO']:
-                    # Nomes extraídos por contexto (título, assinatura, cargo, condomínio)
-                    # Limpar valor - remover caracteres extras
-                    valor_limpo = valor.strip()
-                    # Verificar se é um nome válido (pelo menos 2 palavras, não muito longo)
-                    palavras = valor_limpo.split()
-                    if len(palavras) >= 2 and len(palavras) <= 5 and len(valor_limpo) <= 45:
-                        # Verificar que todas as palavras (exceto preposições) começam com maiúscula
-                        preposicoes = {'de', 'da', 'do', 'dos', 'das', 'e'}
-                        palavras_validas = all(
-                            p.lower() in preposicoes or (p[0].isupper() and len(p) > 1)
-                            for p in palavras
-                        )
-                        if palavras_validas:
-                            findings.append({
-                                "tipo": "NOME", "valor": valor_limpo,
-                                "confianca": 0.85,
-                                "peso": 4, "inicio": inicio, "fim": fim
-                            })
-
-                elif tipo == 'CARTAO_CREDITO':
+            elif tipo in ['TELEFONE', 'TELEFONE_DDI', 'TELEFONE_FIXO', 'TELEFONE_LOCAL', 'TELEFONE_CURTO', 'CELULAR']:
+                contexto = texto[max(0, inicio-60):fim+60].lower()
+                if any(g in contexto for g in ["meu tel", "meu telefone", "celular", "telefone", "contato"]):
                     findings.append({
-                        "tipo": "CARTAO_CREDITO", "valor": valor,
-                        "confianca": self._calcular_confianca("CARTAO_CREDITO", texto, inicio, fim),
+                        "tipo": "TELEFONE", "valor": valor,
+                        "confianca": self._calcular_confianca("TELEFONE", texto, inicio, fim),
                         "peso": 4, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo == 'DATA_NASCIMENTO':
+            elif tipo == 'REGISTRO_PROFISSIONAL':
+                contexto = texto[max(0, inicio-60):fim+60].lower()
+                if any(g in contexto for g in ["oab", "crm", "crea", "cro", "crp", "crf", "coren", "crc"]):
                     findings.append({
-                        "tipo": "DATA_NASCIMENTO", "valor": valor,
-                        "confianca": self._calcular_confianca("DATA_NASCIMENTO", texto, inicio, fim),
-                        "peso": 3, "inicio": inicio, "fim": fim
+                        "tipo": "OAB", "valor": valor,
+                        "confianca": 0.85,
+                        "peso": 4, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo == 'PASSAPORTE':
-                    contexto = texto[max(0, inicio-60):fim+60].lower()
-                    # Nunca marca exemplos/fictícios como PII
-                    if any(kw in contexto for kw in ["exemplo", "ficticio", "fictício", "teste", "000000", "aa000000"]):
-                        continue
-                    findings.append({
-                        "tipo": tipo, "valor": valor,
-                        "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
-                        "peso": 5, "inicio": inicio, "fim": fim
-                    })
-                elif tipo in ['PIS', 'CNS', 'TITULO_ELEITOR', 'CTPS', 'CERTIDAO', 'REGISTRO_ACADEMICO']:
-                    # Para CTPS com múltiplos grupos, reconstruir valor
-                    if valor is None and match.groups():
-                        grupos = [g for g in match.groups() if g]
-                        if grupos:
-                            valor = '-'.join(grupos)  # Ex: 65421-00123-DF
-                    if not valor:
-                        valor = match.group()  # Fallback para match completo
+            # PATCH ULTRA: qualquer referência a prontuário, tratamento, diagnóstico, CID, paciente, etc., é PII, exceto se contexto genérico/institucional
+            elif tipo == 'DADO_SAUDE':
+                contexto = texto[max(0, inicio-100):fim+50].upper()
+                contextos_genericos = [
+                    'ISENÇÃO', 'IMPOSTO DE RENDA', 'APOSENTADO', 'SOLICITAÇÃO', 'SOLICITO', 'PEDIDO', 'BENEFÍCIO', 'BENEFICIO', 'AUXÍLIO', 'AUXILIO', 'APOSENTADORIA', 'REQUERIMENTO', 'GENÉRICO', 'GENERICA', 'GENÉRICA', 'GENERICAMENTE', 'PARA', 'SOBRE', 'REFERENTE', 'REFERÊNCIA', 'REFERENCIA', 'INFORMAÇÃO', 'INFORMACAO', 'INFORMAÇÕES', 'INFORMACOES', 'DADOS EPIDEMIOLÓGICOS', 'DADOS EPIDEMIOLOGICOS', 'DADOS ESTATÍSTICOS', 'DADOS ESTATISTICOS', 'ESTATÍSTICA', 'ESTATISTICA', 'ESTATÍSTICAS', 'ESTATISTICAS', 'PÚBLICO', 'PUBLICO', 'SES-DF', 'SECRETARIA', 'SECRETARIA DE SAÚDE', 'SECRETARIA DE SAUDE', 'GDF', 'PÚBLICA', 'PUBLICA', 'PÚBLICO', 'PUBLICO', 'HOSPITAL', 'CLÍNICA', 'CLINICA', 'UNIDADE', 'UBS', 'UPA', 'POSTO', 'SERVIÇO', 'SERVICO', 'SERVIÇOS', 'SERVICOS', 'GENÉRICO', 'GENERICA', 'GENÉRICA', 'GENERICAMENTE'
+                ]
+                # Só ignora se contexto genérico/institucional
+                if any(cg in contexto for cg in contextos_genericos):
+                    continue
+                findings.append({
+                    "tipo": "DADO_SAUDE", "valor": valor,
+                    "confianca": self._calcular_confianca("DADO_SAUDE", texto, inicio, fim),
+                    "peso": 5, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo == 'MENOR_IDENTIFICADO':
+                findings.append({
+                    "tipo": "MENOR_IDENTIFICADO", "valor": valor,
+                    "confianca": self._calcular_confianca("MENOR_IDENTIFICADO", texto, inicio, fim),
+                    "peso": 5, "inicio": inicio, "fim": fim
+                })
+
+            # NOVO: Conta bancária com contexto explícito (não confundir com "conta de luz")
+            elif tipo == 'CONTA_BANCARIA_CONTEXTUAL':
+                # Extrai conta e agência dos grupos
+                grupos = [g for g in match.groups() if g]
+                conta = grupos[0] if grupos else valor
+                agencia = grupos[1] if len(grupos) > 1 else None
+                # Valida que conta tem ao menos 4 dígitos
+                digitos_conta = ''.join(c for c in conta if c.isdigit())
+                if len(digitos_conta) >= 4:
+                    valor_completo = f"Conta {conta}"
+                    if agencia:
+                        valor_completo += f" Ag {agencia}"
                     findings.append({
-                        "tipo": tipo, "valor": valor,
-                        "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
+                        "tipo": "CONTA_BANCARIA", "valor": valor_completo,
+                        "confianca": 0.92,
                         "peso": 5, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo == 'MATRICULA_SERVIDOR':
-                    # PATCH: Excluir matrícula que está dentro de processo SEI
-                    processo_sei_pattern = re.compile(r'\b\d{4,5}-\d{5,8}/\d{4}(?:-\d{2})?\b', re.IGNORECASE)
-                    dentro_sei = False
-                    for sei_match in processo_sei_pattern.finditer(texto):
-                        if sei_match.start() <= inicio and fim <= sei_match.end():
-                            dentro_sei = True
-                            break
-                        # Também verifica se o valor está contido no SEI
-                        if valor in sei_match.group():
-                            dentro_sei = True
-                            break
-                    if dentro_sei:
-                        continue  # Ignora matrícula dentro de SEI
-                    
-                    # PATCH: Excluir se contexto indica inscrição imobiliária, IPTU ou Registro de Imóveis
-                    contexto = texto[max(0, inicio-100):fim+100].lower()
-                    contexto_imovel = re.search(
-                        r'inscri[cç][ãa]o\s*(imobili[aá]ria|im[oó]vel|iptu)|'
-                        r'iptu|matr[ií]cula\s*(do\s+)?im[oó]vel|'
-                        r'registr[oa]\s*(de\s+)?im[oó]v|'
-                        r'\d+[ºo°]\s*ri\b|\d+[ºo°]\s*registro|'
-                        r'inscri[cç][aã]o\s*imobil|cart[oó]rio',
-                        contexto
+            elif tipo in ['NOME_TITULO', 'NOME_ASSINATURA', 'NOME_CARGO', 'NOME_CONDOMINIO']:
+                # Nomes extraídos por contexto (título, assinatura, cargo, condomínio)
+                # Limpar valor - remover caracteres extras
+                valor_limpo = valor.strip()
+                # Verificar se é um nome válido (pelo menos 2 palavras, não muito longo)
+                palavras = valor_limpo.split()
+                if len(palavras) >= 2 and len(palavras) <= 5 and len(valor_limpo) <= 45:
+                    # Verificar que todas as palavras (exceto preposições) começam com maiúscula
+                    preposicoes = {'de', 'da', 'do', 'dos', 'das', 'e'}
+                    palavras_validas = all(
+                        p.lower() in preposicoes or (p[0].isupper() and len(p) > 1)
+                        for p in palavras
                     )
-                    if contexto_imovel:
-                        continue  # É inscrição imobiliária/matrícula de imóvel, não matrícula de servidor
-                    
-                    # Aceita se tiver contexto de matrícula (servidor, aluno, funcionário)
-                    contexto_matricula = re.search(
-                        r'servidor|funcional|servi[cç]o\s+p[uú]blico|gdf|seedf|sedf|'
-                        r'se[jc]us|tcdf|pmdf|pcdf|cbmdf|gest[aã]o\s+de\s+pessoas|'
-                        r'funcion[aá]rio|mat[r\.]|matr[ií]cula|aluno|estudante|boletim|escolar',
-                        contexto
-                    )
-                    if contexto_matricula:
+                    if palavras_validas:
                         findings.append({
-                            "tipo": tipo, "valor": valor,
-                            "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
-                            "peso": 3, "inicio": inicio, "fim": fim
+                            "tipo": "NOME", "valor": valor_limpo,
+                            "confianca": 0.85,
+                            "peso": 4, "inicio": inicio, "fim": fim
                         })
 
-                elif tipo in ['PROCESSO_SEI', 'PROTOCOLO_LAI', 'PROTOCOLO_OUV']:
-                    # IMPORTANTE: Nunca adicionar processos sem verificação de contexto
-                    # A heurística principal de PROCESSO_SEI está em _detectar_regex
-                    # Esta seção é um fallback que NÃO deve adicionar PIIs sem contexto
-                    # Processos sem contexto de posse/interesse são apenas referências administrativas
-                    continue  # Ignora - a lógica correta está no bloco principal
+            elif tipo == 'CARTAO_CREDITO':
+                findings.append({
+                    "tipo": "CARTAO_CREDITO", "valor": valor,
+                    "confianca": self._calcular_confianca("CARTAO_CREDITO", texto, inicio, fim),
+                    "peso": 4, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo == 'DATA_NASCIMENTO':
+                findings.append({
+                    "tipo": "DATA_NASCIMENTO", "valor": valor,
+                    "confianca": self._calcular_confianca("DATA_NASCIMENTO", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo == 'PASSAPORTE':
+                contexto = texto[max(0, inicio-60):fim+60].lower()
+                # Nunca marca exemplos/fictícios como PII
+                if any(kw in contexto for kw in ["exemplo", "ficticio", "fictício", "teste", "000000", "aa000000"]):
+                    continue
+                findings.append({
+                    "tipo": tipo, "valor": valor,
+                    "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
+                    "peso": 5, "inicio": inicio, "fim": fim
+                })
+            elif tipo in ['PIS', 'CNS', 'TITULO_ELEITOR', 'CTPS', 'CERTIDAO', 'REGISTRO_ACADEMICO']:
+                # Para CTPS com múltiplos grupos, reconstruir valor
+                if valor is None and match.groups():
+                    grupos = [g for g in match.groups() if g]
+                    if grupos:
+                        valor = '-'.join(grupos)  # Ex: 65421-00123-DF
+                if not valor:
+                    valor = match.group()  # Fallback para match completo
+                findings.append({
+                    "tipo": tipo, "valor": valor,
+                    "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
+                    "peso": 5, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo == 'CONTA_BANCARIA':
+            elif tipo == 'MATRICULA_SERVIDOR':
+                # PATCH: Excluir matrícula que está dentro de processo SEI
+                processo_sei_pattern = re.compile(r'\b\d{4,5}-\d{5,8}/\d{4}(?:-\d{2})?\b', re.IGNORECASE)
+                dentro_sei = False
+                for sei_match in processo_sei_pattern.finditer(texto):
+                    if sei_match.start() <= inicio and fim <= sei_match.end():
+                        dentro_sei = True
+                        break
+                    # Também verifica se o valor está contido no SEI
+                    if valor in sei_match.group():
+                        dentro_sei = True
+                        break
+                if dentro_sei:
+                    continue  # Ignora matrícula dentro de SEI
+                
+                # PATCH: Excluir se contexto indica inscrição imobiliária, IPTU ou Registro de Imóveis
+                contexto = texto[max(0, inicio-100):fim+100].lower()
+                contexto_imovel = re.search(
+                    r'inscri[cç][ãa]o\s*(imobili[aá]ria|im[oó]vel|iptu)|'
+                    r'iptu|matr[ií]cula\s*(do\s+)?im[oó]vel|'
+                    r'registr[oa]\s*(de\s+)?im[oó]v|'
+                    r'\d+[ºo°]\s*ri\b|\d+[ºo°]\s*registro|'
+                    r'inscri[cç][aã]o\s*imobil|cart[oó]rio',
+                    contexto
+                )
+                if contexto_imovel:
+                    continue  # É inscrição imobiliária/matrícula de imóvel, não matrícula de servidor
+                
+                # Aceita se tiver contexto de matrícula (servidor, aluno, funcionário)
+                contexto_matricula = re.search(
+                    r'servidor|funcional|servi[cç]o\s+p[uú]blico|gdf|seedf|sedf|'
+                    r'se[jc]us|tcdf|pmdf|pcdf|cbmdf|gest[aã]o\s+de\s+pessoas|'
+                    r'funcion[aá]rio|mat[r\.]|matr[ií]cula|aluno|estudante|boletim|escolar',
+                    contexto
+                )
+                if contexto_matricula:
                     findings.append({
-                        "tipo": "CONTA_BANCARIA", "valor": valor,
-                        "confianca": self._calcular_confianca("CONTA_BANCARIA", texto, inicio, fim),
-                        "peso": 4, "inicio": inicio, "fim": fim
+                        "tipo": tipo, "valor": valor,
+                        "confianca": self._calcular_confianca(tipo, texto, inicio, fim),
+                        "peso": 3, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo == 'PIX_UUID':
+            elif tipo in ['PROCESSO_SEI', 'PROTOCOLO_LAI', 'PROTOCOLO_OUV']:
+                # IMPORTANTE: Nunca adicionar processos sem verificação de contexto
+                # A heurística principal de PROCESSO_SEI está em _detectar_regex
+                # Esta seção é um fallback que NÃO deve adicionar PIIs sem contexto
+                # Processos sem contexto de posse/interesse são apenas referências administrativas
+                continue  # Ignora - a lógica correta está no bloco principal
+
+            elif tipo == 'CONTA_BANCARIA':
+                findings.append({
+                    "tipo": "CONTA_BANCARIA", "valor": valor,
+                    "confianca": self._calcular_confianca("CONTA_BANCARIA", texto, inicio, fim),
+                    "peso": 4, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo == 'PIX_UUID':
+                findings.append({
+                    "tipo": "PIX", "valor": valor,
+                    "confianca": self._calcular_confianca("PIX", texto, inicio, fim),
+                    "peso": 4, "inicio": inicio, "fim": fim
+                })
+
+            elif tipo == 'IP_ADDRESS':
+                if not any(valor.startswith(prefix) for prefix in ['127.', '0.', '255.']):
                     findings.append({
-                        "tipo": "PIX", "valor": valor,
-                        "confianca": self._calcular_confianca("PIX", texto, inicio, fim),
-                        "peso": 4, "inicio": inicio, "fim": fim
+                        "tipo": "IP_ADDRESS", "valor": valor,
+                        "confianca": self._calcular_confianca("IP_ADDRESS", texto, inicio, fim),
+                        "peso": 2, "inicio": inicio, "fim": fim
                     })
 
-                elif tipo == 'IP_ADDRESS':
-                    if not any(valor.startswith(prefix) for prefix in ['127.', '0.', '255.']):
-                        findings.append({
-                            "tipo": "IP_ADDRESS", "valor": valor,
-                            "confianca": self._calcular_confianca("IP_ADDRESS", texto, inicio, fim),
-                            "peso": 2, "inicio": inicio, "fim": fim
-                        })
+            elif tipo == 'PLACA_VEICULO':
+                findings.append({
+                    "tipo": "PLACA_VEICULO", "valor": valor,
+                    "confianca": self._calcular_confianca("PLACA_VEICULO", texto, inicio, fim),
+                    "peso": 3, "inicio": inicio, "fim": fim
+                })
 
-                elif tipo == 'PLACA_VEICULO':
+            elif tipo == 'CEP':
+                # CEP é dado de localização - pode identificar a residência de uma pessoa
+                
+                # EXCLUSÃO 1: CEP dentro de número de processo SEI (ex: 00015-01009853/2023-11)
+                processo_sei_pattern = re.compile(r'\b\d{4,5}-\d{5,8}/\d{4}(?:-\d{2})?\b', re.IGNORECASE)
+                dentro_sei = False
+                for sei_match in processo_sei_pattern.finditer(texto):
+                    if sei_match.start() <= inicio and fim <= sei_match.end():
+                        dentro_sei = True
+                        break
+                    # Também verifica se o valor está contido no SEI
+                    if valor in sei_match.group():
+                        dentro_sei = True
+                        break
+                if dentro_sei:
+                    continue  # Ignora CEP dentro de processo SEI
+                
+                # EXCLUSÃO 2: CEPs genéricos/institucionais (não identificam pessoa específica)
+                # 70000-000 a 70999-999 = Brasília centro/Esplanada (locais públicos)
+                valor_limpo = valor.replace('.', '').replace('-', '').replace(' ', '')
+                if len(valor_limpo) == 8:
+                    prefixo_cep = valor_limpo[:5]
+                    # CEPs de áreas públicas/comerciais genéricas
+                    if prefixo_cep in ['70000', '70001', '70002', '70003', '70004', '70005', '70040', '70041', '70042', '70043', '70044', '70050', '70051']:
+                        continue  # Esplanada dos Ministérios, Praça dos Três Poderes, etc.
+                
+                # Contexto de endereço aumenta a relevância
+                contexto = texto[max(0, inicio-80):fim+50].lower()
+                
+                # EXCLUSÃO 3: Contexto de consulta urbanística sobre TERCEIROS (não identifica pessoa)
+                # Importante: "meu endereço", "imóvel de interesse", "moro" = identificador pessoal
+                contexto_urbanismo_terceiros = any(kw in contexto for kw in [
+                    'ocupação do solo', 'ocupacao do solo', 
+                    'circulação de pessoas', 'circulacao de pessoas',
+                    'espaço público', 'espaco publico',
+                    'estabelecimento comercial', 'complexo'
+                ])
+                # Mas se tem contexto pessoal, não ignorar
+                contexto_pessoal = any(kw in contexto for kw in [
+                    'meu endere', 'minha casa', 'moro', 'resido', 'interesse', 
+                    'im[oó]vel de interesse', 'inscrição imobil', 'inscricao imobil',
+                    'matrícula', 'matricula'
+                ])
+                if contexto_urbanismo_terceiros and not contexto_pessoal:
+                    continue  # Contexto de urbanismo sobre terceiros, não identifica pessoa
+                
+                if re.search(r'endere[çc]o|resid|moro|casa|apt|apartamento|rua|av[en]|quadra|bloco|lote|lt|conjunto|cj|setor|im[oó]vel|localizado|cep\s*:', contexto):
                     findings.append({
-                        "tipo": "PLACA_VEICULO", "valor": valor,
-                        "confianca": self._calcular_confianca("PLACA_VEICULO", texto, inicio, fim),
-                        "peso": 3, "inicio": inicio, "fim": fim
+                        "tipo": "CEP", "valor": valor,
+                        "confianca": 0.85, "peso": 3, "inicio": inicio, "fim": fim
                     })
-
-                elif tipo == 'CEP':
-                    # CEP é dado de localização - pode identificar a residência de uma pessoa
-                    
-                    # EXCLUSÃO 1: CEP dentro de número de processo SEI (ex: 00015-01009853/2023-11)
-                    processo_sei_pattern = re.compile(r'\b\d{4,5}-\d{5,8}/\d{4}(?:-\d{2})?\b', re.IGNORECASE)
-                    dentro_sei = False
-                    for sei_match in processo_sei_pattern.finditer(texto):
-                        if sei_match.start() <= inicio and fim <= sei_match.end():
-                            dentro_sei = True
-                            break
-                        # Também verifica se o valor está contido no SEI
-                        if valor in sei_match.group():
-                            dentro_sei = True
-                            break
-                    if dentro_sei:
-                        continue  # Ignora CEP dentro de processo SEI
-                    
-                    # EXCLUSÃO 2: CEPs genéricos/institucionais (não identificam pessoa específica)
-                    # 70000-000 a 70999-999 = Brasília centro/Esplanada (locais públicos)
-                    valor_limpo = valor.replace('.', '').replace('-', '').replace(' ', '')
-                    if len(valor_limpo) == 8:
-                        prefixo_cep = valor_limpo[:5]
-                        # CEPs de áreas públicas/comerciais genéricas
-                        if prefixo_cep in ['70000', '70001', '70002', '70003', '70004', '70005', '70040', '70041', '70042', '70043', '70044', '70050', '70051']:
-                            continue  # Esplanada dos Ministérios, Praça dos Três Poderes, etc.
-                    
-                    # Contexto de endereço aumenta a relevância
-                    contexto = texto[max(0, inicio-80):fim+50].lower()
-                    
-                    # EXCLUSÃO 3: Contexto de consulta urbanística sobre TERCEIROS (não identifica pessoa)
-                    # Importante: "meu endereço", "imóvel de interesse", "moro" = identificador pessoal
-                    contexto_urbanismo_terceiros = any(kw in contexto for kw in [
-                        'ocupação do solo', 'ocupacao do solo', 
-                        'circulação de pessoas', 'circulacao de pessoas',
-                        'espaço público', 'espaco publico',
-                        'estabelecimento comercial', 'complexo'
-                    ])
-                    # Mas se tem contexto pessoal, não ignorar
-                    contexto_pessoal = any(kw in contexto for kw in [
-                        'meu endere', 'minha casa', 'moro', 'resido', 'interesse', 
-                        'im[oó]vel de interesse', 'inscrição imobil', 'inscricao imobil',
-                        'matrícula', 'matricula'
-                    ])
-                    if contexto_urbanismo_terceiros and not contexto_pessoal:
-                        continue  # Contexto de urbanismo sobre terceiros, não identifica pessoa
-                    
-                    if re.search(r'endere[çc]o|resid|moro|casa|apt|apartamento|rua|av[en]|quadra|bloco|lote|lt|conjunto|cj|setor|im[oó]vel|localizado|cep\s*:', contexto):
-                        findings.append({
-                            "tipo": "CEP", "valor": valor,
-                            "confianca": 0.85, "peso": 3, "inicio": inicio, "fim": fim
-                        })
-                    else:
-                        # CEP isolado sem contexto de endereço pessoal - ignorar
-                        # CEPs genéricos/comerciais não identificam pessoa
-                        continue
-        
+                else:
+                    # CEP isolado sem contexto de endereço pessoal - ignorar
+                    # CEPs genéricos/comerciais não identificam pessoa
+                    continue
+    
         # === HEURÍSTICAS ADICIONAIS ===
         texto_lower = texto.lower()
         
@@ -2660,10 +2967,9 @@ class PIIDetector:
         
         # Heurística: Nome + menção de CPF/documento (sem número)
         # Ex: "Maria Souza, servidora, informou seu CPF"
-        nome_cpf_match = re.search(
-            r'([A-Za-zÀ-ÿ]+(?:\s+[A-Za-zÀ-ÿ]+)+)[^.]{0,50}(?:seu\s+cpf|seu\s+documento|informou\s+(?:seu\s+)?cpf)',
-            texto, re.IGNORECASE
-        )
+        nome_cpf_match = None
+        if perfil is None or self.prefiltro_regex.pode_casar('NOME_MENCAO_CPF', perfil):
+            nome_cpf_match = self.heuristicas_regex['NOME_MENCAO_CPF'].search(texto)
         if nome_cpf_match:
             nome = nome_cpf_match.group(1)
             # Verifica se o nome começa com maiúscula e tem mais de uma palavra
@@ -2727,7 +3033,9 @@ class PIIDetector:
     def _extrair_nomes_gatilho(self, texto: str) -> List[Dict]:
         """Extrai nomes após gatilhos de contato (sempre PII)."""
         findings = []
-        texto_upper = self._normalizar(texto)
+        documento = texto if isinstance(texto, DocumentContext) else DocumentContext(texto)
+        # Sem strip: as posições dos gatilhos valem no mapa de offsets do documento
+        texto_upper = documento.texto_norm
         
         # Palavras que indicam fim do nome (não são partes de nomes)
         PALAVRAS_FIM_NOME = {
@@ -2735,12 +3043,15 @@ class PIIDetector:
             "ESTOU", "TENHO", "FAÇO", "MORO", "TRABALHO", "SOU"
         }
         
-        for gatilho in self.gatilhos_contato:
-            if gatilho not in texto_upper:
-                continue
-            
-            idx = texto_upper.find(gatilho) + len(gatilho)
-            resto = texto[idx:idx+60].strip()
+        # Gatilhos presentes, na ordem da primeira ocorrência (equivale a texto_upper.find)
+        posicoes = self.vocabulario.buscar(texto_upper).primeiras_posicoes(GATILHO_CONTATO)
+        for gatilho, pos in sorted(posicoes.items(), key=lambda item: (item[1], item[0])):
+            # `pos` é do texto normalizado, que muda de tamanho com o unidecode ("…" -> "...")
+            idx = documento.para_original(pos + len(gatilho))
+            janela = texto[idx:idx+60]
+            resto = janela.strip()
+            # Offset de `resto` no texto (o strip tira os espaços depois do gatilho)
+            base = idx + len(janela) - len(janela.lstrip())
             
             if "ME CHAMO" in gatilho:
                 # Captura nome simples ou composto após "me chamo"
@@ -2763,7 +3074,7 @@ class PIIDetector:
                     if self._deve_ignorar_entidade(nome):
                         continue
                     
-                    inicio = idx + match.start()
+                    inicio = base + match.start()
                     fim = inicio + len(nome)
                     # Maior confiança para nomes após "Me chamo" (auto-identificação)
                     confianca = min(1.0, self._calcular_confianca("NOME", texto, inicio, fim) * 1.1)
@@ -2789,8 +3100,8 @@ class PIIDetector:
                     if self._deve_ignorar_entidade(nome):
                         continue
                     
-                    inicio = idx + match.start()
-                    fim = idx + match.end()
+                    inicio = base + match.start(1)
+                    fim = inicio + len(nome)
                     confianca = min(1.0, self._calcular_confianca("NOME", texto, inicio, fim) * 1.05)
                     findings.append({
                         "tipo": "NOME", "valor": nome, "confianca": confianca,
@@ -2801,14 +3112,16 @@ class PIIDetector:
     
     def _deve_ignorar_nome(self, texto: str, inicio: int) -> bool:
         """Determina se nome deve ser ignorado (imunidade funcional)."""
-        pre_text = self._normalizar(texto[max(0, inicio-100):inicio])
-        pos_text = self._normalizar(texto[inicio:min(len(texto), inicio+150)])
+        pre_text = self._normalizar_trecho(texto, max(0, inicio-100), inicio)
+        pos_text = self._normalizar_trecho(texto, inicio, min(len(texto), inicio+150))
         full_context = pre_text + " " + pos_text
         
+        vocab_pre = self.vocabulario.buscar(pre_text)
+        vocab_pos = self.vocabulario.buscar(pos_text)
+        
         # Gatilho de contato ANULA imunidade
-        for gatilho in self.gatilhos_contato:
-            if gatilho in pre_text:
-                return False
+        if vocab_pre.tem(GATILHO_CONTATO):
+            return False
         
         if "FUNCIONARIO DO MES" in full_context or "FUNCIONARIA DO MES" in full_context:
             return True
@@ -2827,13 +3140,12 @@ class PIIDetector:
         if has_titulo and has_instituicao:
             return True
         
-        for cargo in self.cargos_autoridade:
-            if re.search(rf"\b{cargo}\.?\s*$", pre_text):
-                if has_instituicao:
-                    return True
+        # Cargo de autoridade imediatamente antes do nome ("DR.", "SRA")
+        if has_instituicao and vocab_pre.termina_com(CARGO_AUTORIDADE):
+            return True
         
-        has_servidor_context = any(ind in pre_text for ind in self.indicadores_servidor)
-        has_servidor_after = any(ind in pos_text[:50] for ind in self.indicadores_servidor)
+        has_servidor_context = vocab_pre.tem(INDICADOR_SERVIDOR)
+        has_servidor_after = vocab_pos.tem(INDICADOR_SERVIDOR, fim_max=50)
         
         if has_servidor_context or has_servidor_after:
             dados_pessoais_anuladores = {
@@ -2845,16 +3157,20 @@ class PIIDetector:
         
         return False
     
-    def _detectar_ner_bert_only(self, texto: str) -> List[Dict]:
-        """Detecta apenas com BERT NER."""
+    def _detectar_ner_bert_only(self, texto: str, resultados: Optional[List[Dict]] = None) -> List[Dict]:
+        """Detecta apenas com BERT NER.
+
+        Args:
+            texto: Texto original
+            resultados: Saída bruta do pipeline já calculada (usado por detect_many)
+        """
         findings = []
         if not self.nlp_bert:
             return findings
         
         try:
-            # Trunca texto se necessário
-            texto_truncado = texto[:4096] if len(texto) > 4096 else texto
-            resultados = self.nlp_bert(texto_truncado)
+            if resultados is None:
+                resultados = self._inferir_ner(self.nlp_bert, [texto], 1, modelo="bert")[0]
             
             for ent in resultados:
                 if ent['entity_group'] not in ['PER', 'PESSOA', 'B-PER', 'I-PER', 'PERSON']:
@@ -2884,15 +3200,20 @@ class PIIDetector:
         
         return findings
     
-    def _detectar_ner_nuner_only(self, texto: str) -> List[Dict]:
-        """Detecta apenas com NuNER pt-BR."""
+    def _detectar_ner_nuner_only(self, texto: str, resultados: Optional[List[Dict]] = None) -> List[Dict]:
+        """Detecta apenas com NuNER pt-BR.
+
+        Args:
+            texto: Texto original
+            resultados: Saída bruta do pipeline já calculada (usado por detect_many)
+        """
         findings = []
         if not self.nlp_nuner:
             return findings
         
         try:
-            texto_truncado = texto[:4096] if len(texto) > 4096 else texto
-            resultados = self.nlp_nuner(texto_truncado)
+            if resultados is None:
+                resultados = self._inferir_ner(self.nlp_nuner, [texto], 1, modelo="nuner")[0]
             
             for ent in resultados:
                 if ent['entity_group'] not in ['PER', 'PESSOA', 'B-PER', 'I-PER', 'PERSON']:
@@ -2916,31 +3237,55 @@ class PIIDetector:
         
         return findings
     
-    def _detectar_ner_spacy_only(self, texto: str) -> List[Dict]:
-        """Detecta apenas com spaCy NER."""
+    def _entidades_spacy(self, textos: List[str], batch_size: int) -> List[List[Dict]]:
+        """Entidades do spaCy por texto ({entity_group, word, start, end}), via nlp.pipe.
+
+        Com o cache de segmentos ligado, só as linhas inéditas passam pelo spaCy.
+        """
+        def inferir(trechos: List[str]) -> List[List[Dict]]:
+            return [
+                [{"entity_group": ent.label_, "word": ent.text, "start": ent.start_char, "end": ent.end_char}
+                 for ent in doc.ents]
+                for doc in self.nlp_spacy.pipe(trechos, batch_size=max(batch_size, 1))
+            ]
+        
+        cache = self.cache_segmentos_ner.get("spacy")
+        if cache is None:
+            return inferir(textos)
+        return cache.inferir(self._versao_ner("spacy"), textos, inferir)
+    
+    def _detectar_ner_spacy_only(self, texto: str, entidades: Optional[List[Dict]] = None) -> List[Dict]:
+        """Detecta apenas com spaCy NER.
+
+        Args:
+            texto: Texto original
+            entidades: Entidades já calculadas por _entidades_spacy (usado por detect_many)
+        """
         findings = []
         if not self.nlp_spacy:
             return findings
         
         try:
-            doc = self.nlp_spacy(texto)
-            for ent in doc.ents:
-                if ent.label_ != 'PER':
+            if entidades is None:
+                entidades = self._entidades_spacy([texto], 1)[0]
+            for ent in entidades:
+                if ent['entity_group'] != 'PER':
                     continue
-                if len(ent.text) <= 3 or " " not in ent.text:
+                nome = ent['word']
+                if len(nome) <= 3 or " " not in nome:
                     continue
-                if self._deve_ignorar_entidade(ent.text):
+                if self._deve_ignorar_entidade(nome):
                     continue
-                if self._deve_ignorar_nome(texto, ent.start_char):
+                if self._deve_ignorar_nome(texto, ent['start']):
                     continue
                 
-                inicio, fim = ent.start_char, ent.end_char
+                inicio, fim = ent['start'], ent['end']
                 base = self.confianca_base.get("NOME_SPACY", 0.70)
                 fator = self._calcular_fator_contexto(texto, inicio, fim, "NOME")
                 confianca = min(1.0, base * fator)
                 
                 findings.append({
-                    "tipo": "NOME", "valor": ent.text, "confianca": confianca,
+                    "tipo": "NOME", "valor": nome, "confianca": confianca,
                     "peso": 4, "inicio": inicio, "fim": fim, "source": "spacy"
                 })
         except Exception as e:
@@ -2956,6 +3301,126 @@ class PIIDetector:
         findings.extend(self._detectar_ner_spacy_only(texto))
         return findings
     
+    def _inferir_ner(self, nlp, textos: List[str], batch_size: int,
+                     modelo: Optional[str] = None) -> List[List[Dict]]:
+        """Entidades de um pipeline HF por texto, com memoização por segmento.
+
+        Com `modelo` ("bert"/"nuner") e o cache de segmentos ligado, só as
+        linhas ainda não vistas vão ao modelo (src/inference/segmentos_ner.py);
+        sem cache, os textos inteiros vão direto para _inferir_fragmentos. O
+        filtro de candidatos (src/candidatos_nome.py) tira da inferência as
+        linhas sem par de palavras capitalizadas que possa ser nome.
+        """
+        filtro = self.filtro_nome.filtrar if (modelo and self.filtro_nome) else None
+        cache = self.cache_segmentos_ner.get(modelo) if modelo else None
+        if cache is not None:
+            return cache.inferir(
+                self._versao_ner(modelo), textos, lambda segmentos: self._inferir_fragmentos(nlp, segmentos, batch_size), filtro
+            )
+        if filtro is None:
+            return self._inferir_fragmentos(nlp, textos, batch_size)
+        # Sem cache de segmentos o filtro vale para o texto inteiro
+        candidatos = [i for i, t in enumerate(textos) if t and filtro(t)]
+        resultados: List[List[Dict]] = [[] for _ in textos]
+        if candidatos:
+            calculados = self._inferir_fragmentos(nlp, [textos[i] for i in candidatos], batch_size)
+            for i, entidades in zip(candidatos, calculados):
+                resultados[i] = entidades
+        return resultados
+    
+    def _inferir_fragmentos(self, nlp, textos: List[str], batch_size: int) -> List[List[Dict]]:
+        """Roda um pipeline HF sobre os textos inteiros, fragmentando os longos.
+
+        Cada texto vira fragmentos alinhados a sentenças que cabem na janela do
+        modelo (src/inference/fragmentacao.py); os fragmentos de todos os textos
+        vão ao pipeline em uma única chamada e as entidades voltam por texto,
+        com offsets globais e sem duplicatas da sobreposição. Texto curto é um
+        único fragmento, idêntico à chamada direta.
+        """
+        medir = criar_medidor(nlp)
+        por_texto = [
+            fragmentar_texto(t, self.ner_fragmento_tokens, self.ner_sobreposicao_tokens, medir)
+            for t in textos
+        ]
+        entradas = [f.texto for fragmentos in por_texto for f in fragmentos]
+        if not entradas:
+            return [[] for _ in textos]
+        saidas = list(nlp(entradas, batch_size=max(batch_size, 1)))
+        # Algumas versões do pipeline "achatam" a saída quando a lista tem 1 texto
+        if len(entradas) == 1 and (not saidas or isinstance(saidas[0], dict)):
+            saidas = [saidas]
+        if len(saidas) != len(entradas):
+            raise ValueError(f"{len(saidas)} saídas para {len(entradas)} fragmentos")
+        
+        resultados, pos = [], 0
+        for texto, fragmentos in zip(textos, por_texto):
+            brutos = saidas[pos:pos + len(fragmentos)]
+            pos += len(fragmentos)
+            resultados.append(mesclar_entidades(fragmentos, brutos, len(texto)) if fragmentos else [])
+        return resultados
+    
+    def _executar_pipeline_lote(self, nlp, textos: List[str], batch_size: int, nome: str,
+                                modelo: Optional[str] = None) -> List[Optional[List[Dict]]]:
+        """Roda um pipeline HF sobre vários textos em uma única chamada com batching real.
+
+        Retorna a saída bruta por texto (mesma fragmentação de _inferir_ner usada
+        em detect()). Em caso de erro no lote, retorna None para cada texto e o
+        chamador cai no caminho por texto, que já trata exceções individualmente.
+        """
+        if not nlp or not textos:
+            return [None] * len(textos)
+        try:
+            return self._inferir_ner(nlp, textos, batch_size, modelo=modelo)
+        except Exception as e:
+            logger.warning(f"Erro no {nome} em lote, voltando para execução por texto: {e}")
+            return [None] * len(textos)
+    
+    def metricas_segmentos_ner(self) -> Dict[str, Dict]:
+        """Hits/misses e tempo economizado da memoização de NER por segmento, por modelo."""
+        return {modelo: cache.metricas() for modelo, cache in self.cache_segmentos_ner.items()}
+    
+    def metricas_filtro_nome(self) -> Optional[Dict]:
+        """Trechos/caracteres que o filtro de candidatos tirou do BERT/NuNER (None se desligado)."""
+        return self.filtro_nome.metricas() if self.filtro_nome else None
+    
+    def metricas_cache(self) -> Dict:
+        """Métricas do cache de resultados, da coalescência e do NER por segmento (GET /cache/stats)."""
+        extras = {
+            "coalescencia": self.coalescencia.metricas() if self.coalescencia else None,
+            "ner_segmentos": self.metricas_segmentos_ner(),
+            "ner_candidatos": self.metricas_filtro_nome(),
+        }
+        if self.cache_resultados is None:
+            return {"enabled": False, **extras}
+        return {"enabled": True, **self.cache_resultados.metricas(), **extras}
+    
+    def _detectar_ner_lote(self, textos: List[str], batch_size: int) -> List[List[Dict]]:
+        """Detecta nomes em vários textos rodando cada modelo NER uma vez por lote.
+
+        BERT e NuNER recebem a lista inteira (batching do pipeline HF) e o spaCy
+        usa nlp.pipe; com o cache de segmentos, só as linhas inéditas do lote
+        vão aos modelos. O pós-processamento por texto é o mesmo de
+        _detectar_ner, então o resultado é idêntico ao da detecção individual.
+        """
+        brutos_bert = self._executar_pipeline_lote(self.nlp_bert, textos, batch_size, "BERT NER", "bert")
+        brutos_nuner = self._executar_pipeline_lote(self.nlp_nuner, textos, batch_size, "NuNER", "nuner")
+        
+        entidades_spacy = [None] * len(textos)
+        if self.nlp_spacy and textos:
+            try:
+                entidades_spacy = self._entidades_spacy(textos, batch_size)
+            except Exception as e:
+                logger.warning(f"Erro no spaCy em lote, voltando para execução por texto: {e}")
+        
+        resultados = []
+        for texto, bert, nuner, spacy_ents in zip(textos, brutos_bert, brutos_nuner, entidades_spacy):
+            findings = []
+            findings.extend(self._detectar_ner_bert_only(texto, bert))
+            findings.extend(self._detectar_ner_nuner_only(texto, nuner))
+            findings.extend(self._detectar_ner_spacy_only(texto, spacy_ents))
+            resultados.append(findings)
+        return resultados
+    
     def _detectar_presidio(self, texto: str) -> List[Dict]:
         """Detecta PII complementar usando Presidio (apenas tipos que não cobrimos bem).
         
@@ -3049,41 +3514,395 @@ class PIIDetector:
         
         return False
     
-    def detect(self, text: str, force_llm: bool = False) -> Tuple[bool, List[Dict], str, float]:
+    @staticmethod
+    def _carregar_timeouts_estagios() -> Dict[str, Optional[float]]:
+        """Timeouts (s) por etapa no modo paralelo: PII_STAGE_TIMEOUT_<ETAPA> ou PII_STAGE_TIMEOUT.
+        
+        Valores <= 0 desativam o timeout da etapa.
+        """
+        def _ler(nome_env: str, padrao: str) -> Optional[float]:
+            try:
+                valor = float(os.getenv(nome_env, padrao))
+            except ValueError:
+                logger.warning(f"⚠️ {nome_env} inválido, usando {padrao}s")
+                valor = float(padrao)
+            return valor if valor > 0 else None
+        
+        padrao = os.getenv("PII_STAGE_TIMEOUT", "10")
+        return {
+            estagio: _ler(f"PII_STAGE_TIMEOUT_{estagio.upper()}", padrao)
+            for estagio in ESTAGIOS_DETECCAO
+        }
+    
+    def _obter_executor_estagios(self) -> Executor:
+        """Executor das etapas paralelas, criado sob demanda na primeira chamada."""
+        if self._stage_executor is None:
+            with self._stage_executor_lock:
+                if self._stage_executor is None:
+                    workers = int(os.getenv("PII_STAGE_WORKERS", str(2 * len(ESTAGIOS_DETECCAO))))
+                    self._stage_workers = max(1, workers)
+                    self._stage_executor = ThreadPoolExecutor(
+                        max_workers=self._stage_workers, thread_name_prefix="pii-estagio"
+                    )
+        return self._stage_executor
+    
+    def _registrar_atrasado(self, futuro) -> None:
+        """Conta a etapa que estourou o timeout até ela liberar a thread."""
+        def liberar(_futuro):
+            with self._stage_executor_lock:
+                self._estagios_atrasados -= 1
+        
+        with self._stage_executor_lock:
+            self._estagios_atrasados += 1
+        futuro.add_done_callback(liberar)
+    
+    def _executor_tomado_por_atrasados(self) -> bool:
+        """Todas as threads do executor presas em etapas atrasadas: nada novo começaria."""
+        with self._stage_executor_lock:
+            return self._stage_workers is not None and self._estagios_atrasados >= self._stage_workers
+    
+    def _funcoes_estagios(self, text: str, ctx: Optional[ContextoDeteccao] = None) -> Dict[str, Callable[[], List[Dict]]]:
+        """Função de cada etapa 1-4 para o texto, por nome de etapa."""
+        return {
+            "regex": lambda: self._detectar_regex(text, ctx),
+            "gatilho": lambda: self._extrair_nomes_gatilho(text),
+            "bert": lambda: self._detectar_ner_bert_only(text),
+            "nuner": lambda: self._detectar_ner_nuner_only(text),
+            "spacy": lambda: self._detectar_ner_spacy_only(text),
+            "presidio": lambda: self._detectar_presidio(text),
+        }
+    
+    def _executar_estagios(self, text: str, ner_findings: Optional[List[Dict]] = None,
+                           ctx: Optional[ContextoDeteccao] = None) -> Dict[str, List[Dict]]:
+        """Roda as etapas 1-4 e devolve os findings de cada uma, por nome de etapa.
+        
+        No modo sequencial (padrão) as etapas rodam uma após a outra, como
+        sempre. No modo paralelo são submetidas juntas ao executor (torch e
+        spaCy liberam o GIL) e aguardadas até o timeout de cada uma: etapa que
+        estoura o prazo ou falha contribui com lista vazia e a detecção segue
+        com o resultado parcial. O timeout conta a partir do início da etapa,
+        não do envio: a espera na fila do executor não consome o prazo.
+        
+        A etapa atrasada não é interrompida; ela termina em background
+        ocupando uma thread do executor. Para isso não virar timeouts em
+        cascata, o executor não acumula fila: etapa que não começa dentro do
+        seu timeout é retirada da fila e roda na thread da chamada, e com
+        todas as threads presas em etapas atrasadas as etapas rodam direto
+        na thread da chamada, como no modo sequencial.
+        
+        Se `ner_findings` vier preenchido (detect_many), BERT/NuNER/spaCy não
+        rodam e o NER em lote entra no lugar de "bert".
+        """
+        estagios = self._funcoes_estagios(text, ctx)
+        # Etapas já executadas pelo modo "classify" não rodam de novo
+        resultados: Dict[str, List[Dict]] = dict(ctx.estagios) if ctx is not None else {}
+        if ner_findings is not None:
+            resultados.update({"bert": ner_findings, "nuner": [], "spacy": []})
+        pendentes = [nome for nome in ESTAGIOS_DETECCAO if nome not in resultados]
+        
+        if not self.parallel_stages:
+            for nome in pendentes:
+                resultados[nome] = estagios[nome]()
+            return resultados
+        
+        executor = self._obter_executor_estagios()
+        if self._executor_tomado_por_atrasados():
+            logger.warning("⏱️ Executor de etapas ocupado por etapas atrasadas; rodando etapas na thread da chamada")
+            futuros = [(nome, None) for nome in pendentes]
+        else:
+            enviado = time.monotonic()
+            inicios: Dict[str, float] = {}
+            comecou = {nome: threading.Event() for nome in pendentes}
+            
+            def marcar_inicio(nome: str, funcao: Callable[[], List[Dict]]) -> Callable[[], List[Dict]]:
+                def rodar():
+                    inicios[nome] = time.monotonic()
+                    comecou[nome].set()
+                    return funcao()
+                return rodar
+            
+            futuros = [(nome, executor.submit(marcar_inicio(nome, estagios[nome]))) for nome in pendentes]
+        for nome, futuro in futuros:
+            timeout = self.stage_timeouts.get(nome)
+            try:
+                if futuro is not None and timeout is not None:
+                    # Ainda na fila quando o prazo venceria: sai da fila e roda aqui
+                    if not comecou[nome].wait(max(0.0, enviado + timeout - time.monotonic())) and futuro.cancel():
+                        futuro = None
+                    else:
+                        comecou[nome].wait()
+                if futuro is None:
+                    resultados[nome] = estagios[nome]()
+                    continue
+                restante = None if timeout is None else max(0.0, inicios[nome] + timeout - time.monotonic())
+                resultados[nome] = futuro.result(timeout=restante)
+            except FuturesTimeoutError:
+                futuro.cancel()
+                logger.warning(f"⏱️ Etapa '{nome}' excedeu {timeout}s; seguindo com resultado parcial")
+                self._registrar_atrasado(futuro)
+                resultados[nome] = []
+                if ctx is not None:
+                    ctx.estagios_degradados.append(nome)
+            except Exception as e:
+                logger.warning(f"⚠️ Etapa '{nome}' falhou; seguindo com resultado parcial: {e}")
+                resultados[nome] = []
+                if ctx is not None:
+                    ctx.estagios_degradados.append(nome)
+        return resultados
+    
+    def _calcular_assinatura_base(self) -> str:
+        """Parte fixa da assinatura de configuração usada na chave do cache."""
+        patterns = hashlib.sha256()
+        for nome, pattern in sorted({**self.patterns_compilados, **self.heuristicas_regex}.items()):
+            patterns.update(f"{nome}\x00{pattern.pattern}\x00{pattern.flags}\x01".encode("utf-8"))
+        spacy_versao = None
+        if self.nlp_spacy is not None:
+            spacy_versao = getattr(self.nlp_spacy, "meta", {}).get("version")
+        return json.dumps({
+            "thresholds": self.THRESHOLDS_DINAMICOS,
+            "pesos": self.ensemble_weights,
+            "patterns": patterns.hexdigest(),
+            "modelos": {nome: cfg.get("model_id") for nome, cfg in MODELOS_NER.items()},
+            "backend": getattr(self, "ner_backend", None),
+            "int8": getattr(self, "ner_int8", False),
+            "spacy": spacy_versao,
+            "fragmentos": [self.ner_fragmento_tokens, self.ner_sobreposicao_tokens],
+            "segmentos_ner": bool(self.cache_segmentos_ner),
+            "filtro_nome": self.filtro_nome is not None,
+            "prefiltro": self.prefiltro_regex is not None,
+            "probabilistica": self.use_probabilistic_confidence,
+            # Formato dos findings guardados (2 = registro compacto, sem explicação)
+            "formato": 2,
+        }, sort_keys=True, default=str)
+    
+    def _assinatura_cache(self, force_llm: bool, modo: str = "full") -> str:
+        """Assinatura da configuração que decide o resultado de um texto.
+        
+        Etapas/modelos carregados e a disponibilidade do LLM são lidos a cada
+        chamada: se um modelo cair ou o token mudar, as entradas antigas deixam
+        de casar em vez de devolver resultado de outra configuração.
+        """
+        llm_env = os.getenv("PII_USE_LLM_ARBITRATION", "").lower()
+        llm = (self.use_llm_arbitration or force_llm) and bool(os.getenv("HF_TOKEN")) and llm_env != "false"
+        etapas = "".join(
+            "1" if modelo is not None else "0"
+            for modelo in (self.nlp_bert, self.nlp_nuner, self.nlp_spacy, self.presidio_analyzer)
+        )
+        return f"{self._assinatura_base}|force_llm={int(force_llm)}|llm={int(llm)}|etapas={etapas}|modo={modo}"
+    
+    def _chave_cache(self, text: str, force_llm: bool, modo: str = "full") -> Optional[str]:
+        """Chave do texto no cache de resultados (None se o cache está desligado ou o texto é vazio)."""
+        if self.cache_resultados is None or not text or not text.strip():
+            return None
+        return self.cache_resultados.chave(text, self._assinatura_cache(force_llm, modo))
+    
+    def _chave_coalescencia(self, text: str, force_llm: bool, chave_cache: Optional[str],
+                            modo: str = "full") -> Optional[str]:
+        """Chave do SingleFlight: a do cache ou, sem cache, um SHA-256 só em memória."""
+        if self.coalescencia is None or not text or not text.strip():
+            return None
+        if chave_cache is not None:
+            return chave_cache
+        mensagem = f"{self._assinatura_cache(force_llm, modo)}\x00{text}".encode("utf-8", "surrogatepass")
+        return hashlib.sha256(mensagem).hexdigest()
+    
+    def _obter_do_cache(self, chave: Optional[str]) -> Optional[Tuple[bool, List[Dict], str, float]]:
+        if chave is None or self.cache_resultados is None:
+            return None
+        resultado = self.cache_resultados.obter(chave)
+        # Nível compartilhado volta de JSON como lista
+        return tuple(resultado) if resultado is not None else None
+    
+    def _guardar_no_cache(self, chave: Optional[str], resultado: Tuple, ctx: ContextoDeteccao) -> None:
+        # Resultado parcial (etapa com timeout/erro) não é guardado
+        if chave is not None and not ctx.estagios_degradados:
+            self.cache_resultados.guardar(chave, resultado)
+    
+    @staticmethod
+    def _validar_modo(mode: str) -> None:
+        if mode not in MODOS_DETECCAO:
+            raise ValueError(f"mode inválido: {mode!r} (use um de {', '.join(MODOS_DETECCAO)})")
+    
+    def detect(self, text: str, force_llm: bool = False, mode: str = "full",
+               explain: bool = True) -> Tuple[bool, List[Dict], str, float]:
         """
         Detecta PII priorizando minimização de FN (recall máximo, permissivo).
+        
+        Com o cache de resultados ligado, um texto já analisado com a mesma
+        configuração volta do cache sem passar pelas etapas. Chamadas
+        simultâneas com o mesmo texto e opções esperam um único cálculo
+        (src/coalescencia.py).
+        
+        Com mode="classify" só has_pii é garantido igual ao do modo "full":
+        a detecção para no primeiro finding decisivo de regex/gatilhos (ver
+        _classificar_antecipado) e os findings vêm sem explicação.
+        
+        Com explain=False os findings vêm só com o registro compacto, sem
+        'explicacao'; explicar() gera as explicações depois, se preciso. O
+        cache guarda sempre o resultado sem explicações.
+        """
+        self._validar_modo(mode)
+        chave = self._chave_cache(text, force_llm, mode)
+        resultado = self._obter_do_cache(chave)
+        if resultado is None:
+            def calcular():
+                ctx = ContextoDeteccao(texto=text, force_llm=force_llm, modo=mode)
+                resultado = self._detectar_texto(text, force_llm=force_llm, ctx=ctx)
+                self._guardar_no_cache(chave, resultado, ctx)
+                return resultado
+            
+            chave_voo = self._chave_coalescencia(text, force_llm, chave, mode)
+            if chave_voo is None:
+                resultado = calcular()
+            else:
+                resultado, _ = self.coalescencia.executar(chave_voo, calcular)
+        return self._com_explicacoes(text, resultado) if explain and mode == "full" else resultado
+    
+    def _com_explicacoes(self, text: str, resultado: Tuple) -> Tuple[bool, List[Dict], str, float]:
+        has_pii, findings, nivel_risco, confianca = resultado
+        return has_pii, self.explicar(text, findings), nivel_risco, confianca
+    
+    def detect_many(self, texts: Iterable[str], batch_size: int = 16, force_llm: bool = False,
+                    mode: str = "full", explain: bool = True) -> List[Tuple[bool, List[Dict], str, float]]:
+        """
+        Detecta PII em vários textos, rodando os modelos NER uma vez por lote.
+        
+        O resultado de cada posição é idêntico ao de detect() para o mesmo texto;
+        só muda a forma de execução dos modelos (batching no BERT/NuNER e
+        nlp.pipe no spaCy).
+        
+        Args:
+            texts: Textos a analisar (a ordem é preservada)
+            batch_size: Quantidade de textos por lote enviado aos modelos
+            force_llm: Forçar uso do árbitro LLM (como em detect())
+            mode: "full" ou "classify" (como em detect()); no "classify" só
+                os textos sem finding decisivo vão ao NER em lote
+            explain: Gerar explicações XAI (como em detect()); jobs em lote
+                que não leem 'explicacao' devem passar False
+        
+        Returns:
+            Lista de tuplas (has_pii, findings, nivel_risco, confianca)
+        """
+        return list(self.iter_detect_many(
+            texts, batch_size=batch_size, force_llm=force_llm, mode=mode, explain=explain
+        ))
+    
+    def iter_detect_many(self, texts: Iterable[str], batch_size: int = 16, force_llm: bool = False,
+                         mode: str = "full", explain: bool = True) -> Iterator[Tuple[bool, List[Dict], str, float]]:
+        """
+        Versão geradora de detect_many().
+        
+        Consome `texts` em lotes de `batch_size` e produz os resultados na mesma
+        ordem, lote a lote. Útil para entradas grandes (arquivos em lote) sem
+        materializar tudo em memória.
+        """
+        self._validar_modo(mode)
+        explicar = explain and mode == "full"
+        batch_size = max(1, int(batch_size))
+        
+        def processar(lote: List[str]) -> Iterator[Tuple[bool, List[Dict], str, float]]:
+            for texto, resultado in zip(lote, self._detectar_lote(lote, batch_size, force_llm, mode)):
+                yield self._com_explicacoes(texto, resultado) if explicar else resultado
+        
+        lote: List[str] = []
+        for texto in texts:
+            lote.append(texto)
+            if len(lote) >= batch_size:
+                yield from processar(lote)
+                lote = []
+        if lote:
+            yield from processar(lote)
+    
+    def _detectar_lote(self, textos: List[str], batch_size: int, force_llm: bool,
+                       modo: str = "full") -> List[Tuple[bool, List[Dict], str, float]]:
+        """Processa um lote: NER em lote para os textos não vazios, resto por texto.
+        
+        Textos já presentes no cache de resultados não entram no lote do NER,
+        nem, no modo "classify", os decididos por regex/gatilhos.
+        """
+        chaves = [self._chave_cache(t, force_llm, modo) for t in textos]
+        resultados: List[Optional[Tuple]] = [self._obter_do_cache(chave) for chave in chaves]
+        contextos = {
+            i: ContextoDeteccao(texto=t, force_llm=force_llm, modo=modo)
+            for i, t in enumerate(textos) if resultados[i] is None
+        }
+        indices_validos = [
+            i for i, t in enumerate(textos)
+            if t and t.strip() and resultados[i] is None
+        ]
+        if modo == "classify":
+            for i in indices_validos:
+                resultados[i] = self._classificar_antecipado(contextos[i])
+                if resultados[i] is not None:
+                    self._guardar_no_cache(chaves[i], resultados[i], contextos[i])
+            indices_validos = [i for i in indices_validos if resultados[i] is None]
+        ner_por_indice = {}
+        if indices_validos:
+            ner_lote = self._detectar_ner_lote([textos[i] for i in indices_validos], batch_size)
+            ner_por_indice = dict(zip(indices_validos, ner_lote))
+        
+        for i, texto in enumerate(textos):
+            if resultados[i] is not None:
+                continue
+            ctx = contextos[i]
+            resultados[i] = self._detectar_texto(
+                texto, force_llm=force_llm, ner_findings=ner_por_indice.get(i), ctx=ctx
+            )
+            self._guardar_no_cache(chaves[i], resultados[i], ctx)
+        return resultados
+    
+    def _detectar_texto(self, text: str, force_llm: bool = False,
+                        ner_findings: Optional[List[Dict]] = None,
+                        ctx: Optional[ContextoDeteccao] = None) -> Tuple[bool, List[Dict], str, float]:
+        """
+        Núcleo de detect(). Se `ner_findings` vier preenchido (detect_many),
+        reaproveita o resultado do NER em lote em vez de rodar os modelos.
+        Todo estado da chamada fica em `ctx` (criado aqui se não vier).
         """
         if not text or not text.strip():
             return False, [], "SEGURO", 1.0
+        if ctx is None:
+            ctx = ContextoDeteccao(texto=text, force_llm=force_llm)
+        # Normalização única do documento; todas as etapas recebem o DocumentContext
+        if ctx.documento is None:
+            ctx.documento = text if isinstance(text, DocumentContext) else DocumentContext(text)
+        text = ctx.documento
+
+        # Modo "classify": regex/gatilhos podem decidir sozinhos. Em detect_many
+        # isso já foi tentado antes do NER em lote, que então vem em ner_findings.
+        if ctx.modo == "classify" and ner_findings is None:
+            antecipado = self._classificar_antecipado(ctx)
+            if antecipado is not None:
+                return antecipado
 
         # === ENSEMBLE DE DETECÇÃO ===
+        # Etapas 1-4 (sequenciais ou em paralelo, ver _executar_estagios)
+        estagios = self._executar_estagios(text, ner_findings, ctx)
         all_findings = []
         # 1. Regex
-        regex_findings = self._detectar_regex(text)
-        for f in regex_findings:
+        for f in estagios["regex"]:
             f['source'] = 'regex'
-        all_findings.extend(regex_findings)
+        all_findings.extend(estagios["regex"])
         # 2. Gatilhos
-        gatilho_findings = self._extrair_nomes_gatilho(text)
-        for f in gatilho_findings:
+        for f in estagios["gatilho"]:
             f['source'] = 'gatilho'
-        all_findings.extend(gatilho_findings)
+        all_findings.extend(estagios["gatilho"])
         # 3. NER (BERT + NuNER + spaCy)
-        ner_findings = self._detectar_ner(text)
-        all_findings.extend(ner_findings)
+        all_findings.extend(estagios["bert"])
+        all_findings.extend(estagios["nuner"])
+        all_findings.extend(estagios["spacy"])
         # 4. Presidio Analyzer (pt-BR)
-        presidio_findings = self._detectar_presidio(text)
-        all_findings.extend(presidio_findings)
+        all_findings.extend(estagios["presidio"])
 
         # === VOTAÇÃO (permissiva) ===
-        self._pendentes_llm = []  # Reset
-        all_findings = self._aplicar_votacao(all_findings)
+        all_findings = self._aplicar_votacao(all_findings, ctx)
+        pendentes_llm = ctx.pendentes_llm
 
         # === LLM PARA RECUPERAR PENDENTES (evitar FN) ===
         # Ativação Inteligente: LLM em ambiguidades, MAS respeita variável de ambiente
         # Se PII_USE_LLM_ARBITRATION=false explicitamente, NÃO usa LLM (útil para CI/testes)
         # Se não definida ou true, ativa automaticamente em ambiguidades
-        has_ambiguity = len(self._pendentes_llm) > 0
+        has_ambiguity = len(pendentes_llm) > 0
         has_hf_token = bool(os.getenv("HF_TOKEN"))
         
         # Verifica se foi explicitamente desabilitado via env
@@ -3093,9 +3912,9 @@ class PIIDetector:
         # Só usa LLM se: (ativado OU forçado OU ambiguidade) E tem token E não foi explicitamente desabilitado
         should_use_llm = (self.use_llm_arbitration or force_llm or has_ambiguity) and has_hf_token and not llm_explicitly_disabled
         
-        if should_use_llm and self._pendentes_llm:
+        if should_use_llm and pendentes_llm:
             try:
-                for pendente in self._pendentes_llm:
+                for pendente in pendentes_llm:
                     # Pergunta ao LLM se deve incluir
                     decision, explanation = arbitrate_with_llama(
                         text,
@@ -3110,29 +3929,18 @@ class PIIDetector:
             except Exception as e:
                 # Em caso de erro, INCLUIR para evitar FN (critério 1)
                 logger.warning(f"Erro no LLM, incluindo pendentes para evitar FN: {e}")
-                all_findings.extend(self._pendentes_llm)
-        elif self._pendentes_llm:
+                all_findings.extend(pendentes_llm)
+                # Sem a arbitragem o resultado é parcial: fora do cache
+                ctx.estagios_degradados.append("llm")
+        elif pendentes_llm:
             # Sem LLM disponível: incluir tudo para evitar FN
-            all_findings.extend(self._pendentes_llm)
+            all_findings.extend(pendentes_llm)
 
         # === DEDUPLICAÇÃO AVANÇADA ===
         final_list = self._deduplicate_findings(all_findings)
 
         # === FILTRAGEM POR THRESHOLD (permissiva) ===
-        pii_relevantes = []
-        for f in final_list:
-            tipo = f.get('tipo')
-            conf = f.get('confianca', 1.0)
-            peso = f.get('peso', 1)
-            # Threshold reduzido para evitar FN
-            if tipo in self.THRESHOLDS_DINAMICOS:
-                th = self.THRESHOLDS_DINAMICOS[tipo]
-                peso_min_ajustado = max(1, th['peso_min'] - 1)
-                conf_min_ajustada = th['confianca_min'] * 0.9
-                if peso >= peso_min_ajustado and conf >= conf_min_ajustada:
-                    pii_relevantes.append(f)
-            elif peso >= 1:  # Era 2, agora 1 (mais permissivo)
-                pii_relevantes.append(f)
+        pii_relevantes = self._filtrar_por_threshold(final_list)
 
         # === RESULTADO ===
         if not pii_relevantes:
@@ -3149,22 +3957,73 @@ class PIIDetector:
                         }], "MODERADO", 0.80
                 except Exception as e:
                     logger.warning(f"Erro no LLM final: {e}")
+                    ctx.estagios_degradados.append("llm")
             return False, [], "SEGURO", 1.0
 
+        return self._montar_resultado(pii_relevantes)
+    
+    def _filtrar_por_threshold(self, findings: List[Dict]) -> List[Dict]:
+        """Mantém os findings que passam nos THRESHOLDS_DINAMICOS (reduzidos para evitar FN)."""
+        pii_relevantes = []
+        for f in findings:
+            tipo = f.get('tipo')
+            conf = f.get('confianca', 1.0)
+            peso = f.get('peso', 1)
+            # Threshold reduzido para evitar FN
+            if tipo in self.THRESHOLDS_DINAMICOS:
+                th = self.THRESHOLDS_DINAMICOS[tipo]
+                peso_min_ajustado = max(1, th['peso_min'] - 1)
+                conf_min_ajustada = th['confianca_min'] * 0.9
+                if peso >= peso_min_ajustado and conf >= conf_min_ajustada:
+                    pii_relevantes.append(f)
+            elif peso >= 1:  # Era 2, agora 1 (mais permissivo)
+                pii_relevantes.append(f)
+        return pii_relevantes
+    
+    def _classificar_antecipado(self, ctx: ContextoDeteccao) -> Optional[Tuple[bool, List[Dict], str, float]]:
+        """Modo "classify": tenta decidir has_pii só com as etapas baratas.
+        
+        Roda as etapas de ESTAGIOS_CLASSIFICACAO em ordem, guardando os
+        findings em ctx.estagios para não rodarem de novo, e após cada uma
+        aplica aos findings acumulados as regras do caminho completo (votação,
+        deduplicação, thresholds). Se sobrar um finding de TIPOS_ALTA_CONFIANCA
+        ou com peso >= 4, o texto tem PII em qualquer modo: devolve o resultado
+        sem NER, Presidio nem explicações. Senão devolve None.
+        """
+        if ctx.documento is None:
+            ctx.documento = ctx.texto if isinstance(ctx.texto, DocumentContext) else DocumentContext(ctx.texto)
+        text = ctx.documento
+        funcoes = self._funcoes_estagios(text, ctx)
+        acumulados: List[Dict] = []
+        for nome in ESTAGIOS_CLASSIFICACAO:
+            if nome not in ctx.estagios:
+                ctx.estagios[nome] = funcoes[nome]()
+            acumulados.extend(dict(f, source=nome) for f in ctx.estagios[nome])
+            # Cópias: votação e deduplicação marcam os findings
+            votados = self._aplicar_votacao([dict(f) for f in acumulados])
+            confirmados = self._filtrar_por_threshold(self._deduplicate_findings(votados))
+            if any(f.get('tipo') in self.TIPOS_ALTA_CONFIANCA or f.get('peso', 0) >= 4 for f in confirmados):
+                return self._montar_resultado(confirmados)
+        return None
+    
+    def _montar_resultado(self, pii_relevantes: List[Dict]) -> Tuple[bool, List[Dict], str, float]:
+        """Tupla de detect() a partir dos findings relevantes (não vazios), sem explicações."""
         # Cálculo de risco
         max_peso = max(f.get('peso', 0) for f in pii_relevantes)
         max_confianca = max(f.get('confianca', 0) for f in pii_relevantes)
         risco_map = {5: "CRITICO", 4: "ALTO", 3: "MODERADO", 2: "BAIXO", 1: "BAIXO", 0: "SEGURO"}
         nivel_risco = risco_map.get(max_peso, "MODERADO")
         
-        # === EXPLICABILIDADE (XAI) ===
-        pii_relevantes = self._adicionar_explicacoes(pii_relevantes, text)
-        
+        # Registro compacto: o suficiente para explicar() gerar a explicação depois
         findings_output = [{
             "tipo": f.get("tipo"),
             "valor": f.get("valor"),
             "confianca": f.get("confianca"),
-            "explicacao": f.get("explicacao"),  # XAI: motivos da detecção
+            "fonte": f.get("source"),
+            "peso": f.get("peso"),
+            "inicio": f.get("inicio"),
+            "fim": f.get("fim"),
+            "votacao_motivo": f.get("votacao_motivo"),
         } for f in pii_relevantes]
         return True, findings_output, nivel_risco, max_confianca
     
@@ -3178,7 +4037,9 @@ class PIIDetector:
                 "confidence": {"no_pii": 0.9999, "all_found": None, "min_entity": None},
                 "sources_used": [],
                 "entities": [],
-                "total_entities": 0
+                "total_entities": 0,
+                "degraded_stages": [],
+                "regex_patterns_skipped": 0
             }
         
         sources_used = []
@@ -3190,7 +4051,9 @@ class PIIDetector:
             sources_used.append("spacy")
         sources_used.append("regex")
         
-        is_pii, findings, nivel_risco, conf = self.detect(text)
+        ctx = ContextoDeteccao(texto=text)
+        is_pii, findings, nivel_risco, conf = self._detectar_texto(text, ctx=ctx)
+        findings = self.explicar(text, findings)
         
         return {
             "has_pii": is_pii,
@@ -3203,7 +4066,9 @@ class PIIDetector:
             },
             "sources_used": sources_used,
             "entities": findings,
-            "total_entities": len(findings)
+            "total_entities": len(findings),
+            "degraded_stages": ctx.estagios_degradados,
+            "regex_patterns_skipped": ctx.patterns_regex_ignorados
         }
 
 
@@ -0,0 +1,157 @@
+"""
+Contexto de documento compartilhado pelas etapas de uma chamada de detect().
+
+`DocumentContext` é um `str` (o texto original, intacto) que carrega junto a
+versão normalizada do documento inteiro (unidecode + maiúsculas), o mapa de
+offsets original ↔ normalizado, os limites de linhas e sentenças e um cache
+das janelas já normalizadas. Por ser `str`, pode ser passado a qualquer
+função que hoje recebe `texto` (regex, pipelines NER, spaCy) sem mudanças; as
+funções de contexto do detector verificam `isinstance(texto, DocumentContext)`
+e leem as janelas do cache em vez de chamar `unidecode()` de novo.
+
+A equivalência com `unidecode(texto[a:b]).upper().strip()` é exata porque
+tanto o unidecode quanto o upper() transformam caractere a caractere.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from text_unidecode import unidecode
+
+# Fim de sentença: pontuação final seguida de espaço/fim, ou quebra de linha
+_RE_FIM_SENTENCA = re.compile(r'[.!?]+(?=\s|$)|\n')
+
+
+class DocumentContext(str):
+    """Texto original + normalização do documento inteiro com mapa de offsets."""
+
+    def __new__(cls, texto: str):
+        doc = super().__new__(cls, texto)
+        doc._construir_normalizacao()
+        doc._janelas: Dict[tuple, str] = {}
+        doc._posicoes: Dict[str, int] = {}
+        doc._linhas: Optional[List[Tuple[int, int]]] = None
+        doc._sentencas: Optional[List[Tuple[int, int]]] = None
+        return doc
+
+    def _construir_normalizacao(self) -> None:
+        texto = str(self)
+        if texto.isascii():
+            # Caso comum: offsets idênticos, sem mapa explícito
+            self.texto_norm = texto.upper()
+            self._orig_para_norm = None
+            self._norm_para_orig = None
+            return
+
+        pedacos = []
+        orig_para_norm = [0] * (len(texto) + 1)
+        norm_para_orig = []
+        cache: Dict[str, str] = {}
+        pos = 0
+        for i, ch in enumerate(texto):
+            orig_para_norm[i] = pos
+            if ch.isascii():
+                pedaco = ch.upper()
+            else:
+                pedaco = cache.get(ch)
+                if pedaco is None:
+                    pedaco = cache[ch] = unidecode(ch).upper()
+            pedacos.append(pedaco)
+            norm_para_orig.extend([i] * len(pedaco))
+            pos += len(pedaco)
+        orig_para_norm[len(texto)] = pos
+        norm_para_orig.append(len(texto))
+
+        self.texto_norm = "".join(pedacos)
+        self._orig_para_norm = orig_para_norm
+        self._norm_para_orig = norm_para_orig
+
+    # === Mapa de offsets ===
+
+    def para_normalizado(self, pos: int) -> int:
+        """Offset no texto original -> offset no texto normalizado."""
+        pos = max(0, min(pos, len(self)))
+        return pos if self._orig_para_norm is None else self._orig_para_norm[pos]
+
+    def para_original(self, pos_norm: int) -> int:
+        """Offset no texto normalizado -> offset do caractere original que o gerou."""
+        pos_norm = max(0, min(pos_norm, len(self.texto_norm)))
+        return pos_norm if self._norm_para_orig is None else self._norm_para_orig[pos_norm]
+
+    # === Janelas normalizadas ===
+
+    def normalizar_trecho(self, inicio: int, fim: int) -> str:
+        """Equivale a `unidecode(texto[inicio:fim]).upper().strip()`, com cache."""
+        chave = (inicio, fim)
+        janela = self._janelas.get(chave)
+        if janela is None:
+            if inicio < 0 or fim < 0:
+                janela = unidecode(str(self)[inicio:fim]).upper().strip()
+            else:
+                a = min(inicio, len(self))
+                b = max(a, min(fim, len(self)))
+                janela = self.texto_norm[self.para_normalizado(a):self.para_normalizado(b)].strip()
+            self._janelas[chave] = janela
+        return janela
+
+    def minusculo_trecho(self, inicio: int, fim: int) -> str:
+        """Equivale a `unidecode(texto[inicio:fim]).lower()` (sem strip), com cache."""
+        chave = (inicio, fim, "lower")
+        janela = self._janelas.get(chave)
+        if janela is None:
+            if inicio < 0 or fim < 0:
+                janela = unidecode(str(self)[inicio:fim]).lower()
+            else:
+                a = min(inicio, len(self))
+                b = max(a, min(fim, len(self)))
+                # Saída do unidecode é ASCII: lower(upper(x)) == lower(x)
+                janela = self.texto_norm[self.para_normalizado(a):self.para_normalizado(b)].lower()
+            self._janelas[chave] = janela
+        return janela
+
+    @property
+    def normalizado(self) -> str:
+        """Documento inteiro normalizado (equivale a `_normalizar(texto)`)."""
+        return self.normalizar_trecho(0, len(self))
+
+    def primeira_posicao(self, valor: str) -> int:
+        """`texto.find(valor)` com cache por valor."""
+        pos = self._posicoes.get(valor)
+        if pos is None:
+            pos = self._posicoes[valor] = str.find(self, valor)
+        return pos
+
+    # === Linhas e sentenças ===
+
+    def linhas(self) -> List[Tuple[int, int]]:
+        """Spans (inicio, fim) de cada linha, sem o '\\n'."""
+        if self._linhas is None:
+            spans, inicio = [], 0
+            for m in re.finditer(r'\n', self):
+                spans.append((inicio, m.start()))
+                inicio = m.end()
+            spans.append((inicio, len(self)))
+            self._linhas = spans
+        return self._linhas
+
+    def sentencas(self) -> List[Tuple[int, int]]:
+        """Spans (inicio, fim) das sentenças, incluindo a pontuação final."""
+        if self._sentencas is None:
+            spans, inicio = [], 0
+            for m in _RE_FIM_SENTENCA.finditer(self):
+                if m.end() > inicio and str(self)[inicio:m.end()].strip():
+                    spans.append((inicio, m.end()))
+                inicio = m.end()
+            if inicio < len(self) and str(self)[inicio:].strip():
+                spans.append((inicio, len(self)))
+            self._sentencas = spans
+        return self._sentencas
+
+    def sentenca_em(self, pos: int) -> Optional[Tuple[int, int]]:
+        """Span da sentença que contém o offset `pos` (None se cair entre sentenças)."""
+        sentencas = self.sentencas()
+        i = bisect_right([s[0] for s in sentencas], pos) - 1
+        if i >= 0 and sentencas[i][0] <= pos < sentencas[i][1]:
+            return sentencas[i]
+        return None
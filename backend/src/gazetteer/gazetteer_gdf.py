@@ -1,16 +1,27 @@
 import os
 import json
+import threading
+import time
+from typing import FrozenSet, Optional
 
-def carregar_gazetteer_gdf():
-    """
-    Lê o arquivo gazetteer_gdf.json e retorna um set com todos os nomes, siglas e aliases institucional do GDF.
-    """
+try:
+    from ..aho_corasick import AutomatoAhoCorasick
+except ImportError:
+    from aho_corasick import AutomatoAhoCorasick
+
+
+def _caminho_gazetteer() -> str:
     # Caminho absoluto para garantir compatibilidade
     base_dir = os.path.dirname(os.path.abspath(__file__))
     json_path = os.path.join(base_dir, 'gazetteer_gdf.json')
     if not os.path.exists(json_path):
         # Fallback: tenta na raiz do backend/src
         json_path = os.path.join(base_dir, '..', 'gazetteer', 'gazetteer_gdf.json')
+    return json_path
+
+
+def _ler_termos(json_path: str) -> set:
+    """Lê nomes, siglas e aliases do JSON (em minúsculas)."""
     if not os.path.exists(json_path):
         return set()
     with open(json_path, encoding='utf-8') as f:
@@ -28,4 +39,73 @@ def carregar_gazetteer_gdf():
             termos.add(item.get('sigla', '').strip().lower())
             for alias in item.get('aliases', []):
                 termos.add(alias.strip().lower())
-    return termos
\ No newline at end of file
+    return termos
+
+
+class IndiceGazetteer:
+    """Índice imutável do gazetteer: conjunto de termos + autômato de substrings."""
+
+    __slots__ = ('termos', 'automato', 'caminho', 'mtime')
+
+    def __init__(self, termos: FrozenSet[str], caminho: str, mtime: Optional[float]):
+        self.termos = termos
+        self.automato = AutomatoAhoCorasick(termos)
+        self.caminho = caminho
+        self.mtime = mtime
+
+    def contem(self, texto: str) -> bool:
+        """Texto é exatamente um termo do gazetteer."""
+        return texto in self.termos
+
+    def algum_termo_em(self, texto: str) -> bool:
+        """Algum termo do gazetteer aparece como substring do texto."""
+        return self.automato.contem_algum(texto)
+
+
+# Segundos entre verificações do mtime do JSON (a consulta roda a cada entidade)
+INTERVALO_VERIFICACAO = float(os.getenv("PII_GAZETTEER_RECHECK_S", "5"))
+
+_indice: Optional[IndiceGazetteer] = None
+_indice_lock = threading.Lock()
+_proxima_verificacao = 0.0
+
+
+def obter_indice_gazetteer() -> IndiceGazetteer:
+    """
+    Retorna o índice do gazetteer, carregado uma vez e recarregado só quando
+    o mtime do gazetteer_gdf.json muda. O mtime é conferido no máximo a cada
+    INTERVALO_VERIFICACAO segundos; entre uma conferência e outra o índice
+    em cache volta sem acessar o disco.
+    """
+    global _indice, _proxima_verificacao
+    indice = _indice
+    agora = time.monotonic()
+    if indice is not None and agora < _proxima_verificacao:
+        return indice
+
+    json_path = _caminho_gazetteer()
+    try:
+        mtime = os.stat(json_path).st_mtime
+    except OSError:
+        mtime = None
+
+    if indice is not None and indice.caminho == json_path and indice.mtime == mtime:
+        _proxima_verificacao = agora + INTERVALO_VERIFICACAO
+        return indice
+
+    with _indice_lock:
+        indice = _indice
+        if indice is None or indice.caminho != json_path or indice.mtime != mtime:
+            indice = IndiceGazetteer(frozenset(_ler_termos(json_path)), json_path, mtime)
+            _indice = indice
+        _proxima_verificacao = agora + INTERVALO_VERIFICACAO
+    return indice
+
+
+def carregar_gazetteer_gdf():
+    """
+    Lê o arquivo gazetteer_gdf.json e retorna um set com todos os nomes, siglas e aliases institucional do GDF.
+
+    O conjunto vem do índice em cache (frozenset, somente leitura).
+    """
+    return obter_indice_gazetteer().termos
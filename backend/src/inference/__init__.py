@@ -0,0 +1,56 @@
+"""
+Backends de inferência para os estágios NER do detector.
+
+- onnx_backend: pipelines BERT/NuNER via ONNX Runtime (PII_NER_BACKEND=onnx)
+- exportar_onnx: CLI de export/verificação/quantização dos modelos ONNX
+- quantizacao: INT8 dinâmico com guarda de recall (PII_NER_QUANTIZACAO=int8)
+- fragmentacao: documentos longos em fragmentos alinhados a sentenças para o NER
+- segmentos_ner: memoização da saída do NER por linha do documento
+"""
+
+from .onnx_backend import (
+    BACKEND_TORCH,
+    BACKEND_ONNX,
+    MODELOS_NER,
+    ONNXRUNTIME_AVAILABLE,
+    OPTIMUM_AVAILABLE,
+    obter_backend_ner,
+    criar_session_options,
+    criar_pipeline_ner_onnx,
+    modelo_onnx_disponivel,
+)
+from .quantizacao import (
+    obter_quantizacao_ner,
+    quantizacao_int8_habilitada,
+    validar_int8,
+)
+from .fragmentacao import (
+    Fragmento,
+    obter_config_fragmentacao,
+    criar_medidor,
+    fragmentar_texto,
+    mesclar_entidades,
+)
+from .segmentos_ner import CacheSegmentosNER, segmentar
+
+__all__ = [
+    'BACKEND_TORCH',
+    'BACKEND_ONNX',
+    'MODELOS_NER',
+    'ONNXRUNTIME_AVAILABLE',
+    'OPTIMUM_AVAILABLE',
+    'obter_backend_ner',
+    'criar_session_options',
+    'criar_pipeline_ner_onnx',
+    'modelo_onnx_disponivel',
+    'obter_quantizacao_ner',
+    'quantizacao_int8_habilitada',
+    'validar_int8',
+    'Fragmento',
+    'obter_config_fragmentacao',
+    'criar_medidor',
+    'fragmentar_texto',
+    'mesclar_entidades',
+    'CacheSegmentosNER',
+    'segmentar',
+]
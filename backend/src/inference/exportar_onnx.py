@@ -0,0 +1,179 @@
+"""Exporta e verifica os modelos NER (BERT e NuNER) para ONNX Runtime.
+
+Uso (a partir de backend/):
+    python -m src.inference.exportar_onnx export --modelo todos
+    python -m src.inference.exportar_onnx verify --modelo bert --tolerancia 1e-3
+    python -m src.inference.exportar_onnx quantize --modelo todos --arch avx2
+
+O export gera ``models/<modelo>_ner_onnx/model.onnx`` já otimizado pelo
+ORTOptimizer (nível 2, CPU), junto com tokenizer, config.json e ort_config.json.
+O verify compara spans e scores do pipeline ONNX com o pipeline PyTorch.
+O quantize gera ``model_quantized.onnx`` (INT8 dinâmico) a partir do model.onnx;
+a ativação em produção depende da guarda de recall em ``quantizacao.py``.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Tuple
+
+from .onnx_backend import (
+    MODELOS_NER, ARQUIVO_ONNX, ARQUIVO_ONNX_INT8, diretorio_onnx, criar_pipeline_ner_onnx,
+)
+
+logger = logging.getLogger(__name__)
+
+# Frases curtas cobrindo PER/ORG/LOC/DATE no registro dos pedidos e-SIC
+TEXTOS_VERIFICACAO = [
+    "Meu nome é Maria da Silva Santos e moro em Ceilândia.",
+    "Solicito informações sobre o servidor João Pereira lotado na Secretaria de Saúde.",
+    "O Dr. Carlos Alberto Nogueira atendeu minha mãe no Hospital Regional de Taguatinga em 15/03/2024.",
+    "A empresa Construtora Alvorada Ltda venceu a licitação da NOVACAP.",
+    "Encaminho a reclamação da senhora Ana Beatriz Costa, residente no Gama.",
+    "Bom dia, gostaria de saber o horário de funcionamento da Administração Regional.",
+    "Prezados, sou Fernanda Lima Rodrigues e preciso do meu histórico escolar.",
+    "O processo foi aberto em janeiro de 2023 pelo Detran-DF em Brasília.",
+]
+
+
+def exportar(chave: str, destino: str = None, nivel_otimizacao: int = 2) -> str:
+    """Exporta o modelo HuggingFace da chave para ONNX e aplica o ORTOptimizer."""
+    from transformers import AutoTokenizer
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTOptimizer
+    from optimum.onnxruntime.configuration import OptimizationConfig
+
+    model_id = MODELOS_NER[chave]["model_id"]
+    destino = destino or diretorio_onnx(chave)
+
+    logger.info(f"📥 Exportando {model_id} para ONNX...")
+    modelo = ORTModelForTokenClassification.from_pretrained(model_id, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+
+    logger.info(f"⚙️ Otimizando grafo (nível {nivel_otimizacao})...")
+    optimizer = ORTOptimizer.from_pretrained(modelo)
+    config = OptimizationConfig(
+        optimization_level=nivel_otimizacao,
+        optimize_for_gpu=False,
+        enable_transformers_specific_optimizations=True,
+    )
+    # file_suffix vazio mantém o nome model.onnx esperado pelo backend
+    optimizer.optimize(save_dir=destino, optimization_config=config, file_suffix="")
+    tokenizer.save_pretrained(destino)
+
+    logger.info(f"✅ {chave} exportado em {destino}/{ARQUIVO_ONNX}")
+    return destino
+
+
+def quantizar(chave: str, arch: str = "avx512_vnni") -> str:
+    """Gera o model_quantized.onnx (INT8 dinâmico, por tensor) da chave."""
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    model_dir = diretorio_onnx(chave)
+    caminho_config = os.path.join(model_dir, "ort_config.json")
+    with open(caminho_config, encoding="utf-8") as f:
+        ort_config = json.load(f)
+
+    logger.info(f"⚙️ Quantizando {chave} para INT8 ({arch})...")
+    quantizer = ORTQuantizer.from_pretrained(model_dir, file_name=ARQUIVO_ONNX)
+    qconfig = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=model_dir, quantization_config=qconfig)
+
+    # O quantizer sobrescreve ort_config.json; preserva a seção de otimização
+    with open(caminho_config, encoding="utf-8") as f:
+        ort_config["quantization"] = json.load(f).get("quantization", {})
+    with open(caminho_config, "w", encoding="utf-8") as f:
+        json.dump(ort_config, f, indent=2)
+
+    logger.info(f"✅ {chave} quantizado em {model_dir}/{ARQUIVO_ONNX_INT8}")
+    return model_dir
+
+
+def _chave_entidade(ent: Dict) -> Tuple[str, int, int]:
+    return (ent["entity_group"], int(ent["start"]), int(ent["end"]))
+
+
+def verificar(chave: str, tolerancia: float = 1e-3, textos: List[str] = None) -> bool:
+    """Compara as entidades do pipeline ONNX com as do pipeline PyTorch.
+
+    Exige os mesmos spans (entity_group, start, end) e diferença de score
+    menor ou igual a ``tolerancia`` em cada entidade.
+    """
+    from transformers import pipeline
+
+    textos = textos or TEXTOS_VERIFICACAO
+    model_id = MODELOS_NER[chave]["model_id"]
+
+    nlp_torch = pipeline("ner", model=model_id, aggregation_strategy="simple", device=-1)
+    nlp_onnx = criar_pipeline_ner_onnx(chave)
+
+    inicio = time.perf_counter()
+    saidas_torch = [nlp_torch(t) for t in textos]
+    tempo_torch = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    saidas_onnx = [nlp_onnx(t) for t in textos]
+    tempo_onnx = time.perf_counter() - inicio
+
+    divergencias = 0
+    maior_diff = 0.0
+    for texto, ents_torch, ents_onnx in zip(textos, saidas_torch, saidas_onnx):
+        spans_torch = [_chave_entidade(e) for e in ents_torch]
+        spans_onnx = [_chave_entidade(e) for e in ents_onnx]
+        if spans_torch != spans_onnx:
+            divergencias += 1
+            logger.error(f"❌ Spans divergentes em: {texto[:60]}\n   torch={spans_torch}\n   onnx ={spans_onnx}")
+            continue
+        for e_torch, e_onnx in zip(ents_torch, ents_onnx):
+            diff = abs(float(e_torch["score"]) - float(e_onnx["score"]))
+            maior_diff = max(maior_diff, diff)
+            if diff > tolerancia:
+                divergencias += 1
+                logger.error(f"❌ Score divergente ({diff:.5f}) para '{e_torch['word']}' em: {texto[:60]}")
+
+    n = len(textos)
+    logger.info(
+        f"📊 {chave}: {n} textos | maior diff score={maior_diff:.6f} | "
+        f"torch={tempo_torch / n * 1000:.1f}ms/texto | onnx={tempo_onnx / n * 1000:.1f}ms/texto"
+    )
+    if divergencias:
+        logger.error(f"❌ {chave}: {divergencias} divergência(s) entre ONNX e PyTorch")
+        return False
+    logger.info(f"✅ {chave}: ONNX equivalente ao PyTorch")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta/verifica modelos NER em ONNX Runtime")
+    parser.add_argument(
+        "comando", choices=["export", "verify", "quantize"],
+        help="export: gera model.onnx | verify: compara com PyTorch | quantize: gera model_quantized.onnx",
+    )
+    parser.add_argument("--modelo", choices=list(MODELOS_NER) + ["todos"], default="todos")
+    parser.add_argument("--destino", default=None, help="Diretório de saída (apenas com um único --modelo)")
+    parser.add_argument("--nivel-otimizacao", type=int, default=2, choices=[0, 1, 2, 99])
+    parser.add_argument("--arch", choices=["arm64", "avx2", "avx512", "avx512_vnni"], default="avx512_vnni",
+                        help="Conjunto de instruções alvo do quantize")
+    parser.add_argument("--tolerancia", type=float, default=1e-3, help="Diferença máxima de score no verify")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    chaves = list(MODELOS_NER) if args.modelo == "todos" else [args.modelo]
+
+    ok = True
+    for chave in chaves:
+        if args.comando == "export":
+            destino = args.destino if len(chaves) == 1 else None
+            exportar(chave, destino, args.nivel_otimizacao)
+        elif args.comando == "quantize":
+            quantizar(chave, args.arch)
+        else:
+            ok = verificar(chave, args.tolerancia) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
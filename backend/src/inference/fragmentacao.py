@@ -0,0 +1,188 @@
+"""
+Fragmentação de documentos longos para os modelos NER (BERT/NuNER).
+
+Os modelos têm janela de 512 tokens; truncar o texto em 4096 caracteres
+perdia todo nome depois desse ponto e ainda estourava a janela. Aqui o texto
+vira fragmentos que respeitam as sentenças (DocumentContext.sentencas), cada
+um com no máximo `PII_NER_CHUNK_TOKENS` tokens e com `PII_NER_CHUNK_OVERLAP`
+tokens de sobreposição com o anterior, para que um nome na fronteira apareça
+inteiro em pelo menos um fragmento.
+
+Todos os fragmentos vão ao pipeline em uma chamada (batching do HF); as
+entidades voltam com offsets globais e as duplicadas na sobreposição são
+resolvidas ficando com a ocorrência mais distante da borda do seu fragmento
+(mais contexto dos dois lados), depois com o maior score.
+
+Custo linear no tamanho do documento: cada sentença é medida uma vez e
+aparece em no máximo dois fragmentos (salvo sobreposição maior que a
+sentença seguinte).
+"""
+
+import logging
+import math
+from bisect import bisect_left, insort
+import os
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+try:
+    from ..documento import DocumentContext
+except ImportError:
+    from documento import DocumentContext
+
+logger = logging.getLogger(__name__)
+
+# Tokens por fragmento: janela de 512 menos [CLS]/[SEP] e folga para a
+# diferença entre medir sentenças isoladas e o fragmento inteiro
+TOKENS_POR_FRAGMENTO_PADRAO = 400
+SOBREPOSICAO_PADRAO = 64
+
+Medidor = Callable[[List[str]], List[int]]
+
+
+class Fragmento(NamedTuple):
+    """Trecho texto[inicio:fim] enviado ao modelo."""
+    inicio: int
+    fim: int
+    texto: str
+
+
+def obter_config_fragmentacao() -> Tuple[int, int]:
+    """(tokens por fragmento, tokens de sobreposição) de PII_NER_CHUNK_TOKENS/PII_NER_CHUNK_OVERLAP."""
+    def ler(nome: str, padrao: int) -> int:
+        try:
+            return int(os.getenv(nome, padrao))
+        except ValueError:
+            logger.warning(f"⚠️ {nome} inválido, usando {padrao}")
+            return padrao
+
+    limite = max(16, ler("PII_NER_CHUNK_TOKENS", TOKENS_POR_FRAGMENTO_PADRAO))
+    sobreposicao = min(max(0, ler("PII_NER_CHUNK_OVERLAP", SOBREPOSICAO_PADRAO)), limite // 2)
+    return limite, sobreposicao
+
+
+def medir_caracteres(trechos: List[str]) -> List[int]:
+    """Estimativa conservadora de tokens quando não há tokenizer (~3 caracteres por token)."""
+    return [math.ceil(len(t) / 3) for t in trechos]
+
+
+def criar_medidor(nlp) -> Medidor:
+    """Medidor em tokens do tokenizer do pipeline (ou estimativa por caracteres)."""
+    tokenizer = getattr(nlp, "tokenizer", None)
+    if tokenizer is None or not callable(tokenizer):
+        return medir_caracteres
+
+    def medir(trechos: List[str]) -> List[int]:
+        if not trechos:
+            return []
+        try:
+            ids = tokenizer(trechos, add_special_tokens=False)["input_ids"]
+            return [len(i) for i in ids]
+        except Exception:
+            return medir_caracteres(trechos)
+
+    return medir
+
+
+def _dividir_trecho(texto: str, inicio: int, fim: int, medida: int, limite: int, medir: Medidor) -> List[Tuple[int, int, int]]:
+    """Quebra uma sentença maior que o limite em pedaços, cortando em espaço quando possível."""
+    pedacos = max(2, math.ceil(medida / limite))
+    tamanho = (fim - inicio) / pedacos
+    cortes = [inicio]
+    for k in range(1, pedacos):
+        alvo = int(inicio + k * tamanho)
+        espaco = texto.rfind(" ", cortes[-1] + 1, alvo + 1)
+        corte = espaco if espaco > cortes[-1] else alvo
+        if corte > cortes[-1]:
+            cortes.append(corte)
+    cortes.append(fim)
+    spans = [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+    medidas = medir([texto[a:b] for a, b in spans])
+    unidades = []
+    for (a, b), m in zip(spans, medidas):
+        if m > limite and b - a > 1:
+            unidades.extend(_dividir_trecho(texto, a, b, m, limite, medir))
+        else:
+            unidades.append((a, b, m))
+    return unidades
+
+
+def fragmentar_texto(texto: str, limite: int, sobreposicao: int,
+                     medir: Medidor = medir_caracteres) -> List[Fragmento]:
+    """
+    Divide o texto em fragmentos de até `limite` tokens alinhados a sentenças.
+
+    Texto que cabe no limite volta como um único fragmento (o texto inteiro).
+    """
+    if not texto:
+        return []
+    if medir([texto])[0] <= limite:
+        return [Fragmento(0, len(texto), str(texto))]
+
+    doc = texto if isinstance(texto, DocumentContext) else DocumentContext(texto)
+    spans = doc.sentencas() or [(0, len(texto))]
+    medidas = medir([texto[a:b] for a, b in spans])
+    unidades: List[Tuple[int, int, int]] = []
+    for (a, b), m in zip(spans, medidas):
+        if m > limite:
+            unidades.extend(_dividir_trecho(texto, a, b, m, limite, medir))
+        else:
+            unidades.append((a, b, m))
+
+    fragmentos = []
+    i, n = 0, len(unidades)
+    while i < n:
+        j, total = i, unidades[i][2]
+        while j + 1 < n and total + unidades[j + 1][2] <= limite:
+            j += 1
+            total += unidades[j][2]
+        # Espaços antes da 1ª e depois da última sentença ficam nos fragmentos das pontas
+        inicio = unidades[i][0] if i > 0 else 0
+        fim = unidades[j][1] if j + 1 < n else len(texto)
+        fragmentos.append(Fragmento(inicio, fim, texto[inicio:fim]))
+        if j + 1 >= n:
+            break
+        # Próximo fragmento recomeça nas últimas sentenças que cabem na sobreposição
+        proximo, acumulado = j + 1, 0
+        while proximo - 1 > i and acumulado + unidades[proximo - 1][2] <= sobreposicao:
+            proximo -= 1
+            acumulado += unidades[proximo][2]
+        i = proximo
+    return fragmentos
+
+
+def mesclar_entidades(fragmentos: Sequence[Fragmento], saidas: Sequence[List[Dict]],
+                      tamanho_texto: int) -> List[Dict]:
+    """
+    Junta as entidades dos fragmentos com offsets globais, sem duplicatas.
+
+    Entre entidades que se sobrepõem (mesmo nome visto por dois fragmentos,
+    ou um nome cortado na borda de um deles) fica a mais distante da borda do
+    seu fragmento; empate vai para o maior score.
+    """
+    if len(fragmentos) == 1:
+        return list(saidas[0])
+
+    candidatas = []
+    for frag, entidades in zip(fragmentos, saidas):
+        for ent in entidades:
+            global_ent = dict(ent)
+            global_ent["start"] = ent["start"] + frag.inicio
+            global_ent["end"] = ent["end"] + frag.inicio
+            # Bordas do documento não cortam nada: só contam as bordas internas
+            esquerda = global_ent["start"] - frag.inicio if frag.inicio > 0 else math.inf
+            direita = frag.fim - global_ent["end"] if frag.fim < tamanho_texto else math.inf
+            candidatas.append((min(esquerda, direita), float(ent.get("score", 0.0)), global_ent))
+
+    candidatas.sort(key=lambda c: (c[0], c[1]), reverse=True)
+    # Aceitas não se sobrepõem: ordenadas por (start, end), os ends também
+    # ficam em ordem, e só a última que começa antes do fim da candidata
+    # pode alcançá-la (busca binária em vez de comparar com todas)
+    spans: List[Tuple[int, int, int]] = []
+    aceitas: List[Dict] = []
+    for _, _, ent in candidatas:
+        i = bisect_left(spans, (ent["end"],))
+        if i and spans[i - 1][1] > ent["start"]:
+            continue
+        insort(spans, (ent["start"], ent["end"], len(aceitas)))
+        aceitas.append(ent)
+    return [aceitas[indice] for _, _, indice in spans]
@@ -0,0 +1,169 @@
+"""Backend ONNX Runtime para os estágios NER de token-classification (BERT e NuNER).
+
+Os modelos são exportados uma única vez (ver ``exportar_onnx.py``), otimizados
+com o ORTOptimizer no nível definido em ``ort_config.json`` e carregados via
+``optimum.onnxruntime.ORTModelForTokenClassification``. O pipeline resultante
+tem a mesma interface do ``transformers.pipeline("ner")``, então o detector
+consome as saídas sem nenhuma mudança no pós-processamento.
+
+Configuração por variáveis de ambiente:
+- PII_NER_BACKEND: "torch" (padrão) ou "onnx"
+- PII_ORT_INTRA_OP_THREADS: threads por operador (padrão: nº de CPUs)
+- PII_ORT_INTER_OP_THREADS: threads entre operadores (padrão: 1)
+- PII_ONNX_MODELS_DIR: diretório base dos modelos exportados (padrão: backend/models)
+"""
+
+import json
+import os
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from optimum.pipelines import pipeline as ort_pipeline
+    OPTIMUM_AVAILABLE = True
+except ImportError:
+    ORTModelForTokenClassification = None
+    ort_pipeline = None
+    OPTIMUM_AVAILABLE = False
+
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+
+ARQUIVO_ONNX = "model.onnx"
+ARQUIVO_ONNX_INT8 = "model_quantized.onnx"
+
+# Modelos NER do ensemble: chave -> (modelo HuggingFace, subdiretório ONNX)
+MODELOS_NER: Dict[str, Dict[str, str]] = {
+    "bert": {
+        "model_id": "Davlan/bert-base-multilingual-cased-ner-hrl",
+        "onnx_dir": "bert_ner_onnx",
+    },
+    "nuner": {
+        "model_id": "monilouise/ner_news_portuguese",
+        "onnx_dir": "nuner_ner_onnx",
+    },
+}
+
+# optimization_level do ort_config.json -> GraphOptimizationLevel do ORT
+_NIVEIS_OTIMIZACAO = {
+    0: "ORT_DISABLE_ALL",
+    1: "ORT_ENABLE_BASIC",
+    2: "ORT_ENABLE_EXTENDED",
+    99: "ORT_ENABLE_ALL",
+}
+
+
+def obter_backend_ner() -> str:
+    """Retorna o backend NER selecionado em PII_NER_BACKEND ("torch" ou "onnx")."""
+    backend = os.getenv("PII_NER_BACKEND", BACKEND_TORCH).strip().lower()
+    if backend not in (BACKEND_TORCH, BACKEND_ONNX):
+        logger.warning(f"⚠️ PII_NER_BACKEND inválido '{backend}', usando '{BACKEND_TORCH}'")
+        return BACKEND_TORCH
+    return backend
+
+
+def diretorio_modelos() -> str:
+    """Diretório base onde ficam os modelos ONNX exportados."""
+    padrao = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models")
+    return os.getenv("PII_ONNX_MODELS_DIR", padrao)
+
+
+def diretorio_onnx(chave: str) -> str:
+    """Diretório do modelo ONNX exportado para a chave ("bert" ou "nuner")."""
+    return os.path.join(diretorio_modelos(), MODELOS_NER[chave]["onnx_dir"])
+
+
+def ler_nivel_otimizacao(model_dir: str) -> int:
+    """Lê optimization_level do ort_config.json gerado pelo ORTOptimizer (padrão: 2)."""
+    caminho = os.path.join(model_dir, "ort_config.json")
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return int(json.load(f).get("optimization", {}).get("optimization_level", 2))
+    except (OSError, ValueError, TypeError):
+        return 2
+
+
+def _ler_threads(nome_env: str, padrao: int) -> int:
+    try:
+        return max(0, int(os.getenv(nome_env, str(padrao))))
+    except ValueError:
+        logger.warning(f"⚠️ {nome_env} inválido, usando {padrao}")
+        return padrao
+
+
+def criar_session_options(model_dir: Optional[str] = None) -> Any:
+    """Cria SessionOptions do ONNX Runtime com threads e nível de otimização ajustados.
+
+    O grafo é executado em modo sequencial: um único modelo BERT por chamada não
+    tem ramos paralelos que compensem inter-op threads, então todo o paralelismo
+    vai para intra-op (GEMMs da atenção e feed-forward).
+    """
+    if not ONNXRUNTIME_AVAILABLE:
+        raise ImportError("onnxruntime não instalado")
+
+    opcoes = ort.SessionOptions()
+    opcoes.intra_op_num_threads = _ler_threads("PII_ORT_INTRA_OP_THREADS", os.cpu_count() or 1)
+    opcoes.inter_op_num_threads = _ler_threads("PII_ORT_INTER_OP_THREADS", 1)
+    opcoes.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+    nivel = ler_nivel_otimizacao(model_dir) if model_dir else 2
+    nome_nivel = _NIVEIS_OTIMIZACAO.get(nivel, "ORT_ENABLE_EXTENDED")
+    opcoes.graph_optimization_level = getattr(ort.GraphOptimizationLevel, nome_nivel)
+    return opcoes
+
+
+def modelo_onnx_disponivel(chave: str, int8: bool = False) -> bool:
+    """Verifica se o modelo ONNX (fp32 ou int8) da chave já foi exportado."""
+    arquivo = ARQUIVO_ONNX_INT8 if int8 else ARQUIVO_ONNX
+    return os.path.exists(os.path.join(diretorio_onnx(chave), arquivo))
+
+
+def criar_pipeline_ner_onnx(chave: str, device: int = -1, model_dir: Optional[str] = None, int8: bool = False):
+    """Carrega o pipeline NER ONNX da chave ("bert" ou "nuner").
+
+    Com ``int8=True`` usa o ``model_quantized.onnx`` gerado por
+    ``exportar_onnx quantize``. Retorna um pipeline com a mesma interface de
+    ``transformers.pipeline("ner", aggregation_strategy="simple")``: aceita
+    str ou lista de str e ``batch_size``.
+    """
+    if not (ONNXRUNTIME_AVAILABLE and OPTIMUM_AVAILABLE):
+        raise ImportError("optimum[onnxruntime] não instalado")
+
+    model_dir = model_dir or diretorio_onnx(chave)
+    arquivo = ARQUIVO_ONNX_INT8 if int8 else ARQUIVO_ONNX
+    if not os.path.exists(os.path.join(model_dir, arquivo)):
+        comando = "quantize" if int8 else "export"
+        raise FileNotFoundError(
+            f"{model_dir}/{arquivo} não encontrado. "
+            f"Execute: python -m src.inference.exportar_onnx {comando} --modelo {chave}"
+        )
+
+    provider = "CUDAExecutionProvider" if device >= 0 else "CPUExecutionProvider"
+    modelo = ORTModelForTokenClassification.from_pretrained(
+        model_dir,
+        file_name=arquivo,
+        provider=provider,
+        session_options=criar_session_options(model_dir),
+    )
+
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+    return ort_pipeline(
+        "token-classification",
+        model=modelo,
+        tokenizer=tokenizer,
+        accelerator="ort",
+        aggregation_strategy="simple",
+    )
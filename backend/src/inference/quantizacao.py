@@ -0,0 +1,212 @@
+"""Quantização INT8 dinâmica dos modelos NER com guarda de recall no benchmark LGPD.
+
+O modo INT8 é opt-in (PII_NER_QUANTIZACAO=int8) e só é ativado se o relatório
+de validação do backend em uso (torch ou onnx) mostrar que o recall do
+DATASET_LGPD não caiu em relação ao fp32. A aprovação vale para os modelos
+validados: o relatório guarda o model_id de cada NER (e, no ONNX, o sha256 do
+model_quantized.onnx), e trocar o modelo ou reexportar o artefato exige nova
+validação. Sem relatório aprovado, o detector permanece em fp32 e registra o
+motivo no log.
+
+- PyTorch: ``torch.ao.quantization.quantize_dynamic`` nas camadas Linear
+- ONNX: ``model_quantized.onnx`` gerado por ``exportar_onnx quantize``
+
+Uso (a partir de backend/):
+    python -m src.inference.quantizacao validar --backend torch
+    python -m src.inference.quantizacao validar --backend onnx
+
+Variáveis de ambiente:
+- PII_NER_QUANTIZACAO: "none" (padrão) ou "int8"
+- PII_NER_INT8_RELATORIO: caminho do relatório (padrão: models/ner_int8_validacao.json)
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from .onnx_backend import (
+    BACKEND_TORCH, BACKEND_ONNX, ARQUIVO_ONNX_INT8, MODELOS_NER, diretorio_modelos, diretorio_onnx,
+)
+
+logger = logging.getLogger(__name__)
+
+QUANTIZACAO_NENHUMA = "none"
+QUANTIZACAO_INT8 = "int8"
+
+
+def obter_quantizacao_ner() -> str:
+    """Retorna o modo de quantização pedido em PII_NER_QUANTIZACAO ("none" ou "int8")."""
+    modo = os.getenv("PII_NER_QUANTIZACAO", QUANTIZACAO_NENHUMA).strip().lower()
+    if modo not in (QUANTIZACAO_NENHUMA, QUANTIZACAO_INT8):
+        logger.warning(f"⚠️ PII_NER_QUANTIZACAO inválido '{modo}', usando fp32")
+        return QUANTIZACAO_NENHUMA
+    return modo
+
+
+def caminho_relatorio() -> str:
+    """Caminho do relatório de validação fp32 vs int8."""
+    return os.getenv("PII_NER_INT8_RELATORIO", os.path.join(diretorio_modelos(), "ner_int8_validacao.json"))
+
+
+def carregar_relatorio(caminho: Optional[str] = None) -> Dict:
+    """Carrega o relatório de validação ({backend: resultado}); vazio se não existir."""
+    caminho = caminho or caminho_relatorio()
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _sha256_arquivo(caminho: str) -> Optional[str]:
+    h = hashlib.sha256()
+    try:
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def identificar_modelos(backend: str) -> Dict[str, str]:
+    """Identidade dos modelos NER que o INT8 do backend usa: model_id e, no ONNX, o sha256 do artefato."""
+    modelos = {}
+    for chave, info in MODELOS_NER.items():
+        identidade = info["model_id"]
+        if backend == BACKEND_ONNX:
+            sha256 = _sha256_arquivo(os.path.join(diretorio_onnx(chave), ARQUIVO_ONNX_INT8))
+            identidade = f"{identidade}@sha256:{sha256}"
+        modelos[chave] = identidade
+    return modelos
+
+
+def int8_aprovado(backend: str, caminho: Optional[str] = None) -> bool:
+    """Indica se o INT8 do backend passou na guarda de recall com os modelos atuais."""
+    resultado = carregar_relatorio(caminho).get(backend, {})
+    if not resultado.get("aprovado", False):
+        return False
+    if resultado.get("modelos") != identificar_modelos(backend):
+        logger.warning(f"⚠️ Validação INT8 de '{backend}' foi feita com outros modelos; valide de novo")
+        return False
+    return True
+
+
+def quantizacao_int8_habilitada(backend: str) -> bool:
+    """Decide se o INT8 deve ser ativado: pedido via env E aprovado na validação."""
+    if obter_quantizacao_ner() != QUANTIZACAO_INT8:
+        return False
+    if not int8_aprovado(backend):
+        logger.warning(
+            f"⚠️ INT8 recusado para backend '{backend}': sem validação aprovada dos modelos atuais em {caminho_relatorio()}. "
+            f"Execute: python -m src.inference.quantizacao validar --backend {backend}"
+        )
+        return False
+    return True
+
+
+def quantizar_pipeline_torch(nlp):
+    """Aplica quantização dinâmica INT8 às camadas Linear do modelo do pipeline (CPU)."""
+    import torch
+
+    nlp.model = torch.ao.quantization.quantize_dynamic(nlp.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return nlp
+
+
+def calcular_metricas(predicoes: Sequence[bool], rotulos: Sequence[bool]) -> Dict[str, float]:
+    """Recall, precisão e contagens da classificação binária contém/não contém PII."""
+    tp = sum(1 for p, r in zip(predicoes, rotulos) if p and r)
+    fp = sum(1 for p, r in zip(predicoes, rotulos) if p and not r)
+    fn = sum(1 for p, r in zip(predicoes, rotulos) if not p and r)
+    recall = tp / (tp + fn) if (tp + fn) else 1.0
+    precisao = tp / (tp + fp) if (tp + fp) else 1.0
+    return {"recall": round(recall, 6), "precisao": round(precisao, 6), "tp": tp, "fp": fp, "fn": fn}
+
+
+def avaliar_detector(detector, dataset: List[tuple]) -> Dict[str, float]:
+    """Roda o detector sobre o dataset (texto, contem_pii, ...) e calcula as métricas."""
+    textos = [caso[0] for caso in dataset]
+    rotulos = [bool(caso[1]) for caso in dataset]
+    predicoes = [resultado[0] for resultado in detector.detect_many(textos, explain=False)]
+    return calcular_metricas(predicoes, rotulos)
+
+
+def decidir_aprovacao(fp32: Dict[str, float], int8: Dict[str, float], tolerancia: float = 0.0) -> bool:
+    """INT8 só é aprovado se o recall não cair mais que a tolerância (padrão: nenhuma queda)."""
+    return int8["recall"] >= fp32["recall"] - tolerancia
+
+
+def carregar_dataset_lgpd() -> List[tuple]:
+    """Importa DATASET_LGPD de tests/test_benchmark.py."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    tests_dir = os.path.join(backend_dir, "tests")
+    if tests_dir not in sys.path:
+        sys.path.insert(0, tests_dir)
+    from test_benchmark import DATASET_LGPD
+    return DATASET_LGPD
+
+
+def validar_int8(backend: str, tolerancia: float = 0.0, caminho: Optional[str] = None) -> Dict:
+    """Compara fp32 vs int8 no DATASET_LGPD e grava o resultado no relatório."""
+    os.environ["PII_NER_BACKEND"] = backend
+    os.environ.setdefault("PII_USE_LLM_ARBITRATION", "false")
+
+    from ..detector import PIIDetector
+
+    dataset = carregar_dataset_lgpd()
+
+    logger.info(f"📊 Avaliando fp32 ({backend}) em {len(dataset)} casos...")
+    detector = PIIDetector(use_llm_arbitration=False)
+    if not (detector.nlp_bert or detector.nlp_nuner):
+        raise RuntimeError("Nenhum modelo NER carregado; validação INT8 não faz sentido")
+    metricas_fp32 = avaliar_detector(detector, dataset)
+
+    logger.info(f"📊 Avaliando int8 ({backend})...")
+    detector.recarregar_ner(int8=True)
+    metricas_int8 = avaliar_detector(detector, dataset)
+
+    aprovado = decidir_aprovacao(metricas_fp32, metricas_int8, tolerancia)
+    resultado = {
+        "aprovado": aprovado,
+        "fp32": metricas_fp32,
+        "int8": metricas_int8,
+        "tolerancia": tolerancia,
+        "casos": len(dataset),
+        "modelos": identificar_modelos(backend),
+        "data": datetime.now().isoformat(),
+    }
+
+    caminho = caminho or caminho_relatorio()
+    relatorio = carregar_relatorio(caminho)
+    relatorio[backend] = resultado
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+    simbolo = "✅" if aprovado else "❌"
+    logger.info(
+        f"{simbolo} {backend}: recall fp32={metricas_fp32['recall']:.4f} | "
+        f"int8={metricas_int8['recall']:.4f} | aprovado={aprovado}"
+    )
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guarda de recall para NER INT8")
+    parser.add_argument("comando", choices=["validar"])
+    parser.add_argument("--backend", choices=[BACKEND_TORCH, BACKEND_ONNX], default=BACKEND_TORCH)
+    parser.add_argument("--tolerancia", type=float, default=0.0, help="Queda de recall aceitável (padrão: 0)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    resultado = validar_int8(args.backend, args.tolerancia)
+    sys.exit(0 if resultado["aprovado"] else 1)
+
+
+if __name__ == "__main__":
+    main()
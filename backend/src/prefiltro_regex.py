@@ -0,0 +1,240 @@
+"""
+Pré-filtro dos patterns regex: descarta, antes da varredura, os patterns que
+não têm como casar em um documento.
+
+Cada pattern é anotado (a partir do pattern parseado, sem lista manual) com:
+
+- `literais`: conjunto "algum destes" de literais que todo match contém
+  (ex.: {"cnh", "carteira de motorista", ...}, {"@"}, {"lai"});
+- `min_digitos`: tamanho mínimo de uma sequência de dígitos que todo match
+  contém (ex.: CPF → 3, INSCRICAO_IMOVEL_15 → 15).
+
+Por documento é calculado um perfil em duas passadas lineares: a maior
+sequência de dígitos (`\\d+`) e os literais presentes (um autômato
+Aho-Corasick com os literais de todos os patterns sobre o texto dobrado para
+minúsculas). Um pattern só é varrido se o perfil satisfaz seus requisitos.
+
+Os requisitos são necessários, nunca suficientes: a extração é conservadora
+(na dúvida o pattern fica sem requisito) e a dobra de caixa do texto cobre os
+caracteres não-ASCII que o `re.IGNORECASE` casa com letras ASCII (ex.: 'K' de
+Kelvin, 'ſ', 'İ'), então pular um pattern nunca muda o resultado.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+try:
+    from re import _parser as _sre_parse, _constants as _sre_c
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_c
+
+try:
+    from .aho_corasick import AutomatoAhoCorasick
+except ImportError:
+    from aho_corasick import AutomatoAhoCorasick
+
+
+_RE_DIGITOS = re.compile(r"\d+")
+_RE_DIGITO = re.compile(r"\d")
+_ZERO_LARGURA = {_sre_c.AT, _sre_c.ASSERT, _sre_c.ASSERT_NOT}
+_REPETICOES = {_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT, getattr(_sre_c, "POSSESSIVE_REPEAT", _sre_c.MAX_REPEAT)}
+_ATOMICO = getattr(_sre_c, "ATOMIC_GROUP", None)
+
+
+class RequisitosPattern(NamedTuple):
+    """Condições necessárias para um pattern casar em um texto."""
+    literais: FrozenSet[str]  # algum deles aparece (minúsculas); vazio = sem requisito
+    min_digitos: int  # maior sequência de dígitos do texto precisa ser >= isto
+
+
+class PerfilTexto(NamedTuple):
+    """O que o pré-filtro precisa saber de um documento."""
+    corrida_digitos: int
+    literais: FrozenSet[str]
+
+    def permite(self, requisitos: RequisitosPattern) -> bool:
+        if requisitos.min_digitos > self.corrida_digitos:
+            return False
+        return not requisitos.literais or not requisitos.literais.isdisjoint(self.literais)
+
+
+# === Dobra de caixa do texto ===
+
+# Caracteres não-ASCII que o re.IGNORECASE casa com uma letra ASCII -> essa
+# letra: İ/ı (i turco), ſ (s longo) e K (sinal de Kelvin). Fixo em vez de
+# varrer o Unicode a cada PIIDetector; tests/test_prefiltro_regex.py confere
+# a tabela contra o re da versão de Python em uso.
+DOBRAS_ASCII: Dict[int, str] = {0x130: "i", 0x131: "i", 0x17F: "s", 0x212A: "k"}
+
+
+def dobrar_caixa(texto: str) -> str:
+    """Texto em minúsculas em que todo caractere que casa com uma letra ASCII sob IGNORECASE vira essa letra."""
+    return texto.translate(DOBRAS_ASCII).lower()
+
+
+# === Extração dos requisitos ===
+
+def _literal_ascii(codigo: int) -> Optional[str]:
+    ch = chr(codigo)
+    return ch.lower() if ch.isascii() else None
+
+
+def _melhor(candidatos: List[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    """Conjunto mais seletivo: literal mais curto mais longo, depois menos alternativas."""
+    if not candidatos:
+        return None
+    return max(candidatos, key=lambda c: (min(map(len, c)), -len(c)))
+
+
+def _prefixos(itens) -> Optional[FrozenSet[str]]:
+    """Literais com que todo match da sequência começa (um por alternativa)."""
+    corrente: List[str] = []
+    for op, av in itens:
+        if op is _sre_c.LITERAL and _literal_ascii(av) is not None:
+            corrente.append(_literal_ascii(av))
+            continue
+        sub = None
+        if op is _sre_c.SUBPATTERN:
+            sub = _prefixos(av[3])
+        elif op is _sre_c.BRANCH:
+            ramos = [_prefixos(ramo) for ramo in av[1]]
+            if all(ramos):
+                sub = frozenset().union(*ramos)
+        if sub:
+            base = "".join(corrente)
+            return frozenset(base + p for p in sub)
+        break
+    return frozenset({"".join(corrente)}) if corrente else None
+
+
+def _literais_da_sequencia(itens) -> Optional[FrozenSet[str]]:
+    """Conjunto "algum destes" de literais presente em todo match da sequência (None se não há)."""
+    candidatos: List[FrozenSet[str]] = []
+    corrente: List[str] = []
+
+    def fechar():
+        if corrente:
+            candidatos.append(frozenset({"".join(corrente)}))
+            corrente.clear()
+
+    for op, av in itens:
+        if op is _sre_c.LITERAL:
+            ch = _literal_ascii(av)
+            if ch is not None:
+                corrente.append(ch)
+                continue
+        if corrente and op in (_sre_c.SUBPATTERN, _sre_c.BRANCH):
+            # "C(?:NH|ARTEIRA)" (prefixo fatorado pelo parser) -> {"cnh", "carteira"}
+            continuacoes = _prefixos([(op, av)])
+            if continuacoes:
+                base = "".join(corrente)
+                candidatos.append(frozenset(base + c for c in continuacoes))
+        fechar()
+        sub = None
+        if op is _sre_c.SUBPATTERN:
+            sub = _literais_da_sequencia(av[3])
+        elif op is _ATOMICO and op is not None:
+            sub = _literais_da_sequencia(av)
+        elif op is _sre_c.BRANCH:
+            ramos = [_literais_da_sequencia(ramo) for ramo in av[1]]
+            if all(ramos):
+                sub = frozenset().union(*ramos)
+        elif op in _REPETICOES and av[0] >= 1:
+            sub = _literais_da_sequencia(av[2])
+        if sub:
+            candidatos.append(sub)
+    fechar()
+    return _melhor(candidatos)
+
+
+def _digitos_fixos(op, av) -> Optional[int]:
+    """Quantos dígitos o item consome no mínimo, se ele só consome dígitos (None caso contrário)."""
+    if op is _sre_c.LITERAL:
+        return 1 if _RE_DIGITO.fullmatch(chr(av)) else None
+    if op is _sre_c.IN:
+        for sub_op, sub_av in av:
+            if sub_op is _sre_c.CATEGORY and sub_av is _sre_c.CATEGORY_DIGIT:
+                continue
+            if sub_op is _sre_c.LITERAL and "0" <= chr(sub_av) <= "9":
+                continue
+            if sub_op is _sre_c.RANGE and "0" <= chr(sub_av[0]) and chr(sub_av[1]) <= "9":
+                continue
+            return None
+        return 1
+    if op in _REPETICOES:
+        minimo, _, sub = av
+        por_vez = _sequencia_so_digitos(sub)
+        return None if por_vez is None else minimo * por_vez
+    if op is _sre_c.SUBPATTERN:
+        return _sequencia_so_digitos(av[3])
+    return None
+
+
+def _sequencia_so_digitos(itens) -> Optional[int]:
+    total = 0
+    for op, av in itens:
+        fixos = _digitos_fixos(op, av)
+        if fixos is None:
+            return None
+        total += fixos
+    return total
+
+
+def _corrida_da_sequencia(itens) -> int:
+    """Maior sequência de dígitos contíguos presente em todo match da sequência."""
+    melhor = atual = 0
+    for op, av in itens:
+        if op in _ZERO_LARGURA:
+            continue
+        fixos = _digitos_fixos(op, av)
+        if fixos is not None:
+            atual += fixos
+            melhor = max(melhor, atual)
+            continue
+        atual = 0
+        if op is _sre_c.SUBPATTERN:
+            melhor = max(melhor, _corrida_da_sequencia(av[3]))
+        elif op is _ATOMICO and op is not None:
+            melhor = max(melhor, _corrida_da_sequencia(av))
+        elif op is _sre_c.BRANCH:
+            melhor = max(melhor, min(_corrida_da_sequencia(ramo) for ramo in av[1]))
+        elif op in _REPETICOES and av[0] >= 1:
+            melhor = max(melhor, _corrida_da_sequencia(av[2]))
+    return melhor
+
+
+def extrair_requisitos(pattern: re.Pattern) -> RequisitosPattern:
+    """Requisitos de um pattern compilado (sem requisitos se não der para analisar)."""
+    try:
+        itens = _sre_parse.parse(pattern.pattern, pattern.flags)
+        literais = _literais_da_sequencia(itens) or frozenset()
+        return RequisitosPattern(literais, _corrida_da_sequencia(itens))
+    except (re.error, TypeError, ValueError, RecursionError):
+        return RequisitosPattern(frozenset(), 0)
+
+
+class PrefiltroRegex:
+    """Requisitos de um conjunto de patterns e o autômato com os literais de todos eles."""
+
+    def __init__(self, patterns: Dict[str, re.Pattern]):
+        self.requisitos: Dict[str, RequisitosPattern] = {
+            nome: extrair_requisitos(pattern) for nome, pattern in patterns.items()
+        }
+        termos = {literal for req in self.requisitos.values() for literal in req.literais}
+        self._automato = AutomatoAhoCorasick(termos)
+
+    def perfil(self, texto: str) -> PerfilTexto:
+        """Maior sequência de dígitos e literais presentes no texto."""
+        corrida = max(map(len, _RE_DIGITOS.findall(texto)), default=0)
+        literais = frozenset(termo for _, _, termo, _ in self._automato.encontrar(dobrar_caixa(texto)))
+        return PerfilTexto(corrida, literais)
+
+    def pode_casar(self, nome: str, perfil: PerfilTexto) -> bool:
+        requisitos = self.requisitos.get(nome)
+        return requisitos is None or perfil.permite(requisitos)
+
+    def possiveis(self, perfil: PerfilTexto, nomes: Optional[Iterable[str]] = None) -> List[str]:
+        """Patterns (na ordem dada) que o perfil não descarta."""
+        nomes = self.requisitos if nomes is None else nomes
+        return [nome for nome in nomes if self.pode_casar(nome, perfil)]
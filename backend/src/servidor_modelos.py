@@ -0,0 +1,398 @@
+"""
+Servidor de modelos: um processo com o PIIDetector carregado, atendendo a
+API e os workers Celery por um socket Unix.
+
+Cada processo que instanciava o PIIDetector (API, e cada task de lote)
+carregava dois BERT, o spaCy pt_core_news_lg e o Presidio: vários GB de RAM
+por processo e dezenas de segundos por job. Com o servidor, os modelos são
+carregados uma vez por máquina e os demais processos usam o ClienteModelos,
+que tem a mesma interface de detecção do PIIDetector (detect, detect_many,
+iter_detect_many, explicar, metricas_cache) e não importa torch nem
+transformers.
+
+Uso:
+    PII_MODEL_SERVER=/tmp/pii-modelos/modelos.sock python -m src.servidor_modelos
+    PII_MODEL_SERVER=/tmp/pii-modelos/modelos.sock uvicorn api.main:app ...
+    PII_MODEL_SERVER=/tmp/pii-modelos/modelos.sock celery -A api.celery_config worker ...
+
+Protocolo: multiprocessing.connection (pickle) sobre AF_UNIX, uma conexão
+por thread do cliente. Pedido (metodo, args, kwargs); resposta ("ok", valor)
+ou ("erro", exceção). Só os métodos de METODOS são atendidos.
+
+Segurança: pickle executa código ao desserializar, então nenhum pedido é
+lido antes da autenticação HMAC do multiprocessing, que é obrigatória. A
+chave vem de PII_MODEL_SERVER_AUTHKEY ou, sem ela, é gerada pelo servidor e
+gravada com permissão 0600 em <socket>.key, onde os clientes a leem. O
+socket fica num diretório 0700 do usuário do servidor (criado se não
+existir; o servidor se recusa a subir num diretório compartilhado como
+/tmp), então API e workers precisam rodar com o mesmo usuário.
+
+Timeout: o cliente espera a resposta por até PII_MODEL_SERVER_TIMEOUT
+segundos. Sem resposta (ou com a conexão caída), descarta a conexão e tenta
+de novo uma vez; falhando de novo, levanta ServidorModelosIndisponivel (a
+API responde 503).
+
+Batching: chamadas detect() simultâneas, de qualquer cliente, são agrupadas
+por até PII_MODEL_SERVER_BATCH_WAIT_MS (ou PII_DETECT_BATCH_SIZE textos) e
+vão juntas ao detect_many(), com o NER rodando uma vez por lote. O resultado
+de cada texto é o mesmo de detect().
+"""
+
+import logging
+import os
+import queue
+import secrets
+import stat
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METODOS = frozenset({"detect", "detect_many", "explicar", "metricas_cache", "ping"})
+LOTES_POR_CHAMADA = 4  # iter_detect_many manda batch_size * LOTES_POR_CHAMADA textos por chamada
+
+
+class ServidorModelosIndisponivel(ConnectionError):
+    """Servidor de modelos sem resposta no timeout ou fora do ar, mesmo após a nova tentativa."""
+
+
+def _caminho_chave(endereco: str) -> str:
+    return f"{endereco}.key"
+
+
+def _authkey(endereco: str) -> Optional[bytes]:
+    """Chave de PII_MODEL_SERVER_AUTHKEY ou, sem ela, a gravada pelo servidor ao lado do socket."""
+    chave = os.getenv("PII_MODEL_SERVER_AUTHKEY", "")
+    if chave:
+        return chave.encode("utf-8")
+    try:
+        with open(_caminho_chave(endereco), "rb") as f:
+            return f.read() or None
+    except FileNotFoundError:
+        return None
+
+
+def _preparar_diretorio(endereco: str) -> None:
+    """Garante que o socket será criado num diretório 0700 do usuário do servidor."""
+    pasta = os.path.dirname(os.path.abspath(endereco))
+    os.makedirs(pasta, mode=0o700, exist_ok=True)
+    info = os.stat(pasta)
+    if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise PermissionError(
+            f"O diretório do socket do servidor de modelos ({pasta}) deve pertencer ao usuário "
+            f"do servidor e ter permissão 0700 (ex.: PII_MODEL_SERVER=/tmp/pii-modelos/modelos.sock)"
+        )
+
+
+def _gravar_chave(caminho: str, chave: bytes) -> None:
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    fd = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(chave)
+    os.replace(temporario, caminho)
+
+
+class _Pedido:
+    """detect() à espera de um lote."""
+    __slots__ = ("texto", "opcoes", "futuro")
+
+    def __init__(self, texto: str, opcoes: Tuple[bool, str, bool]):
+        self.texto = texto
+        self.opcoes = opcoes  # (force_llm, mode, explain): só agrupa pedidos com as mesmas opções
+        self.futuro: Future = Future()
+
+
+class ServidorModelos:
+    """Atende detecções de vários processos com um único PIIDetector."""
+
+    def __init__(self, detector, endereco: str, authkey: Optional[bytes] = None,
+                 tamanho_lote: int = 16, espera_lote: float = 0.005, workers: int = 1):
+        self.detector = detector
+        self.endereco = endereco
+        self.authkey = authkey
+        self._chave_gerada = False
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.espera_lote = max(0.0, espera_lote)
+        self.workers = max(1, workers)
+        self._fila: "queue.Queue[_Pedido]" = queue.Queue()
+        self._listener: Optional[Listener] = None
+        self._ativo = threading.Event()
+        self._lock = threading.Lock()
+        self._contadores = {"conexoes": 0, "pedidos": 0, "lotes": 0, "textos_em_lote": 0, "erros": 0}
+
+    def iniciar(self) -> None:
+        """Abre o socket e sobe as threads de atendimento e de lote (não bloqueia)."""
+        _preparar_diretorio(self.endereco)
+        if not self.authkey:
+            self.authkey = os.getenv("PII_MODEL_SERVER_AUTHKEY", "").encode("utf-8") or None
+        if not self.authkey:
+            # Sem chave configurada: gera uma e a deixa para os clientes do mesmo usuário
+            self.authkey = secrets.token_bytes(32)
+            _gravar_chave(_caminho_chave(self.endereco), self.authkey)
+            self._chave_gerada = True
+        if os.path.exists(self.endereco) and stat.S_ISSOCK(os.stat(self.endereco).st_mode):
+            os.unlink(self.endereco)  # socket de uma execução anterior
+        self._listener = Listener(self.endereco, family="AF_UNIX", authkey=self.authkey)
+        self._ativo.set()
+        for i in range(self.workers):
+            threading.Thread(target=self._processar_lotes, name=f"modelos-lote-{i}", daemon=True).start()
+        threading.Thread(target=self._aceitar, name="modelos-accept", daemon=True).start()
+        logger.info(f"🧠 Servidor de modelos em {self.endereco} (lote={self.tamanho_lote}, workers={self.workers})")
+
+    def servir(self) -> None:
+        """iniciar() e bloqueia até encerrar()."""
+        self.iniciar()
+        try:
+            while self._ativo.is_set():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.encerrar()
+
+    def encerrar(self) -> None:
+        self._ativo.clear()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if os.path.exists(self.endereco):
+            os.unlink(self.endereco)
+        if self._chave_gerada and os.path.exists(_caminho_chave(self.endereco)):
+            os.unlink(_caminho_chave(self.endereco))
+
+    def _aceitar(self) -> None:
+        while self._ativo.is_set():
+            try:
+                conexao = self._listener.accept()
+            except Exception as e:  # socket fechado em encerrar(), falha de autenticação
+                if self._ativo.is_set():
+                    logger.warning(f"Conexão recusada no servidor de modelos: {e}")
+                    continue
+                return
+            with self._lock:
+                self._contadores["conexoes"] += 1
+            threading.Thread(target=self._atender, args=(conexao,), daemon=True).start()
+
+    def _atender(self, conexao) -> None:
+        """Um cliente (uma thread dele): pedido, resposta, até a conexão fechar."""
+        with conexao:
+            while True:
+                try:
+                    metodo, args, kwargs = conexao.recv()
+                except (EOFError, OSError):
+                    return
+                with self._lock:
+                    self._contadores["pedidos"] += 1
+                try:
+                    resposta = ("ok", self._executar(metodo, args, kwargs))
+                except Exception as e:
+                    with self._lock:
+                        self._contadores["erros"] += 1
+                    resposta = ("erro", e)
+                try:
+                    conexao.send(resposta)
+                except (EOFError, OSError):
+                    return
+                except Exception as e:  # exceção que não serializa
+                    conexao.send(("erro", RuntimeError(f"{type(e).__name__}: {e}")))
+
+    def _executar(self, metodo: str, args: tuple, kwargs: dict) -> Any:
+        if metodo not in METODOS:
+            raise ValueError(f"Método não atendido pelo servidor de modelos: {metodo!r}")
+        if metodo == "ping":
+            return "pong"
+        if metodo == "detect":
+            return self._detectar_em_lote(*args, **kwargs)
+        if metodo == "metricas_cache":
+            return {**self.detector.metricas_cache(), "servidor_modelos": self.metricas()}
+        return getattr(self.detector, metodo)(*args, **kwargs)
+
+    def _detectar_em_lote(self, text: str, force_llm: bool = False, mode: str = "full",
+                          explain: bool = True) -> Tuple:
+        pedido = _Pedido(text, (force_llm, mode, explain))
+        self._fila.put(pedido)
+        return pedido.futuro.result()
+
+    def _processar_lotes(self) -> None:
+        """Junta os detect() que chegam juntos e roda um detect_many por grupo de opções."""
+        while self._ativo.is_set():
+            try:
+                pedidos = [self._fila.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            prazo = time.monotonic() + self.espera_lote
+            while len(pedidos) < self.tamanho_lote:
+                restante = prazo - time.monotonic()
+                try:
+                    pedidos.append(self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            grupos: Dict[Tuple, List[_Pedido]] = {}
+            for pedido in pedidos:
+                grupos.setdefault(pedido.opcoes, []).append(pedido)
+            for (force_llm, mode, explain), grupo in grupos.items():
+                try:
+                    resultados = self.detector.detect_many(
+                        [p.texto for p in grupo], batch_size=self.tamanho_lote,
+                        force_llm=force_llm, mode=mode, explain=explain
+                    )
+                except Exception as e:
+                    for p in grupo:
+                        p.futuro.set_exception(e)
+                    continue
+                for p, resultado in zip(grupo, resultados):
+                    p.futuro.set_result(resultado)
+            with self._lock:
+                self._contadores["lotes"] += len(grupos)
+                self._contadores["textos_em_lote"] += len(pedidos)
+
+    def metricas(self) -> Dict:
+        with self._lock:
+            metricas = dict(self._contadores)
+        metricas["media_textos_por_lote"] = round(metricas["textos_em_lote"] / max(1, metricas["lotes"]), 2)
+        metricas["na_fila"] = self._fila.qsize()
+        return metricas
+
+
+class ClienteModelos:
+    """Cliente do ServidorModelos com a interface de detecção do PIIDetector.
+
+    Thread-safe: cada thread (e cada processo, após fork) usa sua própria
+    conexão. Uma falha de conexão é tentada de novo uma vez, com conexão
+    nova; todos os métodos atendidos são idempotentes.
+
+    Sem `authkey`, a chave é lida a cada nova conexão (ver _authkey): um
+    servidor reiniciado com chave nova continua acessível.
+
+    `timeout` (segundos, None = sem limite) vale para cada resposta.
+    """
+
+    def __init__(self, endereco: str, authkey: Optional[bytes] = None, timeout: Optional[float] = None):
+        self.endereco = endereco
+        self.authkey = authkey
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def de_env(cls) -> "ClienteModelos":
+        timeout = float(os.getenv("PII_MODEL_SERVER_TIMEOUT", "120"))
+        return cls(os.environ["PII_MODEL_SERVER"], timeout=timeout if timeout > 0 else None)
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None or self._local.pid != os.getpid():
+            authkey = self.authkey or _authkey(self.endereco)
+            if not authkey:
+                raise ConnectionRefusedError(
+                    f"Sem chave para o servidor de modelos: defina PII_MODEL_SERVER_AUTHKEY "
+                    f"ou rode com o usuário do servidor ({_caminho_chave(self.endereco)})"
+                )
+            conexao = Client(self.endereco, family="AF_UNIX", authkey=authkey)
+            self._local.conexao, self._local.pid = conexao, os.getpid()
+        return conexao
+
+    def _descartar_conexao(self) -> None:
+        conexao = getattr(self._local, "conexao", None)
+        self._local.conexao = None
+        if conexao is not None and self._local.pid == os.getpid():
+            try:
+                conexao.close()
+            except OSError:
+                pass
+
+    def _chamar(self, metodo: str, *args, **kwargs) -> Any:
+        for tentativa in range(2):
+            try:
+                conexao = self._conexao()
+                conexao.send((metodo, args, kwargs))
+                if self.timeout is not None and not conexao.poll(self.timeout):
+                    raise TimeoutError(f"Servidor de modelos sem resposta em {self.timeout}s ({metodo})")
+                status, valor = conexao.recv()
+                break
+            except (EOFError, OSError) as e:
+                # Conexão nova: uma resposta atrasada não pode chegar na próxima chamada
+                self._descartar_conexao()
+                if tentativa:
+                    raise ServidorModelosIndisponivel(f"Servidor de modelos indisponível: {e}") from e
+        if status == "erro":
+            raise valor
+        return valor
+
+    def ping(self) -> bool:
+        return self._chamar("ping") == "pong"
+
+    def detect(self, text: str, force_llm: bool = False, mode: str = "full",
+               explain: bool = True) -> Tuple[bool, List[Dict], str, float]:
+        return self._chamar("detect", text, force_llm=force_llm, mode=mode, explain=explain)
+
+    def detect_many(self, texts: Iterable[str], batch_size: int = 16, force_llm: bool = False,
+                    mode: str = "full", explain: bool = True) -> List[Tuple[bool, List[Dict], str, float]]:
+        return self._chamar("detect_many", list(texts), batch_size=batch_size,
+                            force_llm=force_llm, mode=mode, explain=explain)
+
+    def iter_detect_many(self, texts: Iterable[str], batch_size: int = 16, force_llm: bool = False,
+                         mode: str = "full", explain: bool = True) -> Iterator[Tuple[bool, List[Dict], str, float]]:
+        """Como PIIDetector.iter_detect_many: manda a entrada em blocos, sem materializá-la."""
+        tamanho = max(1, int(batch_size)) * LOTES_POR_CHAMADA
+        bloco: List[str] = []
+        for texto in texts:
+            bloco.append(texto)
+            if len(bloco) >= tamanho:
+                yield from self.detect_many(bloco, batch_size, force_llm, mode, explain)
+                bloco = []
+        if bloco:
+            yield from self.detect_many(bloco, batch_size, force_llm, mode, explain)
+
+    def explicar(self, texto: str, findings: List[Dict]) -> List[Dict]:
+        return self._chamar("explicar", texto, findings)
+
+    def metricas_cache(self) -> Dict:
+        return self._chamar("metricas_cache")
+
+
+def detector_do_ambiente(**kwargs):
+    """ClienteModelos se PII_MODEL_SERVER estiver definido; senão um PIIDetector(**kwargs) local.
+
+    Com o servidor, a configuração do detector (GPU, árbitro LLM, cache) é a
+    do processo servidor e `kwargs` é ignorado.
+    """
+    if os.getenv("PII_MODEL_SERVER"):
+        logger.info(f"🔌 Usando servidor de modelos em {os.environ['PII_MODEL_SERVER']}")
+        return ClienteModelos.de_env()
+    try:
+        from .detector import PIIDetector
+    except ImportError:
+        from detector import PIIDetector
+    return PIIDetector(**kwargs)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    endereco = os.getenv("PII_MODEL_SERVER")
+    if not endereco:
+        raise SystemExit("Defina PII_MODEL_SERVER com o caminho do socket Unix")
+    try:
+        from .detector import PIIDetector
+    except ImportError:
+        from detector import PIIDetector
+    # Mesma configuração do detector da API
+    detector = PIIDetector(
+        usar_gpu=os.getenv("PII_USAR_GPU", "True").lower() == "true",
+        use_llm_arbitration=os.getenv("PII_USE_LLM_ARBITRATION", "False").lower() == "true",
+        result_cache=os.getenv("PII_CACHE", "True").lower() == "true",
+    )
+    ServidorModelos(
+        detector,
+        endereco,
+        tamanho_lote=int(os.getenv("PII_DETECT_BATCH_SIZE", "16")),
+        espera_lote=float(os.getenv("PII_MODEL_SERVER_BATCH_WAIT_MS", "5")) / 1000,
+        workers=int(os.getenv("PII_MODEL_SERVER_WORKERS", "1")),
+    ).servir()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Varredura única dos patterns regex do detector.
+
+Em vez de um `pattern.finditer(texto)` por pattern (≈67 passadas completas
+por documento), o texto é percorrido uma vez. Para cada caractere há um
+grupo de despacho: os patterns cujo match pode começar com aquele caractere
+(calculado a partir do pattern parseado) unidos em uma alternação. Em cada
+posição x, a alternação do grupo de texto[x] diz se algum pattern casa ali;
+só então cada pattern do grupo é testado com `pattern.match(texto, x)` e os
+matches seguem para o pós-processamento de cada tipo como antes.
+
+O resultado é idêntico ao de `finditer` pattern a pattern:
+
+- Um pattern só é excluído do grupo de um caractere se nenhum match seu pode
+  começar com ele; asserções (`\b`, lookbehind) são ignoradas no cálculo, o
+  que só aumenta o grupo. Na dúvida o pattern entra em todos os grupos.
+- Na alternação os grupos de captura viram grupos não capturantes, o que não
+  muda o que casa; ela só decide se vale testar os patterns em x.
+- Cada pattern guarda onde seu `finditer` retomaria (fim do último match);
+  posições dentro de um match anterior do mesmo pattern são ignoradas,
+  reproduzindo a regra de matches não sobrepostos.
+- `match(texto, pos)` enxerga o texto inteiro (lookbehind, `\b`), então o
+  Match devolvido é o mesmo que o `finditer` produziria.
+
+Patterns com backreference, grupos nomeados, condicionais ou flags que não
+podem ser escopadas ficam isolados e continuam usando `finditer`. Um pattern
+que produza match vazio também cai para `finditer` (semântica de avanço
+própria).
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from re import _parser as _sre_parse, _constants as _sre_c
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_c
+
+logger = logging.getLogger(__name__)
+
+# Flags que podem ser aplicadas a um ramo com (?flags:...)
+_FLAGS_ESCOPO = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x"}
+
+
+def _sem_capturas(fonte: str) -> str:
+    """Troca grupos de captura `(` por `(?:` (respeitando escapes e classes)."""
+    saida = []
+    i, n = 0, len(fonte)
+    while i < n:
+        c = fonte[i]
+        if c == "\\":
+            saida.append(fonte[i:i + 2])
+            i += 2
+        elif c == "[":
+            j = i + 1
+            if j < n and fonte[j] == "^":
+                j += 1
+            if j < n and fonte[j] == "]":
+                j += 1
+            while j < n and fonte[j] != "]":
+                j += 2 if fonte[j] == "\\" else 1
+            saida.append(fonte[i:j + 1])
+            i = j + 1
+        elif c == "(" and not fonte.startswith("(?", i):
+            saida.append("(?:")
+            i += 1
+        else:
+            saida.append(c)
+            i += 1
+    return "".join(saida)
+
+
+_CATEGORIAS = {
+    _sre_c.CATEGORY_DIGIT: r"\d", _sre_c.CATEGORY_NOT_DIGIT: r"\D",
+    _sre_c.CATEGORY_SPACE: r"\s", _sre_c.CATEGORY_NOT_SPACE: r"\S",
+    _sre_c.CATEGORY_WORD: r"\w", _sre_c.CATEGORY_NOT_WORD: r"\W",
+}
+_ZERO_LARGURA = {_sre_c.AT, _sre_c.ASSERT, _sre_c.ASSERT_NOT}
+_REPETICOES = {_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT, getattr(_sre_c, "POSSESSIVE_REPEAT", _sre_c.MAX_REPEAT)}
+
+
+class _Qualquer(Exception):
+    """O primeiro caractere do pattern não pode ser restringido."""
+
+
+def _primeiros_da_sequencia(itens, saida: List[str]) -> bool:
+    """Acumula em `saida` as classes do 1º caractere; retorna True se a sequência pode ser vazia."""
+    for op, av in itens:
+        if op in _ZERO_LARGURA:
+            # Asserções não consomem caractere: o primeiro vem depois (superconjunto)
+            continue
+        if op is _sre_c.LITERAL:
+            saida.append(re.escape(chr(av)))
+            return False
+        if op is _sre_c.IN:
+            for sub_op, sub_av in av:
+                if sub_op is _sre_c.LITERAL:
+                    saida.append(re.escape(chr(sub_av)))
+                elif sub_op is _sre_c.RANGE:
+                    saida.append(f"{re.escape(chr(sub_av[0]))}-{re.escape(chr(sub_av[1]))}")
+                elif sub_op is _sre_c.CATEGORY and sub_av in _CATEGORIAS:
+                    saida.append(_CATEGORIAS[sub_av])
+                else:
+                    raise _Qualquer
+            return False
+        if op is _sre_c.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if add_flags or del_flags:
+                raise _Qualquer
+            if not _primeiros_da_sequencia(sub, saida):
+                return False
+            continue
+        if op is _sre_c.BRANCH:
+            vazio = False
+            for ramo in av[1]:
+                vazio = _primeiros_da_sequencia(ramo, saida) or vazio
+            if not vazio:
+                return False
+            continue
+        if op in _REPETICOES:
+            minimo, _, sub = av
+            if not _primeiros_da_sequencia(sub, saida) and minimo > 0:
+                return False
+            continue
+        raise _Qualquer
+    return True
+
+
+def _primeiro_caractere(pattern: re.Pattern) -> Optional[re.Pattern]:
+    """Classe (compilada com as flags do pattern) dos caracteres em que um match pode começar.
+
+    None quando não dá para restringir (o pattern é testado em toda posição candidata).
+    """
+    try:
+        classes: List[str] = []
+        if _primeiros_da_sequencia(_sre_parse.parse(pattern.pattern, pattern.flags), classes):
+            return None
+        return re.compile(f"[{''.join(classes)}]", pattern.flags)
+    except (_Qualquer, re.error, TypeError, ValueError):
+        return None
+
+
+def _ramo(pattern: re.Pattern) -> Optional[str]:
+    """Fonte do pattern pronta para virar um ramo do localizador (None se incompatível)."""
+    fonte = pattern.pattern
+    if not isinstance(fonte, str) or pattern.groupindex:
+        return None
+    flags = pattern.flags & ~re.UNICODE
+    letras = ""
+    for flag, letra in _FLAGS_ESCOPO.items():
+        if flags & flag:
+            letras += letra
+            flags &= ~flag
+    if flags:
+        return None
+    fonte = _sem_capturas(fonte)
+    if "x" in letras:
+        # Comentário no fim do pattern engoliria o ')' de fechamento
+        fonte += "\n"
+    ramo = f"(?{letras}:{fonte})" if letras else f"(?:{fonte})"
+    try:
+        # Backreferences e condicionais deixam de compilar sem os grupos
+        if re.compile(ramo).groups:
+            return None
+    except re.error:
+        return None
+    return ramo
+
+
+class VarreduraRegex:
+    """Conjunto ordenado de patterns varrido em uma passada sobre o texto.
+
+    Args:
+        patterns: nome -> pattern compilado, na ordem em que os matches
+            devem ser devolvidos (a mesma do loop de `finditer`).
+    """
+
+    # Até quantos patterns selecionados vale mais rodar finditer em cada um
+    MAX_PATTERNS_FINDITER = 4
+    # Seleções distintas com tabela de despacho em cache
+    MAX_SELECOES = 512
+
+    def __init__(self, patterns: Dict[str, re.Pattern]):
+        self.nomes: List[str] = list(patterns)
+        self.patterns: Dict[str, re.Pattern] = dict(patterns)
+        self.combinados: List[str] = []
+        self.isolados: List[str] = []
+        self._ramos: List[str] = []
+        for nome, pattern in self.patterns.items():
+            ramo = _ramo(pattern)
+            if ramo is None:
+                self.isolados.append(nome)
+            else:
+                self.combinados.append(nome)
+                self._ramos.append(ramo)
+        self._primeiros = [_primeiro_caractere(self.patterns[nome]) for nome in self.combinados]
+        self._indice = {nome: i for i, nome in enumerate(self.combinados)}
+        # seleção de patterns -> caractere -> (localizador.match, índices que podem começar nele)
+        self._despachos: Dict[Tuple[int, ...], Dict[str, Optional[Tuple]]] = {}
+        # índices -> alternação compilada (caracteres com o mesmo grupo compartilham)
+        self._localizadores: Dict[Tuple[int, ...], re.Pattern] = {}
+        if self.isolados:
+            logger.debug(f"Varredura regex: {len(self.isolados)} pattern(s) isolado(s): {self.isolados}")
+
+    def _grupo(self, caractere: str, selecao: Tuple[int, ...], despacho: Dict) -> Optional[Tuple]:
+        """Localizador e patterns candidatos para posições que começam com `caractere`."""
+        indices = tuple(
+            i for i in selecao
+            if self._primeiros[i] is None or self._primeiros[i].match(caractere)
+        )
+        grupo = None
+        if indices:
+            localizador = self._localizadores.get(indices)
+            if localizador is None:
+                localizador = re.compile("|".join(self._ramos[i] for i in indices))
+                self._localizadores[indices] = localizador
+            grupo = (localizador.match, indices)
+        despacho[caractere] = grupo
+        return grupo
+
+    def _despacho(self, selecao: Tuple[int, ...]) -> Dict[str, Optional[Tuple]]:
+        despacho = self._despachos.get(selecao)
+        if despacho is None:
+            if len(self._despachos) >= self.MAX_SELECOES:
+                self._despachos.clear()
+                self._localizadores.clear()
+            despacho = self._despachos[selecao] = {}
+        return despacho
+
+    def matches_por_pattern(self, texto: str, nomes: Optional[Iterable[str]] = None) -> Dict[str, List[re.Match]]:
+        """nome -> matches, exatamente como `list(pattern.finditer(texto))`.
+
+        Com `nomes`, só esses patterns são varridos (os demais ficam com lista vazia).
+        """
+        resultado: Dict[str, List[re.Match]] = {nome: [] for nome in self.nomes}
+        if nomes is None:
+            selecao = tuple(range(len(self.combinados)))
+            isolados = self.isolados
+        else:
+            nomes = set(nomes)
+            selecao = tuple(i for i, nome in enumerate(self.combinados) if nome in nomes)
+            isolados = [nome for nome in self.isolados if nome in nomes]
+        if len(selecao) <= self.MAX_PATTERNS_FINDITER:
+            # Poucos patterns: as varreduras em C do finditer saem mais baratas que o loop
+            isolados = isolados + [self.combinados[i] for i in selecao]
+        else:
+            self._varrer(texto, selecao, resultado)
+        for nome in isolados:
+            resultado[nome] = list(self.patterns[nome].finditer(texto))
+        return resultado
+
+    def _varrer(self, texto: str, selecao: Tuple[int, ...], resultado: Dict[str, List[re.Match]]) -> None:
+        """Passada única sobre o texto para os patterns combinados da seleção."""
+        ativos = [(nome, self.patterns[nome], resultado[nome]) for nome in self.combinados]
+        retomar = [0] * len(ativos)
+        recalcular = []
+        despacho = self._despacho(selecao)
+        for x, caractere in enumerate(texto):
+            grupo = despacho[caractere] if caractere in despacho else self._grupo(caractere, selecao, despacho)
+            if grupo is None:
+                continue
+            localizar, indices = grupo
+            if localizar(texto, x) is None:
+                continue
+            for i in indices:
+                if retomar[i] > x:
+                    continue
+                nome, pattern, matches = ativos[i]
+                m = pattern.match(texto, x)
+                if m is None:
+                    continue
+                if m.end() == x:
+                    # Match vazio: deixa o finditer cuidar do avanço
+                    recalcular.append(nome)
+                    retomar[i] = len(texto) + 1
+                    continue
+                matches.append(m)
+                retomar[i] = m.end()
+        # No fim do texto só cabe match vazio, possível apenas nos patterns sem 1º caractere restrito
+        fim = len(texto)
+        for i in selecao:
+            nome, pattern, _ = ativos[i]
+            if self._primeiros[i] is None and retomar[i] <= fim and pattern.match(texto, fim):
+                recalcular.append(nome)
+        for nome in recalcular:
+            resultado[nome] = list(self.patterns[nome].finditer(texto))
+
+    def iterar(self, texto: str, nomes: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, re.Match]]:
+        """(nome, match) na mesma ordem de `for nome, p in patterns: for m in p.finditer(texto)`."""
+        por_pattern = self.matches_por_pattern(texto, nomes)
+        for nome in self.nomes:
+            for m in por_pattern[nome]:
+                yield nome, m
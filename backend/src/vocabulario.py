@@ -0,0 +1,147 @@
+"""
+Motor de vocabulários do detector: todos os termos do allow_list.py em um
+único autômato Aho-Corasick, consultado com uma passada sobre o texto.
+
+Substitui as varreduras `any(termo in texto for termo in CONJUNTO)` feitas
+por entidade/match. Cada ocorrência vem com a categoria e os offsets, então
+uma mesma passada responde "tem gatilho?", "onde está o primeiro?" e "há
+indicador de servidor nos 50 primeiros caracteres?".
+
+Os termos são indexados exatamente como estão no allow_list.py; quem consulta
+passa o texto já na forma usada antes (ex.: `_normalizar()` → maiúsculas sem
+acento), preservando a semântica de substring das varreduras originais.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+try:
+    from .aho_corasick import AutomatoAhoCorasick
+except ImportError:
+    from aho_corasick import AutomatoAhoCorasick
+
+try:
+    from .allow_list import (
+        TERMOS_SEGUROS, INDICADORES_SERVIDOR, CARGOS_AUTORIDADE,
+        GATILHOS_CONTATO, CONTEXTOS_POSITIVOS_CPF,
+    )
+except ImportError:
+    try:
+        from allow_list import (
+            TERMOS_SEGUROS, INDICADORES_SERVIDOR, CARGOS_AUTORIDADE,
+            GATILHOS_CONTATO, CONTEXTOS_POSITIVOS_CPF,
+        )
+    except ImportError:
+        TERMOS_SEGUROS = set()
+        INDICADORES_SERVIDOR = set()
+        CARGOS_AUTORIDADE = set()
+        GATILHOS_CONTATO = set()
+        CONTEXTOS_POSITIVOS_CPF = []
+
+
+# Categorias (texto normalizado: maiúsculas sem acento)
+TERMO_SEGURO = "termo_seguro"
+GATILHO_CONTATO = "gatilho_contato"
+INDICADOR_SERVIDOR = "indicador_servidor"
+CARGO_AUTORIDADE = "cargo_autoridade"
+# Categoria do motor de texto em minúsculas (heurística de CPF)
+CONTEXTO_POSITIVO_CPF = "contexto_positivo_cpf"
+
+
+class Ocorrencia(NamedTuple):
+    inicio: int
+    fim: int
+    termo: str
+    categoria: str
+
+
+class ResultadoVocabulario:
+    """Ocorrências de uma passada sobre um texto, com consultas por categoria."""
+
+    __slots__ = ("texto", "ocorrencias")
+
+    def __init__(self, texto: str, ocorrencias: List[Ocorrencia]):
+        self.texto = texto
+        self.ocorrencias = ocorrencias
+
+    def da_categoria(self, categoria: str, fim_max: Optional[int] = None) -> List[Ocorrencia]:
+        """Ocorrências da categoria; com `fim_max`, só as contidas em texto[:fim_max]."""
+        return [
+            o for o in self.ocorrencias
+            if o.categoria == categoria and (fim_max is None or o.fim <= fim_max)
+        ]
+
+    def tem(self, categoria: str, fim_max: Optional[int] = None) -> bool:
+        """Equivale a `any(t in texto[:fim_max] for t in CATEGORIA)`."""
+        return any(
+            o.categoria == categoria and (fim_max is None or o.fim <= fim_max)
+            for o in self.ocorrencias
+        )
+
+    def primeiras_posicoes(self, categoria: str) -> Dict[str, int]:
+        """Termo -> início da primeira ocorrência (equivale a `texto.find(termo)`)."""
+        posicoes: Dict[str, int] = {}
+        for o in self.ocorrencias:
+            if o.categoria == categoria and (o.termo not in posicoes or o.inicio < posicoes[o.termo]):
+                posicoes[o.termo] = o.inicio
+        return posicoes
+
+    def termina_com(self, categoria: str) -> bool:
+        """Equivale a `re.search(rf"\\b{termo}\\.?\\s*$", texto)` para algum termo da categoria."""
+        base = self.texto.rstrip()
+        if base.endswith("."):
+            base = base[:-1]
+        alvo = len(base)
+        for o in self.ocorrencias:
+            if o.categoria != categoria or o.fim != alvo:
+                continue
+            if o.inicio == 0:
+                return True
+            anterior = self.texto[o.inicio - 1]
+            if not (anterior.isalnum() or anterior == "_"):
+                return True
+        return False
+
+
+class MotorVocabulario:
+    """Autômato imutável com os termos de várias categorias."""
+
+    def __init__(self, vocabularios: Dict[str, Iterable[str]]):
+        self.vocabularios = {cat: frozenset(termos) for cat, termos in vocabularios.items()}
+        self._automato = AutomatoAhoCorasick(
+            (termo, cat) for cat, termos in self.vocabularios.items() for termo in termos
+        )
+
+    def buscar(self, texto: str) -> ResultadoVocabulario:
+        """Uma passada sobre o texto retornando todas as ocorrências de todas as categorias."""
+        return ResultadoVocabulario(texto, [Ocorrencia(*o) for o in self._automato.encontrar(texto)])
+
+    def contem(self, texto: str, categoria: str) -> bool:
+        """Algum termo da categoria aparece no texto (para na primeira ocorrência)."""
+        if "" in self.vocabularios.get(categoria, ()):
+            return True
+        return any(cat == categoria for _, _, _, cat in self._automato.encontrar(texto))
+
+
+def criar_motores_vocabulario(
+    termos_seguros: Iterable[str] = None,
+    gatilhos_contato: Iterable[str] = None,
+    indicadores_servidor: Iterable[str] = None,
+    cargos_autoridade: Iterable[str] = None,
+    contextos_positivos_cpf: Iterable[str] = None,
+):
+    """
+    Cria os motores do detector a partir do allow_list.py (ou dos conjuntos dados).
+
+    Returns:
+        (motor do texto normalizado, motor do texto em minúsculas)
+    """
+    normalizado = MotorVocabulario({
+        TERMO_SEGURO: TERMOS_SEGUROS if termos_seguros is None else termos_seguros,
+        GATILHO_CONTATO: GATILHOS_CONTATO if gatilhos_contato is None else gatilhos_contato,
+        INDICADOR_SERVIDOR: INDICADORES_SERVIDOR if indicadores_servidor is None else indicadores_servidor,
+        CARGO_AUTORIDADE: CARGOS_AUTORIDADE if cargos_autoridade is None else cargos_autoridade,
+    })
+    minusculo = MotorVocabulario({
+        CONTEXTO_POSITIVO_CPF: CONTEXTOS_POSITIVOS_CPF if contextos_positivos_cpf is None else contextos_positivos_cpf,
+    })
+    return normalizado, minusculo
@@ -0,0 +1,130 @@
+"""
+Testes da análise em fluxo de /analyze/stream (api/streaming.py).
+
+A leitura aos pedaços não pode quebrar linhas nem caracteres multibyte; os
+resultados saem na ordem de entrada, em micro-lotes, o primeiro antes do
+fim do corpo, e a fila limitada segura a leitura quando ninguém consome.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+
+from api.streaming import analisar_em_fluxo, itens_csv, itens_ndjson, ler_linhas
+
+
+async def _pedacos(dados: bytes, tamanho: int):
+    for i in range(0, len(dados), tamanho):
+        yield dados[i:i + tamanho]
+
+
+async def _listar(gerador):
+    return [item async for item in gerador]
+
+
+def _rodar(corotina):
+    return asyncio.run(corotina)
+
+
+def test_linhas_com_pedacos_cortando_acentos():
+    dados = "Sérgio\r\nJoão da Conceição\n\núltima".encode("utf-8")
+    for tamanho in (1, 2, 3, 7, len(dados)):
+        assert _rodar(_listar(ler_linhas(_pedacos(dados, tamanho)))) == [
+            "Sérgio", "João da Conceição", "", "última"
+        ]
+
+
+def test_ndjson_linha_invalida_nao_interrompe():
+    corpo = b'{"id": "1", "text": "a"}\nnao e json\n\n{"text": "b"}\n[1]\n'
+    itens = _rodar(_listar(itens_ndjson(ler_linhas(_pedacos(corpo, 5)))))
+    assert itens[0] == ("1", "a")
+    assert itens[1]["error"] == "invalid_json"
+    assert itens[2] == (None, "b")
+    assert itens[3]["error"] == "invalid_item"
+
+
+def test_csv_com_campo_multilinha_e_bom():
+    corpo = '﻿id,texto\n1,"Meu CPF é\n123.456.789-09, ok"\n\n2,sem dados\n'.encode("utf-8")
+    itens = _rodar(_listar(itens_csv(ler_linhas(_pedacos(corpo, 4)))))
+    assert itens == [("1", "Meu CPF é\n123.456.789-09, ok"), ("2", "sem dados")]
+
+
+def test_csv_sem_coluna_de_texto():
+    corpo = b"id,outra\n1,x\n"
+    itens = _rodar(_listar(itens_csv(ler_linhas(_pedacos(corpo, 64)))))
+    assert len(itens) == 1 and itens[0]["error"] == "missing_text_column"
+
+
+def test_linha_longa_vira_erro_sem_guardar_a_linha():
+    corpo = b"curta\n" + b"x" * 50 + b"\nfinal\n" + b"y" * 30
+    for tamanho in (1, 7, 64):
+        linhas = _rodar(_listar(ler_linhas(_pedacos(corpo, tamanho), max_linha=20)))
+        assert linhas[0] == "curta" and linhas[2] == "final"
+        assert linhas[1]["error"] == "line_too_long" and "Linha 2" in linhas[1]["message"]
+        assert linhas[3]["error"] == "line_too_long" and len(linhas) == 4
+
+    itens = _rodar(_listar(itens_ndjson(ler_linhas(_pedacos(b"z" * 100 + b'\n{"text": "a"}\n', 8), 20))))
+    assert itens[0]["error"] == "line_too_long" and itens[1] == (None, "a")
+
+
+def test_csv_aspa_solta_em_campo_sem_aspas():
+    corpo = 'id,texto\n1,monitor de 27" com defeito\n2,sem dados\n3,"com ""aspas"" e, vírgula"\n'.encode("utf-8")
+    itens = _rodar(_listar(itens_csv(ler_linhas(_pedacos(corpo, 5)))))
+    assert itens == [("1", 'monitor de 27" com defeito'), ("2", "sem dados"), ("3", 'com "aspas" e, vírgula')]
+
+
+def test_csv_aspas_sem_fechamento_nao_derrubam_o_fluxo():
+    corpo = b'id,texto\n1,"aberta sem fechar\n' + b"2,linha\n" * 10 + b"3,depois\n"
+    itens = _rodar(_listar(itens_csv(ler_linhas(_pedacos(corpo, 16)), max_registro=60)))
+    assert itens[0]["error"] == "record_too_long" and "linha 2" in itens[0]["message"]
+    # Depois do registro descartado a leitura continua
+    assert itens[-1] == ("3", "depois")
+
+
+def test_ordem_micro_lotes_e_erros_no_lugar():
+    lotes = []
+
+    async def analisar(lote):
+        lotes.append(len(lote))
+        return [{"id": id_, "n": len(texto)} for id_, texto in lote]
+
+    async def itens():
+        for i in range(10):
+            yield (str(i), "x" * i)
+            if i == 4:
+                yield {"id": None, "error": "invalid_json"}
+
+    saida = _rodar(_listar(analisar_em_fluxo(itens(), analisar, tamanho_lote=3, max_pendentes=8)))
+    assert [r["id"] for r in saida] == ["0", "1", "2", "3", "4", None, "5", "6", "7", "8", "9"]
+    assert saida[5]["error"] == "invalid_json"
+    assert sum(lotes) == 10 and max(lotes) <= 3
+
+
+def test_primeiro_resultado_antes_do_fim_e_fila_limitada():
+    async def cenario():
+        lidos = []
+        liberar = asyncio.Event()
+
+        async def itens():
+            for i in range(1000):
+                lidos.append(i)
+                yield (str(i), "texto")
+                if i == 0:
+                    await liberar.wait()
+
+        async def analisar(lote):
+            return [{"id": i} for i, _ in lote]
+
+        fluxo = analisar_em_fluxo(itens(), analisar, tamanho_lote=4, max_pendentes=8)
+        primeiro = await fluxo.__anext__()
+        assert primeiro == {"id": "0"} and len(lidos) == 1
+
+        # Sem consumir a saída, a leitura para quando a fila enche
+        liberar.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        assert len(lidos) <= 1 + 8 + 1
+        await fluxo.aclose()
+
+    _rodar(cenario())
@@ -0,0 +1,114 @@
+"""
+Testes da leitura e escrita em fluxo dos arquivos de lote (api/arquivos_lote.py).
+
+A leitura em blocos deve dar as mesmas linhas da leitura do arquivo
+inteiro, e cada formato de saída deve guardar todos os campos do resultado.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import json
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from api import arquivos_lote
+from api.arquivos_lote import caminho_saida, gravar_resultados, ler_linhas_lote, tipo_midia
+
+RESULTADOS = [
+    {"linha": 0, "texto": "Meu CPF é 210.201.140-24", "is_pii": True, "nivel_risco": "CRITICO",
+     "confianca": 0.98, "findings": [{"tipo": "CPF", "valor": "210.201.140-24"}]},
+    {"linha": 1, "texto": "Olá, tudo bem?", "is_pii": False, "nivel_risco": "SEGURO",
+     "confianca": 1.0, "findings": []},
+]
+
+
+def test_csv_em_blocos_igual_ao_arquivo_inteiro(tmp_path, monkeypatch):
+    arquivo = tmp_path / "lote.csv"
+    linhas = [f'{i},"Texto número {i}, com vírgula"' for i in range(10)]
+    arquivo.write_text("id,texto\n" + "\n".join(linhas) + "\n", encoding="utf-8")
+    monkeypatch.setattr(arquivos_lote, "LEITURA_LINHAS", 3)
+
+    esperado = [(idx, row["texto"]) for idx, row in pd.read_csv(arquivo).iterrows()]
+    assert list(ler_linhas_lote(str(arquivo), "csv")) == esperado
+
+
+def test_xlsx_linha_a_linha(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    livro = openpyxl.Workbook()
+    planilha = livro.active
+    planilha.append(["id", "Texto"])
+    planilha.append([1, "Meu telefone é (61) 99999-8888"])
+    planilha.append([None, None])
+    planilha.append([3, "Solicito informações"])
+    arquivo = str(tmp_path / "lote.xlsx")
+    livro.save(arquivo)
+
+    assert list(ler_linhas_lote(arquivo, "xlsx")) == [
+        (0, "Meu telefone é (61) 99999-8888"), (2, "Solicito informações")
+    ]
+    with pytest.raises(ValueError):
+        list(ler_linhas_lote(arquivo, "ods"))
+
+
+def _pico_leitura_csv(arquivo, linhas):
+    with open(arquivo, "w", encoding="utf-8") as f:
+        f.write("id,texto\n")
+        for i in range(linhas):
+            f.write(f"{i},Manifestação {i} sobre a iluminação pública da quadra\n")
+    tracemalloc.start()
+    total = sum(1 for _ in ler_linhas_lote(str(arquivo), "csv"))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert total == linhas
+    return pico
+
+
+def test_leitura_csv_com_memoria_limitada(tmp_path):
+    pequeno = _pico_leitura_csv(tmp_path / "pequeno.csv", 10000)
+    grande = _pico_leitura_csv(tmp_path / "grande.csv", 80000)
+    # 8x mais linhas, pico de memória praticamente igual
+    assert grande < 2 * pequeno
+
+
+def test_json_no_formato_de_json_dump(tmp_path):
+    saida = caminho_saida(str(tmp_path / "lote.csv"), "json")
+    gravar_resultados(iter(RESULTADOS), saida)
+    with open(saida, encoding="utf-8") as f:
+        assert f.read() == json.dumps(RESULTADOS, ensure_ascii=False, indent=2)
+    gravar_resultados(iter([]), saida)
+    with open(saida, encoding="utf-8") as f:
+        assert f.read() == "[]"
+
+
+def test_jsonl_e_csv(tmp_path):
+    jsonl = caminho_saida(str(tmp_path / "lote.csv"), "jsonl")
+    gravar_resultados(iter(RESULTADOS), jsonl, "jsonl")
+    with open(jsonl, encoding="utf-8") as f:
+        assert [json.loads(linha) for linha in f] == RESULTADOS
+
+    saida_csv = caminho_saida(str(tmp_path / "lote.csv"), "csv")
+    gravar_resultados(iter(RESULTADOS), saida_csv, "csv")
+    with open(saida_csv, encoding="utf-8", newline="") as f:
+        linhas = list(csv.DictReader(f))
+    assert [l["texto"] for l in linhas] == [r["texto"] for r in RESULTADOS]
+    assert json.loads(linhas[0]["findings"]) == RESULTADOS[0]["findings"]
+    assert tipo_midia(saida_csv) == "text/csv"
+
+
+def test_parquet(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(arquivos_lote, "PARQUET_LINHAS_POR_GRUPO", 1)
+    saida = caminho_saida(str(tmp_path / "lote.csv"), "parquet")
+    gravar_resultados(iter(RESULTADOS), saida, "parquet")
+    tabela = pq.read_table(saida)
+    assert tabela.num_rows == 2 and pq.ParquetFile(saida).num_row_groups == 2
+    assert tabela.column("is_pii").to_pylist() == [True, False]
+
+
+def test_formato_invalido(tmp_path):
+    with pytest.raises(ValueError):
+        gravar_resultados(iter(RESULTADOS), str(tmp_path / "x"), "xml")
@@ -0,0 +1,188 @@
+"""
+Testes do cache de resultados de detecção (src/cache_resultados.py).
+
+Cobre o LRU+TTL em memória, a chave HMAC (texto nunca aparece na chave), o
+nível compartilhado (CacheCompartilhadoMemoria no lugar do Redis) e a
+integração com detect()/detect_many(): resultado do cache idêntico ao
+calculado, invalidação por configuração e resultados degradados fora do cache.
+
+O detector é carregado via fixture global em conftest.py (scope=session).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.cache_resultados import CacheMemoria, CacheCompartilhadoMemoria, CacheResultados
+from test_benchmark import DATASET_LGPD
+
+TEXTOS = [texto for texto, _, _, _ in DATASET_LGPD][:20]
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def detector_com_cache(detector, monkeypatch):
+    """Detector da sessão com um cache novo (nível compartilhado em memória)."""
+    cache = CacheResultados(salt="teste", compartilhado=CacheCompartilhadoMemoria())
+    monkeypatch.setattr(detector, "cache_resultados", cache)
+    return detector
+
+
+def test_lru_remove_menos_usado():
+    cache = CacheMemoria(max_itens=2, ttl=60)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    cache.obter("a")
+    cache.guardar("c", 3)
+    assert cache.obter("b") is None
+    assert cache.obter("a") == 1 and cache.obter("c") == 3
+    assert cache.removidos == 1
+
+
+def test_ttl_expira():
+    relogio = Relogio()
+    cache = CacheMemoria(max_itens=10, ttl=5, relogio=relogio)
+    cache.guardar("a", [1])
+    relogio.agora = 4.9
+    assert cache.obter("a") == [1]
+    relogio.agora = 5.0
+    assert cache.obter("a") is None
+    assert cache.expirados == 1
+
+
+def test_valor_devolvido_e_copia():
+    cache = CacheMemoria()
+    valor = {"entidades": [{"tipo": "CPF"}]}
+    cache.guardar("a", valor)
+    valor["entidades"].clear()
+    obtido = cache.obter("a")
+    obtido["entidades"].append({"tipo": "NOME"})
+    assert cache.obter("a") == {"entidades": [{"tipo": "CPF"}]}
+
+
+def test_chave_sem_texto_e_dependente_de_salt_e_assinatura():
+    texto = "Meu CPF é 529.982.247-25"
+    a = CacheResultados(salt="um")
+    b = CacheResultados(salt="dois")
+    chave = a.chave(texto, "cfg")
+    assert texto not in chave and "529" not in chave
+    assert len(chave) == 64
+    assert chave == a.chave(texto, "cfg")
+    assert chave != b.chave(texto, "cfg")
+    assert chave != a.chave(texto, "outra")
+
+
+def test_nivel_compartilhado_entre_instancias():
+    compartilhado = CacheCompartilhadoMemoria()
+    processo_1 = CacheResultados(salt="s", compartilhado=compartilhado)
+    processo_2 = CacheResultados(salt="s", compartilhado=compartilhado)
+    chave = processo_1.chave("texto", "cfg")
+    processo_1.guardar(chave, (True, [{"tipo": "CPF"}], "CRITICO", 0.9))
+
+    assert processo_2.obter(chave) == [True, [{"tipo": "CPF"}], "CRITICO", 0.9]
+    assert processo_2.obter(chave) is not None
+    metricas = processo_2.metricas()
+    assert metricas["hits_compartilhado"] == 1
+    assert metricas["hits_memoria"] == 1
+    assert metricas["hit_rate"] == 1.0
+
+
+def test_falha_no_compartilhado_nao_derruba():
+    class Quebrado:
+        def obter(self, chave):
+            raise ConnectionError("redis fora")
+
+        def guardar(self, chave, valor, ttl):
+            raise ConnectionError("redis fora")
+
+    cache = CacheResultados(salt="s", compartilhado=Quebrado())
+    cache.guardar("k", [1])
+    assert cache.obter("k") == [1]
+    assert cache.obter("outra") is None
+    assert cache.metricas()["erros"] == 2
+
+
+def test_detect_com_cache_igual_sem_cache(detector, detector_com_cache):
+    cache = detector_com_cache.cache_resultados
+    for texto in TEXTOS:
+        calculado = detector_com_cache.detect(texto)
+        do_cache = detector_com_cache.detect(texto)
+        assert do_cache == calculado
+        assert isinstance(do_cache, tuple)
+    metricas = cache.metricas()
+    assert metricas["misses"] == len(TEXTOS)
+    assert metricas["hits_memoria"] == len(TEXTOS)
+
+
+def test_detect_hit_do_nivel_compartilhado(detector_com_cache):
+    texto = TEXTOS[0]
+    esperado = detector_com_cache.detect(texto)
+    detector_com_cache.cache_resultados.memoria.limpar()
+    assert detector_com_cache.detect(texto) == esperado
+    assert detector_com_cache.cache_resultados.metricas()["hits_compartilhado"] == 1
+
+
+def test_force_llm_e_etapas_mudam_a_chave(detector_com_cache, monkeypatch):
+    texto = TEXTOS[0]
+    chave = detector_com_cache._chave_cache(texto, False)
+    assert chave != detector_com_cache._chave_cache(texto, True)
+    monkeypatch.setattr(detector_com_cache, "nlp_spacy", object() if detector_com_cache.nlp_spacy is None else None)
+    assert chave != detector_com_cache._chave_cache(texto, False)
+
+
+def test_texto_vazio_fora_do_cache(detector_com_cache):
+    assert detector_com_cache.detect("   ") == (False, [], "SEGURO", 1.0)
+    assert detector_com_cache.cache_resultados.metricas()["consultas"] == 0
+
+
+def test_resultado_degradado_nao_e_guardado(detector_com_cache, monkeypatch):
+    def regex_quebrado(texto, ctx=None):
+        raise RuntimeError("falha simulada")
+
+    monkeypatch.setattr(detector_com_cache, "parallel_stages", True)
+    monkeypatch.setattr(detector_com_cache, "_detectar_regex", regex_quebrado)
+    detector_com_cache.detect(TEXTOS[0])
+    assert detector_com_cache.cache_resultados.metricas()["armazenados"] == 0
+
+
+def test_falha_do_llm_nao_e_guardada(detector_com_cache, monkeypatch):
+    import src.detector as modulo_detector
+
+    def llm_fora_do_ar(*args, **kwargs):
+        raise RuntimeError("falha simulada")
+
+    monkeypatch.setattr(modulo_detector, "arbitrate_with_llama", llm_fora_do_ar)
+    monkeypatch.setenv("HF_TOKEN", "teste")
+    monkeypatch.setenv("PII_USE_LLM_ARBITRATION", "true")
+    # Pendentes da votação e chamada final sobre o texto inteiro
+    pendente = {"tipo": "NOME", "valor": "Fulano", "confianca": 0.5, "inicio": 0, "fim": 6}
+
+    def votacao_com_pendente(findings, ctx=None):
+        ctx.pendentes_llm = [dict(pendente)]
+        return []
+
+    monkeypatch.setattr(detector_com_cache, "_aplicar_votacao", votacao_com_pendente)
+    detector_com_cache.detect(TEXTOS[0])
+    assert detector_com_cache.cache_resultados.metricas()["armazenados"] == 0
+    monkeypatch.setattr(detector_com_cache, "_aplicar_votacao", lambda findings, ctx=None: [])
+    assert detector_com_cache.detect("Solicito informações sobre os contratos vigentes da secretaria.", force_llm=True) == (
+        False, [], "SEGURO", 1.0
+    )
+    assert detector_com_cache.cache_resultados.metricas()["armazenados"] == 0
+
+
+def test_detect_many_usa_cache(detector_com_cache):
+    esperados = [detector_com_cache.detect(t) for t in TEXTOS[:5]]
+    lote = TEXTOS[:10]
+    obtidos = detector_com_cache.detect_many(lote, batch_size=4)
+    assert obtidos[:5] == esperados
+    assert obtidos == [detector_com_cache.detect(t) for t in lote]
+    assert detector_com_cache.cache_resultados.metricas()["armazenados"] == 10
@@ -0,0 +1,125 @@
+"""
+Testes do filtro de candidatos a nome antes do BERT/NuNER (src/candidatos_nome.py).
+
+O filtro só pode recusar trechos que não renderiam NOME: a verificação de
+recall compara os NOME do detect() no DATASET_LGPD com o filtro ligado e
+desligado, e frases com nomes em formatos variados passam pelo filtro. Também confere que boa parte do texto
+institucional deixa de ir aos transformers.
+
+O detector é carregado via fixture global em conftest.py (scope=session).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.candidatos_nome import FiltroCandidatosNome
+from src.inference.segmentos_ner import CacheSegmentosNER, segmentar
+from test_benchmark import DATASET_LGPD
+from test_fragmentacao_ner import PipelineFalso
+
+COM_NOME = [
+    "O requerente Maria Aparecida Souza solicita cópia.",
+    "Falar com João da Silva no período da tarde.",
+    "Assinado: ANA BEATRIZ DOS SANTOS",
+    "Conforme relato de José Carlos Pereira-Lima, servidor.",
+    "encaminho o pedido de Luíza Conceição d'Ávila",
+    "Eu, Francisco de Assis e Souza, venho requerer",
+]
+
+SEM_NOME = [
+    "Solicito cópia do cadastro que preenchi virtualmente.",
+    "Prezados senhores, boa tarde!",
+    "Gostaria de saber se irão implementar o reajuste no auxílio saúde.",
+    "Quais são os contratos firmados pela Secretaria de Educação em 2022?",
+    "Atenciosamente,",
+    "",
+]
+
+
+@pytest.fixture
+def filtro(detector):
+    return detector.filtro_nome
+
+
+@pytest.mark.parametrize("frase", COM_NOME)
+def test_frases_com_nome_passam(filtro, frase):
+    assert filtro.pode_conter_nome(frase)
+
+
+@pytest.mark.parametrize("frase", SEM_NOME)
+def test_frases_sem_candidato_sao_ignoradas(filtro, frase):
+    assert not filtro.pode_conter_nome(frase)
+
+
+def test_block_if_contains_e_blocklist(detector):
+    filtro = FiltroCandidatosNome(
+        bloqueados=detector.block_if_contains_norm,
+        blocklist=frozenset({"BOA VISTA"}),
+        normalizar=detector._normalizar,
+        termo_ignorado=lambda t: False,
+    )
+    assert not filtro.pode_conter_nome("Ofício da Secretaria Distrital enviado ontem.")
+    assert not filtro.pode_conter_nome("Moro perto de Boa Vista desde então.")
+    # Blocklist só descarta a sequência exata: com outra palavra capitalizada ainda pode haver nome
+    assert filtro.pode_conter_nome("Moro perto de Boa Vista Ramos desde então.")
+
+
+def _nomes(detector, texto):
+    _, findings, _, _ = detector.detect(texto, explain=False)
+    return {(f["inicio"], f["fim"]) for f in findings if f["tipo"] == "NOME"}
+
+
+def test_recall_nomes_do_dataset(detector, monkeypatch):
+    """Nenhum NOME do detect() no DATASET_LGPD se perde com o filtro ligado (PII_NER_GATE)."""
+    if detector.nlp_bert is None and detector.nlp_nuner is None:
+        pytest.skip("Modelos NER (BERT/NuNER) não carregados")
+    assert detector.filtro_nome is not None
+    com_filtro = {texto: _nomes(detector, texto) for texto, _, _, _ in DATASET_LGPD}
+
+    # Equivale a PII_NER_GATE=false: todas as linhas vão ao BERT/NuNER
+    monkeypatch.setattr(detector, "filtro_nome", None)
+    perdidos = []
+    for texto, _, descricao, _ in DATASET_LGPD:
+        for inicio, fim in _nomes(detector, texto) - com_filtro[texto]:
+            perdidos.append(f"{descricao}: {texto[inicio:fim]!r}")
+    assert not perdidos, perdidos
+    assert any(com_filtro.values())
+
+
+def test_fracao_ignorada_no_dataset(detector):
+    filtro = FiltroCandidatosNome(
+        detector.block_if_contains_norm, frozenset(detector.blocklist_total),
+        detector._normalizar, detector._contem_termo_ignorado,
+    )
+    for texto, _, _, _ in DATASET_LGPD:
+        for a, b in segmentar(texto):
+            filtro.filtrar(texto[a:b])
+    metricas = filtro.metricas()
+    assert metricas["trechos"] > 0
+    # Boa parte dos pedidos institucionais nem chega aos transformers
+    assert metricas["fracao_ignorada"] > 0.3
+
+
+def test_linhas_sem_candidato_nao_vao_ao_modelo(detector, monkeypatch):
+    pipeline = PipelineFalso()
+    monkeypatch.setattr(detector, "cache_segmentos_ner", {"bert": CacheSegmentosNER("bert")})
+    texto = "Prezados senhores, boa tarde.\nO requerente José Carlos Pereira pede acesso.\nAtenciosamente,"
+    enviados = []
+    original = detector._inferir_fragmentos
+
+    def registrar(nlp, textos, batch_size):
+        enviados.extend(textos)
+        return original(nlp, textos, batch_size)
+
+    monkeypatch.setattr(detector, "_inferir_fragmentos", registrar)
+    entidades = detector._inferir_ner(pipeline, [texto], 1, modelo="bert")[0]
+    assert enviados == ["O requerente José Carlos Pereira pede acesso."]
+    assert [texto[e["start"]:e["end"]] for e in entidades] == ["José Carlos Pereira"]
+
+    # Sem cache de segmentos o filtro vale para o texto inteiro
+    monkeypatch.setattr(detector, "cache_segmentos_ner", {})
+    enviados.clear()
+    assert detector._inferir_ner(pipeline, ["Prezados senhores, boa tarde."], 1, modelo="bert") == [[]]
+    assert enviados == []
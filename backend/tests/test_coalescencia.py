@@ -0,0 +1,114 @@
+"""
+Testes da coalescência de detecções simultâneas (src/coalescencia.py).
+
+Chamadas com a mesma chave enquanto uma está em andamento devem esperar e
+receber o mesmo resultado (cópia), sem recalcular; chaves diferentes não se
+bloqueiam e exceções do líder chegam a todos.
+
+O detector é carregado via fixture global em conftest.py (scope=session).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.coalescencia import SingleFlight
+from test_benchmark import DATASET_LGPD
+
+TEXTO = DATASET_LGPD[0][0]
+
+
+def _lento(contador, resultado, liberar):
+    def funcao():
+        contador.append(1)
+        liberar.wait(5)
+        return resultado
+    return funcao
+
+
+def _disparar(n, alvo):
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(lambda _: alvo(), range(n)))
+
+
+def test_mesma_chave_executa_uma_vez():
+    voos = SingleFlight()
+    contador, liberar = [], threading.Event()
+    funcao = _lento(contador, {"entidades": [1, 2]}, liberar)
+
+    def chamar():
+        return voos.executar("k", funcao)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futuros = [pool.submit(chamar) for _ in range(8)]
+        while voos.metricas()["coalescidas"] < 7:
+            time.sleep(0.01)
+        liberar.set()
+        resultados = [f.result() for f in futuros]
+
+    assert len(contador) == 1
+    assert all(r == {"entidades": [1, 2]} for r, _ in resultados)
+    assert sum(coalescida for _, coalescida in resultados) == 7
+    # Seguidores recebem cópias independentes
+    assert len({id(r) for r, _ in resultados}) == 8
+    assert voos.metricas() == {"executadas": 1, "coalescidas": 7, "em_andamento": 0}
+
+
+def test_chaves_diferentes_nao_coalescem():
+    voos = SingleFlight()
+    resultados = _disparar(4, lambda: voos.executar(threading.current_thread().name, lambda: 1))
+    assert all(not coalescida for _, coalescida in resultados)
+    assert voos.metricas()["coalescidas"] == 0
+
+
+def test_excecao_do_lider_chega_aos_seguidores():
+    voos = SingleFlight()
+    liberar = threading.Event()
+
+    def falha():
+        liberar.wait(5)
+        raise ValueError("falha do modelo")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futuros = [pool.submit(voos.executar, "k", falha) for _ in range(3)]
+        while voos.metricas()["coalescidas"] < 2:
+            time.sleep(0.01)
+        liberar.set()
+        for f in futuros:
+            with pytest.raises(ValueError):
+                f.result()
+    # A chave é liberada: a próxima chamada calcula de novo
+    assert voos.executar("k", lambda: "ok") == ("ok", False)
+
+
+def test_detect_simultaneo_calcula_uma_vez(detector, monkeypatch):
+    esperado = detector.detect(TEXTO)
+    original = detector._detectar_texto
+    chamadas, liberar = [], threading.Event()
+
+    def detectar_lento(*args, **kwargs):
+        chamadas.append(1)
+        liberar.wait(5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(detector, "coalescencia", SingleFlight())
+    monkeypatch.setattr(detector, "_detectar_texto", detectar_lento)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futuros = [pool.submit(detector.detect, TEXTO) for _ in range(6)]
+        while detector.coalescencia.metricas()["coalescidas"] < 5:
+            time.sleep(0.01)
+        liberar.set()
+        resultados = [f.result() for f in futuros]
+
+    assert len(chamadas) == 1
+    assert all(r == esperado for r in resultados)
+
+
+def test_force_llm_nao_coalesce_com_padrao(detector):
+    assert detector._chave_coalescencia(TEXTO, False, None) != detector._chave_coalescencia(TEXTO, True, None)
+    assert TEXTO not in detector._chave_coalescencia(TEXTO, False, None)
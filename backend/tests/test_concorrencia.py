@@ -0,0 +1,63 @@
+"""
+Teste de estresse de concorrência: uma única instância de PIIDetector
+atendendo N threads simultâneas deve produzir exatamente os mesmos
+resultados da execução serial (ver contrato de thread-safety em PIIDetector).
+"""
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.detector import ContextoDeteccao
+from test_benchmark import DATASET_LGPD
+
+TEXTOS = [texto for texto, _, _, _ in DATASET_LGPD]
+N_THREADS = 8
+REPETICOES = 3
+
+
+def test_detect_concorrente_igual_serial(detector):
+    esperados = {t: detector.detect(t) for t in TEXTOS}
+    carga = TEXTOS * REPETICOES
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as pool:
+        obtidos = list(pool.map(detector.detect, carga))
+
+    for texto, obtido in zip(carga, obtidos):
+        assert obtido == esperados[texto], f"Divergência concorrente: {texto[:80]}"
+
+
+def test_detect_extended_concorrente_igual_serial(detector):
+    textos = TEXTOS[:60]
+    esperados = [detector.detect_extended(t) for t in textos]
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as pool:
+        obtidos = list(pool.map(detector.detect_extended, textos * REPETICOES))
+
+    for i, obtido in enumerate(obtidos):
+        assert obtido == esperados[i % len(textos)]
+
+
+def test_concorrente_com_etapas_paralelas(detector, monkeypatch):
+    textos = TEXTOS[:60]
+    esperados = [detector.detect(t) for t in textos]
+    monkeypatch.setattr(detector, "parallel_stages", True)
+
+    with ThreadPoolExecutor(max_workers=N_THREADS) as pool:
+        obtidos = list(pool.map(detector.detect, textos * REPETICOES))
+
+    for i, obtido in enumerate(obtidos):
+        assert obtido == esperados[i % len(textos)]
+
+
+def test_votacao_usa_contexto_da_chamada(detector):
+    """Pendentes do LLM ficam no contexto, não na instância."""
+    pendente = {"tipo": "NOME", "valor": "Fulano", "confianca": 0.3, "source": "spacy", "peso": 1}
+    ctx = ContextoDeteccao(texto="Fulano")
+    confirmados = detector._aplicar_votacao([pendente], ctx)
+
+    assert confirmados == []
+    assert ctx.pendentes_llm == [pendente]
+    assert not hasattr(detector, "_pendentes_llm")
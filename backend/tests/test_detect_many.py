@@ -0,0 +1,50 @@
+"""
+Testes de equivalência do processamento em lote (detect_many / iter_detect_many).
+
+O resultado de cada texto no lote deve ser idêntico ao de detect() individual,
+incluindo textos vazios e lotes menores que o batch_size.
+
+O detector é carregado via fixture global em conftest.py (scope=session).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from test_benchmark import DATASET_LGPD
+
+TEXTOS = [texto for texto, _, _, _ in DATASET_LGPD]
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 32])
+def test_detect_many_igual_detect(detector, batch_size):
+    """Cada posição de detect_many deve bater com detect() do mesmo texto."""
+    esperados = [detector.detect(texto) for texto in TEXTOS]
+    obtidos = detector.detect_many(TEXTOS, batch_size=batch_size)
+
+    assert len(obtidos) == len(esperados)
+    for texto, esperado, obtido in zip(TEXTOS, esperados, obtidos):
+        assert obtido == esperado, f"Divergência em lote para: {texto[:80]}"
+
+
+def test_detect_many_textos_vazios(detector):
+    """Textos vazios no meio do lote mantêm a posição e o resultado padrão."""
+    textos = ["", "Meu CPF é 529.982.247-25", "   ", None, "Bom dia, como posso ajudar?"]
+    obtidos = detector.detect_many(textos, batch_size=4)
+
+    assert len(obtidos) == len(textos)
+    assert obtidos[0] == (False, [], "SEGURO", 1.0)
+    assert obtidos[2] == (False, [], "SEGURO", 1.0)
+    assert obtidos[3] == (False, [], "SEGURO", 1.0)
+    assert obtidos[1] == detector.detect(textos[1])
+    assert obtidos[4] == detector.detect(textos[4])
+
+
+def test_iter_detect_many_consome_gerador(detector):
+    """A forma geradora aceita iteráveis preguiçosos e preserva a ordem."""
+    textos = TEXTOS[:10]
+    gerador = (t for t in textos)
+    obtidos = list(detector.iter_detect_many(gerador, batch_size=3))
+
+    assert obtidos == [detector.detect(t) for t in textos]
@@ -0,0 +1,128 @@
+"""
+Testes do detector por processo do worker de lote e da divisão de arquivos
+grandes em trechos (api/tasks.py).
+
+processar_lote não cria mais um PIIDetector por job: o detector de cada
+configuração é criado e aquecido uma vez por processo (no
+worker_process_init, para a configuração padrão) e reutilizado.
+
+O detector é carregado via fixture global em conftest.py (scope=session);
+aqui ele faz o papel do detector que o worker carregaria.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+import pytest
+
+pytest.importorskip("celery")
+
+from api import tasks
+from test_benchmark import DATASET_LGPD
+
+
+@pytest.fixture
+def criacoes(detector, monkeypatch):
+    chamadas = []
+
+    def criar(**kwargs):
+        chamadas.append(kwargs)
+        return detector
+
+    monkeypatch.setattr(tasks, "detector_do_ambiente", criar)
+    monkeypatch.setattr(tasks, "_detectores", {})
+    return chamadas
+
+
+def test_detector_criado_uma_vez_por_configuracao(criacoes):
+    _, primeiro = tasks.obter_detector(False, False)
+    _, segundo = tasks.obter_detector(False, False)
+    assert len(criacoes) == 1
+    assert primeiro["reutilizado"] is False and segundo["reutilizado"] is True
+    assert segundo["jobs"] == 2 and segundo["carga_s"] == primeiro["carga_s"]
+    assert {"aquecimento_s", "memoria_mb", "rss_mb", "pid"} <= set(segundo)
+
+    tasks.obter_detector(False, True)
+    assert criacoes[-1] == {"usar_gpu": False, "use_llm_arbitration": True}
+    assert len(criacoes) == 2
+
+
+def test_worker_process_init_aquece_configuracao_padrao(criacoes, monkeypatch):
+    monkeypatch.setenv("PII_USE_LLM_ARBITRATION", "false")
+    monkeypatch.setenv("PII_USAR_GPU", "false")
+    tasks._aquecer_detector_do_worker()
+    _, info = tasks.obter_detector(False, False)
+    assert len(criacoes) == 1 and info["reutilizado"] is True
+
+
+def test_jobs_reutilizam_o_detector(criacoes, tmp_path):
+    arquivo = tmp_path / "lote.csv"
+    arquivo.write_text("id,texto\n1,Meu CPF é 210.201.140-24\n2,Solicito informações sobre o IPTU\n",
+                       encoding="utf-8")
+    for _ in range(2):
+        saida = tasks.processar_lote(str(arquivo), "csv")
+    assert len(criacoes) == 1
+    with open(saida, encoding="utf-8") as f:
+        resultados = json.load(f)
+    assert [r["is_pii"] for r in resultados] == [True, False]
+
+
+@pytest.fixture
+def backend_em_memoria():
+    """Backend de resultados em memória: o chord eager não precisa de Redis."""
+    app = tasks.celery_app
+    original = app.conf.result_backend
+    app.conf.result_backend = "cache+memory://"
+    app._local.__dict__.pop("backend", None)
+    yield
+    app.conf.result_backend = original
+    app._local.__dict__.pop("backend", None)
+
+
+def _csv_lote(tmp_path, linhas):
+    arquivo = tmp_path / "lote.csv"
+    arquivo.write_text("id,texto\n" + "".join(f'{i},"{texto}"\n' for i, texto in enumerate(linhas)),
+                       encoding="utf-8")
+    return str(arquivo)
+
+
+def test_arquivo_grande_dividido_em_trechos_e_juntado_na_ordem(criacoes, backend_em_memoria, tmp_path):
+    textos = [texto for texto, _, _, _ in DATASET_LGPD[:23]]
+    arquivo = _csv_lote(tmp_path, textos)
+
+    saida_inteira = tasks.processar_lote.apply(args=(arquivo, "csv")).get()
+    with open(saida_inteira, encoding="utf-8") as f:
+        esperado = f.read()
+
+    enviados = []
+    original = tasks.processar_parte_lote.run
+
+    def parte(parte_path, *args):
+        with open(parte_path, encoding="utf-8") as f:
+            enviados.append(sum(1 for _ in f))
+        return original(parte_path, *args)
+
+    tasks.processar_parte_lote.run = parte
+    try:
+        saida = tasks.processar_lote.apply(args=(arquivo, "csv", {"chunk_size": 5})).get()
+    finally:
+        tasks.processar_parte_lote.run = original
+    assert enviados == [5, 5, 5, 5, 3]
+    with open(saida, encoding="utf-8") as f:
+        assert f.read() == esperado
+    # Trechos e resultados parciais são removidos depois da junção
+    assert sorted(os.listdir(tmp_path)) == ["lote.csv", "lote.csv.resultado.json"]
+
+
+def test_trechos_juntados_no_formato_pedido(criacoes, backend_em_memoria, tmp_path):
+    textos = [texto for texto, _, _, _ in DATASET_LGPD[:12]]
+    arquivo = _csv_lote(tmp_path, textos)
+    saida = tasks.processar_lote.apply(args=(arquivo, "csv", {"chunk_size": 5, "formato_saida": "jsonl"})).get()
+    assert saida.endswith(".resultado.jsonl")
+    with open(saida, encoding="utf-8") as f:
+        assert [json.loads(linha)["linha"] for linha in f] == list(range(12))
+
+    with pytest.raises(ValueError):
+        tasks.processar_lote.apply(args=(arquivo, "csv", {"formato_saida": "xml"})).get()
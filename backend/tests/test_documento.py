@@ -0,0 +1,101 @@
+"""
+Testes do DocumentContext (src/documento.py).
+
+Garante que as janelas normalizadas lidas do contexto são idênticas às
+chamadas `unidecode(...)` que elas substituem e que o detector produz o
+mesmo resultado recebendo `str` ou `DocumentContext`.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+from text_unidecode import unidecode
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.documento import DocumentContext
+
+
+ALFABETO = list("abc XYZ 0123.,!?\n\tçÇãÁéÊíõÚüß—“”ªº°\x00") + ["😀", "ﬁ", "Ω", "北"]
+
+TEXTOS = [
+    "",
+    "Texto simples em ASCII. Outra frase!",
+    "Solicitação do Sr. João Antônio, CPF 123.456.789-09.\nObrigado.",
+    "São Sebastião — Águas Claras; rua ß 😀 fim",
+]
+
+
+def _textos_aleatorios(n=40, seed=7):
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(ALFABETO) for _ in range(rnd.randint(0, 40))) for _ in range(n)]
+
+
+@pytest.mark.parametrize("texto", TEXTOS + _textos_aleatorios())
+def test_janelas_equivalem_ao_unidecode(texto):
+    doc = DocumentContext(texto)
+    assert str(doc) == texto
+    assert doc.normalizado == unidecode(texto).upper().strip()
+    for a in range(len(texto) + 2):
+        for b in range(a, len(texto) + 3):
+            assert doc.normalizar_trecho(a, b) == unidecode(texto[a:b]).upper().strip()
+            assert doc.minusculo_trecho(a, b) == unidecode(texto[a:b]).lower()
+
+
+@pytest.mark.parametrize("texto", TEXTOS + _textos_aleatorios(seed=11))
+def test_mapa_de_offsets(texto):
+    doc = DocumentContext(texto)
+    assert doc.para_normalizado(0) == 0
+    assert doc.para_normalizado(len(texto)) == len(doc.texto_norm)
+    anterior = 0
+    for i in range(len(texto) + 1):
+        pos = doc.para_normalizado(i)
+        assert pos >= anterior
+        anterior = pos
+        if i < len(texto) and doc.texto_norm[pos:doc.para_normalizado(i + 1)]:
+            assert doc.para_original(pos) == i
+
+
+def test_primeira_posicao_equivale_find():
+    doc = DocumentContext("CPF 111 e depois CPF 222")
+    assert doc.primeira_posicao("CPF") == 0
+    assert doc.primeira_posicao("222") == 21
+    assert doc.primeira_posicao("333") == -1
+
+
+def test_linhas_e_sentencas():
+    doc = DocumentContext("Primeira frase. Segunda?\nTerceira linha\n\nÚltima! ")
+    assert [doc[a:b] for a, b in doc.linhas()] == [
+        "Primeira frase. Segunda?", "Terceira linha", "", "Última! "]
+    assert [doc[a:b].strip() for a, b in doc.sentencas()] == [
+        "Primeira frase.", "Segunda?", "Terceira linha", "Última!"]
+    a, b = doc.sentenca_em(doc.index("Segunda"))
+    assert doc[a:b].strip() == "Segunda?"
+
+
+def test_decimal_nao_quebra_sentenca():
+    doc = DocumentContext("Valor de 1.234,56 reais. Fim")
+    assert [doc[a:b].strip() for a, b in doc.sentencas()] == ["Valor de 1.234,56 reais.", "Fim"]
+
+
+def test_etapas_mesmo_resultado_com_documento(detector):
+    from test_benchmark import DATASET_LGPD
+
+    for texto, _, _, _ in DATASET_LGPD:
+        doc = DocumentContext(texto)
+        assert detector._detectar_regex(doc) == detector._detectar_regex(texto), texto
+        assert detector._extrair_nomes_gatilho(doc) == detector._extrair_nomes_gatilho(texto), texto
+
+
+@pytest.mark.parametrize("prefixo", ["", "  ", "Olá… ½ ", "Ææ ﬁ № "])
+def test_nomes_gatilho_com_offsets_do_texto_original(detector, prefixo):
+    # O unidecode muda o tamanho do texto normalizado ("…" -> "...", "½" -> " 1/2")
+    for texto in (prefixo + "me chamo Ana Souza e preciso de ajuda",
+                  prefixo + "Prezados, falar com a Maria Oliveira sobre o caso"):
+        for entrada in (texto, DocumentContext(texto)):
+            nomes = detector._extrair_nomes_gatilho(entrada)
+            assert nomes, texto
+            for f in nomes:
+                assert texto[f["inicio"]:f["fim"]] == f["valor"], texto
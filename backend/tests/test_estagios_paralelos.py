@@ -0,0 +1,156 @@
+"""
+Testes do modo de execução paralela das etapas de detect() (PII_PARALLEL_STAGES).
+
+O resultado paralelo deve ser idêntico ao sequencial; etapas que estouram o
+timeout ou falham degradam para resultado parcial em vez de derrubar a chamada.
+"""
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from test_benchmark import DATASET_LGPD
+
+TEXTOS = [texto for texto, _, _, _ in DATASET_LGPD]
+
+
+@pytest.fixture
+def detector_paralelo(detector, monkeypatch):
+    monkeypatch.setattr(detector, "parallel_stages", True)
+    return detector
+
+
+def test_paralelo_igual_sequencial(detector, monkeypatch):
+    esperados = [detector.detect(t) for t in TEXTOS]
+    monkeypatch.setattr(detector, "parallel_stages", True)
+    obtidos = [detector.detect(t) for t in TEXTOS]
+    for texto, esperado, obtido in zip(TEXTOS, esperados, obtidos):
+        assert obtido == esperado, f"Divergência no modo paralelo: {texto[:80]}"
+
+
+def test_detect_many_paralelo(detector_paralelo):
+    textos = TEXTOS[:20]
+    assert detector_paralelo.detect_many(textos, batch_size=8) == [detector_paralelo.detect(t) for t in textos]
+
+
+def test_timeout_degrada_para_resultado_parcial(detector_paralelo, monkeypatch):
+    texto = "Meu nome é Maria da Silva, CPF 529.982.247-25"
+    original = detector_paralelo._detectar_regex
+
+    def regex_lento(t, ctx=None):
+        time.sleep(1.0)
+        return original(t, ctx)
+
+    monkeypatch.setattr(detector_paralelo, "_detectar_regex", regex_lento)
+    monkeypatch.setitem(detector_paralelo.stage_timeouts, "regex", 0.1)
+
+    inicio = time.monotonic()
+    has_pii, findings, _, _ = detector_paralelo.detect(texto)
+    assert time.monotonic() - inicio < 1.0
+    assert all(f["tipo"] != "CPF" for f in findings)
+
+
+def test_falha_de_etapa_nao_derruba_deteccao(detector_paralelo, monkeypatch):
+    def presidio_quebrado(t):
+        raise RuntimeError("falha simulada")
+
+    monkeypatch.setattr(detector_paralelo, "_detectar_presidio", presidio_quebrado)
+    has_pii, findings, _, _ = detector_paralelo.detect("CPF 529.982.247-25")
+    assert has_pii
+    assert any(f["tipo"] == "CPF" for f in findings)
+
+
+@pytest.fixture
+def detector_uma_thread(detector_paralelo, monkeypatch):
+    """Executor de etapas com uma única thread: as etapas fazem fila."""
+    # Etapas atrasadas de outros testes terminam antes de trocar o executor
+    limite = time.monotonic() + 5
+    while detector_paralelo._estagios_atrasados and time.monotonic() < limite:
+        time.sleep(0.05)
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(detector_paralelo, "_stage_executor", executor)
+    monkeypatch.setattr(detector_paralelo, "_stage_workers", 1)
+    yield detector_paralelo
+    executor.shutdown(wait=True)
+
+
+def _rodar_estagios(detector, texto):
+    from src.detector import ContextoDeteccao
+    ctx = ContextoDeteccao(texto=texto)
+    return detector._executar_estagios(texto, ctx=ctx), ctx
+
+
+def test_espera_na_fila_nao_conta_no_timeout(detector_uma_thread, monkeypatch):
+    def presidio_lento(t):
+        time.sleep(0.3)
+        return []
+
+    original = detector_uma_thread._detectar_regex
+
+    def regex_lento(t, ctx=None):
+        time.sleep(0.3)
+        return original(t, ctx)
+
+    monkeypatch.setattr(detector_uma_thread, "_detectar_presidio", presidio_lento)
+    monkeypatch.setattr(detector_uma_thread, "_detectar_regex", regex_lento)
+    monkeypatch.setattr(detector_uma_thread, "stage_timeouts", {nome: 0.5 for nome in detector_uma_thread.stage_timeouts})
+
+    # Presidio espera ~0.3s o regex na fila e roda mais 0.3s: passa de 0.5s desde o envio, não desde o início
+    resultados, ctx = _rodar_estagios(detector_uma_thread, "CPF 529.982.247-25")
+    assert ctx.estagios_degradados == []
+    assert any(f["tipo"] == "CPF" for f in resultados["regex"])
+
+
+def test_etapa_sem_vaga_roda_na_thread_da_chamada(detector_uma_thread, monkeypatch):
+    liberar = threading.Event()
+    detector_uma_thread._stage_executor.submit(liberar.wait, 5)
+    monkeypatch.setattr(detector_uma_thread, "stage_timeouts", {nome: 0.2 for nome in detector_uma_thread.stage_timeouts})
+    try:
+        inicio = time.monotonic()
+        resultados, ctx = _rodar_estagios(detector_uma_thread, "CPF 529.982.247-25")
+        assert time.monotonic() - inicio < 2.0
+    finally:
+        liberar.set()
+    assert ctx.estagios_degradados == []
+    assert any(f["tipo"] == "CPF" for f in resultados["regex"])
+
+
+def test_etapas_atrasadas_nao_causam_timeouts_em_cascata(detector_uma_thread, monkeypatch):
+    original = detector_uma_thread._detectar_regex
+    liberar = threading.Event()
+
+    def regex_travado(t, ctx=None):
+        liberar.wait(5)
+        return original(t, ctx)
+
+    monkeypatch.setattr(detector_uma_thread, "_detectar_regex", regex_travado)
+    monkeypatch.setattr(detector_uma_thread, "stage_timeouts", {nome: 0.1 for nome in detector_uma_thread.stage_timeouts})
+    try:
+        _, ctx = _rodar_estagios(detector_uma_thread, "CPF 529.982.247-25")
+        assert ctx.estagios_degradados == ["regex"]
+        assert detector_uma_thread._estagios_atrasados == 1
+
+        # A única thread está presa: a próxima chamada roda as etapas aqui, sem esperar a fila
+        monkeypatch.setattr(detector_uma_thread, "_detectar_regex", original)
+        inicio = time.monotonic()
+        resultados, ctx = _rodar_estagios(detector_uma_thread, "CPF 529.982.247-25")
+        assert time.monotonic() - inicio < 1.0
+        assert ctx.estagios_degradados == []
+        assert any(f["tipo"] == "CPF" for f in resultados["regex"])
+    finally:
+        liberar.set()
+    detector_uma_thread._stage_executor.shutdown(wait=True)
+    assert detector_uma_thread._estagios_atrasados == 0
+
+
+def test_timeouts_por_etapa_via_env(monkeypatch):
+    from src.detector import PIIDetector
+    monkeypatch.setenv("PII_STAGE_TIMEOUT", "5")
+    monkeypatch.setenv("PII_STAGE_TIMEOUT_BERT", "0")
+    timeouts = PIIDetector._carregar_timeouts_estagios()
+    assert timeouts["regex"] == 5.0
+    assert timeouts["bert"] is None
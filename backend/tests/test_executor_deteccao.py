@@ -0,0 +1,146 @@
+"""
+Testes do executor de detecção (api/executor_deteccao.py).
+
+O executor tira a detecção do event loop, limita pool + fila e recusa na
+hora (ExecutorSaturado -> 503) quando os dois estão cheios, exceto para
+chamadas com esperar=True, que aguardam a vaga.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.executor_deteccao import ExecutorDeteccao, ExecutorSaturado
+
+
+def _bloqueante(liberar: threading.Event, valor):
+    liberar.wait(5)
+    return valor
+
+
+async def _ate(condicao, limite=2.0):
+    fim = time.monotonic() + limite
+    while not condicao() and time.monotonic() < fim:
+        await asyncio.sleep(0.005)
+
+
+def test_fila_cheia_recusa_com_retry_after():
+    executor = ExecutorDeteccao(workers=1, max_fila=1)
+
+    async def cenario():
+        liberar = threading.Event()
+        primeira = asyncio.create_task(executor.executar(_bloqueante, liberar, 1))
+        segunda = asyncio.create_task(executor.executar(_bloqueante, liberar, 2))
+        await _ate(lambda: executor.metricas()["na_fila"] == 1)
+        metricas = executor.metricas()
+        assert (metricas["em_execucao"], metricas["na_fila"]) == (1, 1)
+        assert executor.saturado()
+
+        with pytest.raises(ExecutorSaturado) as erro:
+            await executor.executar(_bloqueante, liberar, 3)
+        assert erro.value.retry_after >= 1
+
+        liberar.set()
+        assert await asyncio.gather(primeira, segunda) == [1, 2]
+
+    asyncio.run(cenario())
+    metricas = executor.metricas()
+    assert metricas["concluidas"] == 2 and metricas["rejeitadas"] == 1
+    assert metricas["em_execucao"] == metricas["na_fila"] == 0
+    # A segunda esperou a primeira terminar
+    assert metricas["espera_ms_max"] > 0
+    executor.encerrar()
+
+
+def test_esperar_aguarda_vaga_em_vez_de_recusar():
+    executor = ExecutorDeteccao(workers=1, max_fila=0)
+
+    async def cenario():
+        liberar = threading.Event()
+        primeira = asyncio.create_task(executor.executar(_bloqueante, liberar, 1))
+        await _ate(executor.saturado)
+        segunda = asyncio.create_task(executor.executar(_bloqueante, liberar, 2, esperar=True))
+        await _ate(lambda: executor.metricas()["aguardando_vaga"] == 1)
+        liberar.set()
+        return await asyncio.gather(primeira, segunda)
+
+    assert asyncio.run(cenario()) == [1, 2]
+    assert executor.metricas()["rejeitadas"] == 0
+    executor.encerrar()
+
+
+def test_event_loop_livre_durante_deteccao():
+    executor = ExecutorDeteccao(workers=1, max_fila=0)
+
+    async def cenario():
+        liberar = threading.Event()
+        tarefa = asyncio.create_task(executor.executar(_bloqueante, liberar, "ok"))
+        inicio = time.monotonic()
+        await asyncio.sleep(0.05)  # um /health, por exemplo
+        assert time.monotonic() - inicio < 1
+        liberar.set()
+        return await tarefa
+
+    assert asyncio.run(cenario()) == "ok"
+    executor.encerrar()
+
+
+def test_erro_da_funcao_chega_ao_chamador_e_libera_vaga():
+    executor = ExecutorDeteccao(workers=1, max_fila=0)
+
+    async def cenario():
+        with pytest.raises(ZeroDivisionError):
+            await executor.executar(divmod, 1, 0)
+        return await executor.executar(divmod, 7, 2)
+
+    assert asyncio.run(cenario()) == (3, 1)
+    assert executor.metricas()["falhas"] == 1 and not executor.saturado()
+    executor.encerrar()
+
+
+def test_modo_processo():
+    executor = ExecutorDeteccao(workers=1, max_fila=2, tipo="process")
+    assert asyncio.run(executor.executar(pow, 2, 10)) == 1024
+    assert executor.metricas()["tipo"] == "process"
+    executor.encerrar()
+
+
+# Pool de threads já usado no processo pai, como o das etapas paralelas do detector
+_pool_estagios = ThreadPoolExecutor(max_workers=1)
+_valor_do_filho = None
+
+
+def _inicializar_filho(valor):
+    global _valor_do_filho
+    _valor_do_filho = valor
+
+
+def _usar_pool_estagios():
+    return _pool_estagios.submit(lambda: _valor_do_filho).result(timeout=5)
+
+
+def test_modo_processo_nao_herda_threads_e_roda_inicializador():
+    assert _pool_estagios.submit(lambda: "pai").result() == "pai"
+    executor = ExecutorDeteccao(workers=1, max_fila=0, tipo="process",
+                                inicializador=_inicializar_filho, args_inicializador=("filho",))
+    # Com fork o filho herdaria o pool sem a thread e a chamada expiraria
+    assert asyncio.run(executor.executar(_usar_pool_estagios)) == "filho"
+    executor.encerrar()
+
+
+def test_configuracao_por_env(monkeypatch):
+    monkeypatch.setenv("PII_DETECT_WORKERS", "3")
+    monkeypatch.setenv("PII_DETECT_QUEUE_MAX", "5")
+    executor = ExecutorDeteccao.de_env()
+    assert (executor.tipo, executor.workers, executor.max_fila, executor.capacidade) == ("thread", 3, 5, 8)
+    executor.encerrar()
+
+    monkeypatch.setenv("PII_DETECT_EXECUTOR", "greenlet")
+    with pytest.raises(ValueError):
+        ExecutorDeteccao.de_env()
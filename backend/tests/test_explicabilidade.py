@@ -7,6 +7,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 
 import pytest
 from src.detector import PIIDetector
+from src.contexto_explicacao import recortar, remontar
 
 
 @pytest.fixture(scope="module")
@@ -222,3 +223,46 @@ class TestExplicabilidadeRegressao:
             assert 'tipo' in f
             assert 'valor' in f
             assert 'confianca' in f
+
+
+class TestExplicacaoSobDemanda:
+    """explain=False pula o XAI; explicar() gera depois a mesma explicação."""
+    
+    TEXTO = "Meu CPF é 123.456.789-09, telefone (61) 99999-8888, email joao.silva@gmail.com"
+    
+    def test_sem_explain_nao_gera_explicacao(self, detector, monkeypatch):
+        def falhar(*args, **kwargs):
+            raise AssertionError("explicação não deveria ser gerada")
+        monkeypatch.setattr(detector, "_gerar_explicacao", falhar)
+        has_pii, findings, _, _ = detector.detect(self.TEXTO, explain=False)
+        assert has_pii is True
+        for f in findings:
+            assert 'explicacao' not in f
+            assert self.TEXTO[f['inicio']:f['fim']] == f['valor']
+    
+    def test_explicar_depois_igual_ao_explain(self, detector):
+        _, com_explicacao, _, _ = detector.detect(self.TEXTO)
+        _, compactos, _, _ = detector.detect(self.TEXTO, explain=False)
+        assert detector.explicar(self.TEXTO, compactos) == com_explicacao
+
+    def test_explicar_so_com_janelas_de_contexto(self, detector):
+        """O que GET /explain guarda (janelas, sem o texto) explica igual ao texto inteiro."""
+        textos = [
+            self.TEXTO,
+            "Solicito informações sobre o processo. " * 5 + "Contato: maria.souza@hotmail.com. " + "Sem mais. " * 10,
+            "123.456.789-09",
+        ]
+        for texto in textos:
+            _, compactos, _, _ = detector.detect(texto, explain=False)
+            # Finding sintético colado no fim, com gatilho só na janela de antes
+            compactos = compactos + [{"tipo": "NOME", "valor": "Fulano", "inicio": len(texto), "fim": len(texto) + 6}]
+            janelas = recortar(texto, compactos)
+            assert all(len(j["antes"]) <= 50 and len(j["depois"]) <= 50 for j in janelas)
+            texto_remontado, ajustados = remontar(compactos, janelas)
+            esperado = [f["explicacao"] for f in detector.explicar(texto, compactos)]
+            assert [f["explicacao"] for f in detector.explicar(texto_remontado, ajustados)] == esperado
+
+    def test_detect_many_sem_explain(self, detector):
+        textos = [self.TEXTO, "Solicito informações sobre contratos."]
+        assert detector.detect_many(textos, explain=False) == [detector.detect(t, explain=False) for t in textos]
+        assert detector.detect_many(textos) == [detector.detect(t) for t in textos]
@@ -0,0 +1,198 @@
+"""
+Testes da fragmentação de documentos longos para o NER (src/inference/fragmentacao.py).
+
+Um pipeline falso (reconhece nomes de uma lista fixa) substitui BERT/NuNER:
+os testes verificam que nomes depois de 4096 caracteres são encontrados, que
+os offsets voltam globais, que a sobreposição não duplica entidades e que
+todos os fragmentos vão ao modelo em uma única chamada.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import re
+
+import pytest
+
+from src.inference.fragmentacao import (
+    Fragmento, criar_medidor, fragmentar_texto, mesclar_entidades, medir_caracteres
+)
+
+NOMES = ["Maria Aparecida Souza", "José Carlos Pereira", "Ana Beatriz Lima"]
+RE_NOMES = re.compile("|".join(map(re.escape, NOMES)))
+
+
+class _TokenizerPalavras:
+    """Um token por palavra, como `tokenizer(textos)["input_ids"]`."""
+
+    def __call__(self, textos, add_special_tokens=False):
+        return {"input_ids": [t.split() for t in textos]}
+
+
+class PipelineFalso:
+    """Imita `pipeline("ner", aggregation_strategy="simple")` para a lista NOMES."""
+
+    def __init__(self, limite_caracteres=None, tokenizer=None):
+        self.chamadas = []
+        self.limite_caracteres = limite_caracteres
+        self.tokenizer = tokenizer
+
+    def _entidades(self, texto):
+        if self.limite_caracteres is not None:
+            assert len(texto) <= self.limite_caracteres, "fragmento maior que a janela do modelo"
+        return [
+            {"entity_group": "PER", "score": 0.99, "word": m.group(), "start": m.start(), "end": m.end()}
+            for m in RE_NOMES.finditer(texto)
+        ]
+
+    def __call__(self, entradas, batch_size=1):
+        self.chamadas.append(entradas)
+        if isinstance(entradas, str):
+            return self._entidades(entradas)
+        return [self._entidades(t) for t in entradas]
+
+
+def _documento_longo(repeticoes=60):
+    partes = []
+    for i in range(repeticoes):
+        nome = NOMES[i % len(NOMES)]
+        partes.append(f"Parágrafo {i} do processo administrativo sobre a solicitação registrada. "
+                      f"O requerente {nome} pede acesso aos autos.\n")
+    return "".join(partes)
+
+
+def test_texto_curto_um_fragmento():
+    texto = "Solicito informação sobre o contrato de Maria Aparecida Souza."
+    assert fragmentar_texto(texto, 400, 64) == [Fragmento(0, len(texto), texto)]
+    assert fragmentar_texto("", 400, 64) == []
+
+
+def test_fragmentos_cobrem_texto_e_respeitam_limite():
+    texto = _documento_longo()
+    fragmentos = fragmentar_texto(texto, 100, 20)
+
+    assert len(fragmentos) > 1
+    assert fragmentos[0].inicio == 0
+    assert fragmentos[-1].fim == len(texto)
+    for anterior, atual in zip(fragmentos, fragmentos[1:]):
+        # Sem buracos: o próximo fragmento começa dentro ou no fim do anterior
+        assert atual.inicio <= anterior.fim
+        assert atual.inicio > anterior.inicio
+    for f in fragmentos:
+        assert f.texto == texto[f.inicio:f.fim]
+        assert medir_caracteres([f.texto])[0] <= 100
+
+
+def test_sentenca_maior_que_limite_e_dividida():
+    texto = " ".join(["palavra"] * 500)
+    fragmentos = fragmentar_texto(texto, 50, 0)
+    assert len(fragmentos) > 1
+    assert all(medir_caracteres([f.texto])[0] <= 50 for f in fragmentos)
+    assert "".join(f.texto for f in fragmentos) == texto
+
+
+def test_medidor_usa_tokenizer():
+    medir = criar_medidor(PipelineFalso(tokenizer=_TokenizerPalavras()))
+    assert medir(["um dois três", "quatro"]) == [3, 1]
+    assert criar_medidor(PipelineFalso()) is medir_caracteres
+
+
+def test_mesclar_remove_duplicatas_da_sobreposicao():
+    texto = "Primeira frase. O requerente Ana Beatriz Lima pede acesso. Última frase aqui."
+    inicio_nome = texto.index("Ana")
+    # Dois fragmentos que se sobrepõem na frase do nome
+    fragmentos = [Fragmento(0, 58, texto[0:58]), Fragmento(15, len(texto), texto[15:])]
+    pipeline = PipelineFalso()
+    saidas = [pipeline._entidades(f.texto) for f in fragmentos]
+
+    entidades = mesclar_entidades(fragmentos, saidas, len(texto))
+    assert len(entidades) == 1
+    assert entidades[0]["start"] == inicio_nome
+    assert texto[entidades[0]["start"]:entidades[0]["end"]] == "Ana Beatriz Lima"
+
+
+def test_mesclar_igual_a_comparar_com_todas_as_aceitas():
+    import random
+
+    def referencia(fragmentos, saidas, tamanho):
+        # Versão quadrática: cada candidata comparada com todas as aceitas
+        candidatas = []
+        for frag, entidades in zip(fragmentos, saidas):
+            for ent in entidades:
+                g = dict(ent, start=ent["start"] + frag.inicio, end=ent["end"] + frag.inicio)
+                esquerda = g["start"] - frag.inicio if frag.inicio > 0 else float("inf")
+                direita = frag.fim - g["end"] if frag.fim < tamanho else float("inf")
+                candidatas.append((min(esquerda, direita), float(ent.get("score", 0.0)), g))
+        candidatas.sort(key=lambda c: (c[0], c[1]), reverse=True)
+        aceitas = []
+        for _, _, ent in candidatas:
+            if not any(ent["start"] < a["end"] and a["start"] < ent["end"] for a in aceitas):
+                aceitas.append(ent)
+        return sorted(aceitas, key=lambda e: (e["start"], e["end"]))
+
+    aleatorio = random.Random(11)
+    for _ in range(200):
+        tamanho = 400
+        fragmentos = [Fragmento(i, min(tamanho, i + 150), "") for i in range(0, tamanho, 100)]
+        saidas = []
+        for frag in fragmentos:
+            entidades = []
+            for _ in range(aleatorio.randint(0, 12)):
+                inicio = aleatorio.randint(0, frag.fim - frag.inicio - 1)
+                fim = min(frag.fim - frag.inicio, inicio + aleatorio.randint(0, 20))
+                entidades.append({"start": inicio, "end": fim, "score": aleatorio.choice([0.5, 0.7, 0.9])})
+            saidas.append(entidades)
+        assert mesclar_entidades(fragmentos, saidas, tamanho) == referencia(fragmentos, saidas, tamanho)
+
+
+def test_inferir_ner_encontra_nomes_depois_de_4096(detector):
+    texto = _documento_longo()
+    assert len(texto) > 4096
+    pipeline = PipelineFalso(limite_caracteres=3 * detector.ner_fragmento_tokens)
+
+    entidades = detector._inferir_ner(pipeline, [texto], 8)[0]
+
+    esperadas = [(m.start(), m.end()) for m in RE_NOMES.finditer(texto)]
+    assert [(e["start"], e["end"]) for e in entidades] == esperadas
+    assert any(e["start"] > 4096 for e in entidades)
+    for e in entidades:
+        assert texto[e["start"]:e["end"]] == e["word"]
+    # Todos os fragmentos em uma chamada só
+    assert len(pipeline.chamadas) == 1
+
+
+def test_inferir_ner_lote_uma_chamada(detector):
+    curto = "O servidor José Carlos Pereira atendeu a demanda."
+    textos = [_documento_longo(), curto, "", _documento_longo(20)]
+    pipeline = PipelineFalso()
+
+    resultados = detector._inferir_ner(pipeline, textos, 4)
+
+    assert len(pipeline.chamadas) == 1
+    assert len(resultados) == len(textos)
+    assert resultados[2] == []
+    assert resultados[1] == pipeline._entidades(curto)
+    for texto, entidades in zip(textos, resultados):
+        assert len(entidades) == len(RE_NOMES.findall(texto))
+
+
+def test_bert_only_usa_fragmentos(detector, monkeypatch):
+    texto = _documento_longo()
+    monkeypatch.setattr(detector, "nlp_bert", PipelineFalso())
+
+    findings = detector._detectar_ner_bert_only(texto)
+
+    # Sem truncamento: nomes do fim do documento também chegam ao pós-processamento
+    inicios = [f["inicio"] for f in findings]
+    assert inicios and max(inicios) > 4096
+    for f in findings:
+        assert texto[f["inicio"]:f["fim"]] == f["valor"]
+
+
+@pytest.mark.parametrize("tokens,sobreposicao", [(40, 0), (40, 20), (120, 32)])
+def test_sem_perda_nem_duplicata_em_varias_configuracoes(tokens, sobreposicao):
+    texto = _documento_longo(25)
+    fragmentos = fragmentar_texto(texto, tokens, sobreposicao)
+    pipeline = PipelineFalso()
+    entidades = mesclar_entidades(fragmentos, [pipeline._entidades(f.texto) for f in fragmentos], len(texto))
+    assert [(e["start"], e["end"]) for e in entidades] == [(m.start(), m.end()) for m in RE_NOMES.finditer(texto)]
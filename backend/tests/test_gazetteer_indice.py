@@ -0,0 +1,124 @@
+"""
+Testes do índice em cache do gazetteer GDF e do autômato Aho-Corasick.
+
+O índice deve responder exatamente como a varredura linear antiga
+(`termo in texto` para cada termo) e só recarregar quando o mtime muda.
+"""
+import sys
+import os
+import json
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src import aho_corasick
+from src.aho_corasick import AutomatoAhoCorasick, _AutomatoPython
+from src.gazetteer import gazetteer_gdf
+from src.gazetteer.gazetteer_gdf import (
+    obter_indice_gazetteer, carregar_gazetteer_gdf, _ler_termos, _caminho_gazetteer,
+)
+
+
+def _ocorrencias_ingenuas(termos, texto):
+    return sorted(
+        (i, i + len(t), t)
+        for t in set(termos) if t
+        for i in range(len(texto) - len(t) + 1)
+        if texto.startswith(t, i)
+    )
+
+
+@pytest.mark.parametrize("usar_c", [True, False])
+def test_aho_corasick_igual_busca_ingenua(usar_c, monkeypatch):
+    if usar_c and not aho_corasick.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick não instalado")
+    monkeypatch.setattr(aho_corasick, "AHOCORASICK_AVAILABLE", usar_c)
+
+    termos = ["he", "she", "his", "hers", "h", "ershe", "SEEDF", "SEE"]
+    automato = AutomatoAhoCorasick(termos)
+    if not usar_c:
+        assert isinstance(automato._automato, _AutomatoPython)
+
+    rnd = random.Random(42)
+    for _ in range(200):
+        texto = "".join(rnd.choice("hersiSEDF ") for _ in range(rnd.randint(0, 30)))
+        obtido = sorted((i, f, t) for i, f, t, _ in automato.encontrar(texto))
+        assert obtido == _ocorrencias_ingenuas(termos, texto)
+        assert automato.contem_algum(texto) == any(t in texto for t in termos)
+
+
+def test_aho_corasick_valores_e_vazio():
+    automato = AutomatoAhoCorasick([("gdf", "orgao"), ("gdf", "sigla"), ("escola", "escola")])
+    valores = sorted(v for _, _, t, v in automato.encontrar("escola do gdf") if t == "gdf")
+    assert valores == ["orgao", "sigla"]
+    # String vazia é substring de tudo, como no `in` do Python
+    assert AutomatoAhoCorasick(["", "x"]).contem_algum("abc")
+    assert not AutomatoAhoCorasick([]).contem_algum("abc")
+
+
+def test_indice_em_cache():
+    assert obter_indice_gazetteer() is obter_indice_gazetteer()
+    assert carregar_gazetteer_gdf() == _ler_termos(_caminho_gazetteer())
+
+
+def test_indice_recarrega_quando_mtime_muda(tmp_path, monkeypatch):
+    arquivo = tmp_path / "gazetteer_gdf.json"
+    arquivo.write_text(json.dumps({"orgaos": [{"nome": "Orgao Um", "sigla": "OU1"}]}), encoding="utf-8")
+    monkeypatch.setattr(gazetteer_gdf, "_caminho_gazetteer", lambda: str(arquivo))
+    monkeypatch.setattr(gazetteer_gdf, "_indice", None)
+
+    primeiro = obter_indice_gazetteer()
+    assert primeiro.contem("ou1")
+    assert obter_indice_gazetteer() is primeiro
+
+    arquivo.write_text(json.dumps({"orgaos": [{"nome": "Orgao Dois", "sigla": "OD2"}]}), encoding="utf-8")
+    os.utime(arquivo, (primeiro.mtime + 10, primeiro.mtime + 10))
+    # Passado o intervalo entre verificações do mtime
+    monkeypatch.setattr(gazetteer_gdf, "_proxima_verificacao", 0.0)
+
+    segundo = obter_indice_gazetteer()
+    assert segundo is not primeiro
+    assert segundo.contem("od2") and not segundo.contem("ou1")
+    assert segundo.algum_termo_em("xx od2 yy")
+
+
+def test_mtime_conferido_no_maximo_uma_vez_por_intervalo(tmp_path, monkeypatch):
+    arquivo = tmp_path / "gazetteer_gdf.json"
+    arquivo.write_text(json.dumps({"orgaos": [{"nome": "Orgao Um", "sigla": "OU1"}]}), encoding="utf-8")
+    consultas = []
+
+    def caminho():
+        consultas.append(1)
+        return str(arquivo)
+
+    monkeypatch.setattr(gazetteer_gdf, "_caminho_gazetteer", caminho)
+    monkeypatch.setattr(gazetteer_gdf, "_indice", None)
+    monkeypatch.setattr(gazetteer_gdf, "INTERVALO_VERIFICACAO", 60.0)
+
+    primeiro = obter_indice_gazetteer()
+    for _ in range(1000):
+        assert obter_indice_gazetteer() is primeiro
+    assert len(consultas) == 1
+
+    # Arquivo alterado dentro do intervalo: segue o índice em cache até a próxima verificação
+    arquivo.write_text(json.dumps({"orgaos": [{"nome": "Orgao Dois", "sigla": "OD2"}]}), encoding="utf-8")
+    os.utime(arquivo, (primeiro.mtime + 10, primeiro.mtime + 10))
+    assert obter_indice_gazetteer() is primeiro
+    monkeypatch.setattr(gazetteer_gdf, "_proxima_verificacao", 0.0)
+    assert obter_indice_gazetteer().contem("od2")
+
+
+def test_deve_ignorar_entidade_mesma_semantica(detector):
+    """Compara o gazetteer indexado com a varredura linear original."""
+    termos = _ler_termos(_caminho_gazetteer())
+    entidades = [
+        "Maria da Silva", "SEEDF", "Secretaria de Educação", "HRAN", "João Pereira",
+        "Hospital Regional da Asa Norte", "CEF 01 de Brasília", "detran", "Ana",
+        "Carlos Alberto Nogueira", "Administração Regional do Gama", "Pró-Saúde",
+    ]
+    for entidade in entidades:
+        t_norm = detector._normalizar(entidade)
+        esperado_gdf = t_norm in termos or any(t in t_norm for t in termos)
+        indice = obter_indice_gazetteer()
+        assert (indice.contem(t_norm) or indice.algum_termo_em(t_norm)) == esperado_gdf
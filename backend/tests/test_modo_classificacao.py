@@ -0,0 +1,86 @@
+"""
+Testes do modo de classificação (detect(..., mode="classify")).
+
+O modo só precisa de has_pii: regex e gatilhos rodam primeiro e um achado
+decisivo (documento validado ou peso >= 4) encerra a detecção sem NER,
+Presidio nem explicações. has_pii deve ser o mesmo do modo "full".
+
+O detector é carregado via fixture global em conftest.py (scope=session).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from test_benchmark import DATASET_LGPD
+
+TEXTO_CPF = "Histórico de consumo da Inscrição: 00569848-9, sob o CPF: 210.201.140-24, Maria Martins Mota Silva."
+TEXTO_SEM_PII = "Gostaria de saber se irão implementar o reajuste no auxílio saúde dos servidores."
+
+
+def _proibir(detector, monkeypatch, *metodos):
+    def falhar(*args, **kwargs):
+        raise AssertionError("etapa não deveria rodar no modo classify")
+    for metodo in metodos:
+        monkeypatch.setattr(detector, metodo, falhar)
+
+
+def test_has_pii_igual_ao_modo_full(detector):
+    divergentes = [
+        descricao for texto, _, descricao, _ in DATASET_LGPD
+        if detector.detect(texto)[0] != detector.detect(texto, mode="classify")[0]
+    ]
+    assert divergentes == []
+
+
+def test_cpf_decide_so_com_regex(detector, monkeypatch):
+    _proibir(detector, monkeypatch, "_extrair_nomes_gatilho", "_detectar_ner_bert_only",
+             "_detectar_ner_nuner_only", "_detectar_ner_spacy_only", "_detectar_presidio",
+             "_gerar_explicacao")
+    has_pii, findings, _, _ = detector.detect(TEXTO_CPF, mode="classify")
+    assert has_pii
+    assert any(f["tipo"] == "CPF" for f in findings)
+    assert all("explicacao" not in f for f in findings)
+
+
+def test_sem_achado_decisivo_segue_caminho_completo(detector, monkeypatch):
+    chamadas = []
+    original = detector._extrair_nomes_gatilho
+
+    def gatilho(texto):
+        chamadas.append(texto)
+        return original(texto)
+
+    monkeypatch.setattr(detector, "_extrair_nomes_gatilho", gatilho)
+    assert detector.detect(TEXTO_SEM_PII, mode="classify") == detector.detect(TEXTO_SEM_PII)
+    # Gatilhos já calculados no modo classify não rodam de novo no caminho completo
+    assert len(chamadas) == 2
+
+
+def test_detect_many_so_manda_indecisos_ao_ner(detector, monkeypatch):
+    textos = [TEXTO_CPF, TEXTO_SEM_PII, "", TEXTO_CPF]
+    enviados = []
+    original = detector._detectar_ner_lote
+
+    def ner_lote(lote, batch_size):
+        enviados.extend(lote)
+        return original(lote, batch_size)
+
+    monkeypatch.setattr(detector, "_detectar_ner_lote", ner_lote)
+    resultados = detector.detect_many(textos, batch_size=4, mode="classify")
+    assert enviados == [TEXTO_SEM_PII]
+    assert resultados == [detector.detect(t, mode="classify") for t in textos]
+
+
+def test_modo_invalido(detector):
+    with pytest.raises(ValueError):
+        detector.detect(TEXTO_CPF, mode="rapido")
+    with pytest.raises(ValueError):
+        detector.detect_many([TEXTO_CPF], mode="rapido")
+
+
+def test_modo_entra_na_chave_de_coalescencia(detector):
+    assert detector._chave_coalescencia(TEXTO_CPF, False, None) != detector._chave_coalescencia(
+        TEXTO_CPF, False, None, "classify"
+    )
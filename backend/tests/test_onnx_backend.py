@@ -0,0 +1,53 @@
+"""
+Testes do backend ONNX Runtime para os estágios NER (BERT e NuNER).
+
+A equivalência de spans/scores com o PyTorch só roda quando optimum está
+instalado e os modelos foram exportados (python -m src.inference.exportar_onnx export).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.inference import onnx_backend
+from src.inference.onnx_backend import (
+    obter_backend_ner, criar_session_options, ler_nivel_otimizacao,
+    diretorio_onnx, modelo_onnx_disponivel, BACKEND_TORCH, BACKEND_ONNX,
+)
+
+
+def test_backend_padrao_torch(monkeypatch):
+    monkeypatch.delenv("PII_NER_BACKEND", raising=False)
+    assert obter_backend_ner() == BACKEND_TORCH
+
+
+def test_backend_onnx_e_invalido(monkeypatch):
+    monkeypatch.setenv("PII_NER_BACKEND", "ONNX")
+    assert obter_backend_ner() == BACKEND_ONNX
+    monkeypatch.setenv("PII_NER_BACKEND", "tensorrt")
+    assert obter_backend_ner() == BACKEND_TORCH
+
+
+def test_nivel_otimizacao_do_ort_config():
+    """O ort_config.json versionado do BERT usa optimization_level 2."""
+    assert ler_nivel_otimizacao(diretorio_onnx("bert")) == 2
+
+
+def test_session_options_threads(monkeypatch):
+    ort = pytest.importorskip("onnxruntime")
+    monkeypatch.setenv("PII_ORT_INTRA_OP_THREADS", "3")
+    monkeypatch.setenv("PII_ORT_INTER_OP_THREADS", "1")
+    opcoes = criar_session_options(diretorio_onnx("bert"))
+    assert opcoes.intra_op_num_threads == 3
+    assert opcoes.inter_op_num_threads == 1
+    assert opcoes.execution_mode == ort.ExecutionMode.ORT_SEQUENTIAL
+    assert opcoes.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+
+
+@pytest.mark.parametrize("chave", ["bert", "nuner"])
+def test_onnx_equivalente_torch(chave):
+    if not (onnx_backend.OPTIMUM_AVAILABLE and modelo_onnx_disponivel(chave)):
+        pytest.skip(f"Modelo ONNX '{chave}' não exportado ou optimum ausente")
+    from src.inference.exportar_onnx import verificar
+    assert verificar(chave, tolerancia=1e-3)
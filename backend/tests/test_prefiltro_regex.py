@@ -0,0 +1,96 @@
+"""
+Testes do pré-filtro de patterns regex (src/prefiltro_regex.py).
+
+O pré-filtro só pode descartar patterns que de fato não casam: todo pattern
+com algum match no texto tem que sobrar em `possiveis()`, e o resultado do
+`_detectar_regex` não pode mudar com ele ligado.
+"""
+import sys
+import os
+import re
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.prefiltro_regex import DOBRAS_ASCII, PrefiltroRegex, extrair_requisitos, dobrar_caixa
+from src.detector import ContextoDeteccao
+from test_varredura_regex import TEXTOS
+
+
+@pytest.fixture(scope="module")
+def patterns(detector):
+    return {**detector.patterns_compilados, **detector.heuristicas_regex}
+
+
+def _recortes(n=300, seed=5):
+    rnd = random.Random(seed)
+    texto = " ".join(TEXTOS)
+    for _ in range(n):
+        a = rnd.randrange(len(texto))
+        yield texto[a:a + rnd.randint(1, 200)]
+
+
+def test_requisitos_extraidos():
+    cpf = extrair_requisitos(re.compile(r'\b(\d{3}[\.\s\-]?\d{3}[\.\s\-]?\d{3}[\-\.\s]?\d{1,2})\b'))
+    assert cpf.min_digitos == 3 and not cpf.literais
+    email = extrair_requisitos(re.compile(r'\b([a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,})\b', re.I))
+    assert email.literais == {"@"}
+    rotulo = extrair_requisitos(re.compile(r'(?:CNH|CARTEIRA DE MOTORISTA)[\s:]*(\d{11})', re.I))
+    assert rotulo.literais == {"cnh", "carteira de motorista"} and rotulo.min_digitos == 11
+    # Ramo sem literal: sem requisito de literal
+    assert not extrair_requisitos(re.compile(r'(?:CPF|\d)x?')).literais
+
+
+def test_patterns_com_match_nunca_descartados(detector, patterns):
+    prefiltro = detector.prefiltro_regex
+    for texto in TEXTOS + list(_recortes()):
+        perfil = prefiltro.perfil(texto)
+        possiveis = set(prefiltro.possiveis(perfil))
+        for nome, pattern in patterns.items():
+            if pattern.search(texto):
+                assert nome in possiveis, (nome, texto)
+
+
+def test_texto_sem_digitos_pula_maioria(detector):
+    perfil = detector.prefiltro_regex.perfil("Gostaria de saber o horário de funcionamento da biblioteca.")
+    possiveis = detector.prefiltro_regex.possiveis(perfil, detector.patterns_compilados)
+    assert len(possiveis) < len(detector.patterns_compilados) // 4
+
+
+def test_dobra_de_caixa_cobre_ignorecase():
+    # 'K' (Kelvin) e 'ſ' casam com k/s sob IGNORECASE
+    assert dobrar_caixa("KM 3 e PaſSAPORTE") == "km 3 e passaporte"
+    prefiltro = PrefiltroRegex({"KM": re.compile(r"km\s*\d", re.I)})
+    texto = "Km 3"
+    assert re.search(r"km\s*\d", texto, re.I)
+    assert prefiltro.pode_casar("KM", prefiltro.perfil(texto))
+
+
+def test_tabela_de_dobras_igual_ao_ignorecase():
+    # Todo caractere não-ASCII que o re.IGNORECASE casa com [a-z], e a letra que ele casa
+    todos = "".join(map(chr, range(0x80, 0x110000)))
+    esperado = {
+        ord(ch): next(letra for letra in "abcdefghijklmnopqrstuvwxyz" if re.fullmatch(letra, ch, re.I))
+        for ch in set(re.findall(r"[a-z]", todos, re.I))
+    }
+    assert DOBRAS_ASCII == esperado
+
+
+def test_detectar_regex_igual_sem_prefiltro(detector):
+    prefiltro = detector.prefiltro_regex
+    textos = TEXTOS + list(_recortes(100, seed=3))
+    try:
+        detector.prefiltro_regex = None
+        esperado = [detector._detectar_regex(t) for t in textos]
+    finally:
+        detector.prefiltro_regex = prefiltro
+    assert [detector._detectar_regex(t) for t in textos] == esperado
+
+
+def test_contador_de_patterns_ignorados(detector):
+    ctx = ContextoDeteccao(texto="Qual o prazo de resposta?")
+    detector._detectar_regex(ctx.texto, ctx)
+    assert 0 < ctx.patterns_regex_ignorados <= len(detector.patterns_compilados)
+    resultado = detector.detect_extended("Meu CPF é 529.982.247-25")
+    assert 0 <= resultado["regex_patterns_skipped"] < len(detector.patterns_compilados)
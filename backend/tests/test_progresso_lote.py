@@ -0,0 +1,195 @@
+"""
+Testes do progresso e dos checkpoints dos jobs de lote (api/tasks.py e
+api/progresso_lote.py).
+
+Cada trecho publica linhas processadas/total, vazão e ETA, e o JSONL de
+resultados do trecho serve de checkpoint: uma nova tentativa (worker
+reiniciado) retoma da última linha gravada, sem repetir inferência.
+
+O detector é carregado via fixture global em conftest.py (scope=session).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+
+import pytest
+
+pytest.importorskip("celery")
+
+from api import tasks
+from test_benchmark import DATASET_LGPD
+
+TEXTOS = [texto for texto, _, _, _ in DATASET_LGPD[:12]]
+
+
+class DetectorContado:
+    """Repassa ao detector real e conta os textos que chegaram à inferência."""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.textos = 0
+
+    def iter_detect_many(self, textos, **kwargs):
+        for resultado in self.detector.iter_detect_many(self._contar(textos), **kwargs):
+            yield resultado
+
+    def _contar(self, textos):
+        for texto in textos:
+            self.textos += 1
+            yield texto
+
+    def __getattr__(self, nome):
+        return getattr(self.detector, nome)
+
+
+@pytest.fixture
+def progresso(tmp_path, monkeypatch):
+    # tasks pode ter importado backend.api.progresso_lote ou api.progresso_lote
+    modulo = sys.modules[tasks.iniciar_job.__module__]
+    monkeypatch.setattr(modulo, "PROGRESSO_DIR", str(tmp_path / "progresso"))
+    return modulo
+
+
+@pytest.fixture
+def contado(detector, monkeypatch):
+    contado = DetectorContado(detector)
+    monkeypatch.setattr(tasks, "obter_detector", lambda *a: (contado, {"reutilizado": True}))
+    monkeypatch.setattr(tasks, "LOTE_CHECKPOINT_LINHAS", 2)
+    return contado
+
+
+def _csv_lote(tmp_path, linhas):
+    arquivo = tmp_path / "lote.csv"
+    arquivo.write_text("id,texto\n" + "".join(f'{i},"{texto}"\n' for i, texto in enumerate(linhas)),
+                       encoding="utf-8")
+    return str(arquivo)
+
+
+def _parte(tmp_path, linhas):
+    parte = tmp_path / "lote.csv.parte00000.jsonl"
+    parte.write_text("".join(json.dumps([i, t], ensure_ascii=False) + "\n" for i, t in enumerate(linhas)),
+                     encoding="utf-8")
+    return str(parte)
+
+
+def test_progresso_soma_os_trechos(progresso):
+    inicio = time.time() - 6
+    progresso.iniciar_job("job", 30, 3)
+    progresso.registrar_parte("job", 0, 10, 10, 0, inicio=inicio)
+    progresso.registrar_parte("job", 1, 6, 10, 4, inicio=inicio)
+    estado = progresso.progresso_job("job")
+    assert estado["linhas_processadas"] == 16 and estado["linhas_total"] == 30
+    assert estado["partes"] == 3 and estado["partes_concluidas"] == 1
+    assert estado["percentual"] == pytest.approx(53.3)
+    # Vazão só com as linhas inferidas nesta tentativa: 12 linhas em ~6 s
+    assert estado["linhas_por_s"] == pytest.approx(2.0, rel=0.1)
+    assert estado["eta_s"] == pytest.approx(7.0, rel=0.1)
+    assert progresso.progresso_job("inexistente") is None
+
+    # Nova tentativa do job mantém o início e conta a tentativa
+    progresso.iniciar_job("job", 30, 3)
+    assert progresso.progresso_job("job")["tentativas"] == 2
+    progresso.concluir_job("job")
+    final = progresso.progresso_job("job")
+    assert final["concluido"] is True and final["eta_s"] is None
+
+
+def test_job_publica_progresso_completo(progresso, contado, tmp_path):
+    arquivo = _csv_lote(tmp_path, TEXTOS)
+    tasks.processar_lote.apply(args=(arquivo, "csv"), task_id="job-unico").get()
+    estado = progresso.progresso_job("job-unico")
+    assert estado["linhas_processadas"] == estado["linhas_total"] == len(TEXTOS)
+    assert estado["partes"] == estado["partes_concluidas"] == 1
+    assert estado["concluido"] is True
+    assert sorted(os.listdir(tmp_path)) == ["lote.csv", "lote.csv.resultado.json", "progresso"]
+
+
+def test_trecho_retomado_do_checkpoint_nao_repete_inferencia(contado, detector, tmp_path):
+    opcoes = tasks._opcoes_lote({"batch_size": 4})
+    parte = _parte(tmp_path, TEXTOS)
+    referencia = [json.dumps(r, ensure_ascii=False) for r in tasks._detectar_linhas(
+        enumerate(TEXTOS), opcoes, detector)]
+
+    # Tentativa anterior: 5 linhas gravadas e a sexta cortada no meio da escrita
+    resultados = parte + ".resultado.jsonl"
+    with open(resultados, "w", encoding="utf-8") as f:
+        f.write("".join(linha + "\n" for linha in referencia[:5]) + referencia[5][:10])
+
+    assert tasks.processar_parte_lote.apply(args=(parte, {"batch_size": 4})).get() == resultados
+    assert contado.textos == len(TEXTOS) - 5
+    with open(resultados, encoding="utf-8") as f:
+        assert f.read().splitlines() == referencia
+    assert not os.path.exists(parte)
+
+    # Reentrega depois de o trecho terminar: nada a refazer
+    assert tasks.processar_parte_lote.apply(args=(parte, {"batch_size": 4})).get() == resultados
+    assert contado.textos == len(TEXTOS) - 5
+
+
+def test_juntar_reentregue_devolve_resultado_pronto(progresso, contado, tmp_path):
+    parte = _parte(tmp_path, TEXTOS[:3])
+    resultados = tasks.processar_parte_lote.apply(args=(parte,)).get()
+    saida = str(tmp_path / "lote.csv.resultado.json")
+    assert tasks.juntar_partes_lote.apply(args=([resultados], saida)).get() == saida
+    # Segunda entrega: os trechos já foram apagados, o arquivo final vale
+    assert tasks.juntar_partes_lote.apply(args=([resultados], saida)).get() == saida
+    with open(saida, encoding="utf-8") as f:
+        assert [r["linha"] for r in json.load(f)] == [0, 1, 2]
+
+
+def test_job_novo_com_mesmo_arquivo_nao_usa_checkpoint_de_outro(progresso, contado, monkeypatch, tmp_path):
+    def cair_depois_de_3(textos, **kwargs):
+        for n, resultado in enumerate(contado.detector.iter_detect_many(textos, **kwargs)):
+            if n == 3:
+                raise RuntimeError("worker caiu")
+            yield resultado
+
+    antigos = [f"Texto antigo {i}, CPF 210.201.140-24" for i in range(5)]
+    novos = [f"Texto novo {i}, sem dados pessoais" for i in range(5)]
+    arquivo = _csv_lote(tmp_path, antigos)
+    monkeypatch.setattr(contado, "iter_detect_many", cair_depois_de_3)
+    opcoes = {"batch_size": 1}
+    assert tasks.processar_lote.apply(args=(arquivo, "csv", opcoes), task_id="job-a").failed()
+    # O job que caiu deixou o checkpoint dele no disco
+    assert any(nome.endswith(".resultado.jsonl") for nome in os.listdir(tmp_path))
+
+    monkeypatch.undo()
+    monkeypatch.setattr(sys.modules[tasks.iniciar_job.__module__], "PROGRESSO_DIR", str(tmp_path / "progresso"))
+    monkeypatch.setattr(tasks, "obter_detector", lambda *a: (contado, {"reutilizado": True}))
+    arquivo = _csv_lote(tmp_path, novos)
+    saida = tasks.processar_lote.apply(args=(arquivo, "csv", opcoes), task_id="job-b").get()
+    with open(saida, encoding="utf-8") as f:
+        assert [r["texto"] for r in json.load(f)] == novos
+    assert progresso.progresso_job("job-b")["tentativas"] == 1
+
+
+def test_trecho_publica_estado_no_id_do_job():
+    publicados = []
+
+    class Pedido:
+        id = "trecho-1"
+        is_eager = False
+
+    class Trecho:
+        request = Pedido()
+
+        def update_state(self, **kwargs):
+            publicados.append(kwargs)
+
+    tasks._publicar_estado(Trecho(), {"progresso": {}}, "job-pai")
+    tasks._publicar_estado(Trecho(), {"progresso": {}})
+    assert [p["task_id"] for p in publicados] == ["job-pai", "trecho-1"]
+
+
+def test_job_na_fila_reconhecido_antes_do_worker(progresso):
+    assert progresso.progresso_job("na-fila") is None
+    progresso.registrar_envio("na-fila")
+    estado = progresso.progresso_job("na-fila")
+    assert estado["linhas_total"] is None and estado["percentual"] is None and estado["eta_s"] is None
+
+    progresso.iniciar_job("na-fila", 10, 1)
+    estado = progresso.progresso_job("na-fila")
+    assert estado["linhas_total"] == 10 and estado["percentual"] == 0.0 and estado["tentativas"] == 1
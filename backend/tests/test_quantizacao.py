@@ -0,0 +1,101 @@
+"""
+Testes da quantização INT8 dos modelos NER e da guarda de recall.
+
+A comparação fp32 vs int8 no DATASET_LGPD completo roda via CLI
+(python -m src.inference.quantizacao validar); aqui validamos a decisão
+da guarda e a quantização dinâmica em um BERT pequeno com o tokenizer local.
+"""
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.inference.onnx_backend import diretorio_onnx
+from src.inference.quantizacao import (
+    calcular_metricas, decidir_aprovacao, identificar_modelos, int8_aprovado,
+    quantizacao_int8_habilitada, quantizar_pipeline_torch,
+)
+
+
+def test_calcular_metricas():
+    m = calcular_metricas([True, True, False, False], [True, False, True, False])
+    assert m["tp"] == 1 and m["fp"] == 1 and m["fn"] == 1
+    assert m["recall"] == 0.5
+    assert m["precisao"] == 0.5
+
+
+def test_guarda_recusa_queda_de_recall():
+    fp32 = {"recall": 1.0, "precisao": 0.98}
+    assert decidir_aprovacao(fp32, {"recall": 1.0, "precisao": 0.97})
+    assert not decidir_aprovacao(fp32, {"recall": 0.995, "precisao": 0.99})
+    assert decidir_aprovacao(fp32, {"recall": 0.995, "precisao": 0.99}, tolerancia=0.01)
+
+
+def test_int8_exige_relatorio_aprovado(tmp_path, monkeypatch):
+    relatorio = tmp_path / "ner_int8_validacao.json"
+    monkeypatch.setenv("PII_NER_INT8_RELATORIO", str(relatorio))
+    monkeypatch.setenv("PII_NER_QUANTIZACAO", "int8")
+
+    # Sem relatório: recusado
+    assert not quantizacao_int8_habilitada("torch")
+
+    relatorio.write_text(json.dumps({
+        "torch": {"aprovado": True, "modelos": identificar_modelos("torch")},
+        "onnx": {"aprovado": False, "modelos": identificar_modelos("onnx")},
+    }), encoding="utf-8")
+    assert int8_aprovado("torch")
+    assert quantizacao_int8_habilitada("torch")
+    assert not quantizacao_int8_habilitada("onnx")
+
+    # Sem opt-in via env: fp32 mesmo com aprovação
+    monkeypatch.setenv("PII_NER_QUANTIZACAO", "none")
+    assert not quantizacao_int8_habilitada("torch")
+
+
+def test_aprovacao_vale_so_para_os_modelos_validados(tmp_path, monkeypatch):
+    relatorio = tmp_path / "ner_int8_validacao.json"
+    monkeypatch.setenv("PII_NER_INT8_RELATORIO", str(relatorio))
+    monkeypatch.setenv("PII_ONNX_MODELS_DIR", str(tmp_path / "models"))
+
+    # Relatório antigo, sem a identidade dos modelos: recusado
+    relatorio.write_text(json.dumps({"torch": {"aprovado": True}}), encoding="utf-8")
+    assert not int8_aprovado("torch")
+
+    # Outro modelo no lugar do validado
+    modelos = dict(identificar_modelos("torch"), bert="outro/modelo-ner")
+    relatorio.write_text(json.dumps({"torch": {"aprovado": True, "modelos": modelos}}), encoding="utf-8")
+    assert not int8_aprovado("torch")
+
+    # ONNX: o artefato reexportado muda o hash
+    for chave in ("bert", "nuner"):
+        pasta = tmp_path / "models" / os.path.basename(diretorio_onnx(chave))
+        pasta.mkdir(parents=True)
+        (pasta / "model_quantized.onnx").write_bytes(b"pesos " + chave.encode())
+    relatorio.write_text(json.dumps({"onnx": {"aprovado": True, "modelos": identificar_modelos("onnx")}}), encoding="utf-8")
+    assert int8_aprovado("onnx")
+    (pasta / "model_quantized.onnx").write_bytes(b"pesos reexportados")
+    assert not int8_aprovado("onnx")
+
+
+def test_quantizacao_dinamica_pipeline_torch():
+    torch = pytest.importorskip("torch")
+    from transformers import AutoTokenizer, BertConfig, BertForTokenClassification, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(diretorio_onnx("bert"))
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size, hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64, num_labels=9,
+    )
+    torch.manual_seed(0)
+    modelo = BertForTokenClassification(config).eval()
+    nlp = pipeline("ner", model=modelo, tokenizer=tokenizer, aggregation_strategy="simple", device=-1)
+
+    nlp = quantizar_pipeline_torch(nlp)
+
+    lineares = [m for m in nlp.model.modules() if isinstance(m, torch.nn.Linear)]
+    quantizadas = [m for m in nlp.model.modules() if type(m).__name__ == "Linear" and "quantized" in type(m).__module__]
+    assert not lineares
+    assert quantizadas
+    assert isinstance(nlp("Maria da Silva mora em Ceilândia."), list)
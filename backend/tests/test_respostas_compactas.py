@@ -0,0 +1,96 @@
+"""
+Testes do formato compacto e da serialização das respostas (api/respostas.py).
+
+O formato compact/1 deve trazer cada campo do resultado v2 uma única vez,
+sem perder informação, e o batch só vem com gzip quando o cliente aceita.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gzip
+import json
+
+import pytest
+from starlette.requests import Request
+
+from api.respostas import (
+    GZIP_MIN_BYTES, aceita_gzip, compactar_resultado, formato_resposta, resposta_json, serializar,
+)
+
+ENTIDADE = {
+    "tipo": "CPF", "valor": "210.201.140-24", "confianca": 0.8, "fonte": "regex",
+    "peso": 5, "inicio": 32, "fim": 46, "votacao_motivo": "documento_validado",
+}
+RESULTADO_V2 = {
+    "id": "42", "analysis_id": "abc", "has_pii": True, "entities": [ENTIDADE],
+    "risk_level": "CRITICO", "confidence_all_found": 0.8, "total_entities": 1,
+    "sources_used": ["regex"], "classificacao": "NÃO PÚBLICO", "risco": "CRITICO",
+    "confianca": 0.8, "detalhes": [ENTIDADE],
+}
+
+
+def _request(headers=None, query=""):
+    return Request({
+        "type": "http", "method": "POST", "path": "/analyze", "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    })
+
+
+def test_compacto_sem_campos_duplicados():
+    compacto = compactar_resultado(RESULTADO_V2)
+    assert compacto == {
+        "id": "42", "aid": "abc", "pii": True, "risco": "CRITICO", "conf": 0.8,
+        "ents": [{"t": "CPF", "v": "210.201.140-24", "c": 0.8, "f": "regex",
+                  "p": 5, "i": 32, "e": 46, "m": "documento_validado"}],
+    }
+    assert len(serializar(compacto)) < len(serializar(RESULTADO_V2)) / 2
+
+
+def test_texto_curto_leva_aviso():
+    curto = {"id": None, "analysis_id": None, "has_pii": False, "entities": [], "risco": "BAIXO",
+             "confianca": 1.0, "_warning": "Texto muito curto"}
+    assert compactar_resultado(curto)["w"] == "Texto muito curto"
+
+
+def test_formato_por_query_ou_cabecalho():
+    assert formato_resposta(_request(), None) == "v2"
+    assert formato_resposta(_request({"X-Response-Format": "compact"}), None) == "compact"
+    assert formato_resposta(_request({"X-Response-Format": "compact"}), "v2") == "v2"
+    assert formato_resposta(_request({"X-Response-Format": "xml"}), None) == "v2"
+
+
+def test_serializar_acentos_e_numpy():
+    np = pytest.importorskip("numpy")
+    corpo = serializar({"classificacao": "NÃO PÚBLICO", "c": np.float32(0.5)})
+    assert json.loads(corpo) == {"classificacao": "NÃO PÚBLICO", "c": 0.5}
+    assert "NÃO".encode("utf-8") in corpo
+
+
+@pytest.mark.parametrize("cabecalho,esperado", [
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("*", True),
+    ("identity", False),
+    ("", False),
+])
+def test_aceita_gzip(cabecalho, esperado):
+    assert aceita_gzip(_request({"Accept-Encoding": cabecalho})) is esperado
+
+
+def test_batch_gzip_negociado():
+    conteudo = {"total": 200, "results": [compactar_resultado(RESULTADO_V2)] * 200}
+    assert len(serializar(conteudo)) > GZIP_MIN_BYTES
+
+    comprimida = resposta_json(_request({"Accept-Encoding": "gzip"}), conteudo, comprimir=True)
+    assert comprimida.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(comprimida.body)) == conteudo
+
+    sem_gzip = resposta_json(_request(), conteudo, comprimir=True)
+    assert "content-encoding" not in sem_gzip.headers
+    assert sem_gzip.headers["vary"] == "Accept-Encoding"
+    assert json.loads(sem_gzip.body) == conteudo
+
+    pequena = resposta_json(_request({"Accept-Encoding": "gzip"}), {"total": 0}, comprimir=True)
+    assert "content-encoding" not in pequena.headers
@@ -0,0 +1,157 @@
+"""
+Testes da memoização do NER por segmento (src/inference/segmentos_ner.py).
+
+Linhas já vistas (saudação, preâmbulo da LAI, encerramento) não devem voltar
+ao modelo; as entidades remontadas precisam ter os mesmos offsets que a
+inferência direta. Pipelines falsos substituem BERT e spaCy.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.inference.segmentos_ner import CacheSegmentosNER, segmentar
+from test_fragmentacao_ner import PipelineFalso, RE_NOMES
+
+SAUDACAO = "Prezados senhores, boa tarde."
+PREAMBULO = "Com fundamento na Lei nº 12.527/2011 (Lei de Acesso à Informação), solicito:"
+ENCERRAMENTO = "Atenciosamente,"
+
+
+def _pedido(miolo):
+    return f"{SAUDACAO}\n\n  {PREAMBULO}\n{miolo}\n{ENCERRAMENTO}\nMaria Aparecida Souza\n"
+
+
+class SpacyFalso:
+    """Imita nlp.pipe do spaCy para os nomes de RE_NOMES."""
+
+    def __init__(self):
+        self.chamadas = []
+
+    def pipe(self, textos, batch_size=1):
+        textos = list(textos)
+        self.chamadas.append(textos)
+        for texto in textos:
+            yield SimpleNamespace(ents=[
+                SimpleNamespace(label_="PER", text=m.group(), start_char=m.start(), end_char=m.end())
+                for m in RE_NOMES.finditer(texto)
+            ])
+
+
+def _inferencia(pipeline):
+    return lambda segmentos: [pipeline._entidades(s) for s in segmentos]
+
+
+def test_segmentar_linhas_sem_espacos():
+    texto = _pedido("Quero saber do contrato de José Carlos Pereira.")
+    spans = segmentar(texto)
+    assert [texto[a:b] for a, b in spans] == [
+        SAUDACAO, PREAMBULO, "Quero saber do contrato de José Carlos Pereira.",
+        ENCERRAMENTO, "Maria Aparecida Souza",
+    ]
+    assert segmentar("   \n\n") == []
+
+
+def test_boilerplate_nao_volta_ao_modelo():
+    pipeline = PipelineFalso()
+    cache = CacheSegmentosNER("bert")
+    primeiro = _pedido("Quero saber do contrato de José Carlos Pereira.")
+    segundo = _pedido("Peço a lista de servidores da unidade de Ana Beatriz Lima.")
+    enviados = []
+
+    def inferencia(segmentos):
+        enviados.append(list(segmentos))
+        return _inferencia(pipeline)(segmentos)
+
+    cache.inferir("bert:v1", [primeiro], inferencia)
+    cache.inferir("bert:v1", [segundo], inferencia)
+    # Do segundo pedido só a linha nova foi ao modelo
+    assert enviados[1] == ["Peço a lista de servidores da unidade de Ana Beatriz Lima."]
+    cache.inferir("bert:v1", [primeiro, segundo], inferencia)
+    assert len(enviados) == 2
+
+    metricas = cache.metricas()
+    assert metricas["misses"] == 6
+    assert metricas["hits"] == 4 + 10
+    assert metricas["tempo_economizado_s"] >= 0
+
+
+def test_offsets_iguais_a_inferencia_direta():
+    pipeline = PipelineFalso()
+    cache = CacheSegmentosNER("bert")
+    textos = [_pedido("Contrato de José Carlos Pereira e Ana Beatriz Lima."), "", "sem nomes aqui"]
+    for _ in range(2):
+        obtidos = cache.inferir("bert:v1", textos, _inferencia(pipeline))
+        assert obtidos == [pipeline._entidades(t) for t in textos]
+
+
+def test_lru_limita_memoria():
+    pipeline = PipelineFalso()
+    cache = CacheSegmentosNER("bert", max_itens=3)
+    texto = "\n".join(f"linha {i}" for i in range(10))
+    cache.inferir("bert:v1", [texto], _inferencia(pipeline))
+    metricas = cache.metricas()
+    assert metricas["segmentos_em_cache"] == 3
+    assert metricas["removidos_lru"] == 7
+
+
+def test_trocar_modelo_nao_reaproveita_saida():
+    cache = CacheSegmentosNER("bert")
+    texto = _pedido("Contrato de José Carlos Pereira.")
+    cache.inferir("bert:onnx:fp32:1", [texto], lambda segs: [[] for _ in segs])
+    novo = PipelineFalso()
+    assert cache.inferir("bert:onnx:int8:2", [texto], _inferencia(novo)) == [novo._entidades(texto)]
+
+
+def test_recarregar_ner_muda_versao_e_limpa_cache(detector, monkeypatch):
+    # Estado do detector da sessão restaurado pelo monkeypatch no fim
+    for atributo in ("nlp_bert", "nlp_nuner", "ner_int8", "_geracao_ner", "_assinatura_base"):
+        monkeypatch.setattr(detector, atributo, getattr(detector, atributo))
+    monkeypatch.setattr(detector, "cache_segmentos_ner", {"bert": CacheSegmentosNER("bert")})
+    monkeypatch.setattr(detector, "_criar_pipeline_ner", lambda *a: PipelineFalso())
+    cache = detector.cache_segmentos_ner["bert"]
+    texto = _pedido("Contrato de José Carlos Pereira.")
+    cache.inferir(detector._versao_ner("bert"), [texto], lambda segs: [[] for _ in segs])
+    antes, assinatura = detector._versao_ner("bert"), detector._assinatura_base
+
+    detector.recarregar_ner(int8=not detector.ner_int8)
+    assert detector._versao_ner("bert") != antes
+    assert detector._assinatura_base != assinatura
+    assert cache.metricas()["segmentos_em_cache"] == 0
+
+
+def test_detector_bert_com_cache_de_segmentos(detector, monkeypatch):
+    pipeline = PipelineFalso()
+    monkeypatch.setattr(detector, "nlp_bert", pipeline)
+    monkeypatch.setattr(detector, "cache_segmentos_ner", {"bert": CacheSegmentosNER("bert")})
+    # Só o cache aqui: o filtro de candidatos tiraria as linhas sem nome da contagem
+    monkeypatch.setattr(detector, "filtro_nome", None)
+    texto = _pedido("Quero saber do contrato de José Carlos Pereira.")
+
+    direto = detector._inferir_ner(pipeline, [texto], 1)
+    assert detector._inferir_ner(pipeline, [texto], 1, modelo="bert") == direto
+    findings = detector._detectar_ner_bert_only(texto)
+    assert len(pipeline.chamadas) == 2  # direto + primeira passagem pelo cache
+    for f in findings:
+        assert texto[f["inicio"]:f["fim"]] == f["valor"]
+    assert detector.metricas_segmentos_ner()["bert"]["hits"] == 5
+
+
+def test_detector_spacy_com_cache_de_segmentos(detector, monkeypatch):
+    spacy = SpacyFalso()
+    monkeypatch.setattr(detector, "nlp_spacy", spacy)
+    monkeypatch.setattr(detector, "cache_segmentos_ner", {"spacy": CacheSegmentosNER("spacy")})
+    textos = [_pedido("Contrato de José Carlos Pereira."), _pedido("Contrato de Ana Beatriz Lima.")]
+
+    entidades = detector._entidades_spacy(textos, 4)
+    assert len(spacy.chamadas) == 1
+    assert [[(e["start"], e["end"]) for e in ents] for ents in entidades] == [
+        [(m.start(), m.end()) for m in RE_NOMES.finditer(t)] for t in textos
+    ]
+    # Mesmo pós-processamento com entidades do lote ou calculadas na hora
+    for texto, ents in zip(textos, entidades):
+        assert detector._detectar_ner_spacy_only(texto, ents) == detector._detectar_ner_spacy_only(texto)
+    assert len(spacy.chamadas) == 1
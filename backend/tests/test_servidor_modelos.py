@@ -0,0 +1,126 @@
+"""
+Testes do servidor de modelos (src/servidor_modelos.py).
+
+O ClienteModelos deve devolver o mesmo que o PIIDetector local, e os
+detect() simultâneos de vários clientes devem chegar ao detector em lotes.
+
+O detector é carregado via fixture global em conftest.py (scope=session).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+import pytest
+
+from src.servidor_modelos import ClienteModelos, ServidorModelos, ServidorModelosIndisponivel, detector_do_ambiente
+from test_benchmark import DATASET_LGPD
+
+TEXTOS = [texto for texto, _, _, _ in DATASET_LGPD[:24]]
+
+
+@pytest.fixture(scope="module")
+def servidor(detector):
+    # Caminho curto: sockets Unix têm limite de ~100 caracteres
+    pasta = tempfile.mkdtemp(prefix="pii")
+    servidor = ServidorModelos(detector, os.path.join(pasta, "modelos.sock"), tamanho_lote=8, espera_lote=0.05)
+    servidor.iniciar()
+    yield servidor
+    servidor.encerrar()
+    shutil.rmtree(pasta, ignore_errors=True)
+
+
+@pytest.fixture
+def cliente(servidor):
+    return ClienteModelos(servidor.endereco)
+
+
+def test_resultados_iguais_ao_detector_local(detector, cliente):
+    assert cliente.ping()
+    for texto in TEXTOS[:8]:
+        assert cliente.detect(texto) == detector.detect(texto)
+        assert cliente.detect(texto, mode="classify") == detector.detect(texto, mode="classify")
+    assert cliente.detect_many(TEXTOS, batch_size=4, explain=False) == detector.detect_many(
+        TEXTOS, batch_size=4, explain=False
+    )
+    assert list(cliente.iter_detect_many(iter(TEXTOS), batch_size=2, explain=False)) == detector.detect_many(
+        TEXTOS, explain=False
+    )
+
+
+def test_detect_simultaneos_vao_em_lote(detector, servidor, cliente):
+    antes = servidor.metricas()
+    with ThreadPoolExecutor(8) as pool:
+        resultados = list(pool.map(lambda t: cliente.detect(t, explain=False), TEXTOS))
+    assert resultados == [detector.detect(t, explain=False) for t in TEXTOS]
+
+    depois = servidor.metricas()
+    textos = depois["textos_em_lote"] - antes["textos_em_lote"]
+    lotes = depois["lotes"] - antes["lotes"]
+    assert textos == len(TEXTOS)
+    assert lotes < len(TEXTOS)
+
+
+def test_erros_chegam_ao_cliente(cliente):
+    with pytest.raises(ValueError):
+        cliente.detect(TEXTOS[0], mode="rapido")
+    with pytest.raises(ValueError):
+        cliente._chamar("__init__")
+    # A conexão segue utilizável depois de um erro
+    assert cliente.ping()
+    assert "servidor_modelos" in cliente.metricas_cache()
+
+
+def test_detector_do_ambiente_usa_servidor(servidor, monkeypatch):
+    monkeypatch.setenv("PII_MODEL_SERVER", servidor.endereco)
+    cliente = detector_do_ambiente(usar_gpu=False)
+    assert isinstance(cliente, ClienteModelos) and cliente.ping()
+
+
+def test_conexao_exige_a_chave_do_servidor(servidor):
+    chave = servidor.endereco + ".key"
+    assert os.stat(chave).st_mode & 0o777 == 0o600
+    assert os.stat(os.path.dirname(servidor.endereco)).st_mode & 0o777 == 0o700
+    with pytest.raises(AuthenticationError):
+        ClienteModelos(servidor.endereco, authkey=b"chave errada").ping()
+    # O servidor segue atendendo quem tem a chave
+    assert ClienteModelos(servidor.endereco).ping()
+
+
+def test_servidor_recusa_diretorio_compartilhado(detector, tmp_path):
+    pasta = tmp_path / "compartilhado"
+    pasta.mkdir()
+    os.chmod(pasta, 0o777)
+    with pytest.raises(PermissionError):
+        ServidorModelos(detector, str(pasta / "modelos.sock")).iniciar()
+    assert not os.path.exists(pasta / "modelos.sock")
+
+
+def test_servidor_sem_resposta_estoura_o_timeout():
+    pasta = tempfile.mkdtemp(prefix="pii")
+    endereco = os.path.join(pasta, "mudo.sock")
+    listener = Listener(endereco, family="AF_UNIX", authkey=b"chave")
+    conexoes = []
+
+    def aceitar_sem_responder():
+        for _ in range(2):
+            conexoes.append(listener.accept())
+
+    threading.Thread(target=aceitar_sem_responder, daemon=True).start()
+    try:
+        inicio = time.monotonic()
+        with pytest.raises(ServidorModelosIndisponivel):
+            ClienteModelos(endereco, authkey=b"chave", timeout=0.2).ping()
+        # Uma nova tentativa, com conexão nova, e não uma espera sem fim
+        assert time.monotonic() - inicio < 5
+        assert len(conexoes) == 2
+    finally:
+        listener.close()
+        shutil.rmtree(pasta, ignore_errors=True)
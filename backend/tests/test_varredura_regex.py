@@ -0,0 +1,110 @@
+"""
+Testes da varredura única de regex (src/varredura_regex.py).
+
+A varredura deve devolver exatamente os mesmos matches, na mesma ordem, que
+o loop `for pattern in patterns: pattern.finditer(texto)` que ela substitui,
+sobre os textos das suítes de regex e do benchmark LGPD.
+"""
+import sys
+import os
+import re
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.varredura_regex import VarreduraRegex, _primeiro_caractere
+from test_benchmark import DATASET_LGPD
+import test_edge_cases
+import test_regex_gdf
+
+
+def _textos_das_suites():
+    textos = [texto for texto, _, _, _ in DATASET_LGPD]
+    textos += [caso[0] for caso in test_regex_gdf.CASES]
+    for marca in test_edge_cases.test_edge_cases.pytestmark:
+        if marca.name == "parametrize":
+            textos += [caso[0] for caso in marca.args[1]]
+    return textos
+
+
+TEXTOS = _textos_das_suites()
+
+
+def _finditer(patterns, texto):
+    return [
+        (nome, m.span(), m.groups())
+        for nome, pattern in patterns.items()
+        for m in pattern.finditer(texto)
+    ]
+
+
+def _varredura(varredura, texto):
+    return [(nome, m.span(), m.groups()) for nome, m in varredura.iterar(texto)]
+
+
+@pytest.fixture(scope="module")
+def patterns(detector):
+    return detector.patterns_compilados
+
+
+def test_todos_patterns_do_detector_combinados(detector):
+    assert detector.varredura_regex.isolados == []
+    assert detector.varredura_regex.nomes == list(detector.patterns_compilados)
+
+
+def test_equivalente_ao_finditer_nas_suites(detector, patterns):
+    for texto in TEXTOS:
+        assert _varredura(detector.varredura_regex, texto) == _finditer(patterns, texto), texto
+
+
+def test_equivalente_no_documento_concatenado(detector, patterns):
+    # Matches de vários tipos se sobrepondo em um texto longo
+    texto = "\n".join(TEXTOS)
+    assert _varredura(detector.varredura_regex, texto) == _finditer(patterns, texto)
+
+
+def test_equivalente_em_recortes_aleatorios(detector, patterns):
+    rnd = random.Random(9)
+    texto = " ".join(TEXTOS)
+    for _ in range(200):
+        a = rnd.randrange(len(texto))
+        recorte = texto[a:a + rnd.randint(1, 300)]
+        assert _varredura(detector.varredura_regex, recorte) == _finditer(patterns, recorte), recorte
+
+
+def test_primeiro_caractere():
+    assert _primeiro_caractere(re.compile(r"\bCPF\s*\d")).match("C") is not None
+    assert _primeiro_caractere(re.compile(r"\bCPF\s*\d", re.I)).match("c") is not None
+    assert _primeiro_caractere(re.compile(r"\bCPF\s*\d")).match("c") is None
+    assert _primeiro_caractere(re.compile(r"(?<!\d)\(?\d{2}")).match("(") is not None
+    assert _primeiro_caractere(re.compile(r"(?:a)?b")).match("b") is not None
+    # Sem como restringir: testado em toda posição
+    assert _primeiro_caractere(re.compile(r"[^a]x")) is None
+    assert _primeiro_caractere(re.compile(r"x?")) is None
+
+
+def test_patterns_isolados_e_match_vazio():
+    patterns = {
+        "NOMEADO": re.compile(r"(?P<n>\d+)-(?P=n)"),
+        "VAZIO": re.compile(r"a*"),
+        "DIGITOS": re.compile(r"\d{3}"),
+        "PALAVRA": re.compile(r"\b[a-z]+\b", re.IGNORECASE),
+    }
+    varredura = VarreduraRegex(patterns)
+    varredura.MAX_PATTERNS_FINDITER = 0  # força a passada única mesmo com poucos patterns
+    assert varredura.isolados == ["NOMEADO"]
+    for texto in ["12-12 aaa 1234 Baa", "", "a", "999-999aa"]:
+        assert _varredura(varredura, texto) == _finditer(patterns, texto)
+
+
+def test_selecao_de_patterns(detector, patterns):
+    nomes = ["CPF", "EMAIL_PESSOAL", "TELEFONE_FIXO", "CEP", "PROCESSO_SEI", "DADO_SAUDE"]
+    subconjunto = {nome: pattern for nome, pattern in patterns.items() if nome in nomes}
+    for texto in TEXTOS:
+        obtido = _varredura_nomes(detector.varredura_regex, texto, nomes)
+        assert obtido == _finditer(subconjunto, texto), texto
+
+
+def _varredura_nomes(varredura, texto, nomes):
+    return [(nome, m.span(), m.groups()) for nome, m in varredura.iterar(texto, nomes)]
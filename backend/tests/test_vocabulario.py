@@ -0,0 +1,79 @@
+"""
+Testes do motor de vocabulários (src/vocabulario.py).
+
+Cada consulta do motor deve responder exatamente como a varredura linear
+que ela substitui no detector, sobre textos gerados a partir dos próprios
+termos do allow_list.py.
+"""
+import sys
+import os
+import re
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from src.allow_list import (
+    TERMOS_SEGUROS, GATILHOS_CONTATO, INDICADORES_SERVIDOR, CARGOS_AUTORIDADE,
+    CONTEXTOS_POSITIVOS_CPF,
+)
+from src.vocabulario import (
+    criar_motores_vocabulario, TERMO_SEGURO, GATILHO_CONTATO, INDICADOR_SERVIDOR,
+    CARGO_AUTORIDADE, CONTEXTO_POSITIVO_CPF,
+)
+
+MOTOR, MOTOR_CPF = criar_motores_vocabulario()
+VOCABULARIOS = {
+    TERMO_SEGURO: TERMOS_SEGUROS,
+    GATILHO_CONTATO: GATILHOS_CONTATO,
+    INDICADOR_SERVIDOR: INDICADORES_SERVIDOR,
+    CARGO_AUTORIDADE: CARGOS_AUTORIDADE,
+}
+PECAS = sorted(set().union(*VOCABULARIOS.values())) + ["JOSE", "MARIA", ".", " ", "  ", "X", "DRAGAO", "A"]
+
+
+def _textos(n=300, seed=7):
+    rnd = random.Random(seed)
+    for _ in range(n):
+        yield "".join(rnd.choice(PECAS) + rnd.choice(["", " ", ". "]) for _ in range(rnd.randint(0, 8)))
+
+
+def test_tem_igual_varredura_linear():
+    for texto in _textos():
+        resultado = MOTOR.buscar(texto)
+        for categoria, termos in VOCABULARIOS.items():
+            assert resultado.tem(categoria) == any(t in texto for t in termos)
+            assert resultado.tem(categoria, fim_max=50) == any(t in texto[:50] for t in termos)
+            assert MOTOR.contem(texto, categoria) == any(t in texto for t in termos)
+
+
+def test_primeiras_posicoes_igual_find():
+    for texto in _textos():
+        posicoes = MOTOR.buscar(texto).primeiras_posicoes(GATILHO_CONTATO)
+        esperado = {g: texto.find(g) for g in GATILHOS_CONTATO if g in texto}
+        assert posicoes == esperado
+
+
+def test_termina_com_igual_regex_de_cargo():
+    casos = list(_textos()) + ["CONTATO COM O DR.", "FALAR COM A SRA  ", "DRA", "XDR.", "O DR. .", "MM.", ""]
+    for texto in casos:
+        texto = texto.strip()  # como _normalizar()
+        esperado = any(re.search(rf"\b{cargo}\.?\s*$", texto) for cargo in CARGOS_AUTORIDADE)
+        assert MOTOR.buscar(texto).termina_com(CARGO_AUTORIDADE) == esperado, texto
+
+
+def test_contexto_positivo_cpf():
+    for contexto in ["meu cpf é 123", "informou seu cpf", "cpf com dígito verificador", "número 123", ""]:
+        esperado = any(kw in contexto for kw in CONTEXTOS_POSITIVOS_CPF)
+        assert MOTOR_CPF.contem(contexto, CONTEXTO_POSITIVO_CPF) == esperado
+
+
+def test_ocorrencias_com_offsets_e_categoria():
+    resultado = MOTOR.buscar("FALAR COM O SERVIDOR DO GDF")
+    por_categoria = {(o.termo, o.categoria) for o in resultado.ocorrencias}
+    assert ("FALAR COM O", GATILHO_CONTATO) in por_categoria
+    assert ("SERVIDOR", INDICADOR_SERVIDOR) in por_categoria
+    assert ("SERVIDOR", GATILHO_CONTATO) in por_categoria
+    assert ("GDF", TERMO_SEGURO) in por_categoria
+    for o in resultado.ocorrencias:
+        assert resultado.texto[o.inicio:o.fim] == o.termo
@@ -100,6 +100,7 @@ export interface AnalyzeResponseV2 {
     valor: string;
     confianca: number;
     fonte?: string;
+    explicacao?: ExplicacaoXAI;
   }>;
   risk_level: string;
   confidence_all_found: number;
@@ -353,7 +354,8 @@ class ApiClient {
 
   async analyzeText(text: string): Promise<AnalysisResult> {
     // Novo endpoint: /analyze com body { "text": "..." }
-    const response = await this.request<AnalyzeResponseV2>('/analyze', {
+    // explain=true: a tela de classificação exibe as explicações (XAI)
+    const response = await this.request<AnalyzeResponseV2>('/analyze?explain=true', {
       method: 'POST',
       body: JSON.stringify({ text }),
     });
@@ -391,7 +393,7 @@ class ApiClient {
 
       try {
         // Envia o ID junto com o texto para a API
-        const response = await this.request<AnalyzeResponseV2>('/analyze', {
+        const response = await this.request<AnalyzeResponseV2>('/analyze?explain=true', {
           method: 'POST',
           body: JSON.stringify({ id, text }),
         });